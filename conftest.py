@@ -0,0 +1,7 @@
+"""Puts the repository root on sys.path so the tests import fusion360 as a package
+
+The Fusion 360 scripts under fusion360/ (simple_test.py among them) need the
+real adsk package and are not tests.
+"""
+
+collect_ignore = ["fusion360"]
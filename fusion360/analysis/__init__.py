@@ -0,0 +1,17 @@
+"""
+OKP Sight - Numerical Analysis
+Checks of the design that run on plain Python and NumPy, without Fusion 360
+or the headless stand-in
+
+    optics.py    ray trace of the LED -> protective glass -> reflector path
+    parallax.py  point-of-aim shift across the eye box from LED placement error
+    reticle.py   reticle mask artwork (PNG at any pitch, SVG, DXF), cached
+    packaging.py Pareto search of length, mass and collimation under packaging constraints
+    walls.py     thinnest walls between cavities and to the outside, against ASA/CNC limits
+    mesher.py    watertight preview meshes of the body and mount by dual contouring
+    battery.py   Monte Carlo battery runtime over dot, light and laser usage profiles
+    sdf.py       signed distances to the cavity and shell primitives
+    images.py    PNG and heatmap output without an imaging library
+
+Run a module from the repository root, e.g. `python -m fusion360.analysis.optics`.
+"""
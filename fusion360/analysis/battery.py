@@ -0,0 +1,271 @@
+"""
+OKP Sight - Battery Runtime
+Monte Carlo runtime of the 18650 cell over mixed dot, light and laser use
+
+Usage (from the repository root):
+    python -m fusion360.analysis.battery
+    python -m fusion360.analysis.battery --scenario mixed --profiles 100000 --out runtime.csv
+
+The figures come from electronics/bom.md. The red dot takes 20 mA at 3 V at
+full brightness (set by the rear potentiometer). The XP-L light driver
+gives 1-1.5 A at 6 V, and the green laser module takes 200-300 mA at 3 V.
+All three run from one 3000 mAh 18650 cell through their drivers (DRIVERS).
+The 3.3 V regulator draws QUIESCENT while the sight is on.
+
+A usage profile is one user: a dot brightness, a rate and mean length of
+light bursts, a rate and mean length of laser activations, and an ambient
+temperature, drawn from the ranges of a SCENARIOS entry. The light and
+laser drivers get a current in their range too. Every profile is stepped
+through time together, STEP hours at a time, as arrays. In each step the
+number of bursts is Poisson and their total length is Gamma distributed.
+The cell is an open-circuit voltage curve over state of charge
+(OPEN_CIRCUIT) behind an internal resistance. Each driver is a constant
+power load, so its current rises as the cell voltage drops. A profile
+ends when the charge drawn reaches the capacity, or when the terminal
+voltage under its heaviest load that step falls below CUTOFF_VOLTAGE. Cold
+lowers the usable capacity and raises the resistance.
+
+Printed: runtime percentiles per scenario, the mean share of the capacity
+left stranded when a burst pulls the voltage under the cutoff, and the
+share of profiles meeting the README runtime claim. Written to
+--out: a histogram of the runtimes, one column per scenario.
+"""
+
+import argparse
+import csv
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# 18650 cell
+CAPACITY = 3000.0  # mAh at 25 °C and low rate
+CUTOFF_VOLTAGE = 3.0  # V at the terminals, the protection board and driver undervoltage lockout
+RESISTANCE = 0.07  # ohm at 25 °C, cell plus protection board
+RESISTANCE_PER_DEGREE = 0.025  # resistance grows by exp(this * degrees below 25 °C)
+CAPACITY_PER_DEGREE = 0.006  # share of capacity lost per degree below 25 °C
+MIN_CAPACITY = 0.5  # usable share of capacity in the coldest conditions
+OPEN_CIRCUIT = np.array([  # (state of charge, volts), typical NMC 18650 at rest
+    (0.00, 3.00), (0.05, 3.30), (0.10, 3.45), (0.20, 3.56), (0.30, 3.63), (0.40, 3.69),
+    (0.50, 3.75), (0.60, 3.82), (0.70, 3.90), (0.80, 3.98), (0.90, 4.07), (1.00, 4.20)])
+QUIESCENT = 0.0005  # W, 3.3 V regulator and protection board while switched on
+
+# Drivers: output current range in A, output volts, efficiency from the cell
+Driver = namedtuple("Driver", "low high volts efficiency")
+DRIVERS = {
+    "dot": Driver(0.020, 0.020, 3.0, 0.85),
+    "light": Driver(1.0, 1.5, 6.0, 0.85),
+    "laser": Driver(0.200, 0.300, 3.0, 0.80),
+}
+
+# Usage ranges: dot brightness (share of full current, uniform), median light bursts
+# and laser activations per hour (log-normal across users), their mean length in
+# seconds, ambient temperature (mean, standard deviation) in °C
+Usage = namedtuple("Usage", "brightness light_rate light_seconds laser_rate laser_seconds temperature")
+SCENARIOS = {
+    "dot": Usage((0.3, 1.0), 0.0, 0.0, 0.0, 0.0, (20.0, 8.0)),
+    "mixed": Usage((0.3, 1.0), 2.0, 30.0, 4.0, 10.0, (15.0, 10.0)),
+    "heavy": Usage((0.5, 1.0), 6.0, 60.0, 10.0, 15.0, (5.0, 12.0)),
+}
+CLAIMS = {"dot": (185.0, 185.0), "mixed": (20.0, 30.0)}  # README.md, hours
+RATE_SPREAD = 0.6  # log-normal sigma of the burst rates across users
+BURST_SHAPE = 1.5  # Gamma shape of one burst length (coefficient of variation 1/sqrt)
+TEMPERATURE_RANGE = (-20.0, 45.0)  # °C
+
+PROFILES = 100_000
+STEP = 0.5  # hours
+QUIET_STEP = 2.0  # hours, for scenarios without bursts: a constant load needs no finer step
+MAX_HOURS = 1000.0
+COMPACT = 0.75  # drop finished profiles from the arrays once fewer than this share are still running
+HISTOGRAM_BINS = 60
+
+# One array entry per profile; dot, light, laser are driver output powers in W,
+# light_rate and laser_rate per hour, light_seconds and laser_seconds mean burst lengths
+Profiles = namedtuple("Profiles", "dot light laser light_rate light_seconds laser_rate laser_seconds temperature")
+# hours (N,) runtime; stranded (N,) share of the usable capacity left when the voltage sagged out, 0 if drained
+Runtime = namedtuple("Runtime", "hours stranded")
+
+
+def sample_profiles(usage, count, rng):
+    """count usage profiles drawn from the ranges of usage"""
+    def power(name, size):
+        driver = DRIVERS[name]
+        return rng.uniform(driver.low, driver.high, size) * driver.volts
+
+    def rate(median):
+        return median * rng.lognormal(0.0, RATE_SPREAD, count) if median else np.zeros(count)
+
+    dot = DRIVERS["dot"]
+    temperature = np.clip(rng.normal(*usage.temperature, count), *TEMPERATURE_RANGE)
+    return Profiles(
+        dot=rng.uniform(*usage.brightness, count) * dot.high * dot.volts,
+        light=power("light", count), laser=power("laser", count),
+        light_rate=rate(usage.light_rate), light_seconds=np.full(count, float(usage.light_seconds)),
+        laser_rate=rate(usage.laser_rate), laser_seconds=np.full(count, float(usage.laser_seconds)),
+        temperature=temperature)
+
+
+# ==============================================================================
+# CELL MODEL
+# ==============================================================================
+
+def open_circuit(charge):
+    """Rest voltage at state of charge (0..1)"""
+    return np.interp(charge, OPEN_CIRCUIT[:, 0], OPEN_CIRCUIT[:, 1])
+
+
+def usable_capacity(temperature):
+    """mAh the cell gives at an ambient temperature in °C"""
+    loss = CAPACITY_PER_DEGREE * np.maximum(25.0 - temperature, 0.0)
+    return CAPACITY * np.maximum(1.0 - loss, MIN_CAPACITY)
+
+
+def resistance(temperature):
+    return RESISTANCE * np.exp(RESISTANCE_PER_DEGREE * np.maximum(25.0 - temperature, 0.0))
+
+
+def draw(voltage, ohms, watts):
+    """(current A, terminal volts) of a constant power load on a cell at rest voltage
+
+    The terminal voltage is 0 where the cell cannot deliver the power at all.
+    """
+    discriminant = voltage * voltage - 4.0 * ohms * watts
+    current = (voltage - np.sqrt(np.maximum(discriminant, 0.0))) / (2.0 * ohms)
+    return current, np.where(discriminant >= 0.0, voltage - current * ohms, 0.0)
+
+
+def on_seconds(rng, rate, mean, step):
+    """Total seconds of bursts in one step: a Poisson count of Gamma lengths"""
+    seconds = np.zeros(len(rate))
+    if not rate.any():
+        return seconds
+    count = rng.poisson(rate * step)
+    active = np.flatnonzero(count)
+    if len(active):
+        seconds[active] = rng.gamma(count[active] * BURST_SHAPE, mean[active] / BURST_SHAPE)
+    return np.minimum(seconds, step * 3600.0)
+
+
+# ==============================================================================
+# SIMULATION
+# ==============================================================================
+
+def simulate(profiles, rng, step=STEP, max_hours=MAX_HOURS):
+    """Runtime of every profile, all stepped together; profiles still running at max_hours get max_hours"""
+    count = len(profiles.dot)
+    hours = np.full(count, float(max_hours))
+    stranded = np.zeros(count)
+
+    # One row per quantity, one column per profile: constant cell loads (the dot and the regulator), the light and the
+    # laser on top, capacity, resistance, burst rates and lengths, then the state of charge
+    rows = np.stack([profiles.dot / DRIVERS["dot"].efficiency + QUIESCENT,
+                     profiles.light / DRIVERS["light"].efficiency,
+                     profiles.laser / DRIVERS["laser"].efficiency,
+                     usable_capacity(profiles.temperature), resistance(profiles.temperature),
+                     profiles.light_rate, profiles.light_seconds,
+                     profiles.laser_rate, profiles.laser_seconds, np.ones(count)])
+    bursts = bool(profiles.light_rate.any() or profiles.laser_rate.any())
+    if not bursts:
+        step = max(step, QUIET_STEP)
+    running = np.arange(count)
+    live = np.ones(count, dtype=bool)
+
+    elapsed = 0.0
+    while len(running) and elapsed < max_hours:
+        base, light, laser, capacity, ohms, light_rate, light_seconds, laser_rate, laser_seconds, charge = rows
+        voltage = open_circuit(charge)
+        current, resting = draw(voltage, ohms, base)
+        lowest = resting.copy()
+        amp_seconds = current * (step * 3600.0)
+        if bursts:
+            for watts, rate, mean in ((light, light_rate, light_seconds), (laser, laser_rate, laser_seconds)):
+                seconds = on_seconds(rng, rate, mean, step)
+                on = np.flatnonzero(seconds)
+                if len(on):
+                    peak, terminal = draw(voltage[on], ohms[on], base[on] + watts[on])
+                    amp_seconds[on] += (peak - current[on]) * seconds[on]
+                    lowest[on] = np.minimum(lowest[on], terminal)
+
+        used = amp_seconds * (1000.0 / 3600.0) / capacity  # share of the usable capacity
+        # A cell too low for the dot alone is empty; one that only drops out under a burst sagged
+        empty = live & ((used >= charge) | (resting < CUTOFF_VOLTAGE))
+        sagged = live & ~empty & (lowest < CUTOFF_VOLTAGE)
+        hours[running[sagged]] = elapsed
+        stranded[running[sagged]] = charge[sagged]
+        hours[running[empty]] = elapsed + step * np.minimum(charge[empty] / used[empty], 1.0)
+        live &= ~(empty | sagged)
+        charge -= used
+
+        # Finished profiles ride along until dropping them is worth a copy
+        if live.sum() < COMPACT * len(live):
+            rows, running = rows[:, live], running[live]
+            live = np.ones(len(running), dtype=bool)
+        elapsed += step
+    return Runtime(hours, stranded)
+
+
+def run_scenario(name, count=PROFILES, seed=0, step=STEP, max_hours=MAX_HOURS):
+    """Runtime of count profiles drawn from SCENARIOS[name]"""
+    rng = np.random.default_rng(seed)
+    return simulate(sample_profiles(SCENARIOS[name], count, rng), rng, step, max_hours)
+
+
+# ==============================================================================
+# OUTPUT
+# ==============================================================================
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def format_runtime(name, runtime):
+    """One table row: mean and percentiles in hours, mean charge stranded by sag, share meeting the claim"""
+    hours = runtime.hours
+    cells = [f"{value:7.1f}" for value in np.percentile(hours, PERCENTILES)]
+    row = f"{name:<8}{hours.mean():8.1f} " + " ".join(cells) + f"  {runtime.stranded.mean():8.1%}"
+    if name in CLAIMS:
+        low, high = CLAIMS[name]
+        claim = f"{low:g} h" if low == high else f"{low:g}-{high:g} h"
+        row += f"  {(hours >= low).mean():6.1%} >= {claim}"
+    return row
+
+
+def write_histogram(path, runtimes, bins=HISTOGRAM_BINS):
+    """CSV of runtime counts per bin, one column per scenario"""
+    top = max(float(runtime.hours.max()) for runtime in runtimes.values())
+    edges = np.linspace(0.0, math.ceil(top), bins + 1)
+    counts = {name: np.histogram(runtime.hours, edges)[0] for name, runtime in runtimes.items()}
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["from_h", "to_h"] + list(counts))
+        for i in range(bins):
+            writer.writerow([f"{edges[i]:.2f}", f"{edges[i + 1]:.2f}"] + [int(c[i]) for c in counts.values()])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), default=None,
+                        help="usage scenario (repeatable, default: all)")
+    parser.add_argument("--profiles", type=int, default=PROFILES, help="usage profiles per scenario")
+    parser.add_argument("--step", type=float, default=STEP, help="time step, hours")
+    parser.add_argument("--max-hours", type=float, default=MAX_HOURS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="write a runtime histogram CSV")
+    args = parser.parse_args(argv)
+
+    names = args.scenario or list(SCENARIOS)
+    header = "  ".join(f"p{q:<5}" for q in PERCENTILES)
+    print(f"{'':<8}{'mean h':>8}  {header}  stranded  claim")
+    runtimes = {}
+    for name in names:
+        started = time.perf_counter()
+        runtimes[name] = run_scenario(name, args.profiles, args.seed, args.step, args.max_hours)
+        seconds = time.perf_counter() - started
+        print(f"{format_runtime(name, runtimes[name])}  ({seconds:.1f} s)")
+    if args.out:
+        write_histogram(args.out, runtimes)
+        print(f"Written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
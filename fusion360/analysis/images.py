@@ -0,0 +1,64 @@
+"""
+OKP Sight - Image Output
+PNG files and false-colour heatmaps from NumPy arrays, with no imaging library
+"""
+
+import struct
+import zlib
+
+import numpy as np
+
+# Anchor colours of the heatmap scale, low to high (dark blue -> teal -> yellow)
+HEATMAP_COLOURS = np.array([
+    (68, 1, 84), (59, 82, 139), (33, 145, 140), (94, 201, 98), (253, 231, 37),
+], dtype=float)
+MISSING_COLOUR = (128, 128, 128)
+
+
+def write_png(path, pixels, dpi=None):
+    """Write a uint8 array as PNG: (H, W) grey, (H, W, 3) RGB or (H, W, 4) RGBA
+
+    dpi is stored in the file (pHYs) so the print size is right.
+    """
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+    height, width = pixels.shape[:2]
+    channels = 1 if pixels.ndim == 2 else pixels.shape[2]
+    colour_type = {1: 0, 3: 2, 4: 6}[channels]
+
+    rows = pixels.reshape(height, width * channels)
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), rows]).tobytes()  # filter 0 per row
+
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    parts = [b"\x89PNG\r\n\x1a\n",
+             chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, colour_type, 0, 0, 0))]
+    if dpi:
+        per_metre = int(round(dpi / 0.0254))
+        parts.append(chunk(b"pHYs", struct.pack(">IIB", per_metre, per_metre, 1)))
+    parts += [chunk(b"IDAT", zlib.compress(raw, 6)), chunk(b"IEND", b"")]
+    with open(path, "wb") as f:
+        f.write(b"".join(parts))
+
+
+def heatmap(values, low=None, high=None, scale=1):
+    """RGB image of a 2-D array, first row at the top; nan is grey
+
+    low/high fix the ends of the colour scale (default: the finite range).
+    Each value becomes a scale x scale block of pixels.
+    """
+    values = np.asarray(values, dtype=float)
+    finite = np.isfinite(values)
+    if low is None:
+        low = values[finite].min() if finite.any() else 0.0
+    if high is None:
+        high = values[finite].max() if finite.any() else 1.0
+    span = high - low if high > low else 1.0
+    t = np.clip((np.where(finite, values, low) - low) / span, 0, 1) * (len(HEATMAP_COLOURS) - 1)
+    index = np.minimum(t.astype(int), len(HEATMAP_COLOURS) - 2)
+    fraction = (t - index)[..., None]
+    rgb = HEATMAP_COLOURS[index] * (1 - fraction) + HEATMAP_COLOURS[index + 1] * fraction
+    rgb[~finite] = MISSING_COLOUR
+    rgb = np.round(rgb).astype(np.uint8)
+    return np.repeat(np.repeat(rgb, scale, axis=0), scale, axis=1)
@@ -0,0 +1,242 @@
+"""
+OKP Sight - Preview Mesher
+Watertight triangle meshes of the main body and the mount straight from the
+parameters, without Fusion 360 or the headless stand-in
+
+Usage (from the repository root):
+    python -m fusion360.analysis.mesher --out preview.stl
+    python -m fusion360.analysis.mesher --hood-style skeleton --resolution 0.5 --out skeleton.stl
+
+Each component is its shapes.py steps folded into one signed distance field
+(sdf.py): min for a join, max(f, -g) for a cut. The field is sampled only in
+a narrow band. An octree starts from COARSE blocks and splits a cell only
+while |f| at its centre is within its half-diagonal. The field never
+exceeds the true distance to the surface, so no cell the surface passes
+through is dropped, and memory grows with the surface area, not the volume.
+
+The surface comes from dual contouring. Every grid edge whose two ends
+differ in sign gives a quad joining the four cells around it. Each cell
+gets one vertex, at the point closest to the tangent planes at its edge
+crossings (a least-squares QEF, clamped to the cell), which keeps the sharp
+edges of the boxes. The quads close up, so the mesh is watertight at any
+resolution.
+"""
+
+import argparse
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from . import sdf
+from .. import interference
+from .. import parameters as params
+from .. import shapes
+
+RESOLUTION = 1.0  # mm, finest cell
+COARSE = 8.0  # mm, largest octree cell
+QEF_CUTOFF = 0.1  # singular values below this fraction of the largest are treated as zero
+
+# vertices (V, 3) float mm, faces (F, 3) int, counter-clockwise seen from outside
+Mesh = namedtuple("Mesh", "name vertices faces")
+
+_CORNERS = np.array([[i, j, k] for i in (0, 1) for j in (0, 1) for k in (0, 1)], dtype=np.int64)
+_UNIT = np.eye(3, dtype=np.int64)
+
+
+def field(steps):
+    """Signed distance function of a component's steps, for (N, 3) points"""
+    def distance(points):
+        value = None
+        for step in steps:
+            d = sdf.distance(step.shape, points)
+            if value is None:
+                value = d
+            elif step.operation == "cut":
+                value = np.maximum(value, -d)
+            else:
+                value = np.minimum(value, d)
+        return value
+    return distance
+
+
+def extent(steps):
+    """(lo, hi) bounds of the material a component's steps add"""
+    bounds = [interference.bounds(step.shape) for step in steps if step.operation != "cut"]
+    return np.min([lo for lo, _ in bounds], axis=0), np.max([hi for _, hi in bounds], axis=0)
+
+
+def narrow_band(f, origin, counts, levels, h):
+    """Integer min corners (N, 3) of the finest cells the surface may pass through"""
+    size = 2 ** levels
+    axes = [np.arange(count, dtype=np.int64) * size for count in counts]
+    cells = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+    while True:
+        reach = h * size * math.sqrt(3) / 2
+        cells = cells[np.abs(f(origin + h * (cells + size / 2))) <= reach * (1 + 1e-9)]
+        if size == 1:
+            return cells
+        size //= 2
+        cells = (cells[:, None, :] + _CORNERS * size).reshape(-1, 3)
+
+
+def gradient(f, points, eps):
+    """Unit gradients of f by central differences"""
+    g = np.stack([f(points + eps * _UNIT[i]) - f(points - eps * _UNIT[i]) for i in range(3)], axis=1)
+    return g / np.maximum(np.linalg.norm(g, axis=1, keepdims=True), 1e-12)
+
+
+def contour(f, lo, hi, resolution=RESOLUTION, name=""):
+    """Dual-contoured Mesh of the zero set of f inside the box lo..hi (mm)"""
+    h = float(resolution)
+    origin = np.asarray(lo, dtype=float) - h  # one cell of padding: the surface stays inside the grid
+    span = np.asarray(hi, dtype=float) - origin + h
+    levels = max(0, math.ceil(math.log2(COARSE / h)))
+    counts = np.maximum(np.ceil(span / (h * 2 ** levels)).astype(int), 1)
+    dims = counts.astype(np.int64) * 2 ** levels + 1  # lattice points per axis
+
+    def key(ijk):
+        return (ijk[:, 0] * dims[1] + ijk[:, 1]) * dims[2] + ijk[:, 2]
+
+    cells = narrow_band(f, origin, counts, levels, h)
+    cell_keys = np.sort(key(cells))
+    cells = np.stack(np.unravel_index(cell_keys, dims), axis=1)
+    corner_keys = np.unique(key((cells[:, None, :] + _CORNERS).reshape(-1, 3)))
+    corners = np.stack(np.unravel_index(corner_keys, dims), axis=1)
+    values = f(origin + h * corners)
+    inside = values < 0
+
+    def lookup(sorted_keys, ijk):
+        index = np.searchsorted(sorted_keys, key(ijk))
+        index = np.minimum(index, len(sorted_keys) - 1)
+        return index, sorted_keys[index] == key(ijk)
+
+    quads, crossing_cells, points, normals = [], [], [], []
+    for axis in range(3):
+        ends = corners + _UNIT[axis]
+        other, found = lookup(corner_keys, np.minimum(ends, dims - 1))
+        found &= ends[:, axis] < dims[axis]
+        a = np.flatnonzero(found)
+        b = other[a]
+        change = inside[a] != inside[b]
+        a, b = a[change], b[change]
+        if not len(a):
+            continue
+
+        t = values[a] / (values[a] - values[b])
+        crossing = origin + h * (corners[a] + t[:, None] * _UNIT[axis])
+        u, v = _UNIT[(axis + 1) % 3], _UNIT[(axis + 2) % 3]
+        base = corners[a]
+        around = np.stack([lookup(cell_keys, base - offset)[0] for offset in (0 * u, u, u + v, v)], axis=1)
+        present = np.stack([lookup(cell_keys, base - offset)[1] for offset in (0 * u, u, u + v, v)], axis=1)
+        if not present.all():
+            raise RuntimeError("the narrow band dropped a cell next to the surface")
+        # Counter-clockwise around the edge seen from its far end when the near end is inside
+        outward = inside[a]
+        around[~outward] = around[~outward][:, ::-1]
+        quads.append(around)
+        crossing_cells.append(around.ravel())
+        points.append(np.repeat(crossing, 4, axis=0))
+        normals.append(np.repeat(gradient(f, crossing, h * 1e-3), 4, axis=0))
+
+    if not quads:
+        return Mesh(name, np.empty((0, 3)), np.empty((0, 3), dtype=np.int64))
+    quads = np.concatenate(quads)
+    ids, p, n = np.concatenate(crossing_cells), np.concatenate(points), np.concatenate(normals)
+
+    # QEF per cell: minimise sum (n . (x - p))^2 around the mass point of its crossings
+    used, ids = np.unique(ids, return_inverse=True)
+    count = np.bincount(ids)
+    mass = np.stack([np.bincount(ids, p[:, i]) for i in range(3)], axis=1) / count[:, None]
+    a_matrix = np.empty((len(used), 3, 3))
+    for i in range(3):
+        for j in range(i, 3):
+            a_matrix[:, i, j] = a_matrix[:, j, i] = np.bincount(ids, n[:, i] * n[:, j])
+    offset = np.einsum("ij,ij->i", n, p)
+    b_vector = np.stack([np.bincount(ids, n[:, i] * offset) for i in range(3)], axis=1)
+    residual = b_vector - np.einsum("cij,cj->ci", a_matrix, mass)
+    vertices = mass + np.einsum("cij,cj->ci", np.linalg.pinv(a_matrix, rcond=QEF_CUTOFF), residual)
+    low = origin + h * cells[used]
+    vertices = np.clip(vertices, low, low + h)
+
+    remap = np.searchsorted(used, quads)
+    faces = np.concatenate([remap[:, [0, 1, 2]], remap[:, [0, 2, 3]]])
+    return Mesh(name, vertices, faces)
+
+
+def mesh_steps(steps, resolution=RESOLUTION, name=""):
+    lo, hi = extent(steps)
+    return contour(field(steps), lo, hi, resolution, name)
+
+
+def mesh_variant(p, resolution=RESOLUTION):
+    """One Mesh per component of p (shapes.components)"""
+    return [mesh_steps(steps, resolution, name) for name, steps in shapes.components(p).items()]
+
+
+# ==============================================================================
+# CHECKS AND OUTPUT
+# ==============================================================================
+
+def volume(mesh):
+    """Enclosed volume, mm^3"""
+    v = mesh.vertices[mesh.faces]
+    return float(np.einsum("ij,ij->i", v[:, 0], np.cross(v[:, 1], v[:, 2])).sum() / 6)
+
+
+def is_watertight(mesh):
+    """True if every directed edge is matched by the same edge the other way"""
+    edges = mesh.faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    count = len(mesh.vertices)
+    forward = np.sort(edges[:, 0] * count + edges[:, 1])
+    backward = np.sort(edges[:, 1] * count + edges[:, 0])
+    return bool(np.array_equal(forward, backward))
+
+
+def write_stl(path, meshes):
+    """Binary STL of every mesh together"""
+    triangles = np.concatenate([mesh.vertices[mesh.faces] for mesh in meshes]).astype(np.float32)
+    normal = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    normal /= np.maximum(np.linalg.norm(normal, axis=1, keepdims=True), 1e-12)
+    record = np.dtype([("normal", "<f4", 3), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")])
+    data = np.zeros(len(triangles), dtype=record)
+    data["normal"], data["vertices"] = normal, triangles
+    with open(path, "wb") as f:
+        f.write(b"OKP preview mesh".ljust(80, b" "))
+        f.write(np.uint32(len(triangles)).tobytes())
+        f.write(data.tobytes())
+
+
+def main(argv=None):
+    from .. import sweep
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resolution", type=float, default=RESOLUTION, help="cell size, mm")
+    parser.add_argument("--hood-style", choices=params.HOOD_STYLES, default=None)
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="override a parameter")
+    parser.add_argument("--out", default=None, help="write the meshes to this binary STL file")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for spec in args.set:
+        name, values = sweep.parse_grid(spec)
+        overrides[name] = values[0]
+    if args.hood_style:
+        overrides["HOOD_STYLE"] = args.hood_style
+    p = sweep.variant_parameters(overrides)
+
+    started = time.perf_counter()
+    meshes = mesh_variant(p, args.resolution)
+    seconds = time.perf_counter() - started
+    for mesh in meshes:
+        closed = "watertight" if is_watertight(mesh) else "OPEN"
+        print(f"{mesh.name:<16} {len(mesh.faces):8,} triangles  {volume(mesh) / 1000:8.2f} cm^3  {closed}")
+    print(f"Meshed in {seconds * 1000:.0f} ms at {args.resolution:g} mm")
+    if args.out:
+        write_stl(args.out, meshes)
+        print(f"Written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+OKP Sight - Collimation Ray Tracer
+Traces rays from the LED emitter through its protective glass onto the
+tilted reflector and measures how well the reflected beam is collimated
+
+Usage (from the repository root):
+    python -m fusion360.analysis.optics --rays 2000000
+    python -m fusion360.analysis.optics \\
+        --range REFLECTOR_RADIUS=200:250:5 --range REFLECTOR_TILT_ANGLE=5:45:5
+
+Model, in the reflector frame (mm): the reflector is a conic mirror
+(sphere by default, --conic -1 for a paraboloid) of radius REFLECTOR_RADIUS
+and aperture REFLECTOR_DIAMETER with its vertex at the origin and its centre
+of curvature on +z. The LED sits LED_FOCAL_DISTANCE from the vertex, tilted
+REFLECTOR_TILT_ANGLE off the mirror axis, so the beam reflected at the vertex
+leaves at the same angle on the other side: that is the line of sight. A
+flat protective glass of GLASS_THICKNESS lies across the LED, WINDOW_GAP in
+front of the emitter. The LED is a disc of LED_EMITTER_SIZE.
+
+Rays are aimed at points spread evenly over the reflector aperture. Each is
+refracted through both faces of the glass, intersected with the conic and
+reflected. The results are:
+
+    boresight   mean pointing error of a point source, MOA (zeroed out by
+                the adjustment, reported for reference)
+    divergence  full angle holding 95% of point-source rays around the
+                boresight, MOA; 0 for a perfectly collimated beam
+    dot         full angle holding 95% of the rays from the whole emitter, MOA,
+                compared with RETICLE_DOT_MOA
+    usable      aperture over which point-source rays stay within half a dot
+                of the boresight, as an equivalent diameter in mm
+
+Everything is array based: a sweep traces all its candidates together, in
+chunks of about CHUNK_RAYS rays.
+"""
+
+import argparse
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .. import parameters as params
+
+MOA = math.pi / 10800  # radians per minute of angle
+
+GLASS_INDEX = 1.5168  # N-BK7 at 587.6 nm
+WINDOW_GAP = 2.0  # mm from the emitter to the protective glass
+ENCLOSED = 0.95  # fraction of rays inside the reported divergence and dot diameters
+CHUNK_RAYS = 1_000_000
+
+# Per candidate values of a trace, in mm and radians
+Optics = namedtuple("Optics", "radius tilt focal_distance aperture glass emitter")
+
+Collimation = namedtuple("Collimation", [
+    "boresight_moa",        # mean pointing error of a point source
+    "divergence_moa",       # 95% full angle of point-source rays around the boresight
+    "dot_moa",              # 95% full angle of rays from the whole emitter
+    "dot_spec_moa",         # RETICLE_DOT_MOA
+    "usable_aperture_mm",   # equivalent diameter where rays stay within half a dot
+    "usable_fraction",      # of the reflector aperture area
+    "focus_shift_mm",       # how much further the glass moves the best LED position
+    "rays",                 # rays traced per case
+])
+
+
+def optics(p):
+    """Optics of one Parameters object"""
+    return Optics(p.REFLECTOR_RADIUS, math.radians(p.REFLECTOR_TILT_ANGLE), p.LED_FOCAL_DISTANCE,
+                  p.REFLECTOR_DIAMETER, p.GLASS_THICKNESS, p.LED_EMITTER_SIZE)
+
+
+def stack(candidates):
+    """Optics of many Parameters objects as (C, 1) columns, ready to broadcast against rays"""
+    columns = zip(*(optics(p) for p in candidates))
+    return Optics(*(np.asarray(column, dtype=float)[:, None] for column in columns))
+
+
+# ==============================================================================
+# SAMPLING
+# ==============================================================================
+
+def disc_samples(count, offset=0.0):
+    """Sunflower (Vogel) points filling the unit disc evenly; deterministic"""
+    index = np.arange(count) + 0.5
+    r = np.sqrt(index / count)
+    theta = index * (math.pi * (3 - math.sqrt(5))) + offset
+    return r * np.cos(theta), r * np.sin(theta)
+
+
+# ==============================================================================
+# SURFACES
+# ==============================================================================
+
+def conic_sag(x, y, radius, conic):
+    """z of the conic surface above (x, y); centre of curvature on +z"""
+    c = 1 / radius
+    r2 = x * x + y * y
+    return c * r2 / (1 + np.sqrt(np.maximum(1 - (1 + conic) * c * c * r2, 0.0)))
+
+
+def intersect_conic(o, d, radius, conic):
+    """Distance along each ray to the conic sheet through the origin; nan where missed"""
+    c = 1 / radius
+    k1 = 1 + conic
+    ox, oy, oz = o
+    dx, dy, dz = d
+    a = c * (dx * dx + dy * dy + k1 * dz * dz)
+    b = 2 * c * (ox * dx + oy * dy + k1 * oz * dz) - 2 * dz
+    e = c * (ox * ox + oy * oy + k1 * oz * oz) - 2 * oz
+    disc = b * b - 4 * a * e
+    root = np.sqrt(np.where(disc >= 0, disc, np.nan))
+    # Numerically stable pair of roots; near-flat rays (a ~ 0) keep only the linear one
+    q = -0.5 * (b + np.copysign(root, b))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s1 = np.where(np.abs(a) > 1e-15, q / a, np.inf)
+        s2 = e / q
+    # The sheet through the vertex is the one with the smaller |z|
+    z1, z2 = np.abs(oz + s1 * dz), np.abs(oz + s2 * dz)
+    s = np.where((s2 > 0) & ((z2 <= z1) | ~(s1 > 0)), s2, s1)
+    return np.where(s > 0, s, np.nan)
+
+
+def conic_normal(x, y, z, radius, conic):
+    """Unit normal of the conic at a point on it, pointing to the concave side"""
+    c = 1 / radius
+    nx, ny, nz = -c * x, -c * y, 1 - c * (1 + conic) * z
+    length = np.sqrt(nx * nx + ny * ny + nz * nz)
+    return nx / length, ny / length, nz / length
+
+
+def reflect(d, n):
+    dot = d[0] * n[0] + d[1] * n[1] + d[2] * n[2]
+    return d[0] - 2 * dot * n[0], d[1] - 2 * dot * n[1], d[2] - 2 * dot * n[2]
+
+
+def refract(d, n, ratio):
+    """Snell's law for unit d through a surface with unit normal n; ratio = n1 / n2
+
+    nan where the ray is totally internally reflected.
+    """
+    cos_i = -(d[0] * n[0] + d[1] * n[1] + d[2] * n[2])
+    sign = np.where(cos_i < 0, -1.0, 1.0)  # make n face the incoming ray
+    cos_i = cos_i * sign
+    k = 1 - ratio * ratio * (1 - cos_i * cos_i)
+    cos_t = np.sqrt(np.where(k >= 0, k, np.nan))
+    f = (ratio * cos_i - cos_t) * sign
+    return ratio * d[0] + f * n[0], ratio * d[1] + f * n[1], ratio * d[2] + f * n[2]
+
+
+def through_plate(o, d, point, normal, thickness, index):
+    """Rays through a flat plate whose first face contains point; the plate extends along -normal"""
+    for offset, ratio in ((0.0, 1 / index), (thickness, index)):
+        px, py, pz = (point[i] - offset * normal[i] for i in range(3))
+        s = ((px - o[0]) * normal[0] + (py - o[1]) * normal[1] + (pz - o[2]) * normal[2]) / \
+            (d[0] * normal[0] + d[1] * normal[1] + d[2] * normal[2])
+        o = (o[0] + s * d[0], o[1] + s * d[1], o[2] + s * d[2])
+        d = refract(d, normal, ratio)
+    return o, d
+
+
+# ==============================================================================
+# TRACE
+# ==============================================================================
+
+def frame(o):
+    """Unit vectors of stacked Optics o: (led axis, emitter v, sight, across v)
+
+    The LED axis points from the mirror vertex to the LED, the line of sight
+    along the beam reflected at the vertex. Emitter and eye-plane u is +x
+    for both; v is the second direction across each.
+    """
+    sin_t, cos_t = np.sin(o.tilt), np.cos(o.tilt)
+    zero = np.zeros_like(sin_t)
+    return ((zero, -sin_t, cos_t), (zero, cos_t, sin_t),
+            (zero, sin_t, cos_t), (zero, cos_t, -sin_t))
+
+
+def led_points(o, u, v, axial=0.0):
+    """Points of the emitter plane: u, v (mm) across it, axial (mm) further from the mirror"""
+    axis, emitter_v, _, _ = frame(o)
+    distance = o.focal_distance + axial
+    return (u + 0 * distance,
+            distance * axis[1] + v * emitter_v[1],
+            distance * axis[2] + v * emitter_v[2])
+
+
+def trace_to(o, origin, x, y, conic=0.0, window=True):
+    """Rays from origin points aimed at reflector points above (x, y) (mm)
+
+    Returns the hit points and the reflected unit directions, nan for rays
+    that miss the aperture.
+    """
+    axis = frame(o)[0]
+    z = conic_sag(x, y, o.radius, conic)
+    d = (x - origin[0], y - origin[1], z - origin[2])
+    length = np.sqrt(d[0] ** 2 + d[1] ** 2 + d[2] ** 2)
+    d = (d[0] / length, d[1] / length, d[2] / length)
+
+    if window:
+        face = tuple((o.focal_distance - WINDOW_GAP) * a for a in axis)
+        origin, d = through_plate(origin, d, face, axis, o.glass, GLASS_INDEX)
+
+    s = intersect_conic(origin, d, o.radius, conic)
+    hit = tuple(origin[i] + s * d[i] for i in range(3))
+    out = reflect(d, conic_normal(*hit, o.radius, conic))
+    lost = ~(hit[0] ** 2 + hit[1] ** 2 <= (o.aperture / 2) ** 2)
+    return (tuple(np.where(lost, np.nan, c) for c in hit),
+            tuple(np.where(lost, np.nan, c) for c in out))
+
+
+def sight_errors(o, out):
+    """Angles (u, v, radians) between reflected directions and the line of sight"""
+    _, _, sight, across_v = frame(o)
+    along = out[1] * sight[1] + out[2] * sight[2]
+    return (np.arctan2(out[0], along),
+            np.arctan2(out[1] * across_v[1] + out[2] * across_v[2], along))
+
+
+def trace(o, aperture_u, aperture_v, emitter_u, emitter_v, conic=0.0, window=True):
+    """Trace rays for stacked Optics o; returns (errors u, v in radians, aperture x, y)
+
+    aperture_* and emitter_* are unit-disc samples, one per ray (same length).
+    Errors are angles from the line of sight, nan for rays lost on the way.
+    """
+    half = o.emitter / 2
+    origin = led_points(o, half * emitter_u, half * emitter_v)
+    hit, out = trace_to(o, origin, o.aperture / 2 * aperture_u, o.aperture / 2 * aperture_v,
+                        conic, window)
+    error_u, error_v = sight_errors(o, out)
+    return error_u, error_v, hit[0], hit[1]
+
+
+def enclosed_radius(distance, fraction=ENCLOSED):
+    """Per row: radius holding fraction of the finite values of distance (C, N)"""
+    ordered = np.sort(np.where(np.isnan(distance), np.inf, distance), axis=1)
+    counts = np.isfinite(ordered).sum(axis=1)
+    index = np.clip(np.ceil(fraction * counts).astype(int) - 1, 0, ordered.shape[1] - 1)
+    radius = np.take_along_axis(ordered, index[:, None], axis=1)[:, 0]
+    return np.where(counts > 0, radius, np.nan)
+
+
+def point_spread(o, rays, conic=0.0, window=True):
+    """Point source at the emitter centre: aberrations only
+
+    Returns the mean direction (u, v, radians) per candidate and each ray's
+    angle from it, (C, rays).
+    """
+    aperture_u, aperture_v = disc_samples(rays)
+    zeros = np.zeros(rays)
+    u, v, _, _ = trace(o, aperture_u, aperture_v, zeros, zeros, conic, window)
+    centre_u, centre_v = np.nanmean(u, axis=1), np.nanmean(v, axis=1)
+    return centre_u, centre_v, np.hypot(u - centre_u[:, None], v - centre_v[:, None])
+
+
+def collimation(o, rays=200_000, conic=0.0, window=True, dot_spec=params.DEFAULT.RETICLE_DOT_MOA,
+                tolerance=None):
+    """Collimation of every stacked candidate in o, traced together; one row per candidate
+
+    tolerance is the error (MOA) allowed over the usable aperture, half the
+    dot by default.
+    """
+    tolerance = dot_spec / 2 if tolerance is None else tolerance
+    aperture_u, aperture_v = disc_samples(rays)
+    emitter_u, emitter_v = disc_samples(rays, offset=1.0)
+    emitter_u, emitter_v = np.roll(emitter_u, rays // 3), np.roll(emitter_v, rays // 3)
+
+    centre_u, centre_v, spread = point_spread(o, rays, conic, window)
+    divergence = 2 * enclosed_radius(spread)
+    usable = np.mean(spread <= tolerance * MOA, axis=1)
+
+    # The whole emitter: the dot the shooter sees
+    u, v, _, _ = trace(o, aperture_u, aperture_v, emitter_u, emitter_v, conic, window)
+    dot_u, dot_v = np.nanmean(u, axis=1), np.nanmean(v, axis=1)
+    dot = 2 * enclosed_radius(np.hypot(u - dot_u[:, None], v - dot_v[:, None]))
+
+    focus_shift = (o.glass * (1 - 1 / GLASS_INDEX) if window else 0 * o.glass)[:, 0]
+    return [Collimation(*map(float, row), rays) for row in zip(
+        np.hypot(centre_u, centre_v) / MOA, divergence / MOA, dot / MOA,
+        np.full(len(divergence), float(dot_spec)),
+        o.aperture[:, 0] * np.sqrt(usable), usable, focus_shift)]
+
+
+def analyse(candidates, rays=200_000, conic=0.0, window=True):
+    """Collimation of each Parameters object, in chunks of about CHUNK_RAYS rays"""
+    candidates = list(candidates)
+    per_chunk = max(1, CHUNK_RAYS // rays)
+    results = []
+    for start in range(0, len(candidates), per_chunk):
+        chunk = candidates[start:start + per_chunk]
+        specs = {p.RETICLE_DOT_MOA for p in chunk}
+        if len(specs) == 1:
+            results += collimation(stack(chunk), rays, conic, window, specs.pop())
+        else:
+            for p in chunk:
+                results += collimation(stack([p]), rays, conic, window, p.RETICLE_DOT_MOA)
+    return results
+
+
+# ==============================================================================
+# REPORT
+# ==============================================================================
+
+def format_result(result):
+    verdict = "ok" if result.dot_moa <= result.dot_spec_moa else "too large"
+    return "\n".join([
+        f"Rays per case:      {result.rays}",
+        f"Boresight offset:   {result.boresight_moa:.2f} MOA",
+        f"Residual divergence:{result.divergence_moa:8.2f} MOA (95% full angle)",
+        f"Dot size:           {result.dot_moa:.2f} MOA vs {result.dot_spec_moa:g} MOA spec ({verdict})",
+        f"Usable aperture:    {result.usable_aperture_mm:.1f} mm ({result.usable_fraction:.0%} of the reflector)",
+        f"Glass focus shift:  {result.focus_shift_mm:.2f} mm (move the LED this much further out)",
+    ])
+
+
+def format_table(overrides, results):
+    names = sorted({name for row in overrides for name in row})
+    header = " ".join(f"{name:>22}" for name in names)
+    lines = [f"{header} {'diverg MOA':>11} {'dot MOA':>8} {'usable mm':>10}"]
+    for row, result in zip(overrides, results):
+        values = " ".join(f"{row[name]:>22}" for name in names)
+        lines.append(f"{values} {result.divergence_moa:11.2f} {result.dot_moa:8.2f} "
+                     f"{result.usable_aperture_mm:10.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from .. import sweep
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=v1,v2,...",
+                        help="explicit values for a parameter")
+    parser.add_argument("--range", action="append", default=[], metavar="NAME=start:stop:step",
+                        help="evenly spaced values for a parameter (stop included)")
+    parser.add_argument("--rays", type=int, default=200_000, help="rays per case")
+    parser.add_argument("--conic", type=float, default=0.0,
+                        help="reflector conic constant: 0 sphere (default), -1 paraboloid")
+    parser.add_argument("--no-glass", action="store_true", help="leave out the protective glass")
+    args = parser.parse_args(argv)
+
+    axes = [sweep.parse_grid(spec) for spec in args.grid] + [sweep.parse_range(spec) for spec in args.range]
+    overrides = list(sweep.combinations(axes))
+    candidates = [sweep.variant_parameters(row) for row in overrides]
+
+    started = time.perf_counter()
+    results = analyse(candidates, args.rays, args.conic, not args.no_glass)
+    seconds = time.perf_counter() - started
+
+    print(format_table(overrides, results) if axes else format_result(results[0]))
+    print(f"{len(results) * args.rays:,} rays per trace pass in {seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,513 @@
+"""
+OKP Sight - Packaging Optimiser
+Searches the continuous parameters for the Pareto front of total length,
+housing mass and collimation error, under hard packaging constraints
+
+Usage (from the repository root):
+    python -m fusion360.analysis.packaging --population 4000 --generations 10
+    python -m fusion360.analysis.packaging --hood-style full --material al6061 --out pareto.csv
+    python -m fusion360.analysis.packaging --vary REFLECTOR_DIAMETER=25:35 --fix MOUNT_HEIGHT
+
+Every candidate is a set of overrides of VARIABLES within their bounds. All
+other values come from parameters.DEFAULT (or --set). A generation is
+evaluated as NumPy columns, one entry per candidate. The same formulas
+(including the derived values of parameters.py) also work on a single
+Parameters object, see evaluate_parameters.
+
+The cavities are the ones the generators cut: layout.cavities as
+interference.py primitives, measured by the same gaps as interference.check
+but on NumPy columns. The optical path is modelled along the body from the
+rear: battery section, reflector section (the housing tilted
+REFLECTOR_TILT_ANGLE at MOUNT_HEIGHT), front section. The LED sits
+LED_FOCAL_DISTANCE behind the reflector centre, so the focal distance sets
+the length of the battery and reflector sections.
+
+Hard constraints (all margins in mm must be >= 0; wall = the material's
+minimum wall thickness):
+
+    <a>_<b>           cavities a and b keep a wall between them
+    <a>_shell         cavity a keeps a wall to every face of the body (ports
+                      in interference.OPENINGS excepted)
+    focal_path        LED inside the rear wall
+    front_wall        sections leave at least a wall for the front face
+    reflector_*       tilted housing fits its section and under the hood
+    hood_*            hood shades the reflector and is at least a wall thick
+    rail_*            mount engages MIN_RAIL_SLOTS slots and fits under the body
+
+So every feasible design also passes interference.check with the wall as
+its clearance.
+
+Objectives, all minimised:
+
+    length       TOTAL_LENGTH, mm
+    mass         housing (body, hood, mount) in the chosen material, g;
+                 cavities are subtracted whole, which is exact once they
+                 no longer overlap
+    divergence   95% full angle of point-source rays (optics.py), MOA
+
+The search is a batched evolutionary loop. Each generation, the feasible
+candidates join an archive that only keeps the non-dominated ones, thinned
+by crowding distance. Children are blends of archive members with Gaussian
+mutation, plus a share of fresh random candidates. Only feasible candidates
+are ray traced, about optics.CHUNK_RAYS rays per pass.
+"""
+
+import argparse
+import csv
+import functools
+import math
+import time
+import types
+from collections import namedtuple
+
+import numpy as np
+
+from . import optics
+from .. import interference
+from .. import layout
+from .. import parameters as params
+
+# Searched by default: name -> (low, high), mm
+VARIABLES = {
+    "REFLECTOR_RADIUS": (200.0, 250.0),
+    "TOTAL_LENGTH": (120.0, 230.0),
+    "REFLECTOR_SECTION_LENGTH": (30.0, 100.0),
+    # Every bore starts at the body centre (layout.py), so they sit side by side in the cross-section
+    "BODY_WIDTH": (42.0, 90.0),
+    "BODY_HEIGHT": (35.0, 75.0),
+    "MOUNT_HEIGHT": (30.0, 55.0),
+    "MOUNT_LENGTH": (38.1, 80.0),
+    "LIGHT_OFFSET_X": (-35.0, 0.0),
+    "LIGHT_OFFSET_Z": (10.0, 60.0),
+    "LASER_OFFSET_X": (0.0, 35.0),
+    "LASER_OFFSET_Z": (10.0, 60.0),
+}
+
+# Hood dimensions searched for the hood style in use
+HOOD_VARIABLES = {
+    "minimal": {
+        "HOOD_MINIMAL_LENGTH": (20.0, 60.0),
+        "HOOD_MINIMAL_THICKNESS": (1.0, 4.0),
+    },
+    "full": {
+        "HOOD_FULL_LENGTH": (30.0, 70.0),
+        "HOOD_FULL_WIDTH": (38.0, 60.0),
+        "HOOD_FULL_HEIGHT": (20.0, 45.0),
+        "HOOD_FULL_WINDOW_WIDTH": (30.0, 55.0),
+    },
+    "skeleton": {
+        "HOOD_SKELETON_RIB_THICKNESS": (1.5, 5.0),
+        "HOOD_SKELETON_RIB_HEIGHT": (15.0, 40.0),
+        "HOOD_SKELETON_LENGTH": (30.0, 60.0),
+    },
+}
+
+# Material -> (density, minimum wall) parameter names
+MATERIALS = {
+    "asa": ("ASA_DENSITY", "ASA_MIN_WALL_THICKNESS"),
+    "al6061": ("AL6061_DENSITY", "CNC_MIN_WALL_THICKNESS"),
+    "al7075": ("AL7075_DENSITY", "CNC_MIN_WALL_THICKNESS"),
+}
+
+OBJECTIVES = ("length", "mass", "divergence")
+MIN_RAIL_SLOTS = 3  # rail slots the mount must engage
+POPULATION = 4000
+GENERATIONS = 8
+RAYS = 256  # rays per candidate for the divergence
+ARCHIVE_SIZE = 400  # non-dominated designs kept between generations
+FRESH = 0.1  # share of each generation drawn at random from the bounds
+MUTATION = 0.05  # mutation step, as a fraction of each variable's range
+
+# names (V,), values (N, V) and objectives (N, 3) of the non-dominated designs
+Front = namedtuple("Front", "names values objectives evaluated seconds")
+
+
+def columns(base, names, values):
+    """Parameters-like namespace: each name in names a (N,) column, the rest from base
+
+    Derived values use the formulas of parameters.py, so they are columns too.
+    """
+    c = types.SimpleNamespace(_cache={})
+    for name in params.FIELDS:
+        setattr(c, name, getattr(base, name))
+    for i, name in enumerate(names):
+        setattr(c, name, values[:, i])
+    for name in params.DERIVED:
+        setattr(c, name, getattr(params.Parameters, name).fget(c))
+    return c
+
+
+# ==============================================================================
+# MODEL
+# ==============================================================================
+
+def hood_height(p):
+    """Clear height of the hood above the body"""
+    return {"minimal": p.HOOD_MINIMAL_HEIGHT, "full": p.HOOD_FULL_HEIGHT,
+            "skeleton": p.HOOD_SKELETON_RIB_HEIGHT}[p.HOOD_STYLE]
+
+
+def hood_length(p):
+    return {"minimal": p.HOOD_MINIMAL_LENGTH, "full": p.HOOD_FULL_LENGTH,
+            "skeleton": p.HOOD_SKELETON_LENGTH}[p.HOOD_STYLE]
+
+
+def hood_thickness(p):
+    """Thinnest wall of the hood"""
+    return {"minimal": p.HOOD_MINIMAL_THICKNESS,
+            "full": (p.HOOD_FULL_WIDTH - p.HOOD_FULL_WINDOW_WIDTH) / 2,
+            "skeleton": p.HOOD_SKELETON_RIB_THICKNESS}[p.HOOD_STYLE]
+
+
+# ==============================================================================
+# CAVITIES
+# ==============================================================================
+# interference.gap and interference.walls with NumPy in place of math, so the
+# primitive sizes and positions may be columns
+
+def interval_gap(a_lo, a_hi, b_lo, b_hi):
+    return np.maximum(a_lo - b_hi, b_lo - a_hi)
+
+
+def combine(axial, across):
+    return np.where((axial > 0) & (across > 0), np.hypot(axial, across), np.maximum(axial, across))
+
+
+def box_gap(a_lo, a_hi, b_lo, b_hi):
+    gaps = [interval_gap(a_lo[i], a_hi[i], b_lo[i], b_hi[i]) for i in range(3)]
+    outside = np.sqrt(sum(np.maximum(g, 0.0) ** 2 for g in gaps))
+    return np.where(outside > 0, outside, functools.reduce(np.maximum, gaps))
+
+
+def gap(a, b):
+    """interference.gap of two cylinders or boxes"""
+    Box, Cylinder = interference.Box, interference.Cylinder
+    if isinstance(a, Box) and isinstance(b, Box):
+        return box_gap(a.lo, a.hi, b.lo, b.hi)
+    if isinstance(a, Box):
+        a, b = b, a
+    if isinstance(b, Cylinder) and b.axis != a.axis:
+        b = Box(b.name, *interference.bounds(b))
+    if isinstance(b, Cylinder):
+        axial = interval_gap(a.start, a.end, b.start, b.end)
+        across = np.hypot(a.center[0] - b.center[0], a.center[1] - b.center[1]) - a.radius - b.radius
+        return combine(axial, across)
+
+    lo, hi = interference.bounds(b)
+    axial = interval_gap(a.start, a.end, lo[a.axis], hi[a.axis])
+    sides = list(zip(interference.other_axes(a.axis), a.center))
+    du, dv = (np.maximum(np.maximum(lo[i] - c, 0.0), c - hi[i]) for i, c in sides)
+    inside = functools.reduce(np.minimum, [np.minimum(c - lo[i], hi[i] - c) for i, c in sides])
+    across = np.where((du > 0) | (dv > 0), np.hypot(du, dv) - a.radius, -(inside + a.radius))
+    return combine(axial, across)
+
+
+def shell_wall(shape, outer):
+    """interference.walls: thinnest wall between a primitive and the body faces"""
+    lo, hi = interference.bounds(shape)
+    return functools.reduce(np.minimum, [lo[i] - outer.lo[i] for i in range(3)]
+                            + [outer.hi[i] - hi[i] for i in range(3)])
+
+
+def cavity_margins(p, wall):
+    """Wall margins between the cavities the generators cut, and to the body faces, mm
+
+    interference.check flags gaps within TOUCH of the clearance, so the
+    margins keep that much more.
+    """
+    shapes = [interference.primitive(cavity) for cavity in layout.cavities(p)]
+    outer = interference.shell(p)
+    found = {}
+    for i, a in enumerate(shapes):
+        for b in shapes[i + 1:]:
+            found[f"{a.name}_{b.name}"] = gap(a, b) - wall - interference.TOUCH
+    for shape in shapes:
+        if shape.name not in interference.OPENINGS:
+            found[f"{shape.name}_shell"] = shell_wall(shape, outer) - wall - interference.TOUCH
+    return found
+
+
+def margins(p, wall):
+    """Constraint margins by name, mm; a design is feasible when all are >= 0"""
+    tilt = math.radians(p.REFLECTOR_TILT_ANGLE)
+    housing = p.REFLECTOR_HOUSING_DIAMETER
+    along, upright = housing * math.sin(tilt), housing * math.cos(tilt)
+
+    found = cavity_margins(p, wall)
+    found.update({
+        "focal_path": p.BATTERY_SECTION_LENGTH + p.REFLECTOR_SECTION_LENGTH / 2 - p.LED_FOCAL_DISTANCE - wall,
+        "front_wall": p.FRONT_SECTION_LENGTH - wall,
+        "reflector_section": p.REFLECTOR_SECTION_LENGTH - along - 2 * wall,
+        "reflector_hood": p.BODY_HEIGHT + hood_height(p) - p.MOUNT_HEIGHT - upright / 2,
+        "hood_shade": hood_length(p) - along,
+        "hood_fits": p.TOTAL_LENGTH - hood_length(p),
+        "hood_wall": hood_thickness(p) - wall,
+        "rail_slots": np.floor(p.MOUNT_LENGTH / p.RAIL_SPACING) - MIN_RAIL_SLOTS,
+        "rail_fits": p.TOTAL_LENGTH - p.MOUNT_LENGTH,
+    })
+    if p.HOOD_STYLE == "full":
+        found["hood_window"] = p.HOOD_FULL_WINDOW_WIDTH - housing
+        found["hood_width"] = p.BODY_WIDTH - p.HOOD_FULL_WIDTH
+    return found
+
+
+def rail_area(p, depth):
+    """Area of the rail cross-section (shapes.rail_profile) within depth of its top, mm^2"""
+    flank = (p.RAIL_SLOT_WIDTH - p.RAIL_NECK_WIDTH) / 2
+    upper = np.minimum(depth, flank)
+    lower = np.clip(depth - flank, 0.0, flank)
+    # Each flank adds a triangle: widening over the upper half, narrowing over the lower
+    return p.RAIL_NECK_WIDTH * depth + upper ** 2 + lower * (2 * flank - lower)
+
+
+def volume(p):
+    """Housing volume in mm^3: body less its cavities, hood and rail mount"""
+    def bore(diameter, depth):
+        return math.pi * (diameter / 2) ** 2 * depth
+
+    body = (p.TOTAL_LENGTH * p.BODY_WIDTH * p.BODY_HEIGHT
+            - bore(p.BATTERY_DIAMETER, p.BATTERY_LENGTH)
+            - bore(p.REFLECTOR_HOUSING_DIAMETER, p.REFLECTOR_CAVITY_DEPTH)
+            - bore(p.LIGHT_DIAMETER, p.LIGHT_DEPTH)
+            - bore(p.LASER_DIAMETER, p.LASER_DEPTH)
+            - p.USB_C_WIDTH / 2 * p.USB_C_HEIGHT * p.USB_C_DEPTH)  # port centred on the rear face
+
+    if p.HOOD_STYLE == "minimal":
+        hood = p.HOOD_MINIMAL_LENGTH * p.BODY_WIDTH * p.HOOD_MINIMAL_THICKNESS
+    elif p.HOOD_STYLE == "full":
+        hood = (p.HOOD_FULL_WIDTH - p.HOOD_FULL_WINDOW_WIDTH) * p.HOOD_FULL_LENGTH * p.HOOD_FULL_HEIGHT
+    else:
+        hood = (p.HOOD_SKELETON_RIB_COUNT * p.HOOD_SKELETON_RIB_THICKNESS * p.BODY_WIDTH
+                * p.HOOD_SKELETON_RIB_HEIGHT)
+
+    slots = np.floor(p.MOUNT_LENGTH / p.RAIL_SPACING)
+    mount = (p.MOUNT_LENGTH * rail_area(p, p.MOUNT_HEIGHT_OFFSET)
+             - slots * p.RAIL_GROOVE_WIDTH * rail_area(p, p.RAIL_SLOT_DEPTH)
+             - bore(p.MOUNT_CROSS_BOLT_DIAMETER, p.RAIL_SLOT_WIDTH))
+    return body + hood + mount
+
+
+def divergence(p, rays=RAYS, conic=0.0, window=True):
+    """Point-source divergence (MOA) of each candidate, about optics.CHUNK_RAYS rays per trace pass"""
+    radius = np.atleast_1d(np.asarray(p.REFLECTOR_RADIUS, dtype=float))
+    count = len(radius)
+
+    def column(value):
+        return np.broadcast_to(np.asarray(value, dtype=float), (count,))[:, None]
+
+    o = optics.Optics(radius[:, None], column(math.radians(p.REFLECTOR_TILT_ANGLE)),
+                      column(p.LED_FOCAL_DISTANCE), column(p.REFLECTOR_DIAMETER),
+                      column(p.GLASS_THICKNESS), column(p.LED_EMITTER_SIZE))
+    per_chunk = max(1, optics.CHUNK_RAYS // rays)
+    result = np.empty(count)
+    for start in range(0, count, per_chunk):
+        chunk = optics.Optics(*(field[start:start + per_chunk] for field in o))
+        _, _, spread = optics.point_spread(chunk, rays, conic, window)
+        result[start:start + per_chunk] = 2 * optics.enclosed_radius(spread) / optics.MOA
+    return result
+
+
+def evaluate(base, names, values, material="asa", rays=RAYS, conic=0.0, window=True):
+    """Objectives (N, 3) and total constraint violation (N,) of candidate rows
+
+    Infeasible candidates are not traced; their objectives are inf.
+    """
+    density, wall = (getattr(base, name) for name in MATERIALS[material])
+    c = columns(base, names, values)
+    count = len(values)
+    found = margins(c, wall)
+    violation = sum(np.broadcast_to(np.maximum(-m, 0.0), (count,)) for m in found.values())
+    feasible = violation == 0
+
+    objectives = np.full((count, len(OBJECTIVES)), np.inf)
+    if feasible.any():
+        objectives[feasible, 0] = np.broadcast_to(c.TOTAL_LENGTH, (count,))[feasible]
+        objectives[feasible, 1] = np.broadcast_to(volume(c), (count,))[feasible] / 1000 * density  # g
+        objectives[feasible, 2] = divergence(columns(base, names, values[feasible]), rays, conic, window)
+    return objectives, violation
+
+
+def evaluate_parameters(p, material="asa", rays=RAYS, conic=0.0, window=True):
+    """(length, mass, divergence) and the violated constraints {name: margin} of one Parameters"""
+    density, wall = (getattr(p, name) for name in MATERIALS[material])
+    found = margins(p, wall)
+    objectives = (p.TOTAL_LENGTH, volume(p) / 1000 * density, float(divergence(p, rays, conic, window)[0]))
+    return objectives, {name: float(m) for name, m in found.items() if m < 0}
+
+
+# ==============================================================================
+# SEARCH
+# ==============================================================================
+
+def pareto_mask(objectives, block=256):
+    """True for the rows no other row dominates (all <=, one <)"""
+    keep = np.ones(len(objectives), dtype=bool)
+    for start in range(0, len(objectives), block):
+        rows = objectives[start:start + block, None, :]
+        dominated = ((objectives[None] <= rows).all(axis=2) & (objectives[None] < rows).any(axis=2)).any(axis=1)
+        keep[start:start + block] = ~dominated
+    return keep
+
+
+def crowding(objectives):
+    """Crowding distance of each row; the extremes of every objective are inf"""
+    count = len(objectives)
+    distance = np.zeros(count)
+    span = np.ptp(objectives, axis=0)
+    for k in range(objectives.shape[1]):
+        order = np.argsort(objectives[:, k])
+        distance[order[[0, -1]]] = np.inf
+        if count > 2 and span[k] > 0:
+            distance[order[1:-1]] += (objectives[order[2:], k] - objectives[order[:-2], k]) / span[k]
+    return distance
+
+
+def offspring(rng, parents, count, low, high):
+    """Blend crossover of random parent pairs plus Gaussian mutation, clipped to the bounds"""
+    first = parents[rng.integers(len(parents), size=count)]
+    second = parents[rng.integers(len(parents), size=count)]
+    blend = rng.uniform(-0.25, 1.25, size=first.shape)
+    children = first + blend * (second - first)
+    children += rng.normal(0.0, MUTATION, size=children.shape) * (high - low)
+    return np.clip(children, low, high)
+
+
+def optimise(base=params.DEFAULT, variables=None, population=POPULATION, generations=GENERATIONS,
+             material="asa", rays=RAYS, conic=0.0, window=True, seed=0, progress=None):
+    """Pareto front of (length, mass, divergence) over variables {name: (low, high)}"""
+    variables = variables or search_space(base)
+    names = tuple(variables)
+    low = np.array([variables[name][0] for name in names])
+    high = np.array([variables[name][1] for name in names])
+    rng = np.random.default_rng(seed)
+
+    def fresh(count):
+        return low + rng.random((count, len(names))) * (high - low)
+
+    started = time.perf_counter()
+    candidates = np.vstack([np.clip([getattr(base, name) for name in names], low, high), fresh(population - 1)])
+    archive, archive_objectives = np.empty((0, len(names))), np.empty((0, len(OBJECTIVES)))
+    evaluated = 0
+    for generation in range(generations):
+        objectives, violation = evaluate(base, names, candidates, material, rays, conic, window)
+        evaluated += len(candidates)
+
+        feasible = violation == 0
+        pool = np.vstack([archive, candidates[feasible]])
+        pool_objectives = np.vstack([archive_objectives, objectives[feasible]])
+        front = pareto_mask(pool_objectives)
+        archive, archive_objectives = pool[front], pool_objectives[front]
+        if len(archive) > ARCHIVE_SIZE:
+            keep = np.argsort(-crowding(archive_objectives))[:ARCHIVE_SIZE]
+            archive, archive_objectives = archive[keep], archive_objectives[keep]
+        if progress:
+            progress(generation, int(feasible.sum()), len(archive))
+
+        # Breed from the archive, or from the least infeasible candidates until there is one
+        parents = archive if len(archive) else candidates[np.argsort(violation)[:max(2, population // 10)]]
+        explore = int(population * FRESH)
+        candidates = np.vstack([offspring(rng, parents, population - explore, low, high), fresh(explore)])
+
+    order = np.argsort(archive_objectives[:, 0])
+    return Front(names, archive[order], archive_objectives[order], evaluated, time.perf_counter() - started)
+
+
+def search_space(base=params.DEFAULT):
+    """VARIABLES plus the hood dimensions of base.HOOD_STYLE"""
+    return {**VARIABLES, **HOOD_VARIABLES[base.HOOD_STYLE]}
+
+
+def front_parameters(front, base=params.DEFAULT):
+    """One Parameters object per design of the front"""
+    return [base.replace(**{name: float(value) for name, value in zip(front.names, row)})
+            for row in front.values]
+
+
+# ==============================================================================
+# REPORT
+# ==============================================================================
+
+def format_front(front, limit=20):
+    """Designs spread along the front, shortest first"""
+    rows = range(len(front.values))
+    if len(front.values) > limit:
+        rows = np.unique(np.linspace(0, len(front.values) - 1, limit).round().astype(int))
+    lines = [f"{'length mm':>10} {'mass g':>8} {'diverg MOA':>11} {'radius':>7} {'refl sect':>9}"]
+    radius, section = front.names.index("REFLECTOR_RADIUS"), front.names.index("REFLECTOR_SECTION_LENGTH")
+    for i in rows:
+        length, mass, spread = front.objectives[i]
+        lines.append(f"{length:10.1f} {mass:8.1f} {spread:11.2f} "
+                     f"{front.values[i, radius]:7.1f} {front.values[i, section]:9.1f}")
+    lines.append(f"{len(front.values)} non-dominated designs from {front.evaluated:,} candidates "
+                 f"in {front.seconds:.1f}s ({front.evaluated / front.seconds * 60:,.0f} per minute)")
+    return "\n".join(lines)
+
+
+def write_csv(front, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["length_mm", "mass_g", "divergence_moa"] + list(front.names))
+        for objectives, values in zip(front.objectives, front.values):
+            writer.writerow([f"{v:.4f}" for v in objectives] + [f"{v:.4f}" for v in values])
+
+
+def main(argv=None):
+    from .. import sweep
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--population", type=int, default=POPULATION, help="candidates per generation")
+    parser.add_argument("--generations", type=int, default=GENERATIONS)
+    parser.add_argument("--material", choices=sorted(MATERIALS), default="asa",
+                        help="density and minimum wall thickness")
+    parser.add_argument("--hood-style", choices=params.HOOD_STYLES, default=None)
+    parser.add_argument("--vary", action="append", default=[], metavar="NAME=low:high",
+                        help="search a parameter within bounds (adds to or overrides VARIABLES)")
+    parser.add_argument("--fix", action="append", default=[], metavar="NAME", help="keep a parameter at its value")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="override a parameter")
+    parser.add_argument("--rays", type=int, default=RAYS, help="rays per candidate")
+    parser.add_argument("--conic", type=float, default=0.0, help="reflector conic constant (-1 paraboloid)")
+    parser.add_argument("--no-glass", action="store_true", help="leave out the protective glass")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="write the front to this CSV file")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for spec in args.set:
+        name, values = sweep.parse_grid(spec)
+        overrides[name] = values[0]
+    if args.hood_style:
+        overrides["HOOD_STYLE"] = args.hood_style
+    base = sweep.variant_parameters(overrides)
+
+    variables = search_space(base)
+    for spec in args.vary:
+        name, _, bounds = spec.partition("=")
+        if name not in params.FIELDS:
+            raise KeyError(f"unknown parameter: {name}")
+        low, high = (float(v) for v in bounds.split(":"))
+        variables[name] = (low, high)
+    for name in args.fix + list(overrides):
+        variables.pop(name, None)
+
+    (length, mass, spread), violated = evaluate_parameters(base, args.material, args.rays, args.conic,
+                                                           not args.no_glass)
+    print(f"Current design: {length:.1f} mm, {mass:.1f} g, {spread:.2f} MOA")
+    if violated:
+        print("  violates " + ", ".join(f"{name} by {-m:.1f} mm" for name, m in sorted(violated.items())))
+
+    def progress(generation, feasible, archived):
+        print(f"Generation {generation + 1}: {feasible} feasible, {archived} on the front")
+
+    front = optimise(base, variables, args.population, args.generations, args.material, args.rays,
+                     args.conic, not args.no_glass, args.seed, progress)
+    if not len(front.values):
+        print("No feasible design found; widen the bounds (--vary) or relax --set values")
+        return
+    print(format_front(front))
+    if args.out:
+        write_csv(front, args.out)
+        print(f"Front written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
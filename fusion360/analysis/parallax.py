@@ -0,0 +1,188 @@
+"""
+OKP Sight - Parallax Map
+Apparent point-of-aim shift across the eye box caused by LED placement error
+
+Usage (from the repository root):
+    python -m fusion360.analysis.parallax --tolerance asa --out parallax/
+    python -m fusion360.analysis.parallax --max-error 0.1 --set REFLECTOR_TILT_ANGLE=10
+
+The sight is only parallax free with the LED exactly at LED_FOCAL_DISTANCE.
+This takes a grid of LED displacements, axial (along the LED axis, + away
+from the reflector) and lateral (across it, at --lateral-angle), up to the
+machining tolerance (CNC_TOLERANCE or ASA_TOLERANCE). It also takes a grid
+of eye positions across the eye box, EYE_RELIEF behind the reflector. For
+every pair it traces the ray that reaches the eye (optics.py) and takes the
+dot direction relative to the one seen from the centre of the eye box. All
+pairs are traced together in one array pass.
+
+Written to --out: worst_case.png (worst shift over the eye box per
+displacement), eye_box.png (shift across the eye box for the worst
+displacement), worst_case.csv, and a table of the worst shift within each
+tolerance band, printed too.
+"""
+
+import argparse
+import csv
+import math
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from . import images
+from . import optics
+
+EYE_RELIEF = 75.0  # mm from the reflector vertex to the eye plane, along the line of sight
+EYE_STEPS = 41  # eye positions per eye box axis
+ERROR_STEPS = 9  # displacements per error axis, -max..+max
+AIM_ITERATIONS = 4  # refinements of the reflector point that sends a ray to each eye
+TOLERANCES = {"cnc": "CNC_TOLERANCE", "asa": "ASA_TOLERANCE"}
+
+# eye_u (U,), eye_v (V,), axial (A,), lateral (L,) in mm; shift (A, L, V, U) in MOA, nan where no dot is seen
+ParallaxMap = namedtuple("ParallaxMap", "eye_u eye_v axial lateral shift")
+
+
+def eye_box(p, steps=EYE_STEPS):
+    """Eye positions (u, v) covering the reflector aperture seen along the line of sight"""
+    half = p.REFLECTOR_DIAMETER / 2
+    return (np.linspace(-half, half, steps),
+            np.linspace(-half, half, steps) * math.cos(math.radians(p.REFLECTOR_TILT_ANGLE)))
+
+
+def error_grid(max_error, steps=ERROR_STEPS):
+    return np.linspace(-max_error, max_error, steps)
+
+
+def parallax_map(p, axial, lateral, eye_u, eye_v, lateral_angle=0.0, relief=EYE_RELIEF,
+                 conic=0.0, window=True):
+    """Point-of-aim shift for every LED displacement and eye position, traced in one pass"""
+    o = optics.stack([p])
+    _, _, sight, across_v = optics.frame(o)
+    sin_t, cos_t = math.sin(o.tilt[0, 0]), math.cos(o.tilt[0, 0])
+
+    # Rows: displacements; columns: the centre eye, then every eye of the box
+    da, dl = (a.reshape(-1, 1) for a in np.meshgrid(axial, lateral, indexing="ij"))
+    angle = math.radians(lateral_angle)
+    origin = optics.led_points(o, dl * math.cos(angle), dl * math.sin(angle), da)
+    grid_u, grid_v = np.meshgrid(eye_u, eye_v)
+    eu = np.concatenate([[0.0], grid_u.ravel()])[None, :]
+    ev = np.concatenate([[0.0], grid_v.ravel()])[None, :]
+
+    # Aim at the reflector point in front of each eye, then correct by where the ray lands
+    target_u, target_v = eu + 0 * da, ev + 0 * da
+    z = np.zeros_like(target_u)
+    for _ in range(AIM_ITERATIONS):
+        x, y = target_u, (target_v + z * sin_t) / cos_t
+        z = optics.conic_sag(x, y, o.radius, conic)
+        hit, out = optics.trace_to(o, origin, x, y, conic, window)
+        along = out[1] * sight[1] + out[2] * sight[2]
+        s = (relief - (hit[1] * sight[1] + hit[2] * sight[2])) / along
+        land_u = hit[0] + s * out[0]
+        land_v = (hit[1] + s * out[1]) * across_v[1] + (hit[2] + s * out[2]) * across_v[2]
+        target_u = target_u - np.nan_to_num(land_u - eu)
+        target_v = target_v - np.nan_to_num(land_v - ev)
+
+    error_u, error_v = optics.sight_errors(o, out)
+    shift = np.hypot(error_u[:, 1:] - error_u[:, :1], error_v[:, 1:] - error_v[:, :1]) / optics.MOA
+    shape = (len(axial), len(lateral), len(eye_v), len(eye_u))
+    return ParallaxMap(eye_u, eye_v, axial, lateral, shift.reshape(shape))
+
+
+# ==============================================================================
+# SUMMARIES
+# ==============================================================================
+
+def worst_case(result):
+    """Worst shift over the eye box per displacement, (A, L) MOA"""
+    shift = result.shift.reshape(result.shift.shape[:2] + (-1,))
+    valid = np.isfinite(shift).any(axis=2)
+    return np.where(valid, np.nanmax(np.where(valid[..., None], shift, 0.0), axis=2), np.nan)
+
+
+def tolerance_bands(result):
+    """(band mm, worst shift MOA) for each displacement band |axial|, |lateral| <= band"""
+    worst = worst_case(result)
+    bands = sorted({round(abs(v), 9) for v in result.axial} | {round(abs(v), 9) for v in result.lateral})
+    rows = []
+    for band in bands:
+        inside = (np.abs(result.axial)[:, None] <= band + 1e-9) & (np.abs(result.lateral)[None, :] <= band + 1e-9)
+        rows.append((band, float(np.nanmax(np.where(inside, worst, np.nan)))))
+    return rows
+
+
+def allowed_tolerance(result, limit):
+    """Largest band whose worst shift stays within limit (MOA), or None"""
+    fitting = [band for band, worst in tolerance_bands(result) if worst <= limit]
+    return fitting[-1] if fitting else None
+
+
+def format_bands(result, limit):
+    lines = [f"{'LED error ±mm':>14} {'worst shift MOA':>16}"]
+    for band, worst in tolerance_bands(result):
+        flag = "" if worst <= limit else "  > limit"
+        lines.append(f"{band:14.3f} {worst:16.2f}{flag}")
+    allowed = allowed_tolerance(result, limit)
+    lines.append(f"Tolerance keeping parallax within {limit:g} MOA: "
+                 + (f"±{allowed:.3f} mm" if allowed is not None else "none in this grid"))
+    return "\n".join(lines)
+
+
+def write_outputs(result, directory, scale=8):
+    """worst_case.png/.csv and eye_box.png into directory"""
+    os.makedirs(directory, exist_ok=True)
+    worst = worst_case(result)
+    images.write_png(os.path.join(directory, "worst_case.png"), images.heatmap(worst, low=0.0, scale=scale))
+
+    a, l = np.unravel_index(np.nanargmax(worst), worst.shape)
+    # Image rows run top to bottom, eye v bottom to top
+    images.write_png(os.path.join(directory, "eye_box.png"),
+                     images.heatmap(result.shift[a, l][::-1], low=0.0, scale=max(1, scale // 2)))
+
+    with open(os.path.join(directory, "worst_case.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["axial_mm", "lateral_mm", "worst_shift_moa"])
+        for i, axial in enumerate(result.axial):
+            for j, lateral in enumerate(result.lateral):
+                writer.writerow([f"{axial:.4f}", f"{lateral:.4f}", f"{worst[i, j]:.4f}"])
+    return result.axial[a], result.lateral[l], worst[a, l]
+
+
+def main(argv=None):
+    from .. import sweep
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tolerance", choices=sorted(TOLERANCES), default="cnc",
+                        help="largest LED error: CNC_TOLERANCE or ASA_TOLERANCE")
+    parser.add_argument("--max-error", type=float, default=None, help="largest LED error in mm (overrides --tolerance)")
+    parser.add_argument("--steps", type=int, default=ERROR_STEPS, help="displacements per error axis")
+    parser.add_argument("--eye-steps", type=int, default=EYE_STEPS, help="eye positions per eye box axis")
+    parser.add_argument("--relief", type=float, default=EYE_RELIEF, help="eye relief in mm")
+    parser.add_argument("--lateral-angle", type=float, default=0.0,
+                        help="direction of lateral error in the emitter plane, degrees (0 horizontal, 90 in the tilt plane)")
+    parser.add_argument("--limit", type=float, default=None, help="allowed shift in MOA (default: half the dot)")
+    parser.add_argument("--conic", type=float, default=0.0, help="reflector conic constant (-1 paraboloid)")
+    parser.add_argument("--no-glass", action="store_true", help="leave out the protective glass")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="override a parameter")
+    parser.add_argument("--out", default="parallax", help="output directory")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for spec in args.set:
+        name, values = sweep.parse_grid(spec)
+        overrides[name] = values[0]
+    p = sweep.variant_parameters(overrides)
+    max_error = args.max_error if args.max_error is not None else getattr(p, TOLERANCES[args.tolerance])
+    limit = args.limit if args.limit is not None else p.RETICLE_DOT_MOA / 2
+
+    errors = error_grid(max_error, args.steps)
+    eye_u, eye_v = eye_box(p, args.eye_steps)
+    result = parallax_map(p, errors, errors, eye_u, eye_v, args.lateral_angle, args.relief,
+                          args.conic, not args.no_glass)
+    axial, lateral, worst = write_outputs(result, args.out)
+
+    print(format_bands(result, limit))
+    print(f"Worst: {worst:.2f} MOA at axial {axial:+.3f} mm, lateral {lateral:+.3f} mm -> {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
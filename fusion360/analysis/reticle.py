@@ -0,0 +1,242 @@
+"""
+OKP Sight - Reticle Artwork
+Mask artwork of the reticle at its physical size on the LED aperture, as
+anti-aliased PNG rasters at any resolution and as SVG and DXF outlines
+
+Usage (from the repository root):
+    python -m fusion360.analysis.reticle --pitch-um 1 --pitch-um 0.5 --dpi 25400 --out reticle/
+    python -m fusion360.analysis.reticle --grid RETICLE_DOT_MOA=1,2,3 --format png --pitch-um 1
+
+The reticle is a RETICLE_DOT_MOA dot inside a broken cross: four arms of
+RETICLE_CROSS_LENGTH_MOA by RETICLE_CROSS_THICKNESS_MOA, starting
+RETICLE_CROSS_GAP_MOA / 2 from the centre. At the focal plane an angle of
+one MOA spans LED_FOCAL_DISTANCE * tan(1 MOA), about 33 µm at 112.5 mm.
+
+Rasters come from the signed distance to the reticle outline: each pixel's
+coverage is 0.5 - distance / pitch, clipped to 0..1, which anti-aliases
+every edge at any pitch. Reticle pixels are white (light passes) on black,
+or the other way round with --invert.
+
+Every file is kept in a content store (content_store.py) under
+~/.okp/reticle_cache, keyed on the reticle size in mm, the format and the
+resolution. Regenerating a sweep or a set of resolutions only draws what is
+new.
+"""
+
+import argparse
+import math
+import os
+import shutil
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from . import images
+from .. import content_store
+from .. import parameters as params
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".okp", "reticle_cache")
+FORMAT_VERSION = 1  # bump when the drawing code changes what it writes
+FORMATS = ("png", "svg", "dxf")
+MARGIN = 0.1  # border around the reticle, as a fraction of its extent
+MOA = math.pi / 10800
+
+# Sizes on the mask, mm
+Reticle = namedtuple("Reticle", "dot_diameter arm_length gap thickness")
+
+
+def reticle(p):
+    """Reticle of a Parameters object at its size in the focal plane"""
+    def mm(moa):
+        return p.LED_FOCAL_DISTANCE * math.tan(moa * MOA)
+    return Reticle(mm(p.RETICLE_DOT_MOA), mm(p.RETICLE_CROSS_LENGTH_MOA),
+                   mm(p.RETICLE_CROSS_GAP_MOA), mm(p.RETICLE_CROSS_THICKNESS_MOA))
+
+
+def half_extent(r):
+    """Half the width of the square artwork, margin included, mm"""
+    return max(r.dot_diameter / 2, r.gap / 2 + r.arm_length, r.thickness / 2) * (1 + MARGIN)
+
+
+def arm_boxes(r):
+    """(centre u, centre v, width, height) of the four arms, mm"""
+    middle = r.gap / 2 + r.arm_length / 2
+    return [(middle, 0, r.arm_length, r.thickness), (-middle, 0, r.arm_length, r.thickness),
+            (0, middle, r.thickness, r.arm_length), (0, -middle, r.thickness, r.arm_length)]
+
+
+# ==============================================================================
+# RASTER
+# ==============================================================================
+
+def signed_distance(r, u, v):
+    """Distance (mm) from points to the reticle outline, negative inside"""
+    dot = np.hypot(u, v) - r.dot_diameter / 2
+    # All four arms by symmetry: one horizontal and one vertical box in the first quadrant
+    au, av = np.abs(u), np.abs(v)
+    middle = r.gap / 2 + r.arm_length / 2
+
+    def box(cu, cv, half_u, half_v):
+        qu, qv = np.abs(au - cu) - half_u, np.abs(av - cv) - half_v
+        return np.hypot(np.maximum(qu, 0), np.maximum(qv, 0)) + np.minimum(np.maximum(qu, qv), 0)
+
+    arms = np.minimum(box(middle, 0, r.arm_length / 2, r.thickness / 2),
+                      box(0, middle, r.thickness / 2, r.arm_length / 2))
+    return np.minimum(dot, arms) if r.arm_length > 0 and r.thickness > 0 else dot
+
+
+def rasterise(r, pitch):
+    """Coverage image (0..1, first row at the top) with square pixels of pitch mm"""
+    half = half_extent(r)
+    count = max(1, int(math.ceil(2 * half / pitch)))
+    centres = (np.arange(count) - (count - 1) / 2) * pitch
+    distance = signed_distance(r, centres[None, :], -centres[:, None])
+    return np.clip(0.5 - distance / pitch, 0.0, 1.0)
+
+
+def write_png(r, path, pitch, invert=False):
+    coverage = rasterise(r, pitch)
+    if invert:
+        coverage = 1 - coverage
+    images.write_png(path, np.round(coverage * 255).astype(np.uint8), dpi=25.4 / pitch)
+
+
+# ==============================================================================
+# VECTOR
+# ==============================================================================
+
+def write_svg(r, path, invert=False):
+    """Outline at physical size (mm units)"""
+    half = half_extent(r)
+    ink, paper = ("black", "white") if invert else ("white", "black")
+    shapes = [f'<circle cx="0" cy="0" r="{r.dot_diameter / 2:.6f}"/>']
+    for cu, cv, width, height in arm_boxes(r):
+        shapes.append(f'<rect x="{cu - width / 2:.6f}" y="{cv - height / 2:.6f}" '
+                      f'width="{width:.6f}" height="{height:.6f}"/>')
+    size = 2 * half
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{size:.6f}mm" height="{size:.6f}mm" '
+                f'viewBox="{-half:.6f} {-half:.6f} {size:.6f} {size:.6f}">\n')
+        f.write(f'  <rect x="{-half:.6f}" y="{-half:.6f}" width="{size:.6f}" height="{size:.6f}" fill="{paper}"/>\n')
+        f.write(f'  <g fill="{ink}">\n')
+        for shape in shapes:
+            f.write(f"    {shape}\n")
+        f.write("  </g>\n</svg>\n")
+
+
+def write_dxf(r, path):
+    """Outline as an R12 DXF in mm: a circle and four closed polylines on layer RETICLE"""
+    def pairs(*items):
+        return "".join(f"{code}\n{value}\n" for code, value in items)
+
+    entities = [pairs((0, "CIRCLE"), (8, "RETICLE"), (10, 0.0), (20, 0.0), (30, 0.0),
+                      (40, f"{r.dot_diameter / 2:.6f}"))]
+    for cu, cv, width, height in arm_boxes(r):
+        corners = [(cu - width / 2, cv - height / 2), (cu + width / 2, cv - height / 2),
+                   (cu + width / 2, cv + height / 2), (cu - width / 2, cv + height / 2)]
+        polyline = pairs((0, "POLYLINE"), (8, "RETICLE"), (66, 1), (70, 1))
+        for x, y in corners:
+            polyline += pairs((0, "VERTEX"), (8, "RETICLE"), (10, f"{x:.6f}"), (20, f"{y:.6f}"), (30, 0.0))
+        entities.append(polyline + pairs((0, "SEQEND"), (8, "RETICLE")))
+    with open(path, "w", encoding="ascii") as f:
+        f.write(pairs((0, "SECTION"), (2, "HEADER"), (9, "$ACADVER"), (1, "AC1009"),
+                      (9, "$INSUNITS"), (70, 4), (0, "ENDSEC")))
+        f.write(pairs((0, "SECTION"), (2, "ENTITIES")) + "".join(entities) + pairs((0, "ENDSEC")))
+        f.write(pairs((0, "EOF")))
+
+
+# ==============================================================================
+# CACHED OUTPUT
+# ==============================================================================
+
+class ReticleCache:
+    def __init__(self, root=CACHE_DIR, max_bytes=content_store.DEFAULT_MAX_BYTES):
+        self.store = content_store.ContentStore(root, max_bytes)
+
+    def artwork(self, r, fmt, pitch=None, invert=False):
+        """Path of the artwork in the store, drawn on a miss; pitch (mm) is for PNG only"""
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of {FORMATS}, got {fmt!r}")
+        if fmt == "png" and not pitch:
+            raise ValueError("PNG artwork needs a pixel pitch")
+        resolution = pitch if fmt == "png" else None
+        key = content_store.content_key("reticle", FORMAT_VERSION, r._asdict(), fmt, resolution,
+                                        bool(invert) and fmt != "dxf")
+        filename = f"reticle.{fmt}"
+        path = self.store.get(key, fmt)
+        if path:
+            return os.path.join(path, filename)
+
+        staging = self.store.stage()
+        try:
+            target = os.path.join(staging, filename)
+            if fmt == "png":
+                write_png(r, target, pitch, invert)
+            elif fmt == "svg":
+                write_svg(r, target, invert)
+            else:
+                write_dxf(r, target)
+        except:
+            self.store.discard(staging)
+            raise
+        return os.path.join(self.store.commit(key, staging, fmt), filename)
+
+
+def pitch_name(pitch):
+    return f"{pitch * 1000:g}um"
+
+
+def export(p, directory, pitches, formats=FORMATS, invert=False, cache=None, prefix="reticle"):
+    """Write the artwork of p into directory; returns the paths written"""
+    cache = cache or ReticleCache()
+    r = reticle(p)
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for fmt in formats:
+        for pitch in (pitches if fmt == "png" else [None]):
+            name = f"{prefix}-{pitch_name(pitch)}.png" if pitch else f"{prefix}.{fmt}"
+            target = os.path.join(directory, name)
+            shutil.copyfile(cache.artwork(r, fmt, pitch, invert), target)
+            written.append(target)
+    return written
+
+
+def main(argv=None):
+    from .. import sweep
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pitch-um", action="append", type=float, default=[], help="pixel pitch in microns")
+    parser.add_argument("--dpi", action="append", type=float, default=[], help="pixels per inch")
+    parser.add_argument("--format", action="append", choices=FORMATS, default=[], help="output format (default: all)")
+    parser.add_argument("--invert", action="store_true", help="black reticle on white")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=v1,v2,...",
+                        help="explicit values for a parameter")
+    parser.add_argument("--range", action="append", default=[], metavar="NAME=start:stop:step",
+                        help="evenly spaced values for a parameter (stop included)")
+    parser.add_argument("--cache", default=CACHE_DIR, help="artwork cache directory")
+    parser.add_argument("--out", default="reticle", help="output directory")
+    args = parser.parse_args(argv)
+
+    pitches = [um / 1000 for um in args.pitch_um] + [25.4 / dpi for dpi in args.dpi] or [0.001]
+    axes = [sweep.parse_grid(spec) for spec in args.grid] + [sweep.parse_range(spec) for spec in args.range]
+    cache = ReticleCache(args.cache)
+
+    started = time.perf_counter()
+    written = []
+    for overrides in sweep.combinations(axes):
+        prefix = "-".join(["reticle"] + [f"{name}={value}" for name, value in overrides.items()])
+        written += export(sweep.variant_parameters(overrides), args.out, pitches,
+                          args.format or FORMATS, args.invert, cache, prefix)
+    seconds = time.perf_counter() - started
+
+    r = reticle(params.DEFAULT) if not axes else None
+    if r:
+        print(f"Dot {r.dot_diameter * 1000:.1f} µm, arms {r.arm_length * 1000:.1f} x "
+              f"{r.thickness * 1000:.1f} µm, gap {r.gap * 1000:.1f} µm")
+    print(f"{len(written)} files in {seconds:.2f}s -> {args.out}/")
+    print(cache.store.format_report())
+
+
+if __name__ == "__main__":
+    main()
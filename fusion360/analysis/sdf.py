@@ -0,0 +1,61 @@
+"""
+OKP Sight - Signed Distance Fields
+Exact signed distances (mm, negative inside) to the analytic primitives of
+interference.py, for arrays of points
+"""
+
+import numpy as np
+
+from .. import interference
+
+
+def box(lo, hi, points):
+    """Distance from (N, 3) points to an axis-aligned box"""
+    lo, hi = np.asarray(lo, dtype=float), np.asarray(hi, dtype=float)
+    q = np.abs(points - (lo + hi) / 2) - (hi - lo) / 2
+    outside = np.sqrt(np.sum(np.maximum(q, 0.0) ** 2, axis=1))
+    return outside + np.minimum(q.max(axis=1), 0.0)
+
+
+def cylinder(axis, center, radius, start, end, points):
+    """Distance from (N, 3) points to a capped cylinder along axis 0, 1 or 2"""
+    u, v = interference.other_axes(axis)
+    radial = np.hypot(points[:, u] - center[0], points[:, v] - center[1]) - radius
+    axial = np.abs(points[:, axis] - (start + end) / 2) - (end - start) / 2
+    return (np.minimum(np.maximum(radial, axial), 0.0)
+            + np.hypot(np.maximum(radial, 0.0), np.maximum(axial, 0.0)))
+
+
+def prism(axis, polygon, start, end, points):
+    """Distance from (N, 3) points to a polygon swept along axis 0, 1 or 2"""
+    u, v = interference.other_axes(axis)
+    q = points[:, [u, v]]
+    corners = np.asarray(polygon, dtype=float)
+    nearest = np.full(len(points), np.inf)
+    inside = np.zeros(len(points), dtype=bool)
+    for a, b in zip(corners, np.roll(corners, -1, axis=0)):
+        edge, offset = b - a, q - a
+        t = np.clip(offset @ edge / (edge @ edge), 0.0, 1.0)
+        nearest = np.minimum(nearest, np.hypot(*(offset - t[:, None] * edge).T))
+        # Even-odd crossings of a ray towards +u
+        crosses = (a[1] > q[:, 1]) != (b[1] > q[:, 1])
+        at = a[0] + (q[:, 1] - a[1]) * edge[0] / np.where(edge[1] == 0, 1.0, edge[1])
+        inside ^= crosses & (q[:, 0] < at)
+    across = np.where(inside, -nearest, nearest)
+    axial = np.abs(points[:, axis] - (start + end) / 2) - (end - start) / 2
+    return (np.minimum(np.maximum(across, axial), 0.0)
+            + np.hypot(np.maximum(across, 0.0), np.maximum(axial, 0.0)))
+
+
+def distance(shape, points):
+    """Distance from (N, 3) points to an interference.Box, Cylinder or Prism"""
+    if isinstance(shape, interference.Box):
+        return box(shape.lo, shape.hi, points)
+    if isinstance(shape, interference.Prism):
+        return prism(shape.axis, shape.points, shape.start, shape.end, points)
+    return cylinder(shape.axis, shape.center, shape.radius, shape.start, shape.end, points)
+
+
+def distances(shapes, points):
+    """(N, len(shapes)) distances of every point to every shape"""
+    return np.stack([distance(shape, points) for shape in shapes], axis=1)
@@ -0,0 +1,192 @@
+"""
+OKP Sight - Wall Thickness
+Thinnest wall between every two cavities of the main body and between each
+cavity and the outside, flagged against the ASA and CNC minimum walls
+
+Usage (from the repository root):
+    python -m fusion360.analysis.walls
+    python -m fusion360.analysis.walls --set BODY_WIDTH=54 --tolerance 0.005
+
+The body is the shell box less the cavity primitives of interference.py,
+each an exact signed distance field (sdf.py). For two surfaces A and B,
+d_A + d_B at a point of material between them is at least the wall between
+them, and equal to it on the shortest segment across the wall. So the wall
+is the smallest d_A + d_B over the material.
+
+The search starts from COARSE cells over the whole body for every pair at
+once. It then refines: every level splits the cells that can still hold a
+thinner wall into eight, down to the tolerance. Within a cell, d_A and d_B
+are at least their centre values less the half-diagonal, and at least zero
+in material. A cell is dropped when the sum of those bounds is no better
+than the best wall found, or than the limit. At most BEAM cells per pair
+are kept, those nearest both surfaces first. Overlapping cavities show up
+as walls of zero. The samples stop a cell short of the shell, so a cavity
+that breaks through it (interference.walls) is set to zero as well.
+"""
+
+import argparse
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from . import sdf
+from .. import interference
+from .. import layout
+
+EXTERIOR = "exterior"
+COARSE = 4.0  # mm, first sampling cell
+TOLERANCE = 0.01  # mm, final cell size
+BEAM = 256  # cells kept per pair and level
+# Report label -> minimum wall parameter
+TARGETS = {
+    "ASA": "ASA_MIN_WALL_THICKNESS",
+    "CNC": "CNC_MIN_WALL_THICKNESS",
+    "CNC non-structural": "CNC_MIN_WALL_NON_STRUCTURAL",
+}
+
+# first, second: cavity names (second may be EXTERIOR); thickness mm; location (x, y, z) mm on the wall
+Wall = namedtuple("Wall", "first second thickness location")
+
+_OCTANTS = np.array([[i, j, k] for i in (-1, 1) for j in (-1, 1) for k in (-1, 1)], dtype=float)
+
+
+def default_limit(p):
+    """Walls up to twice the largest target are reported"""
+    return 2 * max(getattr(p, name) for name in TARGETS.values())
+
+
+def wall_pairs(shapes):
+    """(first, second) shape indexes to measure; len(shapes) stands for the outside"""
+    count = len(shapes)
+    pairs = [(a, b) for a in range(count) for b in range(a + 1, count)]
+    pairs += [(a, count) for a in range(count) if shapes[a].name not in interference.OPENINGS]
+    return np.array(pairs, dtype=int).reshape(-1, 2)
+
+
+def thinnest_walls(p, limit=None, tolerance=TOLERANCE, coarse=COARSE):
+    """Every wall thinner than limit (mm), thinnest first"""
+    limit = default_limit(p) if limit is None else limit
+    shapes = [interference.primitive(cavity) for cavity in layout.cavities(p)]
+    outer = interference.shell(p)
+    pairs = wall_pairs(shapes)
+    count = len(shapes)
+
+    # Coarse cells over the body, one copy per pair
+    lo, hi = np.array(outer.lo), np.array(outer.hi)
+    steps = np.maximum(np.ceil((hi - lo) / coarse).astype(int), 1)
+    axes = [lo[i] + (np.arange(steps[i]) + 0.5) * coarse for i in range(3)]
+    grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+    centres = np.tile(grid, (len(pairs), 1))
+    pair = np.repeat(np.arange(len(pairs)), len(grid))
+    half = coarse / 2
+
+    best = np.full(len(pairs), np.inf)
+    where = np.full((len(pairs), 3), np.nan)
+    while len(centres):
+        # Columns: every cavity, then the outside (positive inside the shell)
+        found = np.column_stack([sdf.distances(shapes, centres), -sdf.distance(outer, centres)])
+        rows = np.arange(len(centres))
+        first, second = pairs[pair, 0], pairs[pair, 1]
+        d_first, d_second = found[rows, first], found[rows, second]
+        value = d_first + d_second
+        others = found[:, :count].copy()
+        others[rows, first] = np.inf
+        others[rows[second < count], second[second < count]] = np.inf
+        clear = np.minimum(others.min(axis=1) if count else np.inf, found[:, count])
+
+        # Centres in material between the two surfaces are walls: keep the thinnest per pair
+        material = (d_first >= 0) & (d_second >= 0) & (clear >= 0)
+        if material.any():
+            candidates = np.flatnonzero(material)
+            order = candidates[np.lexsort((value[candidates], pair[candidates]))]
+            groups, start = np.unique(pair[order], return_index=True)
+            thinnest = order[start]
+            better = value[thinnest] < best[groups]
+            best[groups[better]] = value[thinnest[better]]
+            where[groups[better]] = centres[thinnest[better]]
+
+        if half <= tolerance / 2:
+            break
+        # Lower bound of d_A + d_B over the material in a cell: both are >= 0 there
+        reach = half * math.sqrt(3)
+        bound = np.maximum(d_first - reach, 0.0) + np.maximum(d_second - reach, 0.0)
+        keep = ((d_first >= -reach) & (d_second >= -reach) & (clear >= -reach)
+                & (bound < np.minimum(best[pair], limit)))
+        keep = np.flatnonzero(keep)
+        nearness = np.abs(d_first[keep]) + np.abs(d_second[keep])
+        order = keep[np.lexsort((nearness, bound[keep], pair[keep]))]
+        groups, start = np.unique(pair[order], return_index=True)
+        rank = np.arange(len(order)) - np.repeat(start, np.diff(np.append(start, len(order))))
+        kept = order[rank < BEAM]
+
+        half /= 2
+        centres = (centres[kept, None, :] + _OCTANTS * half).reshape(-1, 3)
+        pair = np.repeat(pair[kept], len(_OCTANTS))
+
+    # A cavity crossing the shell leaves no material there, only slivers the cells round up from zero
+    for i, (a, b) in enumerate(pairs):
+        if b == count and interference.walls(shapes[a], outer)[0] < 0:
+            best[i] = 0.0
+            if np.isnan(where[i]).any():
+                lo, hi = interference.bounds(shapes[a])
+                where[i] = [(lo[axis] + hi[axis]) / 2 for axis in range(3)]
+
+    names = [shape.name for shape in shapes] + [EXTERIOR]
+    walls = [Wall(names[a], names[b], max(float(best[i]), 0.0), tuple(map(float, where[i])))
+             for i, (a, b) in enumerate(pairs) if best[i] < limit]
+    return sorted(walls, key=lambda wall: wall.thickness)
+
+
+def flags(p, thickness):
+    """{target label: True if the wall is thick enough}"""
+    return {label: thickness >= getattr(p, name) for label, name in TARGETS.items()}
+
+
+def thinnest(p, **options):
+    """The single thinnest wall in mm, or None when every wall exceeds the limit"""
+    walls = thinnest_walls(p, **options)
+    return walls[0].thickness if walls else None
+
+
+def format_walls(p, walls, limit):
+    targets = "  ".join(f"{label} {getattr(p, name):g}" for label, name in TARGETS.items())
+    lines = [f"Minimum walls (mm): {targets}",
+             f"{'wall':<22} {'mm':>6}  {'at x, y, z (mm)':<24} below"]
+    for wall in walls:
+        below = [label for label, ok in flags(p, wall.thickness).items() if not ok]
+        at = ", ".join(f"{v:.1f}" for v in wall.location)
+        lines.append(f"{wall.first + ' / ' + wall.second:<22} {wall.thickness:6.2f}  {at:<24} "
+                     f"{', '.join(below) or '-'}")
+    if not walls:
+        lines.append(f"No wall under {limit:g} mm")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from .. import sweep
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="override a parameter")
+    parser.add_argument("--limit", type=float, default=None,
+                        help="report walls up to this thickness, mm (default: twice the largest target)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="final sampling cell, mm")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for spec in args.set:
+        name, values = sweep.parse_grid(spec)
+        overrides[name] = values[0]
+    p = sweep.variant_parameters(overrides)
+    limit = default_limit(p) if args.limit is None else args.limit
+
+    started = time.perf_counter()
+    walls = thinnest_walls(p, limit, args.tolerance)
+    seconds = time.perf_counter() - started
+    print(format_walls(p, walls, limit))
+    print(f"Checked in {seconds * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
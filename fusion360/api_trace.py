@@ -0,0 +1,267 @@
+"""
+OKP Sight - API Trace
+Opt-in timing of every Fusion API call the generators make, charged to the
+generator function that made it
+
+Usage:
+    Set API_TRACE = "on" in parameters.py and run a generator or variant
+    table script: the trace goes to TRACE_DIRECTORY.
+
+    From the repository root, headlessly:
+    python -m fusion360.api_trace --set HOOD_STYLE=skeleton --out traces
+
+    In code:
+    with api_trace.tracing() as trace:
+        main_body.build(rootComp, p)
+    trace.write("traces", "main_body")
+
+Inside tracing() every method and property of the adsk.core and adsk.fusion
+classes is wrapped with a timer, and put back on the way out. Only the
+outermost API call is timed: work the API does through other API calls
+counts towards the call that started it. Each call is charged to the stack
+of this package's functions above it, outermost first, e.g.
+
+    main_body.build;main_body.create_laser_cavity;ExtrudeFeatures.add
+
+<stem>.folded holds one "stack microseconds" line per stack, the collapsed
+format flamegraph.pl, inferno and speedscope read. <stem>.json holds the
+same stacks with call counts, total and longest seconds, and the totals per
+API call and per generator, the innermost create_* function of the stack. Outside tracing() nothing is wrapped,
+so with API_TRACE off the generators call the API directly at no cost.
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+
+TRACE_DIRECTORY = os.path.join(os.path.expanduser("~"), "okp_trace")
+TOP = 10  # rows per table in report()
+
+_PACKAGE = __package__
+_SKIP = (f"{_PACKAGE}.api_trace", f"{_PACKAGE}.headless")
+
+_active = None  # the Trace being recorded, or None
+
+
+# ==============================================================================
+# TRACES
+# ==============================================================================
+
+class Trace:
+    """API calls recorded by one tracing() block"""
+
+    def __init__(self):
+        # (frame, ..., call): [count, seconds, longest]
+        self.stacks = {}
+        self.seconds = None  # wall time of the block
+        self._depth = 0  # API calls in progress
+
+    def record(self, call, seconds, frame):
+        """Charge one call of seconds to the package functions above frame"""
+        stack = []
+        while frame is not None:
+            module = frame.f_globals.get("__name__", "")
+            if module.startswith(f"{_PACKAGE}.") and not module.startswith(_SKIP):
+                stack.append(f"{module[len(_PACKAGE) + 1:]}.{frame.f_code.co_name}")
+            frame = frame.f_back
+        key = tuple(reversed(stack)) + (call,)
+        entry = self.stacks.get(key)
+        if entry is None:
+            self.stacks[key] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    @property
+    def calls(self):
+        return sum(count for count, _, _ in self.stacks.values())
+
+    @property
+    def api_seconds(self):
+        return sum(seconds for _, seconds, _ in self.stacks.values())
+
+    def totals(self, by):
+        """{name: [count, seconds]} per API call (by "call") or per generator (by "generator")"""
+        totals = {}
+        for key, (count, seconds, _) in self.stacks.items():
+            total = totals.setdefault(key[-1] if by == "call" else generator(key[:-1]), [0, 0.0])
+            total[0] += count
+            total[1] += seconds
+        return dict(sorted(totals.items(), key=lambda item: -item[1][1]))
+
+    def folded(self):
+        """Collapsed-stack lines, integer microseconds"""
+        return [f"{';'.join(key)} {round(seconds * 1e6)}"
+                for key, (_, seconds, _) in sorted(self.stacks.items())]
+
+    def as_json(self):
+        return {
+            "seconds": self.seconds,
+            "api_seconds": self.api_seconds,
+            "calls": self.calls,
+            "by_call": {name: {"count": count, "seconds": seconds}
+                        for name, (count, seconds) in self.totals("call").items()},
+            "by_generator": {name: {"count": count, "seconds": seconds}
+                             for name, (count, seconds) in self.totals("generator").items()},
+            "stacks": [{"stack": list(key[:-1]), "call": key[-1], "count": count,
+                        "seconds": seconds, "longest": longest}
+                       for key, (count, seconds, longest) in sorted(self.stacks.items())],
+        }
+
+    def write(self, directory, stem):
+        """<stem>.json and <stem>.folded in directory; the written paths"""
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f"{stem}.json")
+        with open(json_path, "w") as f:
+            json.dump(self.as_json(), f, indent=1)
+        folded_path = os.path.join(directory, f"{stem}.folded")
+        with open(folded_path, "w") as f:
+            f.write("\n".join(self.folded()) + "\n")
+        return [json_path, folded_path]
+
+    def report(self, top=TOP):
+        """The slowest API calls and generator functions"""
+        lines = [f"API trace: {self.calls} calls, {self.api_seconds * 1000:.0f} ms in the API"
+                 + (f" of {self.seconds * 1000:.0f} ms" if self.seconds is not None else "")]
+        for title, by in (("API call", "call"), ("Generator", "generator")):
+            lines.append(f"{title:<40} {'calls':>6} {'ms':>9}")
+            for name, (count, seconds) in list(self.totals(by).items())[:top]:
+                lines.append(f"{name:<40} {count:6d} {seconds * 1000:9.1f}")
+        return "\n".join(lines)
+
+
+def generator(stack):
+    """The function responsible for a stack's call: the innermost create_* one, else the innermost"""
+    for frame in reversed(stack):
+        if frame.rpartition(".")[2].startswith("create_"):
+            return frame
+    return stack[-1] if stack else "(outside generators)"
+
+
+# ==============================================================================
+# WRAPPING
+# ==============================================================================
+
+def _timed(cls, name, fn):
+    """fn, timing its outermost calls into the active Trace"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        trace = _active
+        if trace is None or trace._depth:
+            return fn(*args, **kwargs)
+        trace._depth += 1
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - started
+            trace._depth -= 1
+            owner = type(args[0]) if args and isinstance(args[0], cls) else cls
+            trace.record(f"{owner.__name__}.{name}", seconds, sys._getframe(1))
+    return wrapper
+
+
+def _wrapped(cls, name, value):
+    """Timed replacement for a class attribute, or None if it is not an API call"""
+    if isinstance(value, staticmethod):
+        return staticmethod(_timed(cls, name, value.__func__))
+    if isinstance(value, classmethod):
+        return classmethod(_timed(cls, name, value.__func__))
+    if isinstance(value, property):
+        return property(value.fget and _timed(cls, name, value.fget),
+                        value.fset and _timed(cls, f"{name}=", value.fset),
+                        value.fdel, value.__doc__)
+    if callable(value) and not isinstance(value, type):
+        return _timed(cls, name, value)
+    return None
+
+
+def api_classes():
+    """Classes of adsk.core and adsk.fusion"""
+    import adsk.core
+    import adsk.fusion
+
+    for module in (adsk.core, adsk.fusion):
+        for cls in vars(module).values():
+            if isinstance(cls, type) and cls.__module__ == module.__name__:
+                yield cls
+
+
+@contextlib.contextmanager
+def tracing(enabled=True):
+    """Time the API calls made inside the block; yields the Trace, or None unless enabled"""
+    global _active
+    if not enabled:
+        yield None
+        return
+    if _active is not None:
+        raise RuntimeError("API calls are already being traced")
+
+    originals = []
+    for cls in api_classes():
+        for name, value in list(vars(cls).items()):
+            if name.startswith("_"):
+                continue
+            replacement = _wrapped(cls, name, value)
+            if replacement is not None:
+                originals.append((cls, name, value))
+                setattr(cls, name, replacement)
+
+    trace = _active = Trace()
+    started = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        trace.seconds = time.perf_counter() - started
+        _active = None
+        for cls, name, value in originals:
+            setattr(cls, name, value)
+
+
+def write_generated(trace, stem):
+    """trace.write to TRACE_DIRECTORY, if there is a trace; the written paths"""
+    if trace is None:
+        return []
+    return trace.write(TRACE_DIRECTORY, stem)
+
+
+def format_traced(trace, paths):
+    if trace is None:
+        return ""
+    return f"\n\n{trace.report(top=3)}\nTrace written to:\n" + "\n".join(paths)
+
+
+def main(argv=None):
+    from . import headless
+    from . import sweep
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="override a parameter")
+    parser.add_argument("--top", type=int, default=TOP, help="rows per table")
+    parser.add_argument("--out", default=TRACE_DIRECTORY, help="output directory")
+    parser.add_argument("--stem", default="variants", help="output file name, without extension")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for spec in args.set:
+        name, values = sweep.parse_grid(spec)
+        overrides[name] = values[0]
+    base = sweep.variant_parameters(overrides)
+
+    headless.install()
+    from . import build_mode, variants
+
+    design = headless.new_session().activeProduct
+    with tracing() as trace, build_mode.building(design, base.BUILD_MODE) as generation:
+        variants.build_variants(generation.design, variants.HOOD_VARIANTS, base=base, log=lambda line: None)
+    print(trace.report(args.top))
+    print("\n".join(trace.write(args.out, args.stem)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+OKP Sight - Benchmarks
+Times every generator and variant script against the headless stand-in and
+fails when one got slower, bigger or chattier than the stored baseline
+
+Usage (from the repository root):
+    python -m fusion360.benchmark                      # compare with the baseline
+    python -m fusion360.benchmark --save               # store this run as the baseline
+    python -m fusion360.benchmark --only rib_count --repeat 3
+
+Cases:
+    main_body/<hood>     main_body.build for each HOOD_STYLE
+    picatinny_mount      picatinny_mount.build
+    script/<name>        each variant table script, run as Fusion runs it
+    mount_length/<mm>    the mount at growing MOUNT_LENGTH
+    rib_count/<n>        the skeleton body at growing HOOD_SKELETON_RIB_COUNT
+    variant_count/<n>    variants.build_variants over growing tables
+    farm_count/<n>       variant_farm.farm over the same tables, exporting low-refinement STL
+
+Every case runs in a fresh headless session. seconds is the fastest of
+--repeat runs; api_calls, features (timeline entries) and bodies come from
+the last of them, and peak_kb is the tracemalloc peak of one more run, kept
+apart so tracing does not slow the timed runs. Each series also reports how
+its cost grows per step.
+
+A case regresses when api_calls or features go up at all, when seconds
+exceed the baseline by SLOWER plus SLACK_SECONDS, or when peak_kb exceeds it
+by LARGER plus SLACK_KB. The slack keeps scheduler noise on millisecond
+cases from failing the run. Cases the baseline does not have are reported
+as new and never fail.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+
+from . import parameters as params
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+REPEAT = 5
+SLOWER = 0.5  # fraction of the baseline seconds
+SLACK_SECONDS = 0.005
+LARGER = 0.25  # fraction of the baseline peak_kb
+SLACK_KB = 64.0
+COUNTS = ("api_calls", "features")
+
+SCRIPTS = ("variants", "generate_all_variants", "generate_variants_safe", "generate_variants_upright",
+           "generate_variants_with_savepoints")
+
+# name: (parameter, or "variants" for the table size; unit of a step; values)
+SERIES = {
+    "mount_length": ("MOUNT_LENGTH", "mm", (60.0, 120.0, 240.0, 480.0)),
+    "rib_count": ("HOOD_SKELETON_RIB_COUNT", "rib", (2, 4, 8, 16, 32)),
+    "variant_count": ("variants", "variant", (1, 3, 9, 27)),
+    "farm_count": ("variants", "variant", (1, 3, 9)),
+}
+
+# build(app) runs the case in app's active design
+Case = namedtuple("Case", "name build")
+
+
+# ==============================================================================
+# CASES
+# ==============================================================================
+
+def generator_case(name, generator, p):
+    def build(app):
+        generator.build(app.activeProduct.rootComponent, p)
+    return Case(name, build)
+
+
+def script_case(script):
+    from . import headless
+
+    def build(app):
+        headless.run_script(script)
+    return Case(f"script/{script}", build)
+
+
+def table(count):
+    """count variants, the hood styles in turn, one slot each"""
+    from . import variants
+
+    return [variants.Variant(f"V{i + 1}", params.HOOD_STYLES[i % len(params.HOOD_STYLES)], i)
+            for i in range(count)]
+
+
+def variant_case(count):
+    from . import variants
+
+    def build(app):
+        variants.build_variants(app.activeProduct, table(count), log=lambda line: None)
+    return Case(f"variant_count/{count}", build)
+
+
+def farm_case(count):
+    from . import variant_farm
+
+    def build(app):
+        with tempfile.TemporaryDirectory() as directory:
+            variant_farm.farm(app.activeProduct, table(count), directory, refinement="low", formats=("stl",),
+                              log=lambda line: None)
+    return Case(f"farm_count/{count}", build)
+
+
+def series_cases(series):
+    from . import main_body, picatinny_mount
+
+    name, _, values = SERIES[series]
+    if series == "variant_count":
+        return [variant_case(count) for count in values]
+    if series == "farm_count":
+        return [farm_case(count) for count in values]
+    generator = picatinny_mount if series == "mount_length" else main_body
+    base = params.DEFAULT.replace(HOOD_STYLE="skeleton")
+    return [generator_case(f"{series}/{value:g}", generator, base.replace(**{name: value}))
+            for value in values]
+
+
+def cases():
+    """Every case, in report order"""
+    from . import main_body, picatinny_mount
+
+    found = [generator_case(f"main_body/{hood}", main_body, params.DEFAULT.replace(HOOD_STYLE=hood))
+             for hood in params.HOOD_STYLES]
+    found.append(generator_case("picatinny_mount", picatinny_mount, params.DEFAULT))
+    found += [script_case(script) for script in SCRIPTS]
+    for series in SERIES:
+        found += series_cases(series)
+    return found
+
+
+# ==============================================================================
+# MEASURING
+# ==============================================================================
+
+def run_once(case):
+    """Build case in a fresh session, printing nothing; the application"""
+    from . import headless
+
+    app = headless.new_session()
+    with contextlib.redirect_stdout(io.StringIO()):
+        case.build(app)
+    return headless.install().core.Application.get()
+
+
+def measure(case, repeat=REPEAT):
+    """{metric: value} for one case"""
+    fastest = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        app = run_once(case)
+        fastest = min(fastest, time.perf_counter() - started)
+    design = app.activeProduct
+    metrics = {
+        "seconds": fastest,
+        # Application.get is how scripts find the session, not work they do
+        "api_calls": sum(1 for call in app.recorded_calls if call[0] != "Application.get"),
+        "features": design.timeline.count,
+        "bodies": sum(c.bRepBodies.count for c in design.allComponents),
+    }
+    tracemalloc.start()
+    try:
+        run_once(case)
+        metrics["peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+    return metrics
+
+
+def run(selected, repeat=REPEAT, progress=None):
+    """{case name: metrics} for the cases whose names start with one of selected (all if empty)"""
+    from . import headless
+
+    headless.install()
+    results = {}
+    for case in cases():
+        if selected and not any(case.name.startswith(prefix) for prefix in selected):
+            continue
+        results[case.name] = measure(case, repeat)
+        if progress:
+            progress(case.name)
+    return results
+
+
+def growth(results):
+    """{series: (seconds, api_calls, features) per step} between the first and last point measured"""
+    found = {}
+    for series, (_, _, values) in SERIES.items():
+        points = [(value, results.get(f"{series}/{value:g}")) for value in values]
+        points = [(value, metrics) for value, metrics in points if metrics]
+        if len(points) < 2:
+            continue
+        (first, a), (last, b) = points[0], points[-1]
+        steps = last - first
+        found[series] = tuple((b[metric] - a[metric]) / steps for metric in ("seconds",) + COUNTS)
+    return found
+
+
+# ==============================================================================
+# BASELINE
+# ==============================================================================
+
+def regressions(results, baseline):
+    """Lines naming every metric that regressed against baseline"""
+    found = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in COUNTS:
+            if metrics[metric] > base[metric]:
+                found.append(f"{name}: {metric} {base[metric]} -> {metrics[metric]}")
+        if metrics["seconds"] > base["seconds"] * (1 + SLOWER) + SLACK_SECONDS:
+            found.append(f"{name}: {base['seconds'] * 1000:.1f} ms -> {metrics['seconds'] * 1000:.1f} ms")
+        if metrics["peak_kb"] > base["peak_kb"] * (1 + LARGER) + SLACK_KB:
+            found.append(f"{name}: peak {base['peak_kb']:.0f} kB -> {metrics['peak_kb']:.0f} kB")
+    return found
+
+
+def load_baseline(path=BASELINE):
+    """{case name: metrics} stored by save_baseline, or {} if there is none"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def format_results(results, baseline):
+    lines = [f"{'case':<42} {'ms':>8} {'vs base':>8} {'calls':>6} {'feats':>6} {'bodies':>6} {'peak kB':>8}"]
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        change = f"{metrics['seconds'] / base['seconds'] - 1:+8.0%}" if base and base["seconds"] else "     new"
+        lines.append(f"{name:<42} {metrics['seconds'] * 1000:8.1f} {change} {metrics['api_calls']:6d} "
+                     f"{metrics['features']:6d} {metrics['bodies']:6d} {metrics['peak_kb']:8.0f}")
+    for series, (seconds, calls, features) in growth(results).items():
+        unit = SERIES[series][1]
+        lines.append(f"{series}: {seconds * 1e6:.1f} us, {calls:.2f} API calls and {features:.2f} features per {unit}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--only", action="append", default=[], metavar="PREFIX",
+                        help="run only the cases whose names start with PREFIX (repeatable)")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per case")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    results = run(args.only, args.repeat)
+    baseline = load_baseline(args.baseline)
+    print(format_results(results, baseline))
+    print(f"Benchmarked {len(results)} cases in {time.perf_counter() - started:.1f}s")
+    if args.save:
+        save_baseline({**baseline, **results} if args.only else results, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    found = regressions(results, baseline)
+    if found:
+        print("Regressions against the baseline:\n" + "\n".join(found))
+        return 1
+    print("No regressions" if baseline else "No baseline to compare with; run with --save to store one")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
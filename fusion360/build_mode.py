@@ -0,0 +1,198 @@
+"""
+OKP Sight - Build Modes
+Runs bulk generation with less recomputation, then puts everything back
+
+    normal    build as usual
+    deferred  sketches are drawn with compute deferred and compute their
+              profiles once, when a feature first needs them
+    direct    deferred, in a new direct-modelling (history free) document,
+              for runs that only export the result; the user's design is
+              untouched
+
+Usage:
+    with build_mode.building(design, p.BUILD_MODE) as build:
+        main_body.build(build.design.rootComponent, p)
+    print(build.report())
+
+Generators create sketches with new_sketch() and read them with profiles()
+so deferral applies to every sketch made inside the block. Repeated features
+are one feature and a pattern() of it, or, where can_pattern() is False in a
+direct design, every copy in one sketch. On the way out,
+even when a step fails, deferred sketches compute again and the document
+that was active is active again.
+
+Running this script builds the main body and mount once in every mode, each
+in a scratch document, and reports the time saved against normal mode.
+"""
+
+import adsk.core
+import adsk.fusion
+import contextlib
+import time
+import traceback
+from . import parameters as params
+from . import user_parameters
+
+BUILD_MODES = params.BUILD_MODES
+
+_deferring = None  # sketches deferred by the innermost deferred build, or None
+
+
+def run(context):
+    ui = None
+    try:
+        app = adsk.core.Application.get()
+        ui = app.userInterface
+
+        from . import main_body, picatinny_mount
+
+        def build(rootComp):
+            main_body.build(rootComp, params.DEFAULT)
+            picatinny_mount.build(rootComp, params.DEFAULT)
+
+        ui.messageBox(format_comparison(compare(build)))
+
+    except:
+        if ui:
+            ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+
+
+# ==============================================================================
+# SKETCHES
+# ==============================================================================
+
+def new_sketch(comp, plane):
+    """comp.sketches.add(plane), with compute deferred during a deferred build"""
+    sketch = comp.sketches.add(plane)
+    if _deferring is not None:
+        sketch.isComputeDeferred = True
+        _deferring.append(sketch)
+    return sketch
+
+
+def profiles(sketch):
+    """Profiles of a sketch, computing them first if they were deferred"""
+    if sketch.isComputeDeferred:
+        sketch.isComputeDeferred = False
+    return sketch.profiles
+
+
+# ==============================================================================
+# PATTERNS
+# ==============================================================================
+
+def can_pattern(comp):
+    """True unless comp is in a direct design, which keeps no features to pattern"""
+    return comp.parentDesign.designType != adsk.fusion.DesignTypes.DirectDesignType
+
+
+def pattern(comp, feature, axis, count, spacing):
+    """One rectangular pattern feature: count copies of feature, spacing cm apart along axis
+
+    count and spacing may be expressions.Linked, so the pattern follows user-parameter edits.
+    """
+    patterns = comp.features.rectangularPatternFeatures
+    entities = adsk.core.ObjectCollection.create()
+    entities.add(feature)
+    patternInput = patterns.createInput(entities, axis,
+                                        user_parameters.value(count),
+                                        user_parameters.value(spacing),
+                                        adsk.fusion.PatternDistanceType.SpacingPatternDistanceType)
+    return patterns.add(patternInput)
+
+
+# ==============================================================================
+# BUILDS
+# ==============================================================================
+
+class Build:
+    """One timed build: mode, the design to build into, and the results"""
+
+    def __init__(self, mode, design):
+        self.mode = mode
+        self.design = design
+        self.seconds = None
+        self.deferred_sketches = 0
+
+    def report(self, baseline=None):
+        """One line summary; baseline is the seconds of a normal build to compare with"""
+        line = f"{self.mode} build: {self.seconds * 1000:.0f} ms"
+        if self.deferred_sketches:
+            line += f", {self.deferred_sketches} sketches deferred"
+        if baseline:
+            saved = baseline - self.seconds
+            line += f", {saved * 1000:.0f} ms ({saved / baseline:.0%}) saved against normal"
+        return line
+
+
+@contextlib.contextmanager
+def scratch_document(keep=False):
+    """New design document for the block, kept afterwards only if keep and the block succeeded
+
+    The document that was active before is active again afterwards.
+    """
+    app = adsk.core.Application.get()
+    previous = app.activeDocument
+    document = app.documents.add(adsk.core.DocumentTypes.FusionDesignDocumentType)
+    try:
+        yield adsk.fusion.Design.cast(app.activeProduct)
+    except BaseException:
+        # Never leave a half-built document behind
+        document.close(False)
+        raise
+    else:
+        if not keep:
+            document.close(False)
+    finally:
+        if previous is not None and previous.isValid:
+            previous.activate()
+
+
+@contextlib.contextmanager
+def building(design, mode="deferred", keep=True):
+    """Build inside the block in mode; yields a Build whose design is the one to build into
+
+    normal and deferred build into design. direct ignores design and builds
+    into a new document with design history turned off, left open afterwards
+    if keep (see scratch_document).
+    """
+    global _deferring
+    if mode not in BUILD_MODES:
+        raise ValueError(f"build mode must be one of {BUILD_MODES}, got {mode!r}")
+
+    previous = _deferring
+    deferred = []
+    started = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if mode == "direct":
+            design = stack.enter_context(scratch_document(keep))
+            design.designType = adsk.fusion.DesignTypes.DirectDesignType
+        build = Build(mode, design)
+        if mode != "normal":
+            _deferring = deferred
+        try:
+            yield build
+        finally:
+            _deferring = previous
+            for sketch in deferred:
+                if sketch.isValid and sketch.isComputeDeferred:
+                    sketch.isComputeDeferred = False
+            build.deferred_sketches = len(deferred)
+            build.seconds = time.perf_counter() - started
+
+
+def compare(build, modes=BUILD_MODES):
+    """Run build(rootComp) once per mode, each in a scratch document; returns the Builds"""
+    builds = []
+    for mode in modes:
+        with contextlib.ExitStack() as stack:
+            design = None if mode == "direct" else stack.enter_context(scratch_document())
+            with building(design, mode, keep=False) as result:
+                build(result.design.rootComponent)
+        builds.append(result)
+    return builds
+
+
+def format_comparison(builds):
+    baseline = next((build.seconds for build in builds if build.mode == "normal"), None)
+    return "\n".join(build.report(None if build.mode == "normal" else baseline) for build in builds)
@@ -0,0 +1,167 @@
+"""
+OKP Sight - Content-Addressed Store
+On-disk cache of files keyed by a hash of everything that produced them,
+with a size cap and least-recently-used eviction
+No Fusion API here, so scripts and headless tools can share one store
+
+Layout under the root directory:
+    objects/<key[:2]>/<key>/   one directory per entry, meta.json + files
+    staging/                   entries being written (moved in atomically)
+    notes/                     small JSON documents, never evicted
+
+Entries are immutable; the modification time of an entry directory is its
+last use, so several processes can share a store without a lock.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+META = "meta.json"
+
+
+def content_key(*parts):
+    """sha256 of the canonical JSON of parts"""
+    text = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _tree_size(path):
+    return sum(os.path.getsize(os.path.join(folder, name))
+               for folder, _, names in os.walk(path) for name in names)
+
+
+class ContentStore:
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        self.labels = {}  # label -> {"hits": n, "misses": n}
+        for folder in ("objects", "staging", "notes"):
+            os.makedirs(os.path.join(root, folder), exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, "objects", key[:2], key)
+
+    def contains(self, key):
+        return os.path.isfile(os.path.join(self.path(key), META))
+
+    def get(self, key, label=None):
+        """Directory of an entry, marked as just used, or None; counts a hit or miss"""
+        path = self.path(key)
+        found = self.contains(key)
+        if found:
+            try:
+                os.utime(path)
+            except FileNotFoundError:  # evicted by another process meanwhile
+                found = False
+        self.record(label, found)
+        return path if found else None
+
+    def record(self, label, hit):
+        """Count a lookup in the run statistics"""
+        outcome = "hits" if hit else "misses"
+        self.stats[outcome] += 1
+        counts = self.labels.setdefault(label or "-", {"hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+    def stage(self):
+        """Empty directory to write a new entry into; hand it to commit()"""
+        return tempfile.mkdtemp(dir=os.path.join(self.root, "staging"))
+
+    def discard(self, staging):
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def commit(self, key, staging, label=None):
+        """Move a staged directory into the store and enforce the size cap"""
+        size = _tree_size(staging)
+        with open(os.path.join(staging, META), "w", encoding="utf-8") as f:
+            json.dump({"key": key, "label": label, "bytes": size, "created": time.time()}, f)
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.rename(staging, path)
+        except OSError:
+            # Stored by another process first; the contents are the same
+            self.discard(staging)
+        self.stats["stored"] += 1
+        self.evict(keep=key)
+        return path
+
+    def entries(self):
+        """(last_used, bytes, key) of every entry"""
+        found = []
+        objects = os.path.join(self.root, "objects")
+        for prefix in os.listdir(objects):
+            for key in os.listdir(os.path.join(objects, prefix)):
+                path = os.path.join(objects, prefix, key)
+                try:
+                    with open(os.path.join(path, META), encoding="utf-8") as f:
+                        size = json.load(f)["bytes"]
+                    found.append((os.path.getmtime(path), size, key))
+                except (OSError, ValueError, KeyError):
+                    continue  # being written or evicted
+        return found
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the store fits max_bytes"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self.path(key), ignore_errors=True)
+            total -= size
+            self.stats["evicted"] += 1
+        return total
+
+    def clear(self):
+        shutil.rmtree(os.path.join(self.root, "objects"), ignore_errors=True)
+        os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+
+    # ==========================================================================
+    # NOTES
+    # ==========================================================================
+
+    def read_note(self, name):
+        try:
+            with open(os.path.join(self.root, "notes", name + ".json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write_note(self, name, data):
+        path = os.path.join(self.root, "notes", name + ".json")
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp, path)
+
+    # ==========================================================================
+    # REPORT
+    # ==========================================================================
+
+    def report(self):
+        """Statistics of this run plus the current store size"""
+        entries = self.entries()
+        return dict(self.stats, entries=len(entries), bytes=sum(size for _, size, _ in entries),
+                    max_bytes=self.max_bytes, labels=self.labels)
+
+    def format_report(self):
+        report = self.report()
+        lines = [f"{label}: {c['hits']} hit(s), {c['misses']} miss(es)"
+                 for label, c in sorted(report["labels"].items())]
+        lines.append(f"Total: {report['hits']} hit(s), {report['misses']} miss(es), "
+                     f"{report['stored']} stored, {report['evicted']} evicted")
+        lines.append(f"Store: {report['entries']} entries, {report['bytes'] / 1e6:.1f} of "
+                     f"{report['max_bytes'] / 1e6:.0f} MB")
+        return "\n".join(lines)
@@ -0,0 +1,131 @@
+"""
+OKP Sight - Parameter Expressions
+Numbers that remember the Fusion user-parameter expression they were
+computed from (no Fusion API)
+
+With USER_PARAMETERS = "linked", p.cm holds Linked values instead of plain
+floats: p.cm.BODY_HEIGHT is 4.5 and also the expression "BODY_HEIGHT".
+Linked is a float, so sketch points and layout.py arithmetic use it as
+before, and every sum, difference, product or quotient carries the matching
+expression along:
+
+    half = p.cm.TOTAL_LENGTH / 2     # 8.25, "TOTAL_LENGTH / 2"
+    -half + 1.0                      # -7.25, "-(TOTAL_LENGTH / 2) + 10 mm"
+
+power is the length dimension: 1 for lengths, 0 for counts, 2 for areas.
+Plain numbers added to a length are centimetres and are written in mm;
+plain factors and divisors are unitless. user_parameters.value() turns a
+Linked into ValueInput.createByString(expression) and a plain float into
+createByReal, so features built from linked values recompute when a user
+parameter is edited in Fusion.
+"""
+
+import math
+
+# Precedence of the outermost operation of an expression
+SUM, PRODUCT, UNARY, ATOM = range(4)
+
+
+def literal(value, power):
+    """A plain number as an expression term: lengths (cm) in mm, anything else unitless"""
+    if power == 1:
+        return f"{round(value * 10, 9):g} mm"
+    return f"{round(value, 9):g}"
+
+
+class Linked(float):
+    """A float that also carries the Fusion expression it was computed from"""
+
+    def __new__(cls, value, expression, power=1, precedence=ATOM):
+        linked = super().__new__(cls, value)
+        linked.expression = expression
+        linked.power = power
+        linked.precedence = precedence
+        linked.negates = None  # x when this is -x, so that -(-x) is x again
+        return linked
+
+    def __repr__(self):
+        return f"Linked({float(self)!r}, {self.expression!r})"
+
+    def term(self, precedence):
+        """The expression, in parentheses if it binds looser than precedence"""
+        return f"({self.expression})" if self.precedence < precedence else self.expression
+
+    def __add__(self, other):
+        return _combine(self, _operand(other, self.power), "+") if _number(other) else NotImplemented
+
+    def __radd__(self, other):
+        return _combine(_operand(other, self.power), self, "+") if _number(other) else NotImplemented
+
+    def __sub__(self, other):
+        return _combine(self, _operand(other, self.power), "-") if _number(other) else NotImplemented
+
+    def __rsub__(self, other):
+        return _combine(_operand(other, self.power), self, "-") if _number(other) else NotImplemented
+
+    def __mul__(self, other):
+        return _combine(self, _operand(other, 0), "*") if _number(other) else NotImplemented
+
+    def __rmul__(self, other):
+        return _combine(_operand(other, 0), self, "*") if _number(other) else NotImplemented
+
+    def __truediv__(self, other):
+        return _combine(self, _operand(other, 0), "/") if _number(other) else NotImplemented
+
+    def __rtruediv__(self, other):
+        return _combine(_operand(other, 0), self, "/") if _number(other) else NotImplemented
+
+    def __neg__(self):
+        if self.negates is not None:
+            return self.negates
+        negated = Linked(-float(self), f"-{self.term(UNARY)}", self.power, UNARY)
+        negated.negates = self
+        return negated
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return -self if self < 0 else self
+
+    def __floor__(self):
+        return Linked(math.floor(float(self)), f"floor({self.expression})", self.power)
+
+
+def expression(value):
+    """The expression of a Linked length, or a plain cm length as a literal"""
+    if isinstance(value, Linked):
+        return value.expression
+    return literal(value, 1)
+
+
+def _number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _operand(value, power):
+    """value as a Linked term; plain numbers become literals of the given power"""
+    if isinstance(value, Linked):
+        return value
+    value = float(value)
+    if value < 0:
+        return Linked(value, f"-{literal(-value, power)}", power, UNARY)
+    return Linked(value, literal(value, power), power)
+
+
+def _combine(left, right, operator):
+    """left operator right, with the expression written out"""
+    a, b = float(left), float(right)
+    if operator in "+-":
+        precedence, power = SUM, left.power
+        value = a + b if operator == "+" else a - b
+    else:
+        precedence = PRODUCT
+        power = left.power + right.power if operator == "*" else left.power - right.power
+        value = a * b if operator == "*" else a / b
+    # The right operand of - and / needs parentheses at equal precedence too, and a
+    # negative right operand always does
+    tight = precedence + 1 if operator in "-/" else precedence
+    right_term = f"({right.expression})" if right.precedence == UNARY else right.term(tight)
+    return Linked(value, f"{left.term(precedence)} {operator} {right_term}", power, precedence)
+
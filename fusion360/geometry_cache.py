@@ -0,0 +1,189 @@
+"""
+OKP Sight - Geometry Cache
+Builds the main body and mount from cached parts whenever the parameters a
+part depends on are unchanged
+
+Parts are the body shell, the cavity set, the hood and the mount. On a miss
+a part is built in a scratch component under a ParameterTracker (regen.py)
+and exported as SMT, STEP and an STL mesh. The entry key hashes the part name,
+the source of the generators behind it and the values of exactly the
+parameters the build read. The mount, for example, only depends on RAIL_* and
+MOUNT_* values. On a hit the SMT is imported instead of rebuilt. The body is
+then assembled with combine features: shell - cavities + hood.
+
+Dependency sets are learned per part and generator version, so the first run
+after editing a generator is a miss for every part it builds.
+"""
+
+import adsk.core
+import adsk.fusion
+import hashlib
+import os
+import traceback
+from collections import namedtuple
+from . import build_mode
+from . import content_store
+from . import expressions
+from . import layout
+from . import main_body, picatinny_mount
+from . import parameters as params
+from . import profile_select
+from . import regen
+from . import shapes
+from . import user_parameters
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".okp", "geometry_cache")
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+PART_FILES = {"smt": "part.smt", "step": "part.step", "stl": "part.stl"}
+
+# modules: sources hashed into the key; build(comp, p) adds the part's bodies to an empty component
+Part = namedtuple("Part", "name modules build")
+
+
+def run(context):
+    ui = None
+    try:
+        app = adsk.core.Application.get()
+        ui = app.userInterface
+        design = app.activeProduct
+
+        p = params.DEFAULT
+        cache = GeometryCache()
+        with build_mode.building(design, p.BUILD_MODE) as generation:
+            build(generation.design.rootComponent, p, cache)
+
+        ui.messageBox('Geometry cache:\n' + cache.store.format_report() + '\n' + generation.report())
+
+    except:
+        if ui:
+            ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+
+
+def build_mount_part(comp, p):
+    """All mount stages, as one part"""
+    for name, create in picatinny_mount.stages(p):
+        create(comp, p)
+
+
+# Every part sketches, selects profiles and patterns through these
+DRAWING = (build_mode, profile_select, user_parameters, expressions)
+
+PARTS = {
+    "shell": Part("shell", (main_body, layout) + DRAWING, main_body.create_body_box),
+    "cavities": Part("cavities", (main_body, layout) + DRAWING, main_body.create_cavity_tools),
+    "hood": Part("hood", (main_body, layout, shapes) + DRAWING, main_body.create_hood),
+    "mount": Part("mount", (picatinny_mount, shapes) + DRAWING, build_mount_part),
+}
+
+
+def source_version(modules):
+    """Hash of the generator sources, and of which API (Fusion or headless) ran them"""
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    digest.update(b"headless" if getattr(adsk.core, "HEADLESS", False) else b"fusion")
+    return digest.hexdigest()[:16]
+
+
+class GeometryCache:
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.store = content_store.ContentStore(root, max_bytes)
+
+    def key(self, part, version, values):
+        return content_store.content_key("part", part.name, version, values)
+
+    def part_path(self, design, part, p):
+        """Cache entry directory of a part for p, built and stored on a miss"""
+        version = source_version(part.modules)
+        note = f"deps-{part.name}-{version}"
+        known = self.store.read_note(note) or []
+        looked_up = False
+        for names in known:
+            key = self.key(part, version, {name: getattr(p, name, None) for name in names})
+            if self.store.contains(key):
+                looked_up = True
+                path = self.store.get(key, part.name)
+                if path:
+                    return path
+
+        if not looked_up:  # get counted the miss of an entry evicted meanwhile
+            self.store.record(part.name, False)
+        staging = self.store.stage()
+        scratch = design.rootComponent.occurrences.addNewComponent(adsk.core.Matrix3D.create())
+        try:
+            tracker = regen.ParameterTracker(p)
+            part.build(scratch.component, tracker)
+            values = tracker.values()
+            export_part(design, scratch.component, staging)
+        except:
+            self.store.discard(staging)
+            raise
+        finally:
+            scratch.deleteMe()
+
+        if sorted(values) not in known:
+            self.store.write_note(note, known + [sorted(values)])
+        return self.store.commit(self.key(part, version, values), staging, part.name)
+
+    def import_part(self, comp, part, p):
+        """Add the bodies of a part to comp, from the cache when possible"""
+        path = self.part_path(comp.parentDesign, part, p)
+        return import_bodies(comp, os.path.join(path, PART_FILES["smt"]))
+
+
+def export_part(design, comp, directory):
+    """Write the bodies of comp as SMT, STEP and STL into directory"""
+    exports = design.exportManager
+    exports.execute(exports.createSMTExportOptions(os.path.join(directory, PART_FILES["smt"]), comp))
+    exports.execute(exports.createSTEPExportOptions(os.path.join(directory, PART_FILES["step"]), comp))
+    exports.execute(exports.createSTLExportOptions(comp, os.path.join(directory, PART_FILES["stl"])))
+
+
+def import_bodies(comp, filename):
+    """Add the bodies of an SMT file to comp (in a base feature for parametric designs)"""
+    bodies = adsk.fusion.TemporaryBRepManager.get().createFromFile(filename)
+    if comp.parentDesign.designType != adsk.fusion.DesignTypes.ParametricDesignType:
+        return [comp.bRepBodies.add(body) for body in bodies]
+    baseFeature = comp.features.baseFeatures.add()
+    baseFeature.startEdit()
+    for body in bodies:
+        comp.bRepBodies.add(body, baseFeature)
+    baseFeature.finishEdit()
+    return list(baseFeature.bodies)
+
+
+def combine(comp, target, tools, operation):
+    """Combine tool bodies into target, consuming the tools"""
+    toolBodies = adsk.core.ObjectCollection.create()
+    for tool in tools:
+        toolBodies.add(tool)
+    combineInput = comp.features.combineFeatures.createInput(target, toolBodies)
+    combineInput.operation = operation
+    combineInput.isKeepToolBodies = False
+    return comp.features.combineFeatures.add(combineInput)
+
+
+def build_main_body(rootComp, p, cache):
+    """main_body.build from cached parts"""
+    main_body.preflight(p)
+    bodyComp = main_body.create_component(rootComp)
+    shell = cache.import_part(bodyComp, PARTS["shell"], p)[0]
+    combine(bodyComp, shell, cache.import_part(bodyComp, PARTS["cavities"], p),
+            adsk.fusion.FeatureOperations.CutFeatureOperation)
+    combine(bodyComp, shell, cache.import_part(bodyComp, PARTS["hood"], p),
+            adsk.fusion.FeatureOperations.JoinFeatureOperation)
+    return bodyComp
+
+
+def build_mount(rootComp, p, cache):
+    """picatinny_mount.build from the cached mount"""
+    mountComp = picatinny_mount.create_component(rootComp)
+    cache.import_part(mountComp, PARTS["mount"], p)
+    return mountComp
+
+
+def build(rootComp, p, cache):
+    """Main body and mount from cached parts; returns both components"""
+    return build_main_body(rootComp, p, cache), build_mount(rootComp, p, cache)
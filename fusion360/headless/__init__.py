@@ -0,0 +1,55 @@
+"""
+OKP Sight - Headless Fusion 360 Stand-in
+Runs the generators outside Fusion 360 against a recording implementation of
+the adsk.core / adsk.fusion subset they use, backed by a lightweight CSG model
+
+Usage:
+    from fusion360 import headless
+    app = headless.run_script("main_body")
+    app.call_counts()                      # API calls made by the generator
+    body = app.activeProduct.allComponents[1].bRepBodies.item(0)
+    body.volume, body.boundingBox          # cm^3, cm
+"""
+
+import importlib
+import os
+import sys
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_PACKAGE = __name__.rsplit(".", 1)[0]
+
+
+def install():
+    """Put the stand-in `adsk` package on sys.path and return it"""
+    loaded = sys.modules.get("adsk")
+    if loaded is not None and not getattr(loaded, "HEADLESS", False):
+        raise RuntimeError("The real Fusion 360 adsk package is loaded; "
+                           "the headless stand-in cannot replace it")
+    if _HERE not in sys.path:
+        sys.path.insert(0, _HERE)
+    import adsk.core
+    import adsk.fusion
+    return adsk
+
+
+def new_session():
+    """Start a fresh headless application with one empty design"""
+    adsk = install()
+    return adsk.core.new_session()
+
+
+def run_script(name, context=None):
+    """Run fusion360/<name>.py in a fresh session and return the application
+
+    Scripts that call run() at import time are run by importing them the
+    first time; every other case calls module.run(context).
+    """
+    app = new_session()
+    module_name = f"{_PACKAGE}.{name}"
+    if module_name in sys.modules:
+        sys.modules[module_name].run({} if context is None else context)
+        return app
+    module = importlib.import_module(module_name)
+    if not any(call[0] == "Application.get" for call in app.recorded_calls):
+        module.run({} if context is None else context)
+    return app
@@ -0,0 +1,7 @@
+"""
+Headless stand-in for the Fusion 360 `adsk` package
+
+Only importable after fusion360.headless.install() has put it on sys.path.
+"""
+
+HEADLESS = True
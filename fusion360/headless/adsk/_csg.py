@@ -0,0 +1,465 @@
+"""
+Lightweight solid model behind the headless stand-in
+
+Solids are CSG trees of axis-aligned extrusions. Every primitive yields exact
+intervals on a line parallel to a world axis, the tree combines them with
+interval booleans, and a midpoint grid over the other two axes integrates
+volume and centre of mass. All values are in centimetres, like the Fusion API.
+"""
+
+import math
+
+GRID = 48  # line samples per side when integrating a solid
+EPS = 1e-9
+
+
+# ==============================================================================
+# INTERVAL BOOLEANS (sorted lists of disjoint (start, end) tuples)
+# ==============================================================================
+
+def union(a, b):
+    merged = []
+    for start, end in sorted(a + b):
+        if merged and start <= merged[-1][1] + EPS:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def intersect(a, b):
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if end - start > EPS:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def subtract(a, b):
+    result = []
+    for start, end in a:
+        for cut_start, cut_end in b:
+            if cut_end <= start or cut_start >= end:
+                continue
+            if cut_start - start > EPS:
+                result.append((start, cut_start))
+            start = max(start, cut_end)
+            if start >= end:
+                break
+        if end - start > EPS:
+            result.append((start, end))
+    return result
+
+
+# ==============================================================================
+# 2D SHAPES (sketch space)
+# ==============================================================================
+
+class Polygon:
+    """Closed loop of straight edges"""
+
+    def __init__(self, points):
+        self.points = list(points)
+        us = sorted({p[0] for p in self.points})
+        vs = sorted({p[1] for p in self.points})
+        # Axis-aligned rectangles answer chords and containment in O(1)
+        self._box = (us[0], vs[0], us[-1], vs[-1]) if len(self.points) == 4 and len(us) == len(vs) == 2 else None
+
+    @property
+    def area(self):
+        return abs(self._signed_area())
+
+    def _signed_area(self):
+        pts = self.points
+        return 0.5 * sum(pts[i - 1][0] * pts[i][1] - pts[i][0] * pts[i - 1][1]
+                         for i in range(len(pts)))
+
+    @property
+    def centroid(self):
+        pts = self.points
+        signed = self._signed_area()
+        if abs(signed) < EPS:
+            return (sum(p[0] for p in pts) / len(pts), sum(p[1] for p in pts) / len(pts))
+        cx = cy = 0.0
+        for i in range(len(pts)):
+            (x0, y0), (x1, y1) = pts[i - 1], pts[i]
+            cross = x0 * y1 - x1 * y0
+            cx += (x0 + x1) * cross
+            cy += (y0 + y1) * cross
+        return (cx / (6 * signed), cy / (6 * signed))
+
+    @property
+    def perimeter(self):
+        pts = self.points
+        return sum(math.dist(pts[i - 1], pts[i]) for i in range(len(pts)))
+
+    @property
+    def bounds(self):
+        us = [p[0] for p in self.points]
+        vs = [p[1] for p in self.points]
+        return (min(us), min(vs)), (max(us), max(vs))
+
+    @property
+    def sample_point(self):
+        """A point strictly inside the polygon, also for concave outlines"""
+        (u0, v0), (u1, v1) = self.bounds
+        spans = self.chord(0, v0 + (v1 - v0) * 0.5000001)
+        if not spans:
+            return self.centroid
+        start, end = max(spans, key=lambda span: span[1] - span[0])
+        return ((start + end) / 2, v0 + (v1 - v0) * 0.5000001)
+
+    def contains(self, u, v):
+        if self._box:
+            u0, v0, u1, v1 = self._box
+            return u0 < u < u1 and v0 < v < v1
+        inside = False
+        pts = self.points
+        for i in range(len(pts)):
+            (u0, v0), (u1, v1) = pts[i - 1], pts[i]
+            if (v0 > v) != (v1 > v):
+                if u < u0 + (v - v0) * (u1 - u0) / (v1 - v0):
+                    inside = not inside
+        return inside
+
+    def chord(self, along, value):
+        """Intervals along sketch axis `along` (0 = u, 1 = v) at the other axis = value"""
+        across = 1 - along
+        if self._box:
+            lo, hi = self._box[across], self._box[across + 2]
+            if lo < value < hi:
+                return [(self._box[along], self._box[along + 2])]
+            return []
+        crossings = []
+        pts = self.points
+        for i in range(len(pts)):
+            p0, p1 = pts[i - 1], pts[i]
+            if (p0[across] > value) != (p1[across] > value):
+                t = (value - p0[across]) / (p1[across] - p0[across])
+                crossings.append(p0[along] + t * (p1[along] - p0[along]))
+        crossings.sort()
+        return [(crossings[k], crossings[k + 1])
+                for k in range(0, len(crossings) - 1, 2)
+                if crossings[k + 1] - crossings[k] > EPS]
+
+
+class Circle:
+    """Full circle"""
+
+    def __init__(self, center, radius):
+        self.center = (center[0], center[1])
+        self.radius = radius
+
+    @property
+    def area(self):
+        return math.pi * self.radius ** 2
+
+    @property
+    def centroid(self):
+        return self.center
+
+    @property
+    def perimeter(self):
+        return 2 * math.pi * self.radius
+
+    @property
+    def bounds(self):
+        (cu, cv), r = self.center, self.radius
+        return (cu - r, cv - r), (cu + r, cv + r)
+
+    @property
+    def sample_point(self):
+        return self.center
+
+    def contains(self, u, v):
+        return (u - self.center[0]) ** 2 + (v - self.center[1]) ** 2 < self.radius ** 2
+
+    def chord(self, along, value):
+        offset = value - self.center[1 - along]
+        half_sq = self.radius ** 2 - offset ** 2
+        if half_sq <= EPS:
+            return []
+        half = math.sqrt(half_sq)
+        mid = self.center[along]
+        return [(mid - half, mid + half)]
+
+
+class Region:
+    """Outer loop minus the loops nested directly inside it"""
+
+    def __init__(self, outer, holes=()):
+        self.outer = outer
+        self.holes = list(holes)
+
+    @property
+    def area(self):
+        return self.outer.area - sum(h.area for h in self.holes)
+
+    @property
+    def centroid(self):
+        area = self.area
+        if area <= EPS:
+            return self.outer.centroid
+        cu = self.outer.area * self.outer.centroid[0]
+        cv = self.outer.area * self.outer.centroid[1]
+        for hole in self.holes:
+            cu -= hole.area * hole.centroid[0]
+            cv -= hole.area * hole.centroid[1]
+        return (cu / area, cv / area)
+
+    @property
+    def perimeter(self):
+        return self.outer.perimeter + sum(h.perimeter for h in self.holes)
+
+    @property
+    def bounds(self):
+        return self.outer.bounds
+
+    def contains(self, u, v):
+        return self.outer.contains(u, v) and not any(h.contains(u, v) for h in self.holes)
+
+    def chord(self, along, value):
+        spans = self.outer.chord(along, value)
+        for hole in self.holes:
+            spans = subtract(spans, hole.chord(along, value))
+        return spans
+
+
+# ==============================================================================
+# SOLIDS
+# ==============================================================================
+
+class Extrusion:
+    """Region swept along a world axis between lo and hi"""
+
+    kind = "prim"
+
+    def __init__(self, region, axes, lo, hi):
+        self.region = region
+        self.axes = axes  # world indices of sketch u, sketch v and the normal
+        self.lo = min(lo, hi)
+        self.hi = max(lo, hi)
+        (u0, v0), (u1, v1) = region.bounds
+        box_lo, box_hi = [0.0] * 3, [0.0] * 3
+        u_axis, v_axis, n_axis = axes
+        box_lo[u_axis], box_hi[u_axis] = u0, u1
+        box_lo[v_axis], box_hi[v_axis] = v0, v1
+        box_lo[n_axis], box_hi[n_axis] = self.lo, self.hi
+        self.bounds = (box_lo, box_hi)
+
+    @property
+    def volume(self):
+        return self.region.area * (self.hi - self.lo)
+
+    def intervals(self, axis, point):
+        lo, hi = self.bounds
+        for i in range(3):
+            if i != axis and not lo[i] <= point[i] <= hi[i]:
+                return []
+        u_axis, v_axis, n_axis = self.axes
+        if axis == n_axis:
+            if self.region.contains(point[u_axis], point[v_axis]):
+                return [(self.lo, self.hi)]
+            return []
+        if not self.lo <= point[n_axis] <= self.hi:
+            return []
+        if axis == u_axis:
+            return self.region.chord(0, point[v_axis])
+        return self.region.chord(1, point[u_axis])
+
+
+class Node:
+    """Boolean combination of solids: 'union', 'diff' or 'inter'"""
+
+    def __init__(self, kind, children):
+        self.kind = kind
+        self.children = list(children)
+        self.bounds = self._bounds()
+
+    def _bounds(self):
+        boxes = [c.bounds for c in self.children]
+        if self.kind == "diff":
+            return boxes[0]
+        if self.kind == "inter":
+            lo = [max(b[0][i] for b in boxes) for i in range(3)]
+            hi = [min(b[1][i] for b in boxes) for i in range(3)]
+            return lo, [max(lo[i], hi[i]) for i in range(3)]
+        lo = [min(b[0][i] for b in boxes) for i in range(3)]
+        hi = [max(b[1][i] for b in boxes) for i in range(3)]
+        return lo, hi
+
+    def intervals(self, axis, point):
+        spans = self.children[0].intervals(axis, point)
+        for child in self.children[1:]:
+            if self.kind == "union":
+                spans = union(spans, child.intervals(axis, point))
+            elif self.kind == "diff":
+                if not spans:
+                    break
+                spans = subtract(spans, child.intervals(axis, point))
+            else:
+                spans = intersect(spans, child.intervals(axis, point))
+        return spans
+
+
+def combine(kind, *solids):
+    """Flatten nested nodes of the same kind into one node"""
+    children = []
+    for solid in solids:
+        if solid.kind == kind and kind != "diff":
+            children.extend(solid.children)
+        elif kind == "diff" and solid.kind == "diff" and not children:
+            children.extend(solid.children)
+        else:
+            children.append(solid)
+    return Node(kind, children)
+
+
+def translate(solid, offset):
+    """Copy of a solid moved by a world (x, y, z) offset"""
+    if solid.kind != "prim":
+        return Node(solid.kind, [translate(child, offset) for child in solid.children])
+    u_axis, v_axis, n_axis = solid.axes
+    du, dv = offset[u_axis], offset[v_axis]
+
+    def moved(shape):
+        if isinstance(shape, Circle):
+            return Circle((shape.center[0] + du, shape.center[1] + dv), shape.radius)
+        return Polygon([(u + du, v + dv) for u, v in shape.points])
+
+    region = Region(moved(solid.region.outer), [moved(hole) for hole in solid.region.holes])
+    return Extrusion(region, solid.axes, solid.lo + offset[n_axis], solid.hi + offset[n_axis])
+
+
+def overlaps(a, b):
+    """True when two bounding boxes intersect or touch"""
+    return all(a[0][i] <= b[1][i] + EPS and b[0][i] <= a[1][i] + EPS for i in range(3))
+
+
+def mass_properties(solid, grid=GRID):
+    """Integrate (volume, centroid) of a solid on lines along its longest axis"""
+    lo, hi = solid.bounds
+    extents = [hi[i] - lo[i] for i in range(3)]
+    axis = extents.index(max(extents))
+    a, b = [i for i in range(3) if i != axis]
+    if extents[a] <= EPS or extents[b] <= EPS:
+        return 0.0, tuple((lo[i] + hi[i]) / 2 for i in range(3))
+    da, db = extents[a] / grid, extents[b] / grid
+    cell = da * db
+    volume = 0.0
+    moments = [0.0, 0.0, 0.0]
+    point = [0.0, 0.0, 0.0]
+    for i in range(grid):
+        point[a] = lo[a] + (i + 0.5) * da
+        for j in range(grid):
+            point[b] = lo[b] + (j + 0.5) * db
+            for start, end in solid.intervals(axis, point):
+                length = (end - start) * cell
+                volume += length
+                moments[axis] += length * (start + end) / 2
+                moments[a] += length * point[a]
+                moments[b] += length * point[b]
+    if volume <= EPS:
+        return 0.0, tuple((lo[i] + hi[i]) / 2 for i in range(3))
+    return volume, tuple(m / volume for m in moments)
+
+
+def voxel_mesh(solid, cell):
+    """Boundary faces of the grid cells whose centres are inside a solid
+
+    Returns flat (coordinates, indices) lists as a TriangleMesh holds them,
+    wound counter-clockwise seen from outside. Cells are at most `cell` wide
+    and fit the bounds exactly, so faces lying on the bounds stay exact.
+    """
+    lo, hi = solid.bounds
+    counts = [max(1, math.ceil((hi[i] - lo[i]) / cell - EPS)) for i in range(3)]
+    steps = [(hi[i] - lo[i]) / counts[i] for i in range(3)]
+    filled = set()
+    point = [0.0, 0.0, 0.0]
+    for i in range(counts[0]):
+        point[0] = lo[0] + (i + 0.5) * steps[0]
+        for j in range(counts[1]):
+            point[1] = lo[1] + (j + 0.5) * steps[1]
+            for start, end in solid.intervals(2, point):
+                # Cells whose centre lies in [start, end)
+                first = max(0, math.ceil((start - lo[2]) / steps[2] - 0.5))
+                last = min(counts[2], math.ceil((end - lo[2]) / steps[2] - 0.5))
+                filled.update((i, j, k) for k in range(first, last))
+
+    vertices = {}
+    coordinates, indices = [], []
+
+    def vertex(key):
+        if key not in vertices:
+            vertices[key] = len(vertices)
+            coordinates.extend(lo[i] + key[i] * steps[i] for i in range(3))
+        return vertices[key]
+
+    for cell_index in sorted(filled):
+        for axis in range(3):
+            u, v = (axis + 1) % 3, (axis + 2) % 3
+            for side in (0, 1):
+                neighbour = list(cell_index)
+                neighbour[axis] += 1 if side else -1
+                if tuple(neighbour) in filled:
+                    continue
+                base = list(cell_index)
+                base[axis] += side
+                corners = []
+                for du, dv in ((0, 0), (1, 0), (1, 1), (0, 1)) if side else ((0, 0), (0, 1), (1, 1), (1, 0)):
+                    corner = list(base)
+                    corner[u] += du
+                    corner[v] += dv
+                    corners.append(vertex(tuple(corner)))
+                a, b, c, d = corners
+                indices.extend((a, b, c, a, c, d))
+    return coordinates, indices
+
+
+# ==============================================================================
+# SERIALISATION (the headless stand-in's export format)
+# ==============================================================================
+
+def to_data(solid):
+    """Plain lists and dicts describing a solid, for JSON"""
+    if solid.kind == "prim":
+        return {"prim": {"region": _region_data(solid.region), "axes": list(solid.axes),
+                         "lo": solid.lo, "hi": solid.hi}}
+    return {solid.kind: [to_data(child) for child in solid.children]}
+
+
+def from_data(data):
+    """Inverse of to_data"""
+    (kind, value), = data.items()
+    if kind == "prim":
+        return Extrusion(_region_from_data(value["region"]), tuple(value["axes"]), value["lo"], value["hi"])
+    return Node(kind, [from_data(child) for child in value])
+
+
+def _shape_data(shape):
+    if isinstance(shape, Circle):
+        return {"circle": [list(shape.center), shape.radius]}
+    return {"polygon": [list(p) for p in shape.points]}
+
+
+def _shape_from_data(data):
+    if "circle" in data:
+        center, radius = data["circle"]
+        return Circle(center, radius)
+    return Polygon([tuple(p) for p in data["polygon"]])
+
+
+def _region_data(region):
+    return {"outer": _shape_data(region.outer), "holes": [_shape_data(h) for h in region.holes]}
+
+
+def _region_from_data(data):
+    return Region(_shape_from_data(data["outer"]), [_shape_from_data(h) for h in data["holes"]])
@@ -0,0 +1,482 @@
+"""
+Headless stand-in for adsk.core
+
+Covers the subset of the Fusion 360 core API used by the OKP generators.
+Every API method call is appended to Application.recorded_calls.
+"""
+
+import collections
+import functools
+import math
+import re
+
+HEADLESS = True
+
+_app = None
+
+
+def recorded(name):
+    """Record calls of an API method on the running application"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _app is not None:
+                _app.recorded_calls.append((name, args, kwargs))
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ==============================================================================
+# GEOMETRY
+# ==============================================================================
+
+class Point3D:
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    @staticmethod
+    @recorded("Point3D.create")
+    def create(x=0.0, y=0.0, z=0.0):
+        return Point3D(x, y, z)
+
+    def copy(self):
+        return Point3D(self.x, self.y, self.z)
+
+    def asArray(self):
+        return [self.x, self.y, self.z]
+
+    def distanceTo(self, other):
+        return math.dist(self.asArray(), other.asArray())
+
+    def isEqualTo(self, other):
+        return self.distanceTo(other) < 1e-9
+
+    def transformBy(self, matrix):
+        self.x, self.y, self.z = matrix._apply(self.asArray(), 1.0)
+        return True
+
+    def __repr__(self):
+        return f"Point3D({self.x:g}, {self.y:g}, {self.z:g})"
+
+
+class Vector3D:
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    @staticmethod
+    @recorded("Vector3D.create")
+    def create(x=0.0, y=0.0, z=0.0):
+        return Vector3D(x, y, z)
+
+    def copy(self):
+        return Vector3D(self.x, self.y, self.z)
+
+    def asArray(self):
+        return [self.x, self.y, self.z]
+
+    @property
+    def length(self):
+        return math.sqrt(self.x ** 2 + self.y ** 2 + self.z ** 2)
+
+    def normalize(self):
+        length = self.length
+        if length == 0:
+            return False
+        self.x, self.y, self.z = self.x / length, self.y / length, self.z / length
+        return True
+
+    def scaleBy(self, scale):
+        self.x, self.y, self.z = self.x * scale, self.y * scale, self.z * scale
+        return True
+
+    def add(self, other):
+        self.x, self.y, self.z = self.x + other.x, self.y + other.y, self.z + other.z
+        return True
+
+    def dotProduct(self, other):
+        return self.x * other.x + self.y * other.y + self.z * other.z
+
+    def crossProduct(self, other):
+        return Vector3D(self.y * other.z - self.z * other.y,
+                        self.z * other.x - self.x * other.z,
+                        self.x * other.y - self.y * other.x)
+
+    def transformBy(self, matrix):
+        self.x, self.y, self.z = matrix._apply(self.asArray(), 0.0)
+        return True
+
+    def __repr__(self):
+        return f"Vector3D({self.x:g}, {self.y:g}, {self.z:g})"
+
+
+class Matrix3D:
+    """Row-major 4x4 homogeneous transform"""
+
+    def __init__(self, data=None):
+        self._data = list(data) if data else [1.0 if i % 5 == 0 else 0.0 for i in range(16)]
+
+    @staticmethod
+    @recorded("Matrix3D.create")
+    def create():
+        return Matrix3D()
+
+    def copy(self):
+        return Matrix3D(self._data)
+
+    def asArray(self):
+        return list(self._data)
+
+    def setWithArray(self, data):
+        self._data = [float(v) for v in data]
+        return True
+
+    @property
+    def translation(self):
+        return Vector3D(self._data[3], self._data[7], self._data[11])
+
+    @translation.setter
+    def translation(self, vector):
+        self._data[3], self._data[7], self._data[11] = vector.x, vector.y, vector.z
+
+    def setToIdentity(self):
+        self._data = Matrix3D()._data
+        return True
+
+    def setToRotation(self, angle, axis, origin):
+        """Rotation of `angle` radians about `axis` through `origin`"""
+        unit = axis.copy()
+        unit.normalize()
+        x, y, z = unit.asArray()
+        c, s = math.cos(angle), math.sin(angle)
+        t = 1 - c
+        rot = [[t * x * x + c, t * x * y - s * z, t * x * z + s * y],
+               [t * x * y + s * z, t * y * y + c, t * y * z - s * x],
+               [t * x * z - s * y, t * y * z + s * x, t * z * z + c]]
+        o = origin.asArray()
+        data = []
+        for r in range(3):
+            shift = o[r] - sum(rot[r][k] * o[k] for k in range(3))
+            data.extend(rot[r] + [shift])
+        self._data = data + [0.0, 0.0, 0.0, 1.0]
+        return True
+
+    def transformBy(self, matrix):
+        """Apply `matrix` after this transform"""
+        a, b = matrix._data, self._data
+        self._data = [sum(a[r * 4 + k] * b[k * 4 + c] for k in range(4))
+                      for r in range(4) for c in range(4)]
+        return True
+
+    def _apply(self, xyz, w):
+        d = self._data
+        return [d[r * 4] * xyz[0] + d[r * 4 + 1] * xyz[1] + d[r * 4 + 2] * xyz[2] + d[r * 4 + 3] * w
+                for r in range(3)]
+
+
+class BoundingBox3D:
+    def __init__(self, minPoint, maxPoint):
+        self.minPoint = minPoint
+        self.maxPoint = maxPoint
+
+    @staticmethod
+    @recorded("BoundingBox3D.create")
+    def create(minPoint, maxPoint):
+        return BoundingBox3D(minPoint.copy(), maxPoint.copy())
+
+    def copy(self):
+        return BoundingBox3D(self.minPoint.copy(), self.maxPoint.copy())
+
+    def contains(self, point):
+        lo, hi, p = self.minPoint.asArray(), self.maxPoint.asArray(), point.asArray()
+        return all(lo[i] <= p[i] <= hi[i] for i in range(3))
+
+    def expand(self, point):
+        lo, hi, p = self.minPoint.asArray(), self.maxPoint.asArray(), point.asArray()
+        self.minPoint = Point3D(*[min(lo[i], p[i]) for i in range(3)])
+        self.maxPoint = Point3D(*[max(hi[i], p[i]) for i in range(3)])
+        return True
+
+    def combine(self, other):
+        self.expand(other.minPoint)
+        self.expand(other.maxPoint)
+        return True
+
+    def __repr__(self):
+        return f"BoundingBox3D({self.minPoint!r}, {self.maxPoint!r})"
+
+
+class Line3D:
+    def __init__(self, startPoint, endPoint):
+        self.startPoint = startPoint
+        self.endPoint = endPoint
+
+    @staticmethod
+    @recorded("Line3D.create")
+    def create(startPoint, endPoint):
+        return Line3D(startPoint.copy(), endPoint.copy())
+
+
+class Circle3D:
+    def __init__(self, center, normal, radius):
+        self.center = center
+        self.normal = normal
+        self.radius = radius
+
+    @staticmethod
+    @recorded("Circle3D.createByCenter")
+    def createByCenter(center, normal, radius):
+        return Circle3D(center.copy(), normal.copy(), radius)
+
+
+# ==============================================================================
+# VALUES AND COLLECTIONS
+# ==============================================================================
+
+class ValueTypes:
+    RealValueType = 0
+    StringValueType = 1
+    ObjectValueType = 2
+
+
+_UNIT_SCALE = {"mm": 0.1, "cm": 1.0, "m": 100.0, "in": 2.54, "deg": math.pi / 180, "rad": 1.0}
+
+
+class ValueInput:
+    def __init__(self, valueType, value):
+        self.valueType = valueType
+        self._value = value
+
+    @staticmethod
+    @recorded("ValueInput.createByReal")
+    def createByReal(realValue):
+        return ValueInput(ValueTypes.RealValueType, float(realValue))
+
+    @staticmethod
+    @recorded("ValueInput.createByString")
+    def createByString(stringValue):
+        return ValueInput(ValueTypes.StringValueType, stringValue)
+
+    @property
+    def realValue(self):
+        if self.valueType == ValueTypes.RealValueType:
+            return self._value
+        return evaluate_expression(self._value)
+
+    @property
+    def stringValue(self):
+        if self.valueType == ValueTypes.StringValueType:
+            return self._value
+        return ""
+
+
+def evaluate_expression(expression, names=None):
+    """Evaluate a Fusion-style expression such as '45 mm' or 'r / 2' in internal units (cm, rad)"""
+    def unit(match):
+        return f"({match.group(1)} * {_UNIT_SCALE[match.group(2)]!r})"
+
+    text = re.sub(r"(\d+(?:\.\d*)?|\.\d+)\s*(mm|cm|m|in|deg|rad)\b", unit, expression)
+    namespace = {"__builtins__": {}, "PI": math.pi, "sqrt": math.sqrt,
+                 "sin": math.sin, "cos": math.cos, "tan": math.tan, "abs": abs,
+                 "floor": math.floor, "ceil": math.ceil, "round": round}
+    namespace.update(names or {})
+    return float(eval(text, namespace))  # expressions come from the design, not user input
+
+
+class ObjectCollection:
+    def __init__(self):
+        self._items = []
+
+    @staticmethod
+    @recorded("ObjectCollection.create")
+    def create():
+        return ObjectCollection()
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def add(self, item):
+        self._items.append(item)
+        return True
+
+    def item(self, index):
+        return self._items[index]
+
+    def removeByIndex(self, index):
+        del self._items[index]
+        return True
+
+    def clear(self):
+        self._items.clear()
+        return True
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+
+class Attribute:
+    def __init__(self, parent, groupName, name, value):
+        self.parent = parent
+        self.groupName = groupName
+        self.name = name
+        self.value = value
+
+    @recorded("Attribute.deleteMe")
+    def deleteMe(self):
+        self.parent.attributes._items.remove(self)
+        return True
+
+
+class Attributes:
+    """Named string values attached to a design entity"""
+
+    def __init__(self, parent):
+        self._parent = parent
+        self._items = []
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    @recorded("Attributes.add")
+    def add(self, groupName, name, value):
+        attribute = self.itemByName(groupName, name)
+        if attribute is None:
+            attribute = Attribute(self._parent, groupName, name, value)
+            self._items.append(attribute)
+        attribute.value = value
+        return attribute
+
+    def itemByName(self, groupName, name):
+        return next((a for a in self._items if a.groupName == groupName and a.name == name), None)
+
+    def itemsByGroup(self, groupName):
+        return [a for a in self._items if a.groupName == groupName]
+
+
+# ==============================================================================
+# APPLICATION
+# ==============================================================================
+
+class DocumentTypes:
+    FusionDesignDocumentType = 0
+
+
+class DialogResults:
+    DialogOK = 0
+
+
+class UserInterface:
+    def __init__(self):
+        self.messages = []
+
+    @recorded("UserInterface.messageBox")
+    def messageBox(self, text, title="", buttons=0, icon=0):
+        self.messages.append(text)
+        return DialogResults.DialogOK
+
+
+class Document:
+    def __init__(self, name):
+        from . import fusion
+        self.name = name
+        self.isSaved = False
+        self.isModified = False
+        self.isValid = True
+        self.design = fusion.Design(self)
+
+    @property
+    def products(self):
+        return [self.design]
+
+    @recorded("Document.save")
+    def save(self, description):
+        if not self.isSaved:
+            return False
+        self.isModified = False
+        return True
+
+    @recorded("Document.saveAs")
+    def saveAs(self, name, dataFolder, description, tag):
+        self.name = name
+        self.isSaved = True
+        return True
+
+    @recorded("Document.close")
+    def close(self, saveChanges):
+        self.isValid = False
+        if _app is not None and self in _app._documents:
+            _app._documents.remove(self)
+            if _app._active is self:
+                _app._active = _app._documents[-1] if _app._documents else None
+        return True
+
+    @recorded("Document.activate")
+    def activate(self):
+        _app._active = self
+        return True
+
+
+class Documents:
+    def __init__(self, app):
+        self._app = app
+
+    @property
+    def count(self):
+        return len(self._app._documents)
+
+    def item(self, index):
+        return self._app._documents[index]
+
+    @recorded("Documents.add")
+    def add(self, documentType, visible=True, options=None):
+        doc = Document(f"Untitled{len(self._app._documents) + 1}")
+        self._app._documents.append(doc)
+        self._app._active = doc
+        return doc
+
+
+class Application:
+    def __init__(self):
+        self.userInterface = UserInterface()
+        self.recorded_calls = []
+        self._documents = [Document("Untitled")]
+        self._active = self._documents[0]
+        self.documents = Documents(self)
+
+    @staticmethod
+    def get():
+        global _app
+        if _app is None:
+            _app = Application()
+        _app.recorded_calls.append(("Application.get", (), {}))
+        return _app
+
+    @property
+    def activeDocument(self):
+        return self._active
+
+    @property
+    def activeProduct(self):
+        return self._active.design if self._active else None
+
+    def call_counts(self):
+        """Number of recorded calls per API method"""
+        return collections.Counter(name for name, _, _ in self.recorded_calls)
+
+
+def new_session():
+    """Replace the running application with a fresh one holding an empty design"""
+    global _app
+    _app = Application()
+    return _app
@@ -0,0 +1,1682 @@
+"""
+Headless stand-in for adsk.fusion
+
+Sketches, profiles, construction planes and axes, extrude and rectangular
+pattern features and bodies backed by the CSG model in _csg. Sketch axes follow the generators' convention:
+xY sketches map (u, v) to (x, y), yZ sketches to (y, z) and xZ sketches to
+(x, z); extrusions run along the right-handed plane normal.
+
+User parameters and sketch dimensions hold expressions. Editing one
+re-solves the sketches and replays the timeline, with feature extents and
+plane offsets evaluated again, so designs recompute the way Fusion does.
+"""
+
+import itertools
+import json
+import math
+import re
+
+from . import _csg
+from . import core
+from .core import recorded
+
+HEADLESS = True
+
+DEFAULT_DENSITY = 7.85  # g/cm^3, new Fusion designs default to steel
+
+
+class FeatureOperations:
+    JoinFeatureOperation = 0
+    CutFeatureOperation = 1
+    IntersectFeatureOperation = 2
+    NewBodyFeatureOperation = 3
+    NewComponentFeatureOperation = 4
+
+
+class DesignTypes:
+    DirectDesignType = 0
+    ParametricDesignType = 1
+
+
+class TriangleMeshQualityOptions:
+    LowQualityTriangleMesh = 8
+    NormalQualityTriangleMesh = 11
+    HighQualityTriangleMesh = 13
+    VeryHighQualityTriangleMesh = 15
+
+
+def _collection(items):
+    collection = core.ObjectCollection()
+    for item in items:
+        collection.add(item)
+    return collection
+
+
+# ==============================================================================
+# DESIGN AND COMPONENTS
+# ==============================================================================
+
+class Design:
+    def __init__(self, document):
+        self.parentDocument = document
+        self._designType = DesignTypes.ParametricDesignType
+        self.attributes = core.Attributes(self)
+        self.timeline = Timeline(self)
+        self.exportManager = ExportManager(self)
+        self.userParameters = UserParameters(self)
+        self.allComponents = []
+        self.rootComponent = Component(self, "Root")
+        self._revision = 0  # bumped whenever a parameter edit changes geometry
+        self._dimension_count = 0
+
+    @staticmethod
+    def cast(obj):
+        return obj if isinstance(obj, Design) else None
+
+    @property
+    def designType(self):
+        return self._designType
+
+    @designType.setter
+    def designType(self, designType):
+        # Switching either way keeps the bodies but drops the recorded history
+        if designType != self._designType:
+            self.timeline._flatten()
+        self._designType = designType
+
+    @property
+    def activeComponent(self):
+        return self.rootComponent
+
+    @recorded("Design.findAttributes")
+    def findAttributes(self, groupName, attributeName):
+        owners = [self] + self.allComponents + [item.entity for item in self.timeline._items]
+        return [a for owner in owners for a in owner.attributes
+                if a.groupName == groupName and (not attributeName or a.name == attributeName)]
+
+    def _next_parameter_name(self):
+        self._dimension_count += 1
+        return f"d{self._dimension_count}"
+
+    def _parameters_changed(self):
+        """Re-solve every sketch against the parameters and replay the timeline"""
+        self._revision += 1
+        for component in self.allComponents:
+            for sketch in component.sketches:
+                sketch._solve()
+        self.timeline._replay()
+
+
+class TimelineObject:
+    def __init__(self, timeline, entity):
+        self.parent = timeline
+        self.entity = entity
+
+    @property
+    def index(self):
+        return self.parent._items.index(self)
+
+    @property
+    def isRolledBack(self):
+        return self.index >= self.parent.markerPosition
+
+    @recorded("TimelineObject.rollTo")
+    def rollTo(self, rollBefore):
+        self.parent.markerPosition = self.index if rollBefore else self.index + 1
+        return True
+
+
+class Timeline:
+    """Parametric history; bodies are replayed from it whenever it changes
+
+    New sketches, planes, features and components are inserted at the
+    marker, so rolling back and adding features edits the middle of the
+    history the way Fusion does.
+    """
+
+    def __init__(self, design):
+        self._design = design
+        self._items = []
+        self._marker = 0
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    @property
+    def markerPosition(self):
+        return self._marker
+
+    @markerPosition.setter
+    def markerPosition(self, position):
+        if not 0 <= position <= len(self._items):
+            raise ValueError(f"marker position {position} outside the timeline")
+        self._marker = position
+        self._replay()
+
+    @recorded("Timeline.moveToEnd")
+    def moveToEnd(self):
+        self.markerPosition = len(self._items)
+        return True
+
+    @recorded("Timeline.moveToBeginning")
+    def moveToBeginning(self):
+        self.markerPosition = 0
+        return True
+
+    def _insert(self, entity):
+        """Add an entity at the marker; True if that was the end of the timeline"""
+        if self._design.designType == DesignTypes.DirectDesignType:
+            return True  # direct designs keep no history
+        at_end = self._marker == len(self._items)
+        entity.timelineObject = TimelineObject(self, entity)
+        self._items.insert(self._marker, entity.timelineObject)
+        self._marker += 1
+        return at_end
+
+    def _remove(self, entity):
+        if entity.timelineObject is None:
+            entity.isValid = False
+            return
+        index = entity.timelineObject.index
+        del self._items[index]
+        if index < self._marker:
+            self._marker -= 1
+        entity.timelineObject = None
+        entity.isValid = False
+        self._replay()
+
+    def _replay(self):
+        active = [item.entity for item in self._items[:self._marker]]
+        for component in self._design.allComponents:
+            component._bodies = list(component._baseBodies)
+        for entity in active:
+            if isinstance(entity, _Feature):
+                entity._apply()
+
+    def _flatten(self):
+        """Forget the history; the current bodies become the starting point of replays"""
+        for component in self._design.allComponents:
+            component._baseBodies = list(component._bodies)
+        for item in self._items:
+            item.entity.timelineObject = None
+        self._items = []
+        self._marker = 0
+
+
+class Component:
+    def __init__(self, design, name):
+        self.parentDesign = design
+        self.name = name
+        self.sketches = Sketches(self)
+        self.features = Features(self)
+        self.occurrences = Occurrences(self)
+        self.constructionPlanes = ConstructionPlanes(self)
+        self.xYConstructionPlane = ConstructionPlane(self, "XY", (0, 1, 2), 1)
+        self.xZConstructionPlane = ConstructionPlane(self, "XZ", (0, 2, 1), -1)
+        self.yZConstructionPlane = ConstructionPlane(self, "YZ", (1, 2, 0), 1)
+        self.xConstructionAxis = ConstructionAxis(self, "X", 0)
+        self.yConstructionAxis = ConstructionAxis(self, "Y", 1)
+        self.zConstructionAxis = ConstructionAxis(self, "Z", 2)
+        self.attributes = core.Attributes(self)
+        self._bodies = []
+        self._baseBodies = []  # bodies from before the history, see Timeline._flatten
+        self._counters = {}
+        design.allComponents.append(self)
+
+    def _next_name(self, prefix):
+        self._counters[prefix] = self._counters.get(prefix, 0) + 1
+        return f"{prefix}{self._counters[prefix]}"
+
+    @property
+    def bRepBodies(self):
+        return BRepBodies(self._bodies, self)
+
+    @property
+    def allOccurrences(self):
+        found = []
+        for occurrence in self.occurrences:
+            found.append(occurrence)
+            found.extend(occurrence.component.allOccurrences)
+        return _collection(found)
+
+
+class Occurrences:
+    def __init__(self, component):
+        self._component = component
+        self._items = []
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    @recorded("Occurrences.addNewComponent")
+    def addNewComponent(self, transform):
+        design = self._component.parentDesign
+        component = Component(design, f"Component{len(design.allComponents)}")
+        occurrence = Occurrence(component, transform.copy(), self._component)
+        self._items.append(occurrence)
+        design.timeline._insert(occurrence)
+        return occurrence
+
+
+class Occurrence:
+    def __init__(self, component, transform, parent):
+        self.component = component
+        self.transform = transform
+        self.sourceComponent = parent
+        self.attributes = core.Attributes(self)
+        self.timelineObject = None
+        self.isValid = True
+
+    @property
+    def name(self):
+        return f"{self.component.name}:1"
+
+    @recorded("Occurrence.deleteMe")
+    def deleteMe(self):
+        for child in self.component.occurrences:
+            child.deleteMe()
+        self.sourceComponent.occurrences._items.remove(self)
+        design = self.component.parentDesign
+        owned = [item.entity for item in design.timeline._items
+                 if getattr(item.entity, "parentComponent", None) is self.component]
+        for entity in owned + [self]:
+            design.timeline._remove(entity)
+        design.allComponents.remove(self.component)
+        return True
+
+
+# ==============================================================================
+# PARAMETERS
+# ==============================================================================
+
+class _Parameter:
+    """Named expression in the design's units; value is in internal units (cm, rad)"""
+
+    def __init__(self, design, name, expression, unit, comment=""):
+        self._design = design
+        self.name = name
+        self.unit = unit
+        self.comment = comment
+        self._expression = expression
+        self.isValid = True
+
+    @property
+    def expression(self):
+        return self._expression
+
+    @property
+    def value(self):
+        return self._design.userParameters._evaluate(self._expression)
+
+    @value.setter
+    def value(self, value):
+        self.expression = f"{value / core._UNIT_SCALE.get(self.unit, 1.0):g} {self.unit}".strip()
+
+
+class UserParameter(_Parameter):
+    @_Parameter.expression.setter
+    def expression(self, expression):
+        parameters = self._design.userParameters
+        previous, self._expression = self._expression, expression
+        parameters._values = None
+        try:
+            parameters._evaluated()
+        except RuntimeError:
+            # Fusion refuses the edit and keeps the old expression
+            self._expression = previous
+            parameters._values = None
+            raise
+        self._design._parameters_changed()
+
+    @recorded("UserParameter.deleteMe")
+    def deleteMe(self):
+        parameters = self._design.userParameters
+        if any(re.search(rf"\b{self.name}\b", p.expression) for p in parameters if p is not self):
+            return False  # still referenced
+        parameters._items.remove(self)
+        parameters._values = None
+        self.isValid = False
+        return True
+
+
+class ModelParameter(_Parameter):
+    """The value of a sketch dimension"""
+
+    def __init__(self, design, name, expression, unit, dimension):
+        super().__init__(design, name, expression, unit)
+        self.dimension = dimension
+
+    @_Parameter.expression.setter
+    def expression(self, expression):
+        value = self._design.userParameters._evaluate(expression)
+        self._expression = expression
+        if abs(value - self.dimension._measure()) > _csg.EPS:
+            sketch = self.dimension.parentSketch
+            sketch._solve()
+            self._design._revision += 1
+            self._design.timeline._replay()
+
+
+class UserParameters:
+    def __init__(self, design):
+        self._design = design
+        self._items = []
+        self._values = None  # {name: value}, evaluated on demand
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    @recorded("UserParameters.itemByName")
+    def itemByName(self, name):
+        return next((p for p in self._items if p.name == name), None)
+
+    @recorded("UserParameters.add")
+    def add(self, name, value, units, comment):
+        if not name.isidentifier() or self.itemByName(name) is not None:
+            raise RuntimeError(f"invalid or duplicate parameter name {name!r}")
+        if value.valueType == core.ValueTypes.StringValueType:
+            expression = value.stringValue
+        else:
+            expression = f"{value.realValue / core._UNIT_SCALE.get(units, 1.0):g} {units}".strip()
+        # A new parameter can only refer to existing ones, so the others keep their values
+        value = self._evaluate(expression)
+        parameter = UserParameter(self._design, name, expression, units, comment)
+        self._items.append(parameter)
+        self._values[name] = value
+        return parameter
+
+    def _evaluated(self):
+        """{name: value} of every parameter, each evaluated after the ones it refers to"""
+        if self._values is None:
+            expressions = {p.name: p.expression for p in self._items}
+            values = {}
+
+            def evaluate(name, chain):
+                if name in values:
+                    return
+                if name in chain:
+                    raise RuntimeError(f"circular reference through {name}")
+                for reference in re.findall(r"[A-Za-z_]\w*", expressions[name]):
+                    if reference in expressions:
+                        evaluate(reference, chain + (name,))
+                values[name] = _evaluate(expressions[name], values)
+
+            for name in expressions:
+                evaluate(name, ())
+            self._values = values
+        return self._values
+
+    def _evaluate(self, expression):
+        return _evaluate(expression, self._evaluated())
+
+
+def _evaluate(expression, names):
+    try:
+        return core.evaluate_expression(expression, names)
+    except Exception as e:
+        raise RuntimeError(f"cannot evaluate {expression!r}: {e}") from None
+
+
+def _real(value, design):
+    """A ValueInput in internal units; expressions may use the design's user parameters"""
+    if value.valueType == core.ValueTypes.StringValueType:
+        return design.userParameters._evaluate(value.stringValue)
+    return value.realValue
+
+
+# ==============================================================================
+# CONSTRUCTION PLANES
+# ==============================================================================
+
+class ConstructionPlane:
+    def __init__(self, component, name, axes, sign, base=None, distance=None):
+        self.parent = component
+        self.name = name
+        self._axes = axes  # world indices of sketch u, sketch v and the normal
+        self._sign = sign  # direction of the normal along its world axis
+        self._base = base  # plane this one is offset from, None for origin planes
+        self._distance = distance  # offset ValueInput, evaluated again after parameter edits
+        self.parentComponent = component
+        self.attributes = core.Attributes(self)
+        self.timelineObject = None  # origin planes are not in the timeline
+        self.isValid = True
+
+    @property
+    def _offset(self):
+        """World coordinate of the plane along its normal axis"""
+        if self._base is None:
+            return 0.0
+        return self._base._offset + self._base._sign * _real(self._distance, self.parentComponent.parentDesign)
+
+    @recorded("ConstructionPlane.deleteMe")
+    def deleteMe(self):
+        self.parent.constructionPlanes._items.remove(self)
+        self.parent.parentDesign.timeline._remove(self)
+        return True
+
+
+class ConstructionAxis:
+    """Origin axis along a world axis"""
+
+    def __init__(self, component, name, axis):
+        self.parentComponent = component
+        self.name = name
+        self._axis = axis
+        self.timelineObject = None  # origin axes are not in the timeline
+        self.isValid = True
+
+
+class ConstructionPlaneInput:
+    def __init__(self, component):
+        self._component = component
+        self._base = None
+        self._distance = None
+
+    @recorded("ConstructionPlaneInput.setByOffset")
+    def setByOffset(self, planarEntity, offset):
+        _real(offset, self._component.parentDesign)  # Fusion rejects bad expressions here
+        self._base = planarEntity
+        self._distance = offset
+        return True
+
+    def setByAngle(self, linearEntity, angle, planarEntity):
+        raise NotImplementedError("headless planes are axis-aligned; angled planes are not modelled")
+
+
+class ConstructionPlanes:
+    def __init__(self, component):
+        self._component = component
+        self._items = []
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        return self._items[index]
+
+    @recorded("ConstructionPlanes.createInput")
+    def createInput(self, occurrenceForCreation=None):
+        return ConstructionPlaneInput(self._component)
+
+    @recorded("ConstructionPlanes.add")
+    def add(self, input):
+        base = input._base
+        if base is None:
+            raise RuntimeError("construction plane input has no definition")
+        plane = ConstructionPlane(self._component, self._component._next_name("Plane"),
+                                  base._axes, base._sign, base, input._distance)
+        self._items.append(plane)
+        self._component.parentDesign.timeline._insert(plane)
+        return plane
+
+
+# ==============================================================================
+# SKETCHES AND PROFILES
+# ==============================================================================
+
+class Sketches:
+    def __init__(self, component):
+        self._component = component
+        self._items = []
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    @recorded("Sketches.add")
+    def add(self, planarEntity, occurrenceForCreation=None):
+        sketch = Sketch(self._component, planarEntity)
+        self._items.append(sketch)
+        self._component.parentDesign.timeline._insert(sketch)
+        return sketch
+
+
+class Sketch:
+    def __init__(self, component, plane):
+        self.parentComponent = component
+        self.referencePlane = plane
+        self.name = component._next_name("Sketch")
+        self.isComputeDeferred = False
+        self.isVisible = True
+        self.attributes = core.Attributes(self)
+        self.timelineObject = None
+        self.isValid = True
+        self._entities = []
+        self._profiles = None
+        self._revision = 0  # bumped whenever the geometry changes
+        self.originPoint = SketchPoint(core.Point3D(0, 0, 0))
+        self.sketchCurves = SketchCurves(self)
+        self.sketchDimensions = SketchDimensions(self)
+        self.geometricConstraints = GeometricConstraints(self)
+
+    def _add(self, entity):
+        self._entities.append(entity)
+        self._changed()
+        return entity
+
+    def _changed(self):
+        self._profiles = None
+        self._revision += 1
+
+    def _solve(self):
+        """Move the geometry to match every constraint and dimension's current value"""
+        for constraint in self.geometricConstraints:
+            constraint._apply()
+        for dimension in self.sketchDimensions:
+            dimension._apply(dimension.parameter.value)
+        self._changed()
+
+    @property
+    def profiles(self):
+        if self.isComputeDeferred:
+            return Profiles([])  # not computed until compute is turned back on
+        if self._profiles is None:
+            self._profiles = Profiles(_find_profiles(self))
+        return self._profiles
+
+    @recorded("Sketch.deleteMe")
+    def deleteMe(self):
+        self.parentComponent.sketches._items.remove(self)
+        self.parentComponent.parentDesign.timeline._remove(self)
+        return True
+
+
+class SketchCurves:
+    def __init__(self, sketch):
+        self.sketchLines = SketchLines(sketch)
+        self.sketchCircles = SketchCircles(sketch)
+
+
+class SketchLine:
+    def __init__(self, sketch, start, end):
+        self.parentSketch = sketch
+        self.startSketchPoint = start if isinstance(start, SketchPoint) else SketchPoint(start)
+        self.endSketchPoint = end if isinstance(end, SketchPoint) else SketchPoint(end)
+
+    @property
+    def geometry(self):
+        return core.Line3D(self.startSketchPoint.geometry.copy(), self.endSketchPoint.geometry.copy())
+
+
+class SketchCircle:
+    def __init__(self, sketch, center, radius):
+        self.parentSketch = sketch
+        self.centerSketchPoint = SketchPoint(center)
+        self.radius = radius
+
+    @property
+    def geometry(self):
+        return core.Circle3D(self.centerSketchPoint.geometry.copy(), core.Vector3D(0, 0, 1), self.radius)
+
+
+class SketchPoint:
+    def __init__(self, point):
+        self.geometry = point.copy()
+        self._group = [self]  # points that move together, the corners of a rectangle
+
+    def _move(self, axis, coordinate):
+        """Set one coordinate (0 u, 1 v), dragging the points of the group that share it"""
+        old = (self.geometry.x, self.geometry.y)[axis]
+        for point in self._group:
+            if abs((point.geometry.x, point.geometry.y)[axis] - old) <= _csg.EPS:
+                setattr(point.geometry, "xy"[axis], coordinate)
+
+
+class SketchLineList:
+    def __init__(self, lines):
+        self._items = lines
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+class SketchLines:
+    def __init__(self, sketch):
+        self._sketch = sketch
+
+    @recorded("SketchLines.addByTwoPoints")
+    def addByTwoPoints(self, startPoint, endPoint):
+        return self._sketch._add(SketchLine(self._sketch, startPoint, endPoint))
+
+    @recorded("SketchLines.addTwoPointRectangle")
+    def addTwoPointRectangle(self, pointOne, pointTwo):
+        x0, y0, x1, y1 = pointOne.x, pointOne.y, pointTwo.x, pointTwo.y
+        corners = [SketchPoint(core.Point3D(x, y)) for x, y in ((x0, y0), (x1, y0), (x1, y1), (x0, y1))]
+        for corner in corners:
+            corner._group = corners  # horizontal and vertical constraints keep the sides square
+        lines = [self._sketch._add(SketchLine(self._sketch, corners[i], corners[(i + 1) % 4]))
+                 for i in range(4)]
+        return SketchLineList(lines)
+
+    @recorded("SketchLines.addCenterPointRectangle")
+    def addCenterPointRectangle(self, centerPoint, cornerPoint):
+        opposite = core.Point3D(2 * centerPoint.x - cornerPoint.x, 2 * centerPoint.y - cornerPoint.y)
+        return self.addTwoPointRectangle(opposite, cornerPoint)
+
+
+class SketchCircles:
+    def __init__(self, sketch):
+        self._sketch = sketch
+
+    @recorded("SketchCircles.addByCenterRadius")
+    def addByCenterRadius(self, centerPoint, radius):
+        return self._sketch._add(SketchCircle(self._sketch, centerPoint, radius))
+
+
+# Dimensions drive the axis-aligned sketches the generators draw: a distance
+# dimension moves its second point (with the rectangle corners that share the
+# coordinate), a diameter dimension sets the circle's radius
+
+class DimensionOrientations:
+    AlignedDimensionOrientation = 0
+    HorizontalDimensionOrientation = 1
+    VerticalDimensionOrientation = 2
+
+
+class _SketchDimension:
+    def __init__(self, sketch):
+        self.parentSketch = sketch
+        self.isDriving = True
+        design = sketch.parentComponent.parentDesign
+        self.parameter = ModelParameter(design, design._next_parameter_name(),
+                                        f"{round(self._measure() * 10, 9):g} mm", "mm", self)
+
+    @property
+    def value(self):
+        return self._measure()
+
+
+class SketchLinearDimension(_SketchDimension):
+    def __init__(self, sketch, pointOne, pointTwo, orientation):
+        if orientation == DimensionOrientations.AlignedDimensionOrientation:
+            raise NotImplementedError("headless sketches only solve horizontal and vertical dimensions")
+        self.entityOne = pointOne
+        self.entityTwo = pointTwo
+        self._axis = 0 if orientation == DimensionOrientations.HorizontalDimensionOrientation else 1
+        super().__init__(sketch)
+
+    def _coordinates(self):
+        return [(point.geometry.x, point.geometry.y)[self._axis] for point in (self.entityOne, self.entityTwo)]
+
+    def _measure(self):
+        one, two = self._coordinates()
+        return abs(two - one)
+
+    def _apply(self, value):
+        one, two = self._coordinates()
+        if self.entityTwo is self.parentSketch.originPoint:
+            self.entityOne._move(self._axis, two - value if one < two else two + value)
+        else:
+            self.entityTwo._move(self._axis, one - value if two < one else one + value)
+
+
+class SketchDiameterDimension(_SketchDimension):
+    def __init__(self, sketch, entity):
+        self.entity = entity
+        super().__init__(sketch)
+
+    def _measure(self):
+        return 2 * self.entity.radius
+
+    def _apply(self, value):
+        self.entity.radius = value / 2
+
+
+class SketchDimensions:
+    def __init__(self, sketch):
+        self._sketch = sketch
+        self._items = []
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    @recorded("SketchDimensions.addDistanceDimension")
+    def addDistanceDimension(self, pointOne, pointTwo, orientation, textPoint, isDriving=True):
+        return self._add(SketchLinearDimension(self._sketch, pointOne, pointTwo, orientation))
+
+    @recorded("SketchDimensions.addDiameterDimension")
+    def addDiameterDimension(self, entity, textPoint, isDriving=True):
+        return self._add(SketchDiameterDimension(self._sketch, entity))
+
+    def _add(self, dimension):
+        self._items.append(dimension)
+        return dimension
+
+
+# Constraints line a point up with another, the sketch origin for the generators:
+# the first point keeps its place and the second moves to it
+
+class _PointsConstraint:
+    def __init__(self, sketch, pointOne, pointTwo, axes):
+        self.parentSketch = sketch
+        self.pointOne = pointOne
+        self.pointTwo = pointTwo
+        self._axes = axes  # coordinates held equal (0 u, 1 v)
+
+    def _apply(self):
+        first, second = self.pointOne, self.pointTwo
+        if second is self.parentSketch.originPoint:
+            first, second = second, first
+        for axis in self._axes:
+            second._move(axis, (first.geometry.x, first.geometry.y)[axis])
+
+
+class VerticalPointsConstraint(_PointsConstraint):
+    def __init__(self, sketch, pointOne, pointTwo):
+        super().__init__(sketch, pointOne, pointTwo, (0,))
+
+
+class HorizontalPointsConstraint(_PointsConstraint):
+    def __init__(self, sketch, pointOne, pointTwo):
+        super().__init__(sketch, pointOne, pointTwo, (1,))
+
+
+class CoincidentConstraint(_PointsConstraint):
+    def __init__(self, sketch, point, entity):
+        if not isinstance(entity, SketchPoint):
+            raise NotImplementedError("headless sketches only make points coincident with points")
+        super().__init__(sketch, point, entity, (0, 1))
+
+    @property
+    def point(self):
+        return self.pointOne
+
+    @property
+    def entity(self):
+        return self.pointTwo
+
+
+class GeometricConstraints:
+    def __init__(self, sketch):
+        self._sketch = sketch
+        self._items = []
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    @recorded("GeometricConstraints.addVerticalPoints")
+    def addVerticalPoints(self, pointOne, pointTwo):
+        return self._add(VerticalPointsConstraint(self._sketch, pointOne, pointTwo))
+
+    @recorded("GeometricConstraints.addHorizontalPoints")
+    def addHorizontalPoints(self, pointOne, pointTwo):
+        return self._add(HorizontalPointsConstraint(self._sketch, pointOne, pointTwo))
+
+    @recorded("GeometricConstraints.addCoincident")
+    def addCoincident(self, point, entity):
+        return self._add(CoincidentConstraint(self._sketch, point, entity))
+
+    def _add(self, constraint):
+        constraint._apply()
+        self._sketch._changed()
+        self._items.append(constraint)
+        return constraint
+
+
+class AreaProperties:
+    def __init__(self, area, centroid, perimeter):
+        self.area = area
+        self.centroid = centroid
+        self.perimeter = perimeter
+
+
+class ProfileCurve:
+    def __init__(self, entity, geometry):
+        self.sketchEntity = entity
+        self.geometry = geometry  # the part of the entity that bounds the profile
+
+
+class ProfileLoop:
+    def __init__(self, curves, isOuter):
+        self.isOuter = isOuter
+        self.profileCurves = _collection(ProfileCurve(entity, geometry) for entity, geometry in curves)
+
+
+class Profile:
+    def __init__(self, sketch, region, loops, index):
+        self.parentSketch = sketch
+        self._region = region
+        self.profileLoops = _collection(loops)
+        self._index = index
+        self._revision = sketch._revision
+
+    def _current(self):
+        """This profile as the sketch now computes it; features use it after parameter edits"""
+        sketch = self.parentSketch
+        if sketch._revision == self._revision:
+            return self
+        profiles = sketch.profiles
+        if self._index >= profiles.count:
+            raise RuntimeError(f"profile {self._index} of {sketch.name} no longer exists")
+        return profiles.item(self._index)
+
+    @recorded("Profile.areaProperties")
+    def areaProperties(self, accuracy=0):
+        u, v = self._region.centroid
+        return AreaProperties(self._region.area, core.Point3D(u, v, 0), self._region.perimeter)
+
+    @property
+    def boundingBox(self):
+        (u0, v0), (u1, v1) = self._region.bounds
+        return core.BoundingBox3D(core.Point3D(u0, v0, 0), core.Point3D(u1, v1, 0))
+
+
+class Profiles:
+    def __init__(self, profiles):
+        self._items = profiles
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+def _key(u, v):
+    return (round(u, 9), round(v, 9))
+
+
+def _split_segments(lines):
+    """Split sketch lines at every crossing and shared point; edge -> first source line"""
+    segments = [((ln.geometry.startPoint.x, ln.geometry.startPoint.y),
+                 (ln.geometry.endPoint.x, ln.geometry.endPoint.y)) for ln in lines]
+    cuts = [[0.0, 1.0] for _ in segments]
+    for i, (a0, a1) in enumerate(segments):
+        r = (a1[0] - a0[0], a1[1] - a0[1])
+        for j in range(i + 1, len(segments)):
+            b0, b1 = segments[j]
+            s = (b1[0] - b0[0], b1[1] - b0[1])
+            d = (b0[0] - a0[0], b0[1] - a0[1])
+            denom = r[0] * s[1] - r[1] * s[0]
+            if abs(denom) < _csg.EPS:
+                if abs(d[0] * r[1] - d[1] * r[0]) > _csg.EPS:
+                    continue
+                rr, ss = r[0] ** 2 + r[1] ** 2, s[0] ** 2 + s[1] ** 2
+                for p in (b0, b1):
+                    cuts[i].append(((p[0] - a0[0]) * r[0] + (p[1] - a0[1]) * r[1]) / rr)
+                for p in (a0, a1):
+                    cuts[j].append(((p[0] - b0[0]) * s[0] + (p[1] - b0[1]) * s[1]) / ss)
+                continue
+            t = (d[0] * s[1] - d[1] * s[0]) / denom
+            w = (d[0] * r[1] - d[1] * r[0]) / denom
+            if -_csg.EPS <= t <= 1 + _csg.EPS and -_csg.EPS <= w <= 1 + _csg.EPS:
+                cuts[i].append(t)
+                cuts[j].append(w)
+    edges = {}
+    for i, (a0, a1) in enumerate(segments):
+        ts = sorted(t for t in cuts[i] if -_csg.EPS <= t <= 1 + _csg.EPS)
+        points = [_key(a0[0] + t * (a1[0] - a0[0]), a0[1] + t * (a1[1] - a0[1])) for t in ts]
+        for p, q in zip(points, points[1:]):
+            if p != q:
+                edges.setdefault(frozenset((p, q)), i)
+    return edges
+
+
+def _trace_faces(edges):
+    """Bounded faces of the planar line graph as (polygon, source line index of each edge)"""
+    neighbours = {}
+    for edge in edges:
+        p, q = tuple(edge)
+        neighbours.setdefault(p, set()).add(q)
+        neighbours.setdefault(q, set()).add(p)
+    dangling = [v for v, n in neighbours.items() if len(n) < 2]
+    while dangling:
+        v = dangling.pop()
+        for w in neighbours.pop(v, ()):
+            neighbours[w].discard(v)
+            if len(neighbours[w]) < 2:
+                dangling.append(w)
+    order = {v: sorted(n, key=lambda w, v=v: math.atan2(w[1] - v[1], w[0] - v[0]))
+             for v, n in neighbours.items()}
+    used = set()
+    faces = []
+    for v, around in order.items():
+        for w in around:
+            if (v, w) in used:
+                continue
+            points, sources = [], []
+            a, b = v, w
+            while (a, b) not in used:
+                used.add((a, b))
+                points.append(a)
+                sources.append(edges[frozenset((a, b))])
+                ring = order[b]
+                a, b = b, ring[(ring.index(a) - 1) % len(ring)]
+            polygon = _csg.Polygon(points)
+            if polygon._signed_area() > _csg.EPS:
+                faces.append((polygon, sources))
+    return faces
+
+
+def _find_loops(sketch):
+    """Closed loops (shape, [(entity, curve geometry)]) ordered by their first sketch entity"""
+    lines = [e for e in sketch._entities if isinstance(e, SketchLine)]
+    found = []
+    for polygon, sources in _trace_faces(_split_segments(lines)):
+        ends = zip(polygon.points, polygon.points[1:] + polygon.points[:1])
+        curves = [(lines[i], core.Line3D(core.Point3D(*a), core.Point3D(*b)))
+                  for i, (a, b) in zip(sources, ends)]
+        found.append((sketch._entities.index(lines[min(sources)]), polygon, curves))
+    for index, entity in enumerate(sketch._entities):
+        if isinstance(entity, SketchCircle):
+            center = entity.centerSketchPoint.geometry
+            found.append((index, _csg.Circle((center.x, center.y), entity.radius), [(entity, entity.geometry)]))
+    found.sort(key=lambda item: item[0])
+    return [(shape, curves) for _, shape, curves in found]
+
+
+def _inside(inner, outer):
+    (ilo, ihi), (olo, ohi) = inner.bounds, outer.bounds
+    if inner.area >= outer.area:
+        return False
+    if not all(olo[i] - _csg.EPS <= ilo[i] and ihi[i] <= ohi[i] + _csg.EPS for i in range(2)):
+        return False
+    return outer.contains(*inner.sample_point)
+
+
+def _find_profiles(sketch):
+    """One profile per face of the sketch, minus the loops nested directly inside it
+
+    Lines are split into planar faces like Fusion does; circles that cross
+    lines or other circles are kept whole rather than split into regions.
+    """
+    loops = _find_loops(sketch)
+    parents = {}
+    for i, (shape, _) in enumerate(loops):
+        containers = [j for j, (other, _) in enumerate(loops) if j != i and _inside(shape, other)]
+        if containers:
+            parents[i] = min(containers, key=lambda j: loops[j][0].area)
+    profiles = []
+    for i, (shape, curves) in enumerate(loops):
+        holes = [j for j, parent in parents.items() if parent == i]
+        region = _csg.Region(shape, [loops[j][0] for j in holes])
+        profile_loops = [ProfileLoop(curves, True)] + [ProfileLoop(loops[j][1], False) for j in holes]
+        profiles.append(Profile(sketch, region, profile_loops, i))
+    return profiles
+
+
+# ==============================================================================
+# FEATURES
+# ==============================================================================
+
+class Features:
+    def __init__(self, component):
+        self.extrudeFeatures = ExtrudeFeatures(component)
+        self.combineFeatures = CombineFeatures(component)
+        self.baseFeatures = BaseFeatures(component)
+        self.filletFeatures = FilletFeatures(component)
+        self.rectangularPatternFeatures = RectangularPatternFeatures(component)
+
+
+class FeatureHealthStates:
+    HealthyFeatureHealthState = 0
+    WarningFeatureHealthState = 1
+    ErrorFeatureHealthState = 2
+
+
+class _Feature:
+    """Timeline feature; subclasses change bodies in _compute"""
+
+    def __init__(self, collection, name):
+        self.parentComponent = collection._component
+        self.name = name
+        self.healthState = FeatureHealthStates.HealthyFeatureHealthState
+        self.errorOrWarningMessage = ""
+        self.attributes = core.Attributes(self)
+        self.timelineObject = None
+        self.isValid = True
+        self._collection = collection
+        self._bodies = []
+
+    @property
+    def bodies(self):
+        return BRepBodies(self._bodies)
+
+    def _apply(self):
+        """Apply the feature to the current bodies; errors only mark the feature during replay"""
+        try:
+            self._bodies = self._compute()
+            self.healthState = FeatureHealthStates.HealthyFeatureHealthState
+            self.errorOrWarningMessage = ""
+        except RuntimeError as e:
+            self._bodies = []
+            self.healthState = FeatureHealthStates.ErrorFeatureHealthState
+            self.errorOrWarningMessage = str(e)
+
+    @recorded("Feature.deleteMe")
+    def deleteMe(self):
+        self._collection._items.remove(self)
+        self.parentComponent.parentDesign.timeline._remove(self)
+        return True
+
+
+def _add_feature(collection, feature):
+    """Put a new feature into the timeline at the marker and compute it"""
+    timeline = feature.parentComponent.parentDesign.timeline
+    if timeline.markerPosition == timeline.count:
+        # Appending at the end only has to apply this feature
+        feature._apply()
+        if feature.healthState == FeatureHealthStates.ErrorFeatureHealthState:
+            raise RuntimeError(feature.errorOrWarningMessage)
+        timeline._insert(feature)
+    else:
+        timeline._insert(feature)
+        timeline._replay()
+        if feature.healthState == FeatureHealthStates.ErrorFeatureHealthState:
+            timeline._remove(feature)
+            raise RuntimeError(feature.errorOrWarningMessage)
+    collection._items.append(feature)
+    return feature
+
+
+class _FeatureCollection:
+    def __init__(self, component):
+        self._component = component
+        self._items = []
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+
+class OffsetStartDefinition:
+    def __init__(self, offset):
+        self.offset = offset
+
+    @staticmethod
+    @recorded("OffsetStartDefinition.create")
+    def create(offset):
+        return OffsetStartDefinition(offset)
+
+
+class ProfilePlaneStartDefinition:
+    offset = None
+
+    @staticmethod
+    @recorded("ProfilePlaneStartDefinition.create")
+    def create():
+        return ProfilePlaneStartDefinition()
+
+
+class ExtrudeFeatureInput:
+    def __init__(self, profile, operation):
+        self.profile = profile
+        self.operation = operation
+        self.startExtent = ProfilePlaneStartDefinition()
+        self.participantBodies = []
+        self.isSolid = True
+        self._symmetric = False
+        self._distance = None
+
+    @recorded("ExtrudeFeatureInput.setDistanceExtent")
+    def setDistanceExtent(self, isSymmetric, distance):
+        self._symmetric = isSymmetric
+        self._distance = distance
+        return True
+
+
+class ExtrudeFeature(_Feature):
+    def __init__(self, collection, name, input, participants):
+        super().__init__(collection, name)
+        self.operation = input.operation
+        profiles = input.profile
+        self._profiles = list(profiles) if isinstance(profiles, core.ObjectCollection) else [profiles]
+        self._start = input.startExtent.offset
+        self._distance = input._distance
+        self._symmetric = input._symmetric
+        self._participants = participants
+        self._created = None  # body this feature creates, kept across replays
+        self._solid = None
+        self._revision = None  # design revision _solid was computed at
+
+    @property
+    def _tool(self):
+        """The extruded solid, computed again after parameter edits"""
+        revision = self.parentComponent.parentDesign._revision
+        if self._revision != revision:
+            self._solid = _extrusion_solid(self)
+            self._revision = revision
+        return self._solid
+
+    def _compute(self):
+        return _apply_operation(self, self.parentComponent, self._tool, self.operation, self._participants)
+
+
+class ExtrudeFeatures(_FeatureCollection):
+    @recorded("ExtrudeFeatures.createInput")
+    def createInput(self, profile, operation):
+        return ExtrudeFeatureInput(profile, operation)
+
+    @recorded("ExtrudeFeatures.add")
+    def add(self, input):
+        if input._distance is None:
+            raise RuntimeError("extrude input has no extent")
+        feature = ExtrudeFeature(self, self._component._next_name("Extrude"), input, list(input.participantBodies))
+        return _add_feature(self, feature)
+
+
+class CombineFeatureInput:
+    def __init__(self, targetBody, toolBodies):
+        self.targetBody = targetBody
+        self.toolBodies = toolBodies
+        self.operation = FeatureOperations.JoinFeatureOperation
+        self.isKeepToolBodies = False
+        self.isNewComponent = False
+
+
+class CombineFeature(_Feature):
+    def __init__(self, collection, name, input):
+        super().__init__(collection, name)
+        self.operation = input.operation
+        self.isKeepToolBodies = input.isKeepToolBodies
+        self._target = input.targetBody
+        self._tools = list(input.toolBodies)
+
+    def _compute(self):
+        bodies = self.parentComponent._bodies
+        if self._target not in bodies or not all(tool in bodies for tool in self._tools):
+            raise RuntimeError("Combine target or tool body no longer exists")
+        kind = {FeatureOperations.JoinFeatureOperation: "union",
+                FeatureOperations.CutFeatureOperation: "diff",
+                FeatureOperations.IntersectFeatureOperation: "inter"}[self.operation]
+        self._target._set_solid(_csg.combine(kind, self._target._solid, *[t._solid for t in self._tools]))
+        if not self.isKeepToolBodies:
+            for tool in self._tools:
+                bodies.remove(tool)
+        return [self._target]
+
+
+class CombineFeatures(_FeatureCollection):
+    @recorded("CombineFeatures.createInput")
+    def createInput(self, targetBody, toolBodies):
+        return CombineFeatureInput(targetBody, toolBodies)
+
+    @recorded("CombineFeatures.add")
+    def add(self, input):
+        feature = CombineFeature(self, self._component._next_name("Combine"), input)
+        return _add_feature(self, feature)
+
+
+class BaseFeature(_Feature):
+    """Holds bodies added directly (imported geometry) in a parametric design"""
+
+    def __init__(self, collection, name):
+        super().__init__(collection, name)
+        self._sources = []  # (body, solid as added)
+        self._editing = False
+
+    def _compute(self):
+        for body, solid in self._sources:
+            body._set_solid(solid)
+            self.parentComponent._bodies.append(body)
+        return [body for body, _ in self._sources]
+
+    @recorded("BaseFeature.startEdit")
+    def startEdit(self):
+        self._editing = True
+        return True
+
+    @recorded("BaseFeature.finishEdit")
+    def finishEdit(self):
+        self._editing = False
+        return True
+
+
+class BaseFeatures(_FeatureCollection):
+    @recorded("BaseFeatures.add")
+    def add(self):
+        return _add_feature(self, BaseFeature(self, self._component._next_name("Base Feature")))
+
+
+class FilletFeatures(_FeatureCollection):
+    def createInput(self):
+        raise NotImplementedError("fillets are not modelled by the headless stand-in")
+
+
+class PatternDistanceType:
+    ExtentPatternDistanceType = 0
+    SpacingPatternDistanceType = 1
+
+
+class RectangularPatternFeatureInput:
+    def __init__(self, inputEntities, directionOneEntity, quantityOne, distanceOne, patternDistanceType):
+        self.inputEntities = inputEntities
+        self.directionOneEntity = directionOneEntity
+        self.quantityOne = quantityOne
+        self.distanceOne = distanceOne
+        self.patternDistanceType = patternDistanceType
+        self.directionTwoEntity = None
+        self.quantityTwo = core.ValueInput.createByReal(1)
+        self.distanceTwo = core.ValueInput.createByReal(0)
+
+    @recorded("RectangularPatternFeatureInput.setDirectionTwo")
+    def setDirectionTwo(self, directionTwoEntity, quantityTwo, distanceTwo):
+        self.directionTwoEntity = directionTwoEntity
+        self.quantityTwo = quantityTwo
+        self.distanceTwo = distanceTwo
+        return True
+
+
+class _PatternInstance:
+    """One copy of a patterned feature; keeps the body it creates across replays"""
+
+    def __init__(self):
+        self._created = None
+
+
+class RectangularPatternFeature(_Feature):
+    """Copies of extrude features, moved along one or two construction axes"""
+
+    def __init__(self, collection, name, input):
+        super().__init__(collection, name)
+        self._features = list(input.inputEntities)
+        if not all(isinstance(feature, ExtrudeFeature) for feature in self._features):
+            raise RuntimeError("the headless stand-in only patterns extrude features")
+        self._directions = [(input.directionOneEntity, input.quantityOne, input.distanceOne)]
+        if input.directionTwoEntity is not None:
+            self._directions.append((input.directionTwoEntity, input.quantityTwo, input.distanceTwo))
+        self._distanceType = input.patternDistanceType
+        self._instances = {}
+
+    def _direction(self, axis, quantity, distance):
+        """(world axis, count, spacing), evaluated afresh so parameter edits reach the pattern"""
+        design = self.parentComponent.parentDesign
+        count = int(round(_real(quantity, design)))
+        spacing = _real(distance, design)
+        if self._distanceType == PatternDistanceType.ExtentPatternDistanceType:
+            spacing = spacing / (count - 1) if count > 1 else 0.0
+        return axis._axis, count, spacing
+
+    def _compute(self):
+        bodies = []
+        offsets = [(0.0, 0.0, 0.0)]
+        for axis, count, spacing in (self._direction(*direction) for direction in self._directions):
+            offsets = [tuple(o[i] + (k * spacing if i == axis else 0.0) for i in range(3))
+                       for o in offsets for k in range(count)]
+        for index, feature in enumerate(self._features):
+            for offset in offsets[1:]:
+                instance = self._instances.setdefault((index, offset), _PatternInstance())
+                tool = _csg.translate(feature._tool, offset)
+                bodies += _apply_operation(instance, self.parentComponent, tool, feature.operation,
+                                           feature._participants)
+        return bodies
+
+
+class RectangularPatternFeatures(_FeatureCollection):
+    @recorded("RectangularPatternFeatures.createInput")
+    def createInput(self, inputEntities, directionOneEntity, quantityOne, distanceOne, patternDistanceType):
+        return RectangularPatternFeatureInput(inputEntities, directionOneEntity, quantityOne, distanceOne,
+                                              patternDistanceType)
+
+    @recorded("RectangularPatternFeatures.add")
+    def add(self, input):
+        feature = RectangularPatternFeature(self, self._component._next_name("RectangularPattern"), input)
+        return _add_feature(self, feature)
+
+
+def _extrusion_solid(feature):
+    design = feature.parentComponent.parentDesign
+    start = _real(feature._start, design) if feature._start is not None else 0.0
+    distance = _real(feature._distance, design)
+    solids = []
+    for profile in feature._profiles:
+        profile = profile._current()
+        plane = profile.parentSketch.referencePlane
+        base = plane._offset + plane._sign * start
+        if feature._symmetric:
+            lo, hi = base - abs(distance), base + abs(distance)
+        else:
+            lo, hi = base, base + plane._sign * distance
+        solids.append(_csg.Extrusion(profile._region, plane._axes, lo, hi))
+    return solids[0] if len(solids) == 1 else _csg.combine("union", *solids)
+
+
+def _new_body(feature, component, solid):
+    if feature._created is None:
+        feature._created = BRepBody(component, solid)
+    else:
+        feature._created._set_solid(solid)
+    component._bodies.append(feature._created)
+    return feature._created
+
+
+def _apply_operation(feature, component, tool, operation, participants):
+    if operation in (FeatureOperations.NewBodyFeatureOperation,
+                     FeatureOperations.NewComponentFeatureOperation):
+        return [_new_body(feature, component, tool)]
+
+    candidates = list(participants) or component._bodies
+    targets = [b for b in candidates if _csg.overlaps(b._solid.bounds, tool.bounds)]
+
+    if operation == FeatureOperations.JoinFeatureOperation:
+        if not targets:
+            return [_new_body(feature, component, tool)]
+        keep = targets[0]
+        keep._set_solid(_csg.combine("union", *[b._solid for b in targets], tool))
+        for merged in targets[1:]:
+            component._bodies.remove(merged)
+        return [keep]
+
+    if not targets:
+        raise RuntimeError("No target body found to cut or intersect")
+    kind = "diff" if operation == FeatureOperations.CutFeatureOperation else "inter"
+    for body in targets:
+        body._set_solid(_csg.combine(kind, body._solid, tool))
+    return targets
+
+
+# ==============================================================================
+# BODIES
+# ==============================================================================
+
+class PhysicalProperties:
+    def __init__(self, volume, centerOfMass, density):
+        self.volume = volume
+        self.density = density
+        self.mass = volume * density / 1000  # kg
+        self.centerOfMass = centerOfMass
+
+
+class BRepBody:
+    _ids = itertools.count(1)
+
+    def __init__(self, component, solid):
+        self.parentComponent = component  # None for temporary bodies
+        self.name = component._next_name("Body") if component else "Body"
+        self.isTemporary = component is None
+        self.isSolid = True
+        self.isVisible = True
+        self.entityToken = f"body:{next(BRepBody._ids)}"
+        self._solid = solid
+        self._mass = None
+
+    def _set_solid(self, solid):
+        self._solid = solid
+        self._mass = None
+
+    def _mass_properties(self):
+        if self._mass is None:
+            self._mass = _csg.mass_properties(self._solid)
+        return self._mass
+
+    @property
+    def volume(self):
+        return self._mass_properties()[0]
+
+    @property
+    def boundingBox(self):
+        lo, hi = self._solid.bounds
+        return core.BoundingBox3D(core.Point3D(*lo), core.Point3D(*hi))
+
+    @property
+    def physicalProperties(self):
+        volume, center = self._mass_properties()
+        return PhysicalProperties(volume, core.Point3D(*center), DEFAULT_DENSITY)
+
+    def getPhysicalProperties(self, accuracy=0):
+        return self.physicalProperties
+
+    @property
+    def meshManager(self):
+        return MeshManager(self)
+
+    @recorded("BRepBody.deleteMe")
+    def deleteMe(self):
+        self.parentComponent._bodies.remove(self)
+        return True
+
+
+class BRepBodies:
+    def __init__(self, bodies, component=None):
+        self._items = list(bodies)
+        self._component = component
+
+    @recorded("BRepBodies.add")
+    def add(self, body, targetBaseFeature=None):
+        """Copy a (temporary) body into the component"""
+        component = self._component
+        if component is None:
+            raise RuntimeError("bodies can only be added to a component's bRepBodies")
+        design = component.parentDesign
+        if design.designType == DesignTypes.ParametricDesignType:
+            if targetBaseFeature is None or not targetBaseFeature._editing:
+                raise RuntimeError("parametric designs need a base feature in edit mode to add bodies")
+        added = BRepBody(component, body._solid)
+        component._bodies.append(added)
+        self._items.append(added)
+        if targetBaseFeature is not None:
+            targetBaseFeature._sources.append((added, body._solid))
+            targetBaseFeature._bodies.append(added)
+        return added
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        return self._items[index]
+
+    def itemByName(self, name):
+        return next((b for b in self._items if b.name == name), None)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+# The stand-in tessellates on a voxel grid (see _csg.voxel_mesh): watertight,
+# exact on faces along the bounds, stepped on curved and inner faces
+MESH_CELL = {  # cm, cell size per quality when maxSideLength is not set
+    TriangleMeshQualityOptions.LowQualityTriangleMesh: 0.4,
+    TriangleMeshQualityOptions.NormalQualityTriangleMesh: 0.2,
+    TriangleMeshQualityOptions.HighQualityTriangleMesh: 0.1,
+    TriangleMeshQualityOptions.VeryHighQualityTriangleMesh: 0.05,
+}
+
+
+class TriangleMesh:
+    def __init__(self, coordinates, indices):
+        self.nodeCoordinatesAsDouble = coordinates  # cm, x y z per node
+        self.nodeIndices = indices  # three node indexes per triangle
+
+    @property
+    def nodeCount(self):
+        return len(self.nodeCoordinatesAsDouble) // 3
+
+    @property
+    def triangleCount(self):
+        return len(self.nodeIndices) // 3
+
+
+class TriangleMeshCalculator:
+    def __init__(self, body):
+        self._body = body
+        self._quality = TriangleMeshQualityOptions.NormalQualityTriangleMesh
+        self.surfaceTolerance = 0.0
+        self.maxNormalDeviation = 0.0
+        self.maxSideLength = 0.0
+        self.maxAspectRatio = 0.0
+
+    @recorded("TriangleMeshCalculator.setQuality")
+    def setQuality(self, triangleMeshQuality):
+        self._quality = triangleMeshQuality
+        return True
+
+    @recorded("TriangleMeshCalculator.calculate")
+    def calculate(self):
+        cell = self.maxSideLength if self.maxSideLength > 0 else MESH_CELL[self._quality]
+        return TriangleMesh(*_csg.voxel_mesh(self._body._solid, cell))
+
+
+class MeshManager:
+    def __init__(self, body):
+        self._body = body
+
+    @recorded("MeshManager.createMeshCalculator")
+    def createMeshCalculator(self):
+        return TriangleMeshCalculator(self._body)
+
+
+class TemporaryBRepManager:
+    """Bodies outside any design, read from and written to files"""
+
+    _instance = None
+
+    @staticmethod
+    def get():
+        if TemporaryBRepManager._instance is None:
+            TemporaryBRepManager._instance = TemporaryBRepManager()
+        return TemporaryBRepManager._instance
+
+    @recorded("TemporaryBRepManager.createFromFile")
+    def createFromFile(self, filename):
+        with open(filename, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != EXPORT_FORMAT:
+            raise RuntimeError(f"{filename} was not written by the headless stand-in")
+        return BRepBodies([BRepBody(None, _csg.from_data(solid)) for solid in data["bodies"]])
+
+    @recorded("TemporaryBRepManager.copy")
+    def copy(self, body):
+        return BRepBody(None, body._solid)
+
+    @recorded("TemporaryBRepManager.exportToFile")
+    def exportToFile(self, bodies, filename):
+        _write_solids(filename, [body._solid for body in bodies])
+        return True
+
+
+# ==============================================================================
+# EXPORT
+# ==============================================================================
+
+# SMT and STEP exports hold the CSG tree as JSON; STL holds bounding boxes only
+EXPORT_FORMAT = "okp-headless-csg-1"
+
+
+def _write_solids(filename, solids):
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump({"format": EXPORT_FORMAT, "bodies": [_csg.to_data(solid) for solid in solids]}, f)
+
+
+def _export_bodies(geometry):
+    if isinstance(geometry, Component):
+        return list(geometry._bodies)
+    if isinstance(geometry, Occurrence):
+        return list(geometry.component._bodies)
+    return [geometry]
+
+
+class ExportOptions:
+    def __init__(self, kind, filename, geometry):
+        self.kind = kind
+        self.filename = filename
+        self.geometry = geometry
+        self.isOneFilePerBody = False
+
+
+class ExportManager:
+    def __init__(self, design):
+        self._design = design
+
+    @recorded("ExportManager.createSMTExportOptions")
+    def createSMTExportOptions(self, filename, geometry=None):
+        return ExportOptions("smt", filename, geometry or self._design.rootComponent)
+
+    @recorded("ExportManager.createSTEPExportOptions")
+    def createSTEPExportOptions(self, filename, geometry=None):
+        return ExportOptions("step", filename, geometry or self._design.rootComponent)
+
+    @recorded("ExportManager.createSTLExportOptions")
+    def createSTLExportOptions(self, geometry, filename=""):
+        return ExportOptions("stl", filename, geometry)
+
+    @recorded("ExportManager.execute")
+    def execute(self, exportOptions):
+        bodies = _export_bodies(exportOptions.geometry)
+        if exportOptions.kind == "stl":
+            _write_box_stl(exportOptions.filename, bodies)
+        else:
+            _write_solids(exportOptions.filename, [body._solid for body in bodies])
+        return True
+
+
+def _write_box_stl(filename, bodies):
+    """ASCII STL of each body's bounding box; the stand-in has no tessellator"""
+    corners = [(0, 2, 6, 4), (1, 5, 7, 3), (0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6)]
+    with open(filename, "w", encoding="ascii") as f:
+        f.write("solid headless_bounding_boxes\n")
+        for body in bodies:
+            lo, hi = body._solid.bounds
+            points = [(x, y, z) for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])]
+            for a, b, c, d in corners:
+                for tri in ((a, b, c), (a, c, d)):
+                    f.write("  facet normal 0 0 0\n    outer loop\n")
+                    for index in tri:
+                        f.write("      vertex {:.6e} {:.6e} {:.6e}\n".format(*[v * 10 for v in points[index]]))
+                    f.write("    endloop\n  endfacet\n")
+        f.write("endsolid headless_bounding_boxes\n")
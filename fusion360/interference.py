@@ -0,0 +1,287 @@
+"""
+OKP Sight - Cavity Interference Check
+Pre-flight check that the main body cavities neither collide with each
+other nor break through the outer shell, independent of the Fusion API
+
+Usage (from the repository root):
+    python -m fusion360.interference
+    python -m fusion360.interference --set LIGHT_OFFSET_X=-12 --clearance 2.5
+
+Every cavity of layout.cavities becomes an analytic primitive in mm: a
+circle cut becomes a cylinder along its plane normal, a rectangle cut a box.
+The shell is the body box. Primitives sit in a bounding-volume hierarchy of
+axis-aligned boxes, so only pairs whose boxes come within the clearance are
+tested exactly. Ports (OPENINGS) are meant to break through and are only
+checked against other cavities.
+
+main_body.build calls preflight(p) before any Fusion API call:
+INTERFERENCE_CHECK "strict" raises InterferenceError, "warn" reports, "off"
+skips the check.
+"""
+
+import argparse
+import math
+import time
+from collections import namedtuple
+
+from . import layout
+
+OPENINGS = frozenset({"usb_c"})  # cavities that open through the shell by design
+TOUCH = 1e-6  # mm; surfaces this close count as touching
+LEAF_SIZE = 2  # primitives per BVH leaf
+
+# axis: 0, 1, 2 for x, y, z; lo/hi: (x, y, z) bounds in mm
+Box = namedtuple("Box", "name lo hi")
+# Cylinder along axis from start to end, centred at (u, v) in the other two axes (ascending order)
+Cylinder = namedtuple("Cylinder", "name axis center radius start end")
+# Prism along axis from start to end: a counter-clockwise polygon of (u, v) points in the other two axes
+Prism = namedtuple("Prism", "name axis points start end")
+
+# kind: "overlap" (second is a cavity) or "breakthrough" (second is the shell face);
+# gap: signed clearance in mm, negative when they intersect
+Interference = namedtuple("Interference", "kind first second gap")
+
+FACES = ("rear", "left", "bottom", "front", "right", "top")
+
+
+class InterferenceError(ValueError):
+    """Cavities collide or break through; found lists every Interference"""
+
+    def __init__(self, found):
+        super().__init__("Cavity interference:\n" + format_report(found))
+        self.found = found
+
+
+# ==============================================================================
+# PRIMITIVES
+# ==============================================================================
+
+def primitive(cavity):
+    """Primitive of a layout.Cavity (mm); cuts run along the plane normal from the plane"""
+    axis = {"yz": 0, "xy": 2}[cavity.plane]
+    u, v = cavity.center
+    if cavity.shape == "circle":
+        return Cylinder(cavity.name, axis, (u, v), cavity.size / 2, 0.0, cavity.depth)
+    width, height = cavity.size
+    if axis == 0:
+        return Box(cavity.name, (0.0, u - width / 2, v - height / 2), (cavity.depth, u + width / 2, v + height / 2))
+    return Box(cavity.name, (u - width / 2, v - height / 2, 0.0), (u + width / 2, v + height / 2, cavity.depth))
+
+
+def shell(p):
+    """The body box, as main_body.create_body_box extrudes it"""
+    return Box("shell", (-p.TOTAL_LENGTH / 2, -p.BODY_WIDTH / 2, 0.0),
+               (p.TOTAL_LENGTH / 2, p.BODY_WIDTH / 2, p.BODY_HEIGHT))
+
+
+def bounds(shape):
+    """(lo, hi) axis-aligned bounds of a primitive"""
+    if isinstance(shape, Box):
+        return shape.lo, shape.hi
+    lo, hi = [0.0] * 3, [0.0] * 3
+    lo[shape.axis], hi[shape.axis] = shape.start, shape.end
+    if isinstance(shape, Prism):
+        for k, i in enumerate(other_axes(shape.axis)):
+            lo[i], hi[i] = min(q[k] for q in shape.points), max(q[k] for q in shape.points)
+        return tuple(lo), tuple(hi)
+    for i, c in zip(other_axes(shape.axis), shape.center):
+        lo[i], hi[i] = c - shape.radius, c + shape.radius
+    return tuple(lo), tuple(hi)
+
+
+def other_axes(axis):
+    return [i for i in range(3) if i != axis]
+
+
+def interval_gap(a_lo, a_hi, b_lo, b_hi):
+    """Distance between two intervals; negative overlap depth when they overlap"""
+    return max(a_lo - b_hi, b_lo - a_hi)
+
+
+def combine(axial, across):
+    """Signed gap from the gap along an axis and the gap across it"""
+    if axial > 0 and across > 0:
+        return math.hypot(axial, across)
+    return max(axial, across)
+
+
+def box_gap(a_lo, a_hi, b_lo, b_hi):
+    gaps = [interval_gap(a_lo[i], a_hi[i], b_lo[i], b_hi[i]) for i in range(3)]
+    outside = [g for g in gaps if g > 0]
+    return math.sqrt(sum(g * g for g in outside)) if outside else max(gaps)
+
+
+def gap(a, b):
+    """Signed clearance between two primitives, mm
+
+    Exact for boxes and for cylinders parallel to each other or to a box's
+    edges; a cylinder across another cylinder, and a prism, are measured by
+    their bounds.
+    """
+    a, b = (Box(s.name, *bounds(s)) if isinstance(s, Prism) else s for s in (a, b))
+    if isinstance(a, Box) and isinstance(b, Box):
+        return box_gap(a.lo, a.hi, b.lo, b.hi)
+    if isinstance(a, Box):
+        a, b = b, a
+    if isinstance(b, Cylinder) and b.axis != a.axis:
+        b = Box(b.name, *bounds(b))
+    if isinstance(b, Cylinder):
+        axial = interval_gap(a.start, a.end, b.start, b.end)
+        across = math.dist(a.center, b.center) - a.radius - b.radius
+        return combine(axial, across)
+
+    # Cylinder against a box: the circle against the box's cross-section
+    lo, hi = bounds(b)
+    axial = interval_gap(a.start, a.end, lo[a.axis], hi[a.axis])
+    du, dv = (max(lo[i] - c, 0.0, c - hi[i]) for i, c in zip(other_axes(a.axis), a.center))
+    if du or dv:
+        across = math.hypot(du, dv) - a.radius
+    else:
+        inside = min(min(c - lo[i], hi[i] - c) for i, c in zip(other_axes(a.axis), a.center))
+        across = -(inside + a.radius)
+    return combine(axial, across)
+
+
+def walls(shape, outer):
+    """(thinnest wall in mm, face) between a primitive and the inside of the shell; negative breaks through"""
+    lo, hi = bounds(shape)
+    faces = [lo[i] - outer.lo[i] for i in range(3)] + [outer.hi[i] - hi[i] for i in range(3)]
+    thinnest = min(range(6), key=faces.__getitem__)
+    return faces[thinnest], FACES[thinnest]
+
+
+# ==============================================================================
+# BOUNDING-VOLUME HIERARCHY
+# ==============================================================================
+
+class Node:
+    __slots__ = ("lo", "hi", "shapes", "left", "right")
+
+    def __init__(self, lo, hi, shapes=None, left=None, right=None):
+        self.lo, self.hi = lo, hi
+        self.shapes, self.left, self.right = shapes, left, right
+
+
+class BVH:
+    """Axis-aligned bounding-box tree over primitives, split at the median of the longest axis"""
+
+    def __init__(self, shapes):
+        self.root = self._build([(bounds(shape), shape) for shape in shapes]) if shapes else None
+
+    def _build(self, items):
+        lo = tuple(min(b[0][i] for b, _ in items) for i in range(3))
+        hi = tuple(max(b[1][i] for b, _ in items) for i in range(3))
+        if len(items) <= LEAF_SIZE:
+            return Node(lo, hi, shapes=[shape for _, shape in items])
+        axis = max(range(3), key=lambda i: hi[i] - lo[i])
+        items = sorted(items, key=lambda item: item[0][0][axis] + item[0][1][axis])
+        middle = len(items) // 2
+        return Node(lo, hi, left=self._build(items[:middle]), right=self._build(items[middle:]))
+
+    def pairs(self, clearance=0.0):
+        """Every pair of primitives whose bounds come within clearance, each once"""
+        found = []
+        if self.root is not None:
+            self._self_pairs(self.root, clearance, found)
+        return found
+
+    def _self_pairs(self, node, clearance, found):
+        if node.shapes is not None:
+            shapes = node.shapes
+            found += [(a, b) for i, a in enumerate(shapes) for b in shapes[i + 1:]
+                      if box_gap(*bounds(a), *bounds(b)) < clearance + TOUCH]
+            return
+        self._self_pairs(node.left, clearance, found)
+        self._self_pairs(node.right, clearance, found)
+        self._cross_pairs(node.left, node.right, clearance, found)
+
+    def _cross_pairs(self, a, b, clearance, found):
+        if box_gap(a.lo, a.hi, b.lo, b.hi) >= clearance + TOUCH:
+            return
+        if a.shapes is not None and b.shapes is not None:
+            found += [(x, y) for x in a.shapes for y in b.shapes
+                      if box_gap(*bounds(x), *bounds(y)) < clearance + TOUCH]
+        elif a.shapes is not None or (b.shapes is None and
+                                      (b.hi[0] - b.lo[0]) > (a.hi[0] - a.lo[0])):
+            self._cross_pairs(a, b.left, clearance, found)
+            self._cross_pairs(a, b.right, clearance, found)
+        else:
+            self._cross_pairs(a.left, b, clearance, found)
+            self._cross_pairs(a.right, b, clearance, found)
+
+
+# ==============================================================================
+# CHECK
+# ==============================================================================
+
+def check(p, clearance=0.0):
+    """Every cavity overlap and shell breakthrough of p, worst first
+
+    clearance (mm) is the wall to keep: cavities closer than that to each
+    other or to the outside are reported too.
+    """
+    shapes = [primitive(cavity) for cavity in layout.cavities(p)]
+    outer = shell(p)
+    found = []
+    for a, b in BVH(shapes).pairs(clearance):
+        distance = gap(a, b)
+        if distance < clearance + TOUCH:
+            first, second = sorted((a.name, b.name))
+            found.append(Interference("overlap", first, second, distance))
+    for shape in shapes:
+        if shape.name in OPENINGS:
+            continue
+        wall, face = walls(shape, outer)
+        if wall < clearance + TOUCH:
+            found.append(Interference("breakthrough", shape.name, face, wall))
+    return sorted(found, key=lambda item: item.gap)
+
+
+def preflight(p):
+    """check(p) as INTERFERENCE_CHECK asks, before building; strict raises InterferenceError"""
+    if p.INTERFERENCE_CHECK == "off":
+        return []
+    found = check(p)
+    if found and p.INTERFERENCE_CHECK == "strict":
+        raise InterferenceError(found)
+    return found
+
+
+def format_report(found):
+    if not found:
+        return "No cavity interference"
+    lines = []
+    for item in found:
+        if item.kind == "overlap":
+            what = f"overlap by {-item.gap:.2f} mm" if item.gap < 0 else f"{item.gap:.2f} mm apart"
+            lines.append(f"{item.first} / {item.second}: {what}")
+        else:
+            what = f"breaks through by {-item.gap:.2f} mm" if item.gap < 0 else f"{item.gap:.2f} mm wall"
+            lines.append(f"{item.first} -> {item.second} face: {what}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from . import sweep
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="override a parameter")
+    parser.add_argument("--clearance", type=float, default=0.0, help="wall to keep between cavities, mm")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for spec in args.set:
+        name, values = sweep.parse_grid(spec)
+        overrides[name] = values[0]
+    p = sweep.variant_parameters(overrides)
+
+    started = time.perf_counter()
+    found = check(p, args.clearance)
+    seconds = time.perf_counter() - started
+    print(format_report(found))
+    print(f"Checked in {seconds * 1000:.2f} ms")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,92 @@
+"""
+OKP Sight - Cavity Layout
+Where each cavity of the main body sits, independent of the Fusion API, so the
+separate and batched build modes cut exactly the same geometry
+Values come out in the units passed in: Parameters for millimeters, or its
+`cm` view for the Fusion API. Positions are sketch coordinates of the plane
+"""
+
+from collections import namedtuple
+
+# plane: "xy" or "yz"; shape: "circle" (size = diameter) or "rect" (size = (width, height))
+# Every cavity is cut from its sketch plane in the positive normal direction
+Cavity = namedtuple("Cavity", "name plane shape center size depth")
+
+
+def battery_cavity(params):
+    """18650 battery bore at the rear of the body"""
+    z_position = params.BODY_WALL_THICKNESS + params.BATTERY_DIAMETER/2
+    return Cavity("battery", "yz", "circle", (0, z_position),
+                  params.BATTERY_DIAMETER, params.BATTERY_LENGTH)
+
+
+def usb_port(params):
+    """USB-C charging port cutout on the rear panel"""
+    return Cavity("usb_c", "xy", "rect", (-params.TOTAL_LENGTH/2, 0),
+                  (params.USB_C_WIDTH, params.USB_C_HEIGHT), params.USB_C_DEPTH)
+
+
+def reflector_cavity(params):
+    """Reflector housing bore (vertical until the 45° construction plane exists)"""
+    return Cavity("reflector", "yz", "circle", (0, params.REFLECTOR_CENTER_HEIGHT),
+                  params.REFLECTOR_HOUSING_DIAMETER, params.REFLECTOR_CAVITY_DEPTH)
+
+
+def light_cavity(params):
+    """Tactical light module bore (left side)"""
+    return Cavity("light", "yz", "circle", (params.LIGHT_OFFSET_X, params.LIGHT_OFFSET_Z),
+                  params.LIGHT_DIAMETER, params.LIGHT_DEPTH)
+
+
+def laser_cavity(params):
+    """Green laser module bore (right side)"""
+    return Cavity("laser", "yz", "circle", (params.LASER_OFFSET_X, params.LASER_OFFSET_Z),
+                  params.LASER_DIAMETER, params.LASER_DEPTH)
+
+
+def cavities(params):
+    """All main body cavities in build order"""
+    return [battery_cavity(params), usb_port(params), reflector_cavity(params),
+            light_cavity(params), laser_cavity(params)]
+
+
+def _extent(cavity):
+    (u, v), size = cavity.center, cavity.size
+    half_u, half_v = (size/2, size/2) if cavity.shape == "circle" else (size[0]/2, size[1]/2)
+    return u - half_u, v - half_v, u + half_u, v + half_v
+
+
+def overlaps(a, b):
+    """True if two cavities on the same plane touch or overlap in the sketch"""
+    if a.plane != b.plane:
+        return False
+    if a.shape == "circle" and b.shape == "circle":
+        du, dv = a.center[0] - b.center[0], a.center[1] - b.center[1]
+        return (du * du + dv * dv) ** 0.5 <= (a.size + b.size) / 2
+    if a.shape == "circle" or b.shape == "circle":
+        circle, rect = (a, b) if a.shape == "circle" else (b, a)
+        u0, v0, u1, v1 = _extent(rect)
+        nearest_u = min(max(circle.center[0], u0), u1)
+        nearest_v = min(max(circle.center[1], v0), v1)
+        du, dv = circle.center[0] - nearest_u, circle.center[1] - nearest_v
+        return (du * du + dv * dv) ** 0.5 <= circle.size / 2
+    au0, av0, au1, av1 = _extent(a)
+    bu0, bv0, bu1, bv1 = _extent(b)
+    return au0 <= bu1 and bu0 <= au1 and av0 <= bv1 and bv0 <= av1
+
+
+def sketch_groups(cavity_list):
+    """Pack cavities into as few sketches as possible
+
+    Cavities share a sketch only when they lie on the same plane and do not
+    touch, so every profile in a sketch belongs to exactly one cavity.
+    """
+    groups = []
+    for cavity in cavity_list:
+        for group in groups:
+            if group[0].plane == cavity.plane and not any(overlaps(cavity, other) for other in group):
+                group.append(cavity)
+                break
+        else:
+            groups.append([cavity])
+    return groups
@@ -8,6 +8,14 @@ import adsk.core
 import adsk.fusion
 import traceback
 import math
+from . import api_trace
+from . import build_mode
+from . import interference
+from . import layout
+from . import mesh_export
+from . import profile_select
+from . import shapes
+from . import user_parameters
 from . import parameters as params
 
 def run(context):
@@ -17,291 +25,302 @@ def run(context):
         ui = app.userInterface
         design = app.activeProduct
 
-        # Get the root component
-        rootComp = design.rootComponent
+        p = params.DEFAULT
+        found = []
+        with api_trace.tracing(p.API_TRACE == "on") as trace, \
+                build_mode.building(design, p.BUILD_MODE) as generation:
+            bodyComp = build(generation.design.rootComponent, p, found)
+            exported = mesh_export.export_generated(bodyComp, p, "OKP_MainBody")
+        traced = api_trace.write_generated(trace, "OKP_MainBody")
 
-        # Create a new component for the main body
-        occurrence = rootComp.occurrences.addNewComponent(adsk.core.Matrix3D.create())
-        bodyComp = occurrence.component
-        bodyComp.name = "OKP_MainBody"
+        warnings = f'\n\n{interference.format_report(found)}' if found else ''
+        ui.messageBox(f'Main body created with {p.HOOD_STYLE} hood!\n{generation.report()}{warnings}'
+                      f'{mesh_export.format_exported(exported)}{api_trace.format_traced(trace, traced)}')
 
-        # Create main body box
-        sketches = bodyComp.sketches
-        xyPlane = bodyComp.xYConstructionPlane
-        sketch = sketches.add(xyPlane)
+    except:
+        if ui:
+            ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
-        # Draw main body rectangle (centered on origin)
-        lines = sketch.sketchCurves.sketchLines
-        rect = lines.addTwoPointRectangle(
-            adsk.core.Point3D.create(-params.TOTAL_LENGTH/2, -params.BODY_WIDTH/2, 0),
-            adsk.core.Point3D.create(params.TOTAL_LENGTH/2, params.BODY_WIDTH/2, 0)
-        )
 
-        # Extrude main body
-        extrudes = bodyComp.features.extrudeFeatures
-        prof = sketch.profiles.item(0)
-        extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.NewBodyFeature)
-        distance = adsk.core.ValueInput.createByReal(params.BODY_HEIGHT / 10)  # cm
-        extInput.setDistanceExtent(False, distance)
-        mainBodyExtrude = extrudes.add(extInput)
+def build(rootComp, p, found=None):
+    """Build the main body component for a Parameters object and return it
 
-        # Create battery cavity
-        create_battery_cavity(bodyComp)
+    found, a list, receives the interferences the preflight check reported.
+    """
+    reported = preflight(p)
+    if found is not None:
+        found.extend(reported)
+    user_parameters.link(rootComp.parentDesign, p)
+    bodyComp = create_component(rootComp)
 
-        # Create reflector cavity
-        create_reflector_cavity(bodyComp)
+    # Main body box, cavities, then the hood (see stages)
+    for name, create in stages(p):
+        create(bodyComp, p)
 
-        # Create light module cavity
-        create_light_cavity(bodyComp)
+    # Round exterior edges
+    round_edges(bodyComp)
 
-        # Create laser module cavity
-        create_laser_cavity(bodyComp)
+    return bodyComp
 
-        # Create hood based on style
-        if params.HOOD_STYLE == "minimal":
-            create_hood_minimal(bodyComp)
-        elif params.HOOD_STYLE == "full":
-            create_hood_full(bodyComp)
-        elif params.HOOD_STYLE == "skeleton":
-            create_hood_skeleton(bodyComp)
 
-        # Round exterior edges
-        round_edges(bodyComp)
+def preflight(p):
+    """Cavity interference check before any Fusion API call (p.INTERFERENCE_CHECK)"""
+    return interference.preflight(p)
 
-        ui.messageBox(f'Main body created with {params.HOOD_STYLE} hood!')
 
-    except:
-        if ui:
-            ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+def create_component(rootComp):
+    """Create a new component for the main body"""
+    occurrence = rootComp.occurrences.addNewComponent(adsk.core.Matrix3D.create())
+    bodyComp = occurrence.component
+    bodyComp.name = "OKP_MainBody"
+    return bodyComp
 
 
-def create_battery_cavity(comp):
-    """Create cylindrical cavity for 18650 battery (vertical orientation)"""
-    sketches = comp.sketches
-    yzPlane = comp.yZConstructionPlane
-    sketch = sketches.add(yzPlane)
-
-    # Position at rear of body
-    x_position = -params.TOTAL_LENGTH/2 + params.BATTERY_SECTION_LENGTH/2
-    y_position = 0  # Centered
-    z_position = params.BODY_WALL_THICKNESS + params.BATTERY_DIAMETER/2
-
-    circles = sketch.sketchCurves.sketchCircles
-    circle = circles.addByCenterRadius(
-        adsk.core.Point3D.create(y_position, z_position, 0),
-        params.BATTERY_DIAMETER/2 / 10  # cm
-    )
+def stages(p):
+    """Named build steps in timeline order, each a create_*(comp, p) function
 
-    # Extrude cavity (cut)
-    extrudes = comp.features.extrudeFeatures
-    prof = sketch.profiles.item(0)
-    extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.CutFeature)
-    distance = adsk.core.ValueInput.createByReal(params.BATTERY_LENGTH / 10)
-    extInput.setDistanceExtent(False, distance)
-    extrudes.add(extInput)
+    regen.py rebuilds single stages, so a stage must only add features of its
+    own and must not depend on features of later stages.
+    """
+    return [("body", create_body_box)] + cavity_stages(p) + [("hood", create_hood)]
 
-    # USB-C port cutout (rear panel)
-    create_usb_port(comp, x_position)
 
+def cavity_stages(p):
+    """Cavity steps for p.CAVITY_BUILD_MODE"""
+    if p.CAVITY_BUILD_MODE == "batched":
+        return [("cavities", create_batched_cavities)]
+    return [
+        ("battery_cavity", create_battery_cavity),
+        ("reflector_cavity", create_reflector_cavity),
+        ("light_cavity", create_light_cavity),
+        ("laser_cavity", create_laser_cavity),
+    ]
 
-def create_usb_port(comp, battery_x_position):
-    """Create USB-C port cutout on rear panel"""
-    sketches = comp.sketches
-    xyPlane = comp.xYConstructionPlane
-    sketch = sketches.add(xyPlane)
 
-    # Position on rear panel
-    x = -params.TOTAL_LENGTH/2
-    y = 0
-    z = params.BODY_WALL_THICKNESS + params.BATTERY_DIAMETER/2
+def create_body_box(comp, p):
+    """Create the main housing block"""
+    xyPlane = comp.xYConstructionPlane
+    sketch = build_mode.new_sketch(comp, xyPlane)
 
-    lines = sketch.sketchCurves.sketchLines
-    rect = lines.addTwoPointRectangle(
-        adsk.core.Point3D.create(x - params.USB_C_WIDTH/2, y - params.USB_C_HEIGHT/2, 0),
-        adsk.core.Point3D.create(x + params.USB_C_WIDTH/2, y + params.USB_C_HEIGHT/2, 0)
+    # Draw main body rectangle (centered on origin)
+    rect = user_parameters.rectangle(
+        sketch,
+        (-p.cm.TOTAL_LENGTH/2, -p.cm.BODY_WIDTH/2),
+        (p.cm.TOTAL_LENGTH, p.cm.BODY_WIDTH)
     )
 
-    # Extrude cut
+    # Extrude main body
     extrudes = comp.features.extrudeFeatures
-    prof = sketch.profiles.item(0)
-    extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.CutFeature)
-    distance = adsk.core.ValueInput.createByReal(params.USB_C_DEPTH / 10)
+    prof = build_mode.profiles(sketch).item(0)
+    extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+    distance = user_parameters.value(p.cm.BODY_HEIGHT)
     extInput.setDistanceExtent(False, distance)
-    extrudes.add(extInput)
+    return extrudes.add(extInput)
 
 
-def create_reflector_cavity(comp):
-    """Create cylindrical cavity for parabolic reflector at 45° tilt"""
-    sketches = comp.sketches
-
-    # Create construction plane tilted 45°
-    planes = comp.constructionPlanes
-    planeInput = planes.createInput()
-    # TODO: Create angled plane for reflector
-    # This is complex - need to create offset plane and rotate
+def create_batched_cavities(comp, p):
+    """Cut all cavities in shared sketches"""
+    create_cavities_batched(comp, layout.cavities(p.cm))
 
-    # For now, create vertical cavity (simplification)
-    yzPlane = comp.yZConstructionPlane
-    sketch = sketches.add(yzPlane)
 
-    circles = sketch.sketchCurves.sketchCircles
-    circle = circles.addByCenterRadius(
-        adsk.core.Point3D.create(0, params.REFLECTOR_CENTER_HEIGHT, 0),
-        params.REFLECTOR_HOUSING_DIAMETER/2 / 10
-    )
+def create_cavities_batched(comp, cavities):
+    """Cut cavities with shared sketches and one extrude per distinct depth
 
-    # Extrude cut
+    Cavities on the same plane share a sketch unless they touch, in which
+    case Fusion would merge their profiles; see layout.sketch_groups.
+    """
     extrudes = comp.features.extrudeFeatures
-    prof = sketch.profiles.item(0)
-    extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.CutFeature)
-    distance = adsk.core.ValueInput.createByReal(40 / 10)  # 40mm deep
-    extInput.setDistanceExtent(False, distance)
-    extrudes.add(extInput)
+    for group in layout.sketch_groups(cavities):
+        sketch = build_mode.new_sketch(comp, sketch_plane(comp, group[0].plane))
+        for cavity in group:
+            draw_cavity(sketch, cavity)
+
+        found = profile_select.SketchProfiles(sketch)
+        for depth in sorted({cavity.depth for cavity in group}):
+            profiles = profile_select.collection(cavity_profile(found, cavity)
+                                                 for cavity in group if cavity.depth == depth)
+            extInput = extrudes.createInput(profiles, adsk.fusion.FeatureOperations.CutFeatureOperation)
+            distance = user_parameters.value(depth)
+            extInput.setDistanceExtent(False, distance)
+            extrudes.add(extInput)
 
 
-def create_light_cavity(comp):
-    """Create cylindrical cavity for tactical light module (left side)"""
-    sketches = comp.sketches
-    yzPlane = comp.yZConstructionPlane
-    sketch = sketches.add(yzPlane)
-
-    # Position on left side
-    y_position = params.LIGHT_OFFSET_X
-    z_position = params.LIGHT_OFFSET_Z
-
-    circles = sketch.sketchCurves.sketchCircles
-    circle = circles.addByCenterRadius(
-        adsk.core.Point3D.create(y_position, z_position, 0),
-        params.LIGHT_DIAMETER/2 / 10
-    )
+def cut_cavity(comp, cavity):
+    """Cut a single cavity (in cm) with its own sketch and extrude"""
+    return extrude_cavity(comp, cavity, adsk.fusion.FeatureOperations.CutFeatureOperation)
+
+
+def extrude_cavity(comp, cavity, operation):
+    """Extrude a single cavity (in cm) from its own sketch"""
+    sketch = build_mode.new_sketch(comp, sketch_plane(comp, cavity.plane))
+    draw_cavity(sketch, cavity)
 
-    # Extrude cut from front
     extrudes = comp.features.extrudeFeatures
-    prof = sketch.profiles.item(0)
-    extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.CutFeature)
-    distance = adsk.core.ValueInput.createByReal(params.LIGHT_DEPTH / 10)
+    prof = build_mode.profiles(sketch).item(0)
+    extInput = extrudes.createInput(prof, operation)
+    distance = user_parameters.value(cavity.depth)
     extInput.setDistanceExtent(False, distance)
-    extrudes.add(extInput)
+    return extrudes.add(extInput)
+
+
+def create_cavity_tools(comp, p):
+    """Every cavity as its own body, to subtract later with a combine feature"""
+    for cavity in layout.cavities(p.cm):
+        extrude_cavity(comp, cavity, adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+
+
+def sketch_plane(comp, plane):
+    """Construction plane for a layout plane name"""
+    return comp.xYConstructionPlane if plane == "xy" else comp.yZConstructionPlane
+
+
+def draw_cavity(sketch, cavity):
+    """Draw the outline of a cavity (in cm) into a sketch"""
+    u, v = cavity.center
+    if cavity.shape == "circle":
+        user_parameters.circle(sketch, (u, v), cavity.size)
+    else:
+        width, height = cavity.size
+        user_parameters.rectangle(sketch, (u - width/2, v - height/2), (width, height))
+
+
+def cavity_profile(found, cavity):
+    """Profile of a cavity among the SketchProfiles of non-touching outlines"""
+    return found.one(profile_select.contains(*cavity.center))
 
 
-def create_laser_cavity(comp):
+def create_battery_cavity(comp, p):
+    """Create cylindrical cavity for 18650 battery (vertical orientation)"""
+    cut_cavity(comp, layout.battery_cavity(p.cm))
+
+    # USB-C port cutout (rear panel)
+    create_usb_port(comp, p)
+
+
+def create_usb_port(comp, p):
+    """Create USB-C port cutout on rear panel"""
+    cut_cavity(comp, layout.usb_port(p.cm))
+
+
+def create_reflector_cavity(comp, p):
+    """Create cylindrical cavity for parabolic reflector at 45° tilt"""
+    # TODO: Create angled plane for reflector
+    # This is complex - need to create offset plane and rotate
+    # For now, create vertical cavity (simplification)
+    cut_cavity(comp, layout.reflector_cavity(p.cm))
+
+
+def create_light_cavity(comp, p):
+    """Create cylindrical cavity for tactical light module (left side)"""
+    cut_cavity(comp, layout.light_cavity(p.cm))
+
+
+def create_laser_cavity(comp, p):
     """Create cylindrical cavity for green laser module (right side)"""
-    sketches = comp.sketches
-    yzPlane = comp.yZConstructionPlane
-    sketch = sketches.add(yzPlane)
-
-    # Position on right side
-    y_position = params.LASER_OFFSET_X
-    z_position = params.LASER_OFFSET_Z
-
-    circles = sketch.sketchCurves.sketchCircles
-    circle = circles.addByCenterRadius(
-        adsk.core.Point3D.create(y_position, z_position, 0),
-        params.LASER_DIAMETER/2 / 10
-    )
+    cut_cavity(comp, layout.laser_cavity(p.cm))
 
-    # Extrude cut from front
-    extrudes = comp.features.extrudeFeatures
-    prof = sketch.profiles.item(0)
-    extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.CutFeature)
-    distance = adsk.core.ValueInput.createByReal(params.LASER_DEPTH / 10)
-    extInput.setDistanceExtent(False, distance)
-    extrudes.add(extInput)
+
+def create_hood(comp, p):
+    """Create the hood selected by p.HOOD_STYLE"""
+    if p.HOOD_STYLE == "minimal":
+        create_hood_minimal(comp, p)
+    elif p.HOOD_STYLE == "full":
+        create_hood_full(comp, p)
+    elif p.HOOD_STYLE == "skeleton":
+        create_hood_skeleton(comp, p)
 
 
-def create_hood_minimal(comp):
+def create_hood_minimal(comp, p):
     """Create minimal hood - top shade only"""
-    sketches = comp.sketches
     xyPlane = comp.xYConstructionPlane
-    sketch = sketches.add(xyPlane)
+    sketch = build_mode.new_sketch(comp, xyPlane)
 
     # Create top shade above reflector
-    x_front = params.REFLECTOR_POSITION_X
-    x_rear = x_front - params.HOOD_MINIMAL_LENGTH
-    y_half = params.BODY_WIDTH/2
-
-    lines = sketch.sketchCurves.sketchLines
-    rect = lines.addTwoPointRectangle(
-        adsk.core.Point3D.create(x_rear, -y_half, 0),
-        adsk.core.Point3D.create(x_front, y_half, 0)
-    )
+    x_front = p.cm.REFLECTOR_POSITION_X
+    x_rear = x_front - p.cm.HOOD_MINIMAL_LENGTH
+    y_half = p.cm.BODY_WIDTH/2
+
+    rect = user_parameters.rectangle(sketch, (x_rear, -y_half), (p.cm.HOOD_MINIMAL_LENGTH, p.cm.BODY_WIDTH))
 
     # Extrude upward from top of body
     extrudes = comp.features.extrudeFeatures
-    prof = sketch.profiles.item(0)
-    extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.JoinFeature)
+    prof = build_mode.profiles(sketch).item(0)
+    extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.JoinFeatureOperation)
 
     # Start from top of body
-    start_offset = adsk.core.ValueInput.createByReal(params.BODY_HEIGHT / 10)
+    start_offset = user_parameters.value(p.cm.BODY_HEIGHT)
     extInput.startExtent = adsk.fusion.OffsetStartDefinition.create(start_offset)
 
-    distance = adsk.core.ValueInput.createByReal(params.HOOD_MINIMAL_THICKNESS / 10)
+    distance = user_parameters.value(p.cm.HOOD_MINIMAL_THICKNESS)
     extInput.setDistanceExtent(False, distance)
     extrudes.add(extInput)
 
 
-def create_hood_full(comp):
+def create_hood_full(comp, p):
     """Create full hood - OKP-77 style protective shroud"""
-    sketches = comp.sketches
     xyPlane = comp.xYConstructionPlane
-    sketch = sketches.add(xyPlane)
+    sketch = build_mode.new_sketch(comp, xyPlane)
 
     # Create hollow box around reflector
-    x_front = params.REFLECTOR_POSITION_X + params.HOOD_FULL_LENGTH/2
-    x_rear = x_front - params.HOOD_FULL_LENGTH
-    y_half = params.HOOD_FULL_WIDTH/2
+    x_front = p.cm.REFLECTOR_POSITION_X + p.cm.HOOD_FULL_LENGTH/2
+    x_rear = x_front - p.cm.HOOD_FULL_LENGTH
+    y_half = p.cm.HOOD_FULL_WIDTH/2
 
     # Outer rectangle
-    lines = sketch.sketchCurves.sketchLines
-    outer = lines.addTwoPointRectangle(
-        adsk.core.Point3D.create(x_rear, -y_half, 0),
-        adsk.core.Point3D.create(x_front, y_half, 0)
-    )
+    outer = user_parameters.rectangle(sketch, (x_rear, -y_half), (p.cm.HOOD_FULL_LENGTH, p.cm.HOOD_FULL_WIDTH))
 
     # Inner rectangle (window)
-    window_half = params.HOOD_FULL_WINDOW_WIDTH/2
-    inner = lines.addTwoPointRectangle(
-        adsk.core.Point3D.create(x_rear, -window_half, 0),
-        adsk.core.Point3D.create(x_front, window_half, 0)
-    )
+    window_half = p.cm.HOOD_FULL_WINDOW_WIDTH/2
+    inner = user_parameters.rectangle(sketch, (x_rear, -window_half),
+                                      (p.cm.HOOD_FULL_LENGTH, p.cm.HOOD_FULL_WINDOW_WIDTH))
 
-    # Extrude hollow hood
+    # Extrude hollow hood: every profile between the outer and inner rectangles
     extrudes = comp.features.extrudeFeatures
-    # Select the profile between outer and inner rectangles
-    for prof in sketch.profiles:
-        if prof.areaProperties().area > 0:  # Select wall profile
-            extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.JoinFeature)
-            distance = adsk.core.ValueInput.createByReal(params.HOOD_FULL_HEIGHT / 10)
-            extInput.setDistanceExtent(False, distance)
-            extrudes.add(extInput)
-            break
-
-
-def create_hood_skeleton(comp):
-    """Create skeleton hood - structural ribs only"""
-    # Create multiple thin vertical ribs
-    for i in range(params.HOOD_SKELETON_RIB_COUNT):
-        sketches = comp.sketches
-        xyPlane = comp.xYConstructionPlane
-        sketch = sketches.add(xyPlane)
+    found = profile_select.SketchProfiles(sketch)
+    walls = found.select(profile_select.excludes((x_front + x_rear)/2, 0))
+    extInput = extrudes.createInput(profile_select.collection(walls),
+                                    adsk.fusion.FeatureOperations.JoinFeatureOperation)
+    # Start from top of body
+    start_offset = user_parameters.value(p.cm.BODY_HEIGHT)
+    extInput.startExtent = adsk.fusion.OffsetStartDefinition.create(start_offset)
+    distance = user_parameters.value(p.cm.HOOD_FULL_HEIGHT)
+    extInput.setDistanceExtent(False, distance)
+    extrudes.add(extInput)
 
-        # Space ribs evenly
-        rib_spacing = params.HOOD_SKELETON_LENGTH / (params.HOOD_SKELETON_RIB_COUNT - 1)
-        x_pos = params.REFLECTOR_POSITION_X - (i * rib_spacing)
 
-        lines = sketch.sketchCurves.sketchLines
-        rect = lines.addTwoPointRectangle(
-            adsk.core.Point3D.create(x_pos - params.HOOD_SKELETON_RIB_THICKNESS/2, -params.BODY_WIDTH/2, 0),
-            adsk.core.Point3D.create(x_pos + params.HOOD_SKELETON_RIB_THICKNESS/2, params.BODY_WIDTH/2, 0)
+def create_hood_skeleton(comp, p):
+    """Create skeleton hood - structural ribs only, one rib patterned forward"""
+    # Ribs are HOOD_SKELETON_LENGTH/(count - 1) apart, the front one on the reflector (shapes.skeleton_ribs)
+    ribs = [x / 10 for x in shapes.skeleton_ribs(p)]
+    count = user_parameters.quantity(p, len(ribs), "HOOD_SKELETON_RIB_COUNT")
+    xyPlane = comp.xYConstructionPlane
+    sketch = build_mode.new_sketch(comp, xyPlane)
+    # Direct designs have no features to pattern: every rib goes in the one sketch instead
+    patterned = build_mode.can_pattern(comp) and len(ribs) > 1
+    if patterned:
+        # The rear rib and the spacing as p.cm expressions, for linked user parameters
+        spacing = p.cm.HOOD_SKELETON_LENGTH / (count - 1)
+        ribs = [p.cm.REFLECTOR_POSITION_X - p.cm.HOOD_SKELETON_LENGTH]
+    for x_pos in ribs:
+        user_parameters.rectangle(
+            sketch,
+            (x_pos - p.cm.HOOD_SKELETON_RIB_THICKNESS/2, -p.cm.BODY_WIDTH/2),
+            (p.cm.HOOD_SKELETON_RIB_THICKNESS, p.cm.BODY_WIDTH)
         )
 
-        # Extrude rib upward
-        extrudes = comp.features.extrudeFeatures
-        prof = sketch.profiles.item(0)
-        extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.JoinFeature)
-        distance = adsk.core.ValueInput.createByReal(params.HOOD_SKELETON_RIB_HEIGHT / 10)
-        extInput.setDistanceExtent(False, distance)
-        extrudes.add(extInput)
+    # Extrude rib upward from top of body
+    extrudes = comp.features.extrudeFeatures
+    profiles = profile_select.collection(build_mode.profiles(sketch))
+    extInput = extrudes.createInput(profiles, adsk.fusion.FeatureOperations.JoinFeatureOperation)
+    start_offset = user_parameters.value(p.cm.BODY_HEIGHT)
+    extInput.startExtent = adsk.fusion.OffsetStartDefinition.create(start_offset)
+    distance = user_parameters.value(p.cm.HOOD_SKELETON_RIB_HEIGHT)
+    extInput.setDistanceExtent(False, distance)
+    rib = extrudes.add(extInput)
+
+    # One pattern feature repeats the rib, whatever the rib count
+    if patterned:
+        build_mode.pattern(comp, rib, comp.xConstructionAxis, count, spacing)
 
 
 def round_edges(comp):
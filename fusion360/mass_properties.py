@@ -0,0 +1,497 @@
+"""
+OKP Sight - Mass Properties
+Volume, mass, centre of mass and inertia tensor of every variant and
+material in closed form, without building the model
+
+Usage (from the repository root):
+    python -m fusion360.mass_properties
+    python -m fusion360.mass_properties --set HOOD_STYLE=skeleton --material al7075
+
+The solids are the shapes.py steps: boxes, cylinders and prisms joined and
+cut in timeline order. All cylinders and prisms run along one axis, so the
+solid is a stack of slabs between the ends of the primitives, each with a
+constant cross-section of rectangles, circles and polygons. The area moments
+of a cross-section follow from Green's theorem over its boundary. Every edge
+and circle is split where it meets the others, and a piece is kept where the
+material changes from one side to the other. The integrals over straight pieces and arcs are
+closed form, so overlapping cavities and breakthroughs are exact too.
+Cross-sections whose cuts each lie inside one earlier solid shape, apart
+from each other, are a plain signed sum of rectangle and circle moments.
+Slabs with the same primitives share one cross-section, and recent
+cross-sections are cached across variants.
+"""
+
+import argparse
+import functools
+import math
+import time
+from collections import namedtuple
+
+from . import interference
+from . import shapes
+from .sweep import MATERIALS
+
+SECTION_CACHE = 4096  # cross-sections remembered across calls
+EPS = 1e-6  # mm; offset to either side of a boundary piece when classifying it
+ON = 1e-7  # mm; points this close to a boundary lie on it
+
+# volume mm^3; first (x, y, z) mm^4; second 3x3 rows of integral x_i x_j dV, mm^5
+Moments = namedtuple("Moments", "volume first second")
+# volume mm^3; mass g; center (x, y, z) mm; inertia 3x3 rows about the centre of mass, g*mm^2
+MassProperties = namedtuple("MassProperties", "volume mass center inertia")
+
+# Cross-section primitives in the two axes across the slab axis (ascending order)
+Rect = namedtuple("Rect", "u0 v0 u1 v1")
+Circle = namedtuple("Circle", "u v r")
+Polygon = namedtuple("Polygon", "points")  # counter-clockwise (u, v) points
+
+_GAUSS = (0.5 - 0.5 / math.sqrt(3), 0.5 + 0.5 / math.sqrt(3))  # 2-point Gauss-Legendre on [0, 1]
+
+
+# ==============================================================================
+# CROSS-SECTIONS
+# ==============================================================================
+
+def inside(shape, u, v):
+    if isinstance(shape, Rect):
+        return shape.u0 < u < shape.u1 and shape.v0 < v < shape.v1
+    if isinstance(shape, Polygon):
+        crossings = False
+        for (u0, v0), (u1, v1) in edges(shape):
+            if (v0 > v) != (v1 > v) and u < u0 + (v - v0) * (u1 - u0) / (v1 - v0):
+                crossings = not crossings
+        return crossings and not on_boundary(shape, u, v)
+    return (u - shape.u) ** 2 + (v - shape.v) ** 2 < shape.r ** 2
+
+
+def segment_distance(start, end, u, v):
+    (u0, v0), (u1, v1) = start, end
+    du, dv = u1 - u0, v1 - v0
+    t = min(max(((u - u0) * du + (v - v0) * dv) / (du * du + dv * dv), 0.0), 1.0)
+    return math.hypot(u - u0 - t * du, v - v0 - t * dv)
+
+
+def on_boundary(shape, u, v):
+    if isinstance(shape, Rect):
+        within = shape.u0 - ON <= u <= shape.u1 + ON and shape.v0 - ON <= v <= shape.v1 + ON
+        return within and min(u - shape.u0, shape.u1 - u, v - shape.v0, shape.v1 - v) <= ON
+    if isinstance(shape, Polygon):
+        return any(segment_distance(start, end, u, v) <= ON for start, end in edges(shape))
+    return abs(math.hypot(u - shape.u, v - shape.v) - shape.r) <= ON
+
+
+def material(section, u, v):
+    """True if (u, v) is solid after the section's (operation, shape) steps in order"""
+    solid = False
+    for operation, shape in section:
+        if operation == "cut":
+            solid = solid and not inside(shape, u, v)
+        else:
+            solid = solid or inside(shape, u, v)
+    return solid
+
+
+def edges(shape):
+    """Counter-clockwise edges of a rectangle or polygon as (start, end) points"""
+    if isinstance(shape, Rect):
+        corners = [(shape.u0, shape.v0), (shape.u1, shape.v0), (shape.u1, shape.v1), (shape.u0, shape.v1)]
+    else:
+        corners = shape.points
+    return [(corners[i], corners[(i + 1) % len(corners)]) for i in range(len(corners))]
+
+
+def line_crossings(start, end, a, b):
+    """Parameters along start-end where it meets the segment a-b, or the ends of their shared stretch"""
+    (u0, v0), (u1, v1) = start, end
+    du, dv = u1 - u0, v1 - v0
+    eu, ev = b[0] - a[0], b[1] - a[1]
+    fu, fv = a[0] - u0, a[1] - v0
+    length = math.hypot(du, dv)
+    denom = du * ev - dv * eu
+    if abs(denom) <= ON * length * math.hypot(eu, ev):
+        if abs(fu * dv - fv * du) > ON * length:
+            return []  # parallel, apart
+        return [((q[0] - u0) * du + (q[1] - v0) * dv) / (length * length) for q in (a, b)]
+    w = (fu * dv - fv * du) / denom
+    slack = ON / math.hypot(eu, ev)
+    return [(fu * ev - fv * eu) / denom] if -slack <= w <= 1 + slack else []
+
+
+def circle_crossings(start, end, circle):
+    """Parameters along start-end where the line through it meets the circle"""
+    (u0, v0), (u1, v1) = start, end
+    du, dv = u1 - u0, v1 - v0
+    fu, fv = u0 - circle.u, v0 - circle.v
+    a = du * du + dv * dv
+    b = 2 * (fu * du + fv * dv)
+    c = fu * fu + fv * fv - circle.r ** 2
+    disc = b * b - 4 * a * c
+    if disc <= 0:
+        return []
+    root = math.sqrt(disc)
+    return [(-b - root) / (2 * a), (-b + root) / (2 * a)]
+
+
+def segment_splits(start, end, other):
+    """Parameters in (0, 1) where the segment meets other's boundary"""
+    (u0, v0), (u1, v1) = start, end
+    du, dv = u1 - u0, v1 - v0
+    found = []
+    if isinstance(other, Circle):
+        found = circle_crossings(start, end, other)
+    elif isinstance(other, Rect) and dv == 0:
+        # Axis-aligned segment: cross (or run along) the other rectangle's sides
+        if other.v0 - ON <= v0 <= other.v1 + ON:
+            found = [(u - u0) / du for u in (other.u0, other.u1)]
+    elif isinstance(other, Rect) and du == 0:
+        if other.u0 - ON <= u0 <= other.u1 + ON:
+            found = [(v - v0) / dv for v in (other.v0, other.v1)]
+    else:
+        found = [t for a, b in edges(other) for t in line_crossings(start, end, a, b)]
+    return [t for t in found if 0 < t < 1]
+
+
+def circle_splits(circle, other):
+    """Angles where the circle meets other's boundary"""
+    found = []
+    if isinstance(other, Polygon):
+        for a, b in edges(other):
+            for t in circle_crossings(a, b, circle):
+                if -ON <= t <= 1 + ON:
+                    found.append(math.atan2(a[1] + t * (b[1] - a[1]) - circle.v, a[0] + t * (b[0] - a[0]) - circle.u))
+    elif isinstance(other, Rect):
+        for value, lo, hi, across in ((other.u0, other.v0, other.v1, False), (other.u1, other.v0, other.v1, False),
+                                      (other.v0, other.u0, other.u1, True), (other.v1, other.u0, other.u1, True)):
+            offset = (value - (circle.v if across else circle.u)) / circle.r
+            if abs(offset) >= 1:
+                continue
+            base = math.asin(offset) if across else math.acos(offset)
+            for angle in ((base, math.pi - base) if across else (base, -base)):
+                along = (circle.u + circle.r * math.cos(angle)) if across else (circle.v + circle.r * math.sin(angle))
+                if lo - ON <= along <= hi + ON:
+                    found.append(angle)
+    else:
+        d = math.hypot(other.u - circle.u, other.v - circle.v)
+        if abs(circle.r - other.r) < d < circle.r + other.r:
+            base = math.atan2(other.v - circle.v, other.u - circle.u)
+            half = math.acos((circle.r ** 2 + d * d - other.r ** 2) / (2 * circle.r * d))
+            found = [base - half, base + half]
+    return found
+
+
+def segment_moments(start, end):
+    """(A, Su, Sv, Iuu, Ivv, Iuv) line integrals along a segment (exact for these cubics)"""
+    (u0, v0), (u1, v1) = start, end
+    du, dv = u1 - u0, v1 - v0
+    total = [0.0] * 6
+    for t in _GAUSS:
+        u, v = u0 + t * du, v0 + t * dv
+        terms = (u * dv, u * u / 2 * dv, -v * v / 2 * du, u ** 3 / 3 * dv, -v ** 3 / 3 * du, u * u * v / 2 * dv)
+        for i in range(6):
+            total[i] += terms[i] / 2
+    return total
+
+
+def _arc_antiderivative(circle, t):
+    cu, cv, r = circle
+    c, s = math.cos(t), math.sin(t)
+    s2, s4 = math.sin(2 * t), math.sin(4 * t)
+    ic1, is1 = s, -c
+    ic2, is2, ics = t / 2 + s2 / 4, t / 2 - s2 / 4, s * s / 2
+    ic3, is3 = s - s ** 3 / 3, -c + c ** 3 / 3
+    ic2s = -c ** 3 / 3
+    ic4, is4 = 3 * t / 8 + s2 / 4 + s4 / 32, 3 * t / 8 - s2 / 4 + s4 / 32
+    ic3s = -c ** 4 / 4
+    return (r * cu * ic1 + r * r * ic2,
+            r / 2 * (cu * cu * ic1 + 2 * cu * r * ic2 + r * r * ic3),
+            r / 2 * (cv * cv * is1 + 2 * cv * r * is2 + r * r * is3),
+            r / 3 * (cu ** 3 * ic1 + 3 * cu * cu * r * ic2 + 3 * cu * r * r * ic3 + r ** 3 * ic4),
+            r / 3 * (cv ** 3 * is1 + 3 * cv * cv * r * is2 + 3 * cv * r * r * is3 + r ** 3 * is4),
+            r / 2 * (cu * cu * cv * ic1 + cu * cu * r * ics + 2 * cu * cv * r * ic2 + 2 * cu * r * r * ic2s
+                     + r * r * cv * ic3 + r ** 3 * ic3s))
+
+
+def arc_moments(circle, start, end):
+    """(A, Su, Sv, Iuu, Ivv, Iuv) line integrals along the counter-clockwise arc from start to end"""
+    a, b = _arc_antiderivative(circle, start), _arc_antiderivative(circle, end)
+    return [b[i] - a[i] for i in range(6)]
+
+
+def classify(section, index, u, v, nu, nv):
+    """+1 if the piece at (u, v) with outward normal (nu, nv) bounds material on its inside, -1 outside, 0 neither"""
+    if any(on_boundary(shape, u, v) for _, shape in section[:index]):
+        return 0  # shared with an earlier shape, which counts it
+    solid_in = material(section, u - EPS * nu, v - EPS * nv)
+    solid_out = material(section, u + EPS * nu, v + EPS * nv)
+    return (solid_in > solid_out) - (solid_in < solid_out)
+
+
+def shape_moments(shape):
+    """(A, Su, Sv, Iuu, Ivv, Iuv) of a whole rectangle, circle or polygon"""
+    if isinstance(shape, Polygon):
+        total = [0.0] * 6
+        for start, end in edges(shape):
+            for i, value in enumerate(segment_moments(start, end)):
+                total[i] += value
+        return total
+    if isinstance(shape, Rect):
+        width, height = shape.u1 - shape.u0, shape.v1 - shape.v0
+        area, u, v = width * height, (shape.u0 + shape.u1) / 2, (shape.v0 + shape.v1) / 2
+        return [area, area * u, area * v, area * (u * u + width * width / 12),
+                area * (v * v + height * height / 12), area * u * v]
+    area, u, v, r = math.pi * shape.r ** 2, shape.u, shape.v, shape.r
+    return [area, area * u, area * v, area * (u * u + r * r / 4), area * (v * v + r * r / 4), area * u * v]
+
+
+def bounding_rect(polygon):
+    us, vs = [q[0] for q in polygon.points], [q[1] for q in polygon.points]
+    return Rect(min(us), min(vs), max(us), max(vs))
+
+
+def gap(a, b):
+    """Distance between two shapes, zero or negative when they overlap (a polygon by its bounds)"""
+    a, b = (bounding_rect(shape) if isinstance(shape, Polygon) else shape for shape in (a, b))
+    if isinstance(a, Circle) and isinstance(b, Circle):
+        return math.hypot(a.u - b.u, a.v - b.v) - a.r - b.r
+    if isinstance(a, Rect) and isinstance(b, Rect):
+        return max(a.u0 - b.u1, b.u0 - a.u1, a.v0 - b.v1, b.v0 - a.v1)
+    rect, circle = (a, b) if isinstance(a, Rect) else (b, a)
+    du = max(rect.u0 - circle.u, 0.0, circle.u - rect.u1)
+    dv = max(rect.v0 - circle.v, 0.0, circle.v - rect.v1)
+    return math.hypot(du, dv) - circle.r
+
+
+def apart(a, b):
+    """True if two shapes do not overlap (touching is apart)"""
+    return gap(a, b) >= 0
+
+
+def contains(outer, inner):
+    if not isinstance(outer, Rect):
+        return False
+    if isinstance(inner, Polygon):
+        inner = bounding_rect(inner)
+    lo_u, lo_v, hi_u, hi_v = ((inner.u0, inner.v0, inner.u1, inner.v1) if isinstance(inner, Rect) else
+                              (inner.u - inner.r, inner.v - inner.r, inner.u + inner.r, inner.v + inner.r))
+    return outer.u0 <= lo_u and hi_u <= outer.u1 and outer.v0 <= lo_v and hi_v <= outer.v1
+
+
+def separate_moments(section):
+    """Signed sum of shape moments when the shapes do not interact, else None
+
+    Solid shapes must be apart from each other, and every cut either misses
+    them all or lies inside one earlier solid shape, apart from other cuts.
+    """
+    solids = [(index, shape) for index, (operation, shape) in enumerate(section) if operation != "cut"]
+    if any(not apart(a, b) for i, (_, a) in enumerate(solids) for _, b in solids[i + 1:]):
+        return None
+    cuts = []
+    for index, (operation, shape) in enumerate(section):
+        if operation != "cut":
+            continue
+        hosts = [(j, solid) for j, solid in solids if not apart(solid, shape)]
+        if not hosts:
+            continue
+        if len(hosts) > 1 or hosts[0][0] > index or not contains(hosts[0][1], shape):
+            return None
+        if any(not apart(shape, other) for other in cuts):
+            return None
+        cuts.append(shape)
+    total = [0.0] * 6
+    for shapes_, sign in (([shape for _, shape in solids], 1), (cuts, -1)):
+        for shape in shapes_:
+            for i, value in enumerate(shape_moments(shape)):
+                total[i] += sign * value
+    return total
+
+
+@functools.lru_cache(maxsize=SECTION_CACHE)
+def section_moments(section):
+    """(A, Su, Sv, Iuu, Ivv, Iuv) of the material of a cross-section, a tuple of (operation, shape)"""
+    simple = separate_moments(section)
+    if simple is not None:
+        return tuple(simple)
+    return tuple(boundary_moments(section))
+
+
+def boundary_moments(section):
+    """section_moments by Green's theorem over the pieces of every boundary"""
+    total = [0.0] * 6
+    for index, (_, shape) in enumerate(section):
+        # Only shapes touching this one split its boundary or decide either side of it
+        chosen = [j for j, (_, other) in enumerate(section) if j == index or gap(other, shape) <= ON]
+        near, own = [section[j] for j in chosen], chosen.index(index)
+        others = [other for j, (_, other) in enumerate(near) if j != own]
+        pieces = []
+        if not isinstance(shape, Circle):
+            for start, end in edges(shape):
+                cuts = sorted({0.0, 1.0, *(t for other in others for t in segment_splits(start, end, other))})
+                du, dv = end[0] - start[0], end[1] - start[1]
+                length = math.hypot(du, dv)
+                for t0, t1 in zip(cuts, cuts[1:]):
+                    a = (start[0] + t0 * du, start[1] + t0 * dv)
+                    b = (start[0] + t1 * du, start[1] + t1 * dv)
+                    middle = ((a[0] + b[0]) / 2, (a[1] + b[1]) / 2)
+                    pieces.append((middle, (dv / length, -du / length), segment_moments, (a, b)))
+        else:
+            angles = [angle for other in others for angle in circle_splits(shape, other)]
+            first = angles[0] if angles else 0.0
+            angles = sorted({first + (angle - first) % (2 * math.pi) for angle in angles} | {first})
+            angles.append(first + 2 * math.pi)
+            for t0, t1 in zip(angles, angles[1:]):
+                middle = (t0 + t1) / 2
+                nu, nv = math.cos(middle), math.sin(middle)
+                pieces.append(((shape.u + shape.r * nu, shape.v + shape.r * nv), (nu, nv),
+                               functools.partial(arc_moments, shape), (t0, t1)))
+        for (u, v), (nu, nv), integrate, ends in pieces:
+            sign = classify(near, own, u, v, nu, nv)
+            if sign:
+                for i, value in enumerate(integrate(*ends)):
+                    total[i] += sign * value
+    return total
+
+
+# ==============================================================================
+# SOLIDS
+# ==============================================================================
+
+def slab_axis(steps):
+    """The axis every cylinder and prism runs along (x when there are none)"""
+    axes = {step.shape.axis for step in steps if not isinstance(step.shape, interference.Box)}
+    if len(axes) > 1:
+        raise ValueError(f"cylinders and prisms along several axes {sorted(axes)}; slabs need one common axis")
+    return axes.pop() if axes else 0
+
+
+def slice_step(step, axis):
+    """(lo, hi) along the slab axis and the cross-section of a step's shape"""
+    shape = step.shape
+    if isinstance(shape, interference.Cylinder):
+        return shape.start, shape.end, Circle(shape.center[0], shape.center[1], shape.radius)
+    if isinstance(shape, interference.Prism):
+        polygon = Polygon(tuple(tuple(q) for q in shape.points))
+        if shape_moments(polygon)[0] < 0:
+            polygon = Polygon(polygon.points[::-1])
+        return shape.start, shape.end, polygon
+    u, v = interference.other_axes(axis)
+    return shape.lo[axis], shape.hi[axis], Rect(shape.lo[u], shape.lo[v], shape.hi[u], shape.hi[v])
+
+
+def moments(steps):
+    """Moments of the solid the steps build"""
+    axis = slab_axis(steps)
+    u, v = interference.other_axes(axis)
+    sliced = [(step.operation,) + slice_step(step, axis) for step in steps]
+    breaks = sorted({value for _, lo, hi, _ in sliced for value in (lo, hi)})
+    sections = {}
+    volume, first = 0.0, [0.0] * 3
+    second = [[0.0] * 3 for _ in range(3)]
+    for x0, x1 in zip(breaks, breaks[1:]):
+        middle = (x0 + x1) / 2
+        active = tuple(i for i, (_, lo, hi, _) in enumerate(sliced) if lo < middle < hi)
+        if active not in sections:
+            sections[active] = section_moments(tuple((sliced[i][0], sliced[i][3]) for i in active))
+        area, su, sv, iuu, ivv, iuv = sections[active]
+        if not area:
+            continue
+        length, x1_, x2_ = x1 - x0, (x1 ** 2 - x0 ** 2) / 2, (x1 ** 3 - x0 ** 3) / 3
+        volume += area * length
+        first[axis] += area * x1_
+        first[u] += su * length
+        first[v] += sv * length
+        second[axis][axis] += area * x2_
+        second[u][u] += iuu * length
+        second[v][v] += ivv * length
+        second[axis][u] += su * x1_
+        second[axis][v] += sv * x1_
+        second[u][v] += iuv * length
+    for i in range(3):
+        for j in range(i):
+            second[i][j] = second[j][i] = second[i][j] + second[j][i]
+    return Moments(volume, tuple(first), tuple(tuple(row) for row in second))
+
+
+def add(*parts):
+    """Moments of several solids together"""
+    return Moments(sum(m.volume for m in parts),
+                   tuple(sum(m.first[i] for m in parts) for i in range(3)),
+                   tuple(tuple(sum(m.second[i][j] for m in parts) for j in range(3)) for i in range(3)))
+
+
+def mass_properties(m, density):
+    """MassProperties of Moments at a density in g/cm^3"""
+    scale = density / 1000  # g/mm^3
+    mass = m.volume * scale
+    center = tuple(value / m.volume for value in m.first) if m.volume else (0.0, 0.0, 0.0)
+    # Second moments about the centre of mass, then the inertia tensor
+    second = [[(m.second[i][j] - m.volume * center[i] * center[j]) * scale for j in range(3)] for i in range(3)]
+    trace = second[0][0] + second[1][1] + second[2][2]
+    inertia = tuple(tuple((trace if i == j else 0.0) - second[i][j] for j in range(3)) for i in range(3))
+    return MassProperties(m.volume, mass, center, inertia)
+
+
+def component_moments(p):
+    """{component name: Moments} as the generators build them"""
+    return {name: moments(steps) for name, steps in shapes.components(p).items()}
+
+
+def estimate(p, material="asa", parts=None):
+    """MassProperties of the variant (all components, or only those named in parts) in a material of MATERIALS"""
+    found = component_moments(p)
+    chosen = [m for name, m in found.items() if parts is None or name in parts]
+    return mass_properties(add(*chosen), getattr(p, MATERIALS[material]))
+
+
+def masses(p):
+    """{material: variant mass in g} for every material"""
+    volume = sum(m.volume for m in component_moments(p).values())
+    return {material: volume * getattr(p, name) / 1000 for material, name in MATERIALS.items()}
+
+
+# ==============================================================================
+# REPORT
+# ==============================================================================
+
+def format_properties(name, props):
+    (ixx, ixy, ixz), (_, iyy, iyz), (_, _, izz) = props.inertia
+    center = ", ".join(f"{value:.2f}" for value in props.center)
+    return (f"{name}: {props.volume / 1000:.2f} cm^3, {props.mass:.1f} g, centre of mass ({center}) mm\n"
+            f"  inertia (g*mm^2) Ixx {ixx:,.0f}  Iyy {iyy:,.0f}  Izz {izz:,.0f}  "
+            f"Ixy {ixy:,.0f}  Ixz {ixz:,.0f}  Iyz {iyz:,.0f}")
+
+
+def main(argv=None):
+    from . import sweep
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="override a parameter")
+    parser.add_argument("--material", choices=sorted(MATERIALS), default="asa")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for spec in args.set:
+        name, values = sweep.parse_grid(spec)
+        overrides[name] = values[0]
+    p = sweep.variant_parameters(overrides)
+
+    density = getattr(p, MATERIALS[args.material])
+    found = component_moments(p)
+    for name, m in found.items():
+        print(format_properties(name, mass_properties(m, density)))
+    print(format_properties("Total", mass_properties(add(*found.values()), density)))
+    print("Mass: " + ", ".join(f"{material} {mass:.1f} g" for material, mass in masses(p).items()))
+
+    started = time.perf_counter()
+    section_moments.cache_clear()
+    component_moments(p)
+    cold = time.perf_counter() - started
+    repeats = 1000
+    started = time.perf_counter()
+    for _ in range(repeats):
+        component_moments(p)
+    warm = (time.perf_counter() - started) / repeats
+    print(f"Estimated in {cold * 1e6:.0f} us, {warm * 1e6:.0f} us with cached cross-sections")
+
+
+if __name__ == "__main__":
+    main()
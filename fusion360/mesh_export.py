@@ -0,0 +1,333 @@
+"""
+OKP Sight - Mesh Export
+Tessellates every body the generators build and streams the triangles to
+binary STL and to a 3MF package with one named object per body
+
+Usage:
+    Set EXPORT_REFINEMENT in parameters.py and run a generator or variant
+    table script: the result goes to EXPORT_DIRECTORY.
+
+    From the repository root, headlessly:
+    python -m fusion360.mesh_export --refinement high --out exports
+
+    In code, a whole built variant table in one call:
+    mesh_export.export_variants(design, variants.HOOD_VARIANTS, "exports", "high")
+
+Each body is tessellated once (Fusion's mesh calculator at the refinement's
+surface tolerance, normal deviation and longest edge) and then written to
+every output in blocks of CHUNK triangles. Only one body's mesh and one
+block of output are held at a time, so memory stays flat however fine the
+mesh or however many variants. 3MF objects are named <variant>_<part>, e.g.
+Minimal_Body and Full_Mount, and placed as the variants are laid out.
+"""
+
+import argparse
+import contextlib
+import math
+import os
+import struct
+import time
+import zipfile
+from collections import namedtuple
+from xml.sax.saxutils import quoteattr
+
+EXPORT_DIRECTORY = os.path.join(os.path.expanduser("~"), "okp_export")
+CHUNK = 65536  # triangles (or 3MF vertices) per write
+FORMATS = ("stl", "3mf")
+
+# surface_tolerance mm, normal_deviation degrees, max_side mm (longest triangle edge)
+Refinement = namedtuple("Refinement", "surface_tolerance normal_deviation max_side")
+REFINEMENTS = {
+    "low": Refinement(0.1, 30.0, 4.0),
+    "medium": Refinement(0.05, 15.0, 2.0),
+    "high": Refinement(0.01, 10.0, 1.0),
+}
+DEFAULT_REFINEMENT = "medium"
+
+# Object name suffix per generator component
+PARTS = {"OKP_MainBody": "Body", "Picatinny_Mount": "Mount"}
+
+# name: 3MF object name; transform: row-major 4x4 component -> world (cm)
+ExportObject = namedtuple("ExportObject", "name body transform")
+Exported = namedtuple("Exported", "name triangles")
+
+IDENTITY = tuple(1.0 if i % 5 == 0 else 0.0 for i in range(16))
+
+_STL_TRIANGLE = struct.Struct("<12fH")
+
+
+# ==============================================================================
+# BODIES
+# ==============================================================================
+
+def compose(outer, inner):
+    """Row-major 4x4 product: inner applied first"""
+    return tuple(sum(outer[r * 4 + k] * inner[k * 4 + c] for k in range(4))
+                 for r in range(4) for c in range(4))
+
+
+def component_objects(component, prefix, transform=IDENTITY):
+    """ExportObject for every body of component and its sub-components"""
+    bodies = list(component.bRepBodies)
+    name = f"{prefix}_{PARTS.get(component.name, component.name)}"
+    found = [ExportObject(name if len(bodies) == 1 else f"{name}_{body.name}", body, transform)
+             for body in bodies]
+    for occurrence in component.occurrences:
+        found += component_objects(occurrence.component, prefix,
+                                   compose(transform, tuple(occurrence.transform.asArray())))
+    return found
+
+
+def refinement_of(refinement):
+    """A Refinement from its name in REFINEMENTS, or as given"""
+    if isinstance(refinement, Refinement):
+        return refinement
+    if refinement not in REFINEMENTS:
+        raise ValueError(f"refinement must be one of {tuple(REFINEMENTS)} or a Refinement, got {refinement!r}")
+    return REFINEMENTS[refinement]
+
+
+def tessellate(body, refinement=DEFAULT_REFINEMENT):
+    """The body's TriangleMesh at a refinement (cm, as Fusion returns it)"""
+    refinement = refinement_of(refinement)
+    calculator = body.meshManager.createMeshCalculator()
+    calculator.surfaceTolerance = refinement.surface_tolerance / 10
+    calculator.maxNormalDeviation = math.radians(refinement.normal_deviation)
+    calculator.maxSideLength = refinement.max_side / 10
+    return calculator.calculate()
+
+
+def node_reader(mesh, transform):
+    """Function giving node i as world (x, y, z) in mm"""
+    coordinates = mesh.nodeCoordinatesAsDouble
+    m = [value * 10 for value in transform[:12]]
+
+    def node(i):
+        x, y, z = coordinates[3 * i], coordinates[3 * i + 1], coordinates[3 * i + 2]
+        return (m[0] * x + m[1] * y + m[2] * z + m[3],
+                m[4] * x + m[5] * y + m[6] * z + m[7],
+                m[8] * x + m[9] * y + m[10] * z + m[11])
+    return node
+
+
+# ==============================================================================
+# WRITERS
+# ==============================================================================
+
+class StlWriter:
+    """Binary STL of every body added; the triangle count is filled in on close"""
+
+    def __init__(self, path):
+        self.path = path
+        self.triangles = 0
+        self._file = open(path, "wb")
+        self._file.write(b"OKP Sight binary STL".ljust(80, b" "))
+        self._file.write(struct.pack("<I", 0))
+
+    def add(self, name, mesh, transform=IDENTITY):
+        node = node_reader(mesh, transform)
+        indices = mesh.nodeIndices
+        count = len(indices) // 3
+        for start in range(0, count, CHUNK):
+            block = []
+            for t in range(start, min(start + CHUNK, count)):
+                a, b, c = node(indices[3 * t]), node(indices[3 * t + 1]), node(indices[3 * t + 2])
+                block.append(_STL_TRIANGLE.pack(*normal(a, b, c), *a, *b, *c, 0))
+            self._file.write(b"".join(block))
+        self.triangles += count
+
+    def close(self):
+        self._file.seek(80)
+        self._file.write(struct.pack("<I", self.triangles))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ThreeMfWriter:
+    """3MF package with one mesh object per body, streamed into the zip"""
+
+    CONTENT_TYPES = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>'
+        '</Types>\n')
+    RELATIONSHIPS = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Target="/3D/3dmodel.model" Id="rel0" '
+        'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>'
+        '</Relationships>\n')
+    MODEL = "3D/3dmodel.model"
+
+    def __init__(self, path):
+        self.path = path
+        self.triangles = 0
+        self._objects = 0
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+        self._zip.writestr("[Content_Types].xml", self.CONTENT_TYPES)
+        self._zip.writestr("_rels/.rels", self.RELATIONSHIPS)
+        self._model = self._zip.open(self.MODEL, "w", force_zip64=True)
+        self._write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                    '<model unit="millimeter" xml:lang="en-US" '
+                    'xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">\n<resources>\n')
+
+    def _write(self, text):
+        self._model.write(text.encode("utf-8"))
+
+    def add(self, name, mesh, transform=IDENTITY):
+        indices = mesh.nodeIndices
+        count = len(indices) // 3
+        if not count:
+            return
+        self._objects += 1
+        self._write(f'<object id="{self._objects}" type="model" name={quoteattr(name)}>'
+                    f'<mesh>\n<vertices>\n')
+        node = node_reader(mesh, transform)
+        nodes = mesh.nodeCount
+        for start in range(0, nodes, CHUNK):
+            self._write("".join('<vertex x="%.4f" y="%.4f" z="%.4f"/>\n' % node(i)
+                                for i in range(start, min(start + CHUNK, nodes))))
+        self._write("</vertices>\n<triangles>\n")
+        for start in range(0, count, CHUNK):
+            self._write("".join(f'<triangle v1="{indices[3 * t]}" v2="{indices[3 * t + 1]}" '
+                                f'v3="{indices[3 * t + 2]}"/>\n'
+                                for t in range(start, min(start + CHUNK, count))))
+        self._write("</triangles>\n</mesh></object>\n")
+        self.triangles += count
+
+    def close(self):
+        items = "".join(f'<item objectid="{i}"/>' for i in range(1, self._objects + 1))
+        self._write(f"</resources>\n<build>{items}</build>\n</model>\n")
+        self._model.close()
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+WRITERS = {"stl": StlWriter, "3mf": ThreeMfWriter}
+
+
+def normal(a, b, c):
+    ux, uy, uz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    vx, vy, vz = c[0] - a[0], c[1] - a[1], c[2] - a[2]
+    n = (uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx)
+    length = math.sqrt(n[0] ** 2 + n[1] ** 2 + n[2] ** 2) or 1.0
+    return n[0] / length, n[1] / length, n[2] / length
+
+
+# ==============================================================================
+# EXPORT
+# ==============================================================================
+
+def export_objects(objects, writers, refinement=DEFAULT_REFINEMENT):
+    """Tessellate each ExportObject once and stream it to every writer; one Exported each"""
+    exported = []
+    for obj in objects:
+        mesh = tessellate(obj.body, refinement)
+        for writer in writers:
+            writer.add(obj.name, mesh, obj.transform)
+        exported.append(Exported(obj.name, mesh.triangleCount))
+        del mesh
+    return exported
+
+
+def export_component(component, directory, stem, refinement=DEFAULT_REFINEMENT, formats=FORMATS, prefix="OKP",
+                     transform=IDENTITY):
+    """Every body under component to <directory>/<stem>.stl and .3mf; returns the written paths"""
+    os.makedirs(directory, exist_ok=True)
+    paths = [os.path.join(directory, f"{stem}.{fmt}") for fmt in formats]
+    with contextlib.ExitStack() as stack:
+        writers = [stack.enter_context(WRITERS[fmt](path)) for fmt, path in zip(formats, paths)]
+        export_objects(component_objects(component, prefix, transform), writers, refinement)
+    return paths
+
+
+def export_variants(design, variants, directory, refinement=DEFAULT_REFINEMENT, formats=FORMATS,
+                    stem="OKP_variants", log=print):
+    """A built variant table in one call: an STL per variant and one 3MF holding every body
+
+    Variants are found by their OKP_<name> components (variants.build_variants).
+    Returns the written paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    occurrences = {occurrence.component.name: occurrence for occurrence in design.rootComponent.occurrences}
+    paths = []
+    with contextlib.ExitStack() as stack:
+        package = None
+        if "3mf" in formats:
+            package = stack.enter_context(ThreeMfWriter(os.path.join(directory, f"{stem}.3mf")))
+            paths.append(package.path)
+        for variant in variants:
+            occurrence = occurrences.get(f"OKP_{variant.name}")
+            if occurrence is None:
+                raise ValueError(f"variant {variant.name} is not built in this design")
+            objects = component_objects(occurrence.component, variant.name, tuple(occurrence.transform.asArray()))
+            writers = [package] if package else []
+            if "stl" in formats:
+                stl = StlWriter(os.path.join(directory, f"OKP_{variant.name}.stl"))
+                writers.append(stl)
+                paths.append(stl.path)
+            try:
+                exported = export_objects(objects, writers, refinement)
+            finally:
+                if "stl" in formats:
+                    stl.close()
+            log(f"  {variant.name}: " + ", ".join(f"{e.name} {e.triangles:,} triangles" for e in exported))
+    return paths
+
+
+def export_generated(component, p, stem):
+    """export_component to EXPORT_DIRECTORY as p.EXPORT_REFINEMENT asks; the written paths"""
+    if p.EXPORT_REFINEMENT == "off":
+        return []
+    return export_component(component, EXPORT_DIRECTORY, stem, p.EXPORT_REFINEMENT)
+
+
+def format_exported(paths):
+    return "\n\nExported to:\n" + "\n".join(paths) if paths else ""
+
+
+def main(argv=None):
+    from . import headless
+    from . import sweep
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--refinement", choices=tuple(REFINEMENTS), default=DEFAULT_REFINEMENT)
+    parser.add_argument("--format", choices=FORMATS, action="append", default=None,
+                        help="output format (repeatable; default: both)")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="override a parameter")
+    parser.add_argument("--out", default=EXPORT_DIRECTORY, help="output directory")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for spec in args.set:
+        name, values = sweep.parse_grid(spec)
+        overrides[name] = values[0]
+    base = sweep.variant_parameters(overrides)
+
+    headless.install()
+    from . import variants
+
+    app = headless.new_session()
+    design = app.activeProduct
+    started = time.perf_counter()
+    results = variants.build_variants(design, variants.HOOD_VARIANTS, base=base, log=lambda line: None)
+    built = time.perf_counter()
+    paths = export_variants(design, [result.variant for result in results if result.ok], args.out,
+                            args.refinement, tuple(args.format or FORMATS))
+    print("\n".join(paths))
+    print(f"Built in {(built - started) * 1000:.0f} ms, exported in {(time.perf_counter() - built) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
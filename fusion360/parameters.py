@@ -1,150 +1,339 @@
 """
 OKP Sight - Central Parameter Definitions
 All dimensions in millimeters unless otherwise specified
+
+Parameters is an immutable value object. Edit the defaults below to change the
+design, or derive variants without touching this file:
+
+    p = DEFAULT.replace(REFLECTOR_RADIUS=200.0)
+    p.LED_FOCAL_DISTANCE   # 100.0 - derived lazily, cached per instance
+    p.cm.TOTAL_LENGTH      # 16.5  - centimetre values for the Fusion API
+
+Module attributes (parameters.TOTAL_LENGTH) read DEFAULT for older scripts.
 """
 
-# ==============================================================================
-# OPTICAL PARAMETERS (Physics-driven, do not change unless you know what you're doing)
-# ==============================================================================
-
-REFLECTOR_RADIUS = 225.0  # mm - parabolic reflector curvature radius
-LED_FOCAL_DISTANCE = REFLECTOR_RADIUS / 2  # 112.5mm - LED must be at focal point
-REFLECTOR_TILT_ANGLE = 45.0  # degrees - projects beam forward
-REFLECTOR_DIAMETER = 30.0  # mm - usable aperture ~25mm
-GLASS_THICKNESS = 3.5  # mm
-
-# ==============================================================================
-# OVERALL ENVELOPE
-# ==============================================================================
-
-TOTAL_LENGTH = 165.0  # mm
-BODY_WIDTH = 50.0  # mm
-BODY_HEIGHT = 45.0  # mm (from rail to top)
-MOUNT_HEIGHT = 36.0  # mm (center of lens to rail)
-
-# ==============================================================================
-# PICATINNY MOUNT (MIL-STD-1913)
-# ==============================================================================
-
-RAIL_SLOT_WIDTH = 20.6  # mm
-RAIL_GROOVE_WIDTH = 5.23  # mm
-RAIL_SPACING = 12.7  # mm (0.5 inch)
-MOUNT_LENGTH = 50.0  # mm (4 slots)
-MOUNT_HEIGHT_OFFSET = 10.0  # mm below body
-
-# ==============================================================================
-# MODULE CAVITIES
-# ==============================================================================
-
-# Tactical Light Module (left side)
-LIGHT_DIAMETER = 22.0  # mm (20mm module + 2mm clearance)
-LIGHT_DEPTH = 42.0  # mm
-LIGHT_OFFSET_X = -15.0  # mm from centerline (negative = left)
-LIGHT_OFFSET_Z = 25.0  # mm above rail
-LIGHT_LENS_DIAMETER = 24.0  # mm (bezel)
-
-# Green Laser Module (right side)
-LASER_DIAMETER = 14.0  # mm (12mm module + 2mm clearance)
-LASER_DEPTH = 37.0  # mm
-LASER_OFFSET_X = 15.0  # mm from centerline (positive = right)
-LASER_OFFSET_Z = 25.0  # mm above rail
-LASER_ANGLE_DOWN = 2.0  # degrees (for 50-yard zero)
-LASER_LENS_DIAMETER = 16.0  # mm (bezel)
-
-# Reflector Housing
-REFLECTOR_HOUSING_DIAMETER = 32.0  # mm (30mm reflector + 2mm wall)
-REFLECTOR_CENTER_HEIGHT = MOUNT_HEIGHT  # 36mm above rail
-REFLECTOR_POSITION_X = 60.0  # mm from rear (front third of body)
-
-# ==============================================================================
-# BATTERY COMPARTMENT
-# ==============================================================================
-
-BATTERY_DIAMETER = 19.0  # mm (18650 = 18mm + 1mm clearance)
-BATTERY_LENGTH = 67.0  # mm (65mm + 2mm for contacts)
-USB_C_WIDTH = 9.0  # mm
-USB_C_HEIGHT = 3.2  # mm
-USB_C_DEPTH = 7.0  # mm
-
-# ==============================================================================
-# ADJUSTMENT MECHANISM
-# ==============================================================================
-
-ADJUSTMENT_SCREW_DIAMETER = 6.0  # mm (M6)
-ADJUSTMENT_TRAVEL = 10.0  # mm (±5mm)
-TURRET_DIAMETER = 12.0  # mm
-TURRET_DEPTH = 8.0  # mm (recessed)
-
-# ==============================================================================
-# RETICLE SPECIFICATIONS
-# ==============================================================================
-
-RETICLE_DOT_MOA = 2.0  # MOA at 100 yards
-RETICLE_CROSS_LENGTH_MOA = 10.0  # MOA
-RETICLE_CROSS_GAP_MOA = 4.0  # MOA
-RETICLE_CROSS_THICKNESS_MOA = 0.5  # MOA
-
-# ==============================================================================
-# HOOD STYLES
-# ==============================================================================
-
-HOOD_STYLE = "minimal"  # Options: "minimal", "full", "skeleton"
-
-# Minimal hood (top shade only)
-HOOD_MINIMAL_LENGTH = 40.0  # mm forward of reflector
-HOOD_MINIMAL_HEIGHT = 15.0  # mm above reflector
-HOOD_MINIMAL_THICKNESS = 2.0  # mm
-
-# Full hood (OKP-77 style)
-HOOD_FULL_LENGTH = 50.0  # mm forward of reflector
-HOOD_FULL_WIDTH = 45.0  # mm
-HOOD_FULL_HEIGHT = 35.0  # mm
-HOOD_FULL_WALL_THICKNESS = 2.5  # mm
-HOOD_FULL_WINDOW_WIDTH = 38.0  # mm (leaves side walls)
-
-# Skeleton hood (structural ribs)
-HOOD_SKELETON_RIB_COUNT = 4  # ribs
-HOOD_SKELETON_RIB_THICKNESS = 3.0  # mm
-HOOD_SKELETON_RIB_HEIGHT = 25.0  # mm
-HOOD_SKELETON_LENGTH = 45.0  # mm
-
-# ==============================================================================
-# MATERIAL PROPERTIES
-# ==============================================================================
-
-# ASA 3D Print
-ASA_MIN_WALL_THICKNESS = 2.5  # mm
-ASA_TOLERANCE = 0.2  # mm (clearance for fit)
-
-# CNC Aluminum
-CNC_MIN_WALL_THICKNESS = 2.0  # mm (structural)
-CNC_MIN_WALL_NON_STRUCTURAL = 1.0  # mm
-CNC_TOLERANCE = 0.05  # mm (tight fit)
-CNC_THREAD_ENGAGEMENT = 1.5  # multiplier (1.5x diameter)
-
-# ==============================================================================
-# CALCULATED VALUES (Do not edit)
-# ==============================================================================
-
-# Body sections
-BATTERY_SECTION_LENGTH = BATTERY_LENGTH + 10.0  # 77mm (includes door)
-REFLECTOR_SECTION_LENGTH = 50.0  # mm
-FRONT_SECTION_LENGTH = TOTAL_LENGTH - BATTERY_SECTION_LENGTH - REFLECTOR_SECTION_LENGTH  # 38mm
-
-# Wall thicknesses
-BODY_WALL_THICKNESS = 3.0  # mm
-BATTERY_DOOR_THICKNESS = 2.5  # mm
-
-# Switch positions (rear panel)
-MAIN_POWER_SWITCH_Z = 15.0  # mm from bottom
-DOT_BRIGHTNESS_POT_Z = 25.0  # mm from bottom
-LIGHT_BUTTON_Z = 35.0  # mm from bottom
-
-# Front panel switch positions
-LASER_BUTTON_X = LASER_OFFSET_X
-LASER_BUTTON_Z = LASER_OFFSET_Z + 10.0  # 10mm above laser axis
-
-print("OKP Parameters Loaded")
-print(f"Total Length: {TOTAL_LENGTH}mm")
-print(f"Hood Style: {HOOD_STYLE}")
-print(f"LED Focal Distance: {LED_FOCAL_DISTANCE}mm")
+import dataclasses
+import types
+
+HOOD_STYLES = ("minimal", "full", "skeleton")
+CAVITY_BUILD_MODES = ("separate", "batched")
+BUILD_MODES = ("normal", "deferred", "direct")
+INTERFERENCE_CHECKS = ("off", "warn", "strict")
+EXPORT_REFINEMENTS = ("off", "low", "medium", "high")
+API_TRACES = ("off", "on")
+USER_PARAMETERS_MODES = ("off", "linked")
+
+# Values that are not lengths, so have no centimetre equivalent
+NON_LENGTHS = frozenset({
+    "REFLECTOR_TILT_ANGLE", "LASER_ANGLE_DOWN",
+    "RETICLE_DOT_MOA", "RETICLE_CROSS_LENGTH_MOA", "RETICLE_CROSS_GAP_MOA", "RETICLE_CROSS_THICKNESS_MOA",
+    "HOOD_STYLE", "HOOD_SKELETON_RIB_COUNT", "CAVITY_BUILD_MODE", "BUILD_MODE", "INTERFERENCE_CHECK",
+    "EXPORT_REFINEMENT", "API_TRACE", "USER_PARAMETERS",
+    "ASA_DENSITY", "AL6061_DENSITY", "AL7075_DENSITY", "CNC_THREAD_ENGAGEMENT",
+})
+
+
+def _derived(fn):
+    """Property computed on first access and cached on the instance"""
+    name = fn.__name__
+
+    def get(self):
+        cache = self._cache
+        if name not in cache:
+            cache[name] = fn(self)
+        return cache[name]
+
+    get.__doc__ = fn.__doc__
+    return property(get)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Parameters:
+    # ==============================================================================
+    # OPTICAL PARAMETERS (Physics-driven, do not change unless you know what you're doing)
+    # ==============================================================================
+
+    REFLECTOR_RADIUS: float = 225.0  # mm - parabolic reflector curvature radius
+    REFLECTOR_TILT_ANGLE: float = 45.0  # degrees - projects beam forward
+    REFLECTOR_DIAMETER: float = 30.0  # mm - usable aperture ~25mm
+    GLASS_THICKNESS: float = 3.5  # mm
+    LED_EMITTER_SIZE: float = 0.05  # mm (50µm red LED die)
+
+    # ==============================================================================
+    # OVERALL ENVELOPE
+    # ==============================================================================
+
+    TOTAL_LENGTH: float = 165.0  # mm
+    BODY_WIDTH: float = 50.0  # mm
+    BODY_HEIGHT: float = 45.0  # mm (from rail to top)
+    MOUNT_HEIGHT: float = 36.0  # mm (center of lens to rail)
+
+    # ==============================================================================
+    # PICATINNY MOUNT (MIL-STD-1913)
+    # ==============================================================================
+
+    RAIL_SLOT_WIDTH: float = 20.6  # mm (across the dovetail points)
+    RAIL_NECK_WIDTH: float = 15.6  # mm (0.617 inch, under the dovetail; flanks at 45 degrees)
+    RAIL_GROOVE_WIDTH: float = 5.23  # mm
+    RAIL_SPACING: float = 10.01  # mm (0.394 inch, slot centre to centre)
+    RAIL_SLOT_DEPTH: float = 3.0  # mm
+    MOUNT_LENGTH: float = 50.0  # mm (4 slots)
+    MOUNT_HEIGHT_OFFSET: float = 10.0  # mm below body
+    MOUNT_CROSS_BOLT_DIAMETER: float = 6.0  # mm (M6)
+
+    # ==============================================================================
+    # MODULE CAVITIES
+    # ==============================================================================
+
+    # Tactical Light Module (left side)
+    LIGHT_DIAMETER: float = 22.0  # mm (20mm module + 2mm clearance)
+    LIGHT_DEPTH: float = 42.0  # mm
+    LIGHT_OFFSET_X: float = -15.0  # mm from centerline (negative = left)
+    LIGHT_OFFSET_Z: float = 25.0  # mm above rail
+    LIGHT_LENS_DIAMETER: float = 24.0  # mm (bezel)
+
+    # Green Laser Module (right side)
+    LASER_DIAMETER: float = 14.0  # mm (12mm module + 2mm clearance)
+    LASER_DEPTH: float = 37.0  # mm
+    LASER_OFFSET_X: float = 15.0  # mm from centerline (positive = right)
+    LASER_OFFSET_Z: float = 25.0  # mm above rail
+    LASER_ANGLE_DOWN: float = 2.0  # degrees (for 50-yard zero)
+    LASER_LENS_DIAMETER: float = 16.0  # mm (bezel)
+
+    # Reflector Housing
+    REFLECTOR_HOUSING_DIAMETER: float = 32.0  # mm (30mm reflector + 2mm wall)
+    REFLECTOR_CAVITY_DEPTH: float = 40.0  # mm
+    REFLECTOR_POSITION_X: float = 60.0  # mm from rear (front third of body)
+
+    # ==============================================================================
+    # BATTERY COMPARTMENT
+    # ==============================================================================
+
+    BATTERY_DIAMETER: float = 19.0  # mm (18650 = 18mm + 1mm clearance)
+    BATTERY_LENGTH: float = 67.0  # mm (65mm + 2mm for contacts)
+    USB_C_WIDTH: float = 9.0  # mm
+    USB_C_HEIGHT: float = 3.2  # mm
+    USB_C_DEPTH: float = 7.0  # mm
+
+    # ==============================================================================
+    # ADJUSTMENT MECHANISM
+    # ==============================================================================
+
+    ADJUSTMENT_SCREW_DIAMETER: float = 6.0  # mm (M6)
+    ADJUSTMENT_TRAVEL: float = 10.0  # mm (±5mm)
+    TURRET_DIAMETER: float = 12.0  # mm
+    TURRET_DEPTH: float = 8.0  # mm (recessed)
+
+    # ==============================================================================
+    # RETICLE SPECIFICATIONS
+    # ==============================================================================
+
+    RETICLE_DOT_MOA: float = 2.0  # MOA at 100 yards
+    RETICLE_CROSS_LENGTH_MOA: float = 10.0  # MOA
+    RETICLE_CROSS_GAP_MOA: float = 4.0  # MOA
+    RETICLE_CROSS_THICKNESS_MOA: float = 0.5  # MOA
+
+    # ==============================================================================
+    # HOOD STYLES
+    # ==============================================================================
+
+    HOOD_STYLE: str = "minimal"  # Options: "minimal", "full", "skeleton"
+
+    # Minimal hood (top shade only)
+    HOOD_MINIMAL_LENGTH: float = 40.0  # mm forward of reflector
+    HOOD_MINIMAL_HEIGHT: float = 15.0  # mm above reflector
+    HOOD_MINIMAL_THICKNESS: float = 2.0  # mm
+
+    # Full hood (OKP-77 style)
+    HOOD_FULL_LENGTH: float = 50.0  # mm forward of reflector
+    HOOD_FULL_WIDTH: float = 45.0  # mm
+    HOOD_FULL_HEIGHT: float = 35.0  # mm
+    HOOD_FULL_WALL_THICKNESS: float = 2.5  # mm
+    HOOD_FULL_WINDOW_WIDTH: float = 38.0  # mm (leaves side walls)
+
+    # Skeleton hood (structural ribs)
+    HOOD_SKELETON_RIB_COUNT: int = 4  # ribs
+    HOOD_SKELETON_RIB_THICKNESS: float = 3.0  # mm
+    HOOD_SKELETON_RIB_HEIGHT: float = 25.0  # mm
+    HOOD_SKELETON_LENGTH: float = 45.0  # mm
+
+    # ==============================================================================
+    # BUILD OPTIONS
+    # ==============================================================================
+
+    # "separate": one sketch and cut per cavity
+    # "batched": shared sketches per plane, one cut per distinct depth (fewer timeline features)
+    CAVITY_BUILD_MODE: str = "separate"
+
+    # "normal": build straight into the active design
+    # "deferred": defer sketch compute while generating (see build_mode.py)
+    # "direct": deferred, in a new document without design history (export-only runs)
+    BUILD_MODE: str = "normal"
+
+    # Cavity collision check before building (see interference.py)
+    # "warn": report only; "strict": refuse to build; "off": skip
+    INTERFERENCE_CHECK: str = "warn"
+
+    # Mesh export after building (see mesh_export.py)
+    # "off": none; "low", "medium", "high": STL and 3MF at that tessellation refinement
+    EXPORT_REFINEMENT: str = "off"
+
+    # Fusion API call timing while building (see api_trace.py)
+    # "on": JSON trace and collapsed stacks per run in TRACE_DIRECTORY; "off": no wrapping
+    API_TRACE: str = "off"
+
+    # Fusion user parameters (see user_parameters.py)
+    # "linked": publish these values as user parameters and drive sketch dimensions and
+    # feature extents by expression, so edits in Fusion recompute natively; "off": literal values
+    USER_PARAMETERS: str = "off"
+
+    # ==============================================================================
+    # MATERIAL PROPERTIES
+    # ==============================================================================
+
+    # ASA 3D Print
+    ASA_MIN_WALL_THICKNESS: float = 2.5  # mm
+    ASA_TOLERANCE: float = 0.2  # mm (clearance for fit)
+    ASA_DENSITY: float = 1.07  # g/cm^3
+
+    # CNC Aluminum
+    CNC_MIN_WALL_THICKNESS: float = 2.0  # mm (structural)
+    CNC_MIN_WALL_NON_STRUCTURAL: float = 1.0  # mm
+    CNC_TOLERANCE: float = 0.05  # mm (tight fit)
+    CNC_THREAD_ENGAGEMENT: float = 1.5  # multiplier (1.5x diameter)
+    AL6061_DENSITY: float = 2.70  # g/cm^3
+    AL7075_DENSITY: float = 2.81  # g/cm^3
+
+    # ==============================================================================
+    # BODY SECTIONS AND PANELS
+    # ==============================================================================
+
+    REFLECTOR_SECTION_LENGTH: float = 50.0  # mm
+
+    # Wall thicknesses
+    BODY_WALL_THICKNESS: float = 3.0  # mm
+    BATTERY_DOOR_THICKNESS: float = 2.5  # mm
+
+    # Switch positions (rear panel)
+    MAIN_POWER_SWITCH_Z: float = 15.0  # mm from bottom
+    DOT_BRIGHTNESS_POT_Z: float = 25.0  # mm from bottom
+    LIGHT_BUTTON_Z: float = 35.0  # mm from bottom
+
+    # Lazily derived values, see the CALCULATED VALUES properties below
+    _cache: dict = dataclasses.field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.HOOD_STYLE not in HOOD_STYLES:
+            raise ValueError(f"HOOD_STYLE must be one of {HOOD_STYLES}, got {self.HOOD_STYLE!r}")
+        if self.CAVITY_BUILD_MODE not in CAVITY_BUILD_MODES:
+            raise ValueError(f"CAVITY_BUILD_MODE must be one of {CAVITY_BUILD_MODES}, "
+                             f"got {self.CAVITY_BUILD_MODE!r}")
+        if self.BUILD_MODE not in BUILD_MODES:
+            raise ValueError(f"BUILD_MODE must be one of {BUILD_MODES}, got {self.BUILD_MODE!r}")
+        if self.INTERFERENCE_CHECK not in INTERFERENCE_CHECKS:
+            raise ValueError(f"INTERFERENCE_CHECK must be one of {INTERFERENCE_CHECKS}, "
+                             f"got {self.INTERFERENCE_CHECK!r}")
+        if self.EXPORT_REFINEMENT not in EXPORT_REFINEMENTS:
+            raise ValueError(f"EXPORT_REFINEMENT must be one of {EXPORT_REFINEMENTS}, "
+                             f"got {self.EXPORT_REFINEMENT!r}")
+        if self.API_TRACE not in API_TRACES:
+            raise ValueError(f"API_TRACE must be one of {API_TRACES}, got {self.API_TRACE!r}")
+        if self.USER_PARAMETERS not in USER_PARAMETERS_MODES:
+            raise ValueError(f"USER_PARAMETERS must be one of {USER_PARAMETERS_MODES}, "
+                             f"got {self.USER_PARAMETERS!r}")
+        if self.USER_PARAMETERS == "linked" and self.BUILD_MODE == "direct":
+            raise ValueError("USER_PARAMETERS 'linked' needs design history, which BUILD_MODE 'direct' turns off")
+
+    # ==============================================================================
+    # CALCULATED VALUES (Do not edit)
+    # ==============================================================================
+
+    @_derived
+    def LED_FOCAL_DISTANCE(self):
+        """LED must be at the focal point: half the reflector radius (112.5mm)"""
+        return self.REFLECTOR_RADIUS / 2
+
+    @_derived
+    def REFLECTOR_CENTER_HEIGHT(self):
+        """Reflector centre above the rail (36mm)"""
+        return self.MOUNT_HEIGHT
+
+    @_derived
+    def BATTERY_SECTION_LENGTH(self):
+        """Battery section including the door (77mm)"""
+        return self.BATTERY_LENGTH + 10.0
+
+    @_derived
+    def FRONT_SECTION_LENGTH(self):
+        """What is left in front of the battery and reflector sections (38mm)"""
+        return self.TOTAL_LENGTH - self.BATTERY_SECTION_LENGTH - self.REFLECTOR_SECTION_LENGTH
+
+    @_derived
+    def LASER_BUTTON_X(self):
+        """Front panel laser button, in line with the laser"""
+        return self.LASER_OFFSET_X
+
+    @_derived
+    def LASER_BUTTON_Z(self):
+        """Front panel laser button, 10mm above the laser axis"""
+        return self.LASER_OFFSET_Z + 10.0
+
+    @_derived
+    def cm(self):
+        """Every length in centimetres, computed once for the Fusion API
+
+        With USER_PARAMETERS "linked" each value is an expressions.Linked that
+        also refers to the user parameter of the same name.
+        """
+        if self.USER_PARAMETERS == "linked":
+            from . import expressions
+            return types.SimpleNamespace(**{name: expressions.Linked(getattr(self, name) / 10, name)
+                                            for name in LENGTHS})
+        return types.SimpleNamespace(**{name: getattr(self, name) / 10 for name in LENGTHS})
+
+    def replace(self, **overrides):
+        """Copy with some base values changed; derived values follow"""
+        return dataclasses.replace(self, **overrides)
+
+    def as_dict(self):
+        """Base values by name"""
+        return {name: getattr(self, name) for name in FIELDS}
+
+
+FIELDS = tuple(f.name for f in dataclasses.fields(Parameters) if f.init)
+DERIVED = ("LED_FOCAL_DISTANCE", "REFLECTOR_CENTER_HEIGHT", "BATTERY_SECTION_LENGTH",
+           "FRONT_SECTION_LENGTH", "LASER_BUTTON_X", "LASER_BUTTON_Z")
+LENGTHS = tuple(name for name in FIELDS + DERIVED if name not in NON_LENGTHS)
+ANGLES = ("REFLECTOR_TILT_ANGLE", "LASER_ANGLE_DOWN")
+
+# The derived values as Fusion user-parameter expressions (user_parameters.py); keep in step
+# with the CALCULATED VALUES properties
+DERIVED_EXPRESSIONS = {
+    "LED_FOCAL_DISTANCE": "REFLECTOR_RADIUS / 2",
+    "REFLECTOR_CENTER_HEIGHT": "MOUNT_HEIGHT",
+    "BATTERY_SECTION_LENGTH": "BATTERY_LENGTH + 10 mm",
+    "FRONT_SECTION_LENGTH": "TOTAL_LENGTH - BATTERY_SECTION_LENGTH - REFLECTOR_SECTION_LENGTH",
+    "LASER_BUTTON_X": "LASER_OFFSET_X",
+    "LASER_BUTTON_Z": "LASER_OFFSET_Z + 10 mm",
+}
+
+DEFAULT = Parameters()
+
+
+def __getattr__(name):
+    if name in FIELDS or name in DERIVED:
+        return getattr(DEFAULT, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def summary(p=DEFAULT):
+    return "\n".join([
+        "OKP Parameters Loaded",
+        f"Total Length: {p.TOTAL_LENGTH}mm",
+        f"Hood Style: {p.HOOD_STYLE}",
+        f"LED Focal Distance: {p.LED_FOCAL_DISTANCE}mm",
+    ])
+
+
+if __name__ == "__main__":
+    print(summary())
@@ -6,7 +6,13 @@ Creates MIL-STD-1913 compliant rail mount
 import adsk.core
 import adsk.fusion
 import traceback
+from . import api_trace
+from . import build_mode
+from . import mesh_export
+from . import profile_select
 from . import parameters as params
+from . import shapes
+from . import user_parameters
 
 def run(context):
     ui = None
@@ -14,104 +20,117 @@ def run(context):
         app = adsk.core.Application.get()
         ui = app.userInterface
         design = app.activeProduct
-        rootComp = design.rootComponent
 
-        # Create new component for mount
-        occurrence = rootComp.occurrences.addNewComponent(adsk.core.Matrix3D.create())
-        mountComp = occurrence.component
-        mountComp.name = "Picatinny_Mount"
+        p = params.DEFAULT
+        with api_trace.tracing(p.API_TRACE == "on") as trace, \
+                build_mode.building(design, p.BUILD_MODE) as generation:
+            mountComp = build(generation.design.rootComponent, p)
+            exported = mesh_export.export_generated(mountComp, p, "Picatinny_Mount")
+        traced = api_trace.write_generated(trace, "Picatinny_Mount")
 
-        # Create mount base
-        create_mount_base(mountComp)
-
-        # Create rail slots
-        create_rail_slots(mountComp)
-
-        # Create cross-bolt hole
-        create_cross_bolt_hole(mountComp)
-
-        ui.messageBox('Picatinny mount created!')
+        ui.messageBox(f'Picatinny mount created!\n{generation.report()}{mesh_export.format_exported(exported)}'
+                      f'{api_trace.format_traced(trace, traced)}')
 
     except:
         if ui:
             ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
 
-def create_mount_base(comp):
-    """Create the base mounting plate"""
-    sketches = comp.sketches
-    xyPlane = comp.xYConstructionPlane
-    sketch = sketches.add(xyPlane)
+def build(rootComp, p):
+    """Build the mount component for a Parameters object and return it"""
+    user_parameters.link(rootComp.parentDesign, p)
+    mountComp = create_component(rootComp)
 
-    # MIL-STD-1913 cross-section profile
-    # Simplified for now - create rectangular base
-    half_length = params.MOUNT_LENGTH / 2
-    half_width = params.RAIL_SLOT_WIDTH / 2
+    # Mount base, rail slots, then the cross-bolt hole
+    for name, create in stages(p):
+        create(mountComp, p)
 
-    lines = sketch.sketchCurves.sketchLines
-    rect = lines.addTwoPointRectangle(
-        adsk.core.Point3D.create(-half_length, -half_width, 0),
-        adsk.core.Point3D.create(half_length, half_width, 0)
-    )
+    return mountComp
+
+
+def create_component(rootComp):
+    """Create new component for mount"""
+    occurrence = rootComp.occurrences.addNewComponent(adsk.core.Matrix3D.create())
+    mountComp = occurrence.component
+    mountComp.name = "Picatinny_Mount"
+    return mountComp
 
-    # Extrude downward (mount sits below body)
-    extrudes = comp.features.extrudeFeatures
-    prof = sketch.profiles.item(0)
-    extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.NewBodyFeature)
-    distance = adsk.core.ValueInput.createByReal(-params.MOUNT_HEIGHT_OFFSET / 10)
-    extInput.setDistanceExtent(False, distance)
-    extrudes.add(extInput)
 
+def stages(p):
+    """Named build steps in timeline order (see main_body.stages)"""
+    return [
+        ("base", create_mount_base),
+        ("rail_slots", create_rail_slots),
+        ("cross_bolt", create_cross_bolt_hole),
+    ]
 
-def create_rail_slots(comp):
-    """Create the T-slot grooves per MIL-STD-1913"""
-    # MIL-STD-1913 specifies specific slot dimensions
-    # Slots are 5.23mm wide, spaced 12.7mm apart (0.5 inch)
 
-    num_slots = int(params.MOUNT_LENGTH / params.RAIL_SPACING)
+def create_mount_base(comp, p):
+    """Create the rail section: the MIL-STD-1913 cross-section along the mount"""
+    yzPlane = comp.yZConstructionPlane
+    sketch = build_mode.new_sketch(comp, yzPlane)
+
+    # Dovetail against the body, neck down to the bottom (shapes.rail_profile)
+    user_parameters.polygon(sketch, shapes.rail_profile(p.cm))
+
+    # Extrude both ways, centred on the origin like the body
+    extrudes = comp.features.extrudeFeatures
+    prof = build_mode.profiles(sketch).item(0)
+    extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+    distance = user_parameters.value(p.cm.MOUNT_LENGTH / 2)
+    extInput.setDistanceExtent(True, distance)
+    extrudes.add(extInput)
 
-    for i in range(num_slots):
-        sketches = comp.sketches
-        xyPlane = comp.xYConstructionPlane
-        sketch = sketches.add(xyPlane)
 
-        # Position slot
-        x_pos = -params.MOUNT_LENGTH/2 + (i * params.RAIL_SPACING)
-        slot_half_width = params.RAIL_GROOVE_WIDTH / 2
-        slot_length = params.RAIL_SLOT_WIDTH * 0.8  # Slot doesn't go full width
+def create_rail_slots(comp, p):
+    """Cut one recoil slot across the dovetail and pattern it along the mount"""
+    # Slots are 5.23mm wide, RAIL_SPACING apart, centred on the mount (shapes.rail_slots)
+    centres = [x / 10 for x in shapes.rail_slots(p)]
+    if not centres:
+        return
 
-        lines = sketch.sketchCurves.sketchLines
-        slot = lines.addTwoPointRectangle(
-            adsk.core.Point3D.create(x_pos - slot_half_width, -slot_length/2, 0),
-            adsk.core.Point3D.create(x_pos + slot_half_width, slot_length/2, 0)
+    count = user_parameters.quantity(p, len(centres), "floor(MOUNT_LENGTH / RAIL_SPACING)")
+    xyPlane = comp.xYConstructionPlane
+    sketch = build_mode.new_sketch(comp, xyPlane)
+    slot_half_width = p.cm.RAIL_GROOVE_WIDTH / 2
+    half_width = p.cm.RAIL_SLOT_WIDTH / 2
+    # Direct designs have no features to pattern: every slot goes in the one sketch instead
+    patterned = build_mode.can_pattern(comp) and len(centres) > 1
+    if patterned:
+        # The rear slot as a p.cm expression, for linked user parameters
+        centres = [-(count - 1) / 2 * p.cm.RAIL_SPACING]
+    for x_pos in centres:
+        user_parameters.rectangle(
+            sketch,
+            (x_pos - slot_half_width, -half_width),
+            (p.cm.RAIL_GROOVE_WIDTH, p.cm.RAIL_SLOT_WIDTH)
         )
 
-        # Cut slot
-        extrudes = comp.features.extrudeFeatures
-        prof = sketch.profiles.item(0)
-        extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.CutFeature)
-        distance = adsk.core.ValueInput.createByReal(3.0 / 10)  # 3mm deep
-        extInput.setDistanceExtent(False, distance)
-        extrudes.add(extInput)
+    # Cut down into the dovetail
+    extrudes = comp.features.extrudeFeatures
+    slots = profile_select.collection(build_mode.profiles(sketch))
+    extInput = extrudes.createInput(slots, adsk.fusion.FeatureOperations.CutFeatureOperation)
+    distance = user_parameters.value(-p.cm.RAIL_SLOT_DEPTH)
+    extInput.setDistanceExtent(False, distance)
+    slot = extrudes.add(extInput)
+
+    # One pattern feature repeats the slot, whatever the mount length
+    if patterned:
+        build_mode.pattern(comp, slot, comp.xConstructionAxis, count, p.cm.RAIL_SPACING)
 
 
-def create_cross_bolt_hole(comp):
+def create_cross_bolt_hole(comp, p):
     """Create the cross-bolt clamping hole"""
-    sketches = comp.sketches
     yzPlane = comp.yZConstructionPlane
-    sketch = sketches.add(yzPlane)
+    sketch = build_mode.new_sketch(comp, yzPlane)
 
     # Center the bolt hole
-    circles = sketch.sketchCurves.sketchCircles
-    circle = circles.addByCenterRadius(
-        adsk.core.Point3D.create(0, -params.MOUNT_HEIGHT_OFFSET/2, 0),
-        3.0 / 10  # M6 bolt = 6mm dia, 3mm radius (in cm)
-    )
+    circle = user_parameters.circle(sketch, (0, -p.cm.MOUNT_HEIGHT_OFFSET/2), p.cm.MOUNT_CROSS_BOLT_DIAMETER)
 
     # Cut through mount
     extrudes = comp.features.extrudeFeatures
-    prof = sketch.profiles.item(0)
-    extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.CutFeature)
-    distance = adsk.core.ValueInput.createByReal(params.RAIL_SLOT_WIDTH / 10)
+    prof = build_mode.profiles(sketch).item(0)
+    extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.CutFeatureOperation)
+    distance = user_parameters.value(p.cm.RAIL_SLOT_WIDTH)
     extInput.setDistanceExtent(False, distance)
     extrudes.add(extInput)
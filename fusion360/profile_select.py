@@ -0,0 +1,188 @@
+"""
+OKP Sight - Profile Selection
+Picks sketch profiles by their geometry instead of by index
+
+Fusion numbers the profiles of a sketch in no documented order, so
+profiles.item(1) can be a different region on the next run. SketchProfiles
+measures every profile of a sketch once (area properties, bounding box and
+loops), keeps them in a stable order (by centroid, then area) and selects
+them with predicates:
+
+    found = profile_select.SketchProfiles(sketch)
+    wall = found.one(profile_select.is_ring)
+    window = found.one(profile_select.contains(0, 0))
+    sides = found.select(profile_select.is_solid, profile_select.excludes(0, 0))
+    hole = found.nearest(profile_select.by_area(2.5))
+
+All coordinates are in sketch space, in cm. Make one SketchProfiles after
+drawing and reuse it; drawing more into the sketch needs a new one.
+"""
+
+import adsk.core
+import math
+from collections import namedtuple
+from . import build_mode
+
+# Rounding of centroids and areas (cm, cm^2) for the stable order
+ORDER_DIGITS = 6
+
+# profile: the Fusion Profile; centroid (u, v); bounds ((u0, v0), (u1, v1)); loops: loop count
+ProfileInfo = namedtuple("ProfileInfo", "profile area centroid perimeter bounds loops")
+
+
+def measure(profile):
+    """ProfileInfo of a profile; the one place area properties are computed"""
+    properties = profile.areaProperties()
+    box = profile.boundingBox
+    return ProfileInfo(
+        profile,
+        properties.area,
+        (properties.centroid.x, properties.centroid.y),
+        properties.perimeter,
+        ((box.minPoint.x, box.minPoint.y), (box.maxPoint.x, box.maxPoint.y)),
+        profile.profileLoops.count,
+    )
+
+
+def _order(info):
+    u, v = info.centroid
+    return (round(u, ORDER_DIGITS), round(v, ORDER_DIGITS), round(info.area, ORDER_DIGITS))
+
+
+class SketchProfiles:
+    """The profiles of one sketch, measured once, in a stable order"""
+
+    def __init__(self, sketch):
+        self.sketch = sketch
+        self.infos = sorted((measure(profile) for profile in build_mode.profiles(sketch)), key=_order)
+
+    def __len__(self):
+        return len(self.infos)
+
+    def matching(self, *predicates):
+        """ProfileInfos for which every predicate holds"""
+        return [info for info in self.infos if all(predicate(info) for predicate in predicates)]
+
+    def select(self, *predicates):
+        """Profiles for which every predicate holds"""
+        return [info.profile for info in self.matching(*predicates)]
+
+    def one(self, *predicates):
+        """The only profile for which every predicate holds"""
+        found = self.select(*predicates)
+        if len(found) != 1:
+            raise ValueError(f"expected one matching profile in {self.sketch.name}, found {len(found)} "
+                             f"of {len(self.infos)}")
+        return found[0]
+
+    def nearest(self, key, *predicates):
+        """Matching profile with the smallest key(info)"""
+        found = self.matching(*predicates)
+        if not found:
+            raise ValueError(f"no matching profile in {self.sketch.name}")
+        return min(found, key=key).profile
+
+
+def collection(profiles):
+    """ObjectCollection of profiles, for extruding several at once"""
+    profileCollection = adsk.core.ObjectCollection.create()
+    for profile in profiles:
+        profileCollection.add(profile)
+    return profileCollection
+
+
+# ==============================================================================
+# PREDICATES
+# ==============================================================================
+
+def is_ring(info):
+    """Profile with holes (an outer loop and inner loops)"""
+    return info.loops > 1
+
+
+def is_solid(info):
+    """Profile bounded by a single loop"""
+    return info.loops == 1
+
+
+def contains(u, v):
+    """Predicate: the point lies inside the profile (not in one of its holes)"""
+    def predicate(info):
+        (u0, v0), (u1, v1) = info.bounds
+        return u0 <= u <= u1 and v0 <= v <= v1 and _inside(info.profile, u, v)
+    return predicate
+
+
+def excludes(u, v):
+    """Predicate: the point lies outside the profile"""
+    inside = contains(u, v)
+    return lambda info: not inside(info)
+
+
+def area_near(area, tolerance=1e-6):
+    """Predicate: area within tolerance (cm^2)"""
+    return lambda info: abs(info.area - area) <= tolerance
+
+
+def box_matches(u0, v0, u1, v1, tolerance=1e-6):
+    """Predicate: bounding box equal to ((u0, v0), (u1, v1)) within tolerance (cm)"""
+    target = (u0, v0, u1, v1)
+
+    def predicate(info):
+        (a0, b0), (a1, b1) = info.bounds
+        return all(abs(x - y) <= tolerance for x, y in zip((a0, b0, a1, b1), target))
+    return predicate
+
+
+def within_box(u0, v0, u1, v1, tolerance=1e-6):
+    """Predicate: bounding box inside ((u0, v0), (u1, v1)), widened by tolerance"""
+    def predicate(info):
+        (a0, b0), (a1, b1) = info.bounds
+        return (a0 >= u0 - tolerance and b0 >= v0 - tolerance
+                and a1 <= u1 + tolerance and b1 <= v1 + tolerance)
+    return predicate
+
+
+# ==============================================================================
+# SORT KEYS (for nearest)
+# ==============================================================================
+
+def by_area(area):
+    """Key: difference from an area (cm^2)"""
+    return lambda info: abs(info.area - area)
+
+
+def by_distance(u, v):
+    """Key: distance from the centroid to a point"""
+    return lambda info: math.hypot(info.centroid[0] - u, info.centroid[1] - v)
+
+
+# ==============================================================================
+# POINT IN PROFILE
+# ==============================================================================
+
+def _inside(profile, u, v):
+    """Even-odd test of a ray towards +u against every curve of every loop"""
+    crossings = 0
+    for loop in profile.profileLoops:
+        for curve in loop.profileCurves:
+            crossings += _crossings(curve.geometry, u, v)
+    return crossings % 2 == 1
+
+
+def _crossings(geometry, u, v):
+    """Crossings of the ray from (u, v) towards +u with a line or circle"""
+    if isinstance(geometry, adsk.core.Circle3D):
+        cu, cv, r = geometry.center.x, geometry.center.y, geometry.radius
+        dv = v - cv
+        if abs(dv) >= r:
+            return 0
+        half = math.sqrt(r * r - dv * dv)
+        return (cu - half > u) + (cu + half > u)
+    if isinstance(geometry, adsk.core.Line3D):
+        (a, b), (c, d) = (geometry.startPoint.x, geometry.startPoint.y), (geometry.endPoint.x, geometry.endPoint.y)
+        # Half-open in v so a vertex shared by two edges counts once
+        if (b > v) == (d > v):
+            return 0
+        return int(a + (v - b) * (c - a) / (d - b) > u)
+    raise ValueError(f"profile curves of type {type(geometry).__name__} are not supported")
@@ -0,0 +1,246 @@
+"""
+OKP Sight - Incremental Regeneration
+Updates an existing design, rebuilding only the features whose parameters changed
+
+Each generator stage (main_body.stages, picatinny_mount.stages) runs with a
+ParameterTracker that records which parameters it reads. The values it saw
+are kept as a dependency graph in the design's attributes, and every sketch,
+plane and feature it adds is tagged with its stage. On the next run, stages
+whose recorded values still match are kept; the others have their features
+deleted and rebuilt at the same place in the timeline.
+
+With USER_PARAMETERS "linked" the edits reach the design through its user
+parameters first. Values a stage only read through p.cm are then already
+recomputed by expression, so they do not rebuild it; values read from p
+itself (counts, hood style) steer the Python code and still do.
+
+Run this script instead of main_body.py / picatinny_mount.py after editing
+parameters.py. The first run in a design builds everything.
+"""
+
+import adsk.core
+import adsk.fusion
+import importlib
+import json
+import traceback
+from . import main_body, picatinny_mount
+from . import user_parameters
+from . import parameters as params
+
+ATTRIBUTE_GROUP = "OKP_Regen"
+GENERATORS = (main_body, picatinny_mount)
+
+_MISSING = object()
+
+
+def run(context):
+    ui = None
+    try:
+        app = adsk.core.Application.get()
+        ui = app.userInterface
+        design = adsk.fusion.Design.cast(app.activeProduct)
+
+        # Pick up edits to parameters.py without restarting Fusion
+        importlib.reload(params)
+
+        reports = [regenerate(design, generator, params.DEFAULT) for generator in GENERATORS]
+        ui.messageBox("\n".join(describe(report) for report in reports))
+
+    except:
+        if ui:
+            ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+
+
+# ==============================================================================
+# DEPENDENCY TRACKING
+# ==============================================================================
+
+class ParameterTracker:
+    """Parameters stand-in that records the name of every value read through it"""
+
+    def __init__(self, p):
+        self._p = p
+        self.reads = set()
+        self.direct = set()  # names read from p itself rather than p.cm
+        self.cm = _CentimetreTracker(self)
+
+    def __getattr__(self, name):
+        value = getattr(self._p, name)
+        if name in params.FIELDS or name in params.DERIVED:
+            self.reads.add(name)
+            self.direct.add(name)
+        return value
+
+    def values(self):
+        """Every name read, with the value it had"""
+        return {name: getattr(self._p, name) for name in sorted(self.reads)}
+
+    def live(self):
+        """Names read only through p.cm: in linked builds the features follow them by expression"""
+        return sorted(self.reads - self.direct)
+
+
+class _CentimetreTracker:
+    """p.cm view of a tracker; records the millimetre name"""
+
+    def __init__(self, tracker):
+        self._tracker = tracker
+
+    def __getattr__(self, name):
+        value = getattr(self._tracker._p.cm, name)
+        self._tracker.reads.add(name)
+        return value
+
+
+def stale(recorded, p):
+    """Names whose recorded value differs from p"""
+    return [name for name, value in recorded.items() if getattr(p, name, _MISSING) != value]
+
+
+# ==============================================================================
+# DESIGN STATE
+# ==============================================================================
+
+def generator_name(generator):
+    return generator.__name__.rpartition(".")[2]
+
+
+def load_graph(design, name):
+    """Dependency graph stored by the last run, or None"""
+    attribute = design.attributes.itemByName(ATTRIBUTE_GROUP, name)
+    return json.loads(attribute.value) if attribute else None
+
+
+def save_graph(design, name, graph):
+    design.attributes.add(ATTRIBUTE_GROUP, name, json.dumps(graph))
+
+
+def find_component(design, name):
+    """Component built by a generator, found by its tag"""
+    for attribute in design.findAttributes(ATTRIBUTE_GROUP, "generator"):
+        if attribute.value == name:
+            return attribute.parent
+    return None
+
+
+def stage_entities(design, name):
+    """Timeline entities of each stage of a generator, in timeline order"""
+    found = {}
+    for attribute in design.findAttributes(ATTRIBUTE_GROUP, "stage"):
+        generator, _, stage = attribute.value.partition(":")
+        if generator == name:
+            found.setdefault(stage, []).append(attribute.parent)
+    for entities in found.values():
+        entities.sort(key=lambda entity: entity.timelineObject.index)
+    return found
+
+
+def creates_body(entities):
+    """True if a stage starts a new body, which later stages then depend on"""
+    return any(getattr(entity, "operation", None) == adsk.fusion.FeatureOperations.NewBodyFeatureOperation
+               for entity in entities)
+
+
+# ==============================================================================
+# REGENERATION
+# ==============================================================================
+
+def regenerate(design, generator, p):
+    """Build or update one generator's component; returns what was rebuilt"""
+    if design.designType != adsk.fusion.DesignTypes.ParametricDesignType:
+        raise RuntimeError("Incremental regeneration needs a parametric design (timeline)")
+
+    preflight = getattr(generator, "preflight", None)
+    if preflight:
+        preflight(p)
+    # Linked designs pick up the edits through their user parameters before any stage is rebuilt
+    user_parameters.link(design, p)
+
+    name = generator_name(generator)
+    timeline = design.timeline
+    structure = ParameterTracker(p)
+    plan = generator.stages(structure)
+    order = [stage for stage, _ in plan]
+    # Switching USER_PARAMETERS changes how every stage is built
+    linked = structure.USER_PARAMETERS == "linked"
+
+    graph = load_graph(design, name)
+    comp = find_component(design, name)
+    changed = set()
+    recomputed = set()  # changed values the user parameters carried, without a rebuild
+    if graph is None or comp is None:
+        comp = generator.create_component(design.rootComponent)
+        comp.attributes.add(ATTRIBUTE_GROUP, "generator", name)
+        graph = {"structure": {}, "stages": {}, "live": {}}
+        dirty = set(order)
+    elif stale(graph["structure"], p) or list(graph["stages"]) != order:
+        # A different set of stages (e.g. CAVITY_BUILD_MODE): rebuild them all
+        changed.update(stale(graph["structure"], p))
+        dirty = set(graph["stages"]) | set(order)
+    else:
+        dirty = set()
+        live = graph.get("live", {}) if linked else {}
+        for stage in order:
+            names = stale(graph["stages"][stage], p)
+            followed = [name for name in names if name in live.get(stage, ())]
+            recomputed.update(followed)
+            names = [name for name in names if name not in followed]
+            if names:
+                changed.update(names)
+                dirty.add(stage)
+
+    # Deleting a body's creating feature orphans every feature after it
+    timeline.moveToEnd()
+    entities = stage_entities(design, name)
+    for index, stage in enumerate(order):
+        if stage in dirty and creates_body(entities.get(stage, [])):
+            dirty.update(order[index:])
+            break
+
+    for stage in dirty:
+        for entity in reversed(entities.pop(stage, [])):
+            entity.deleteMe()
+
+    records, live = {}, {}
+    for index, (stage, create) in enumerate(plan):
+        if stage not in dirty:
+            # Kept stages saw no change beyond what their user parameters carried
+            records[stage] = {name: getattr(p, name) for name in graph["stages"][stage]}
+            live[stage] = graph.get("live", {}).get(stage, [])
+            continue
+
+        # Insert before the first kept feature that follows this stage
+        following = [e for later in order[index + 1:] for e in entities.get(later, [])]
+        if following:
+            min(following, key=lambda e: e.timelineObject.index).timelineObject.rollTo(True)
+        else:
+            timeline.moveToEnd()
+
+        start = timeline.markerPosition
+        tracker = ParameterTracker(p)
+        create(comp, tracker)
+        added = [timeline.item(i).entity for i in range(start, timeline.markerPosition)]
+        for entity in added:
+            entity.attributes.add(ATTRIBUTE_GROUP, "stage", f"{name}:{stage}")
+        entities[stage] = added
+        records[stage] = tracker.values()
+        live[stage] = tracker.live()
+
+    timeline.moveToEnd()
+    save_graph(design, name, {"structure": structure.values(), "stages": records, "live": live})
+    return {
+        "generator": name,
+        "changed": sorted(changed),
+        "recomputed": sorted(recomputed),
+        "rebuilt": [stage for stage in order if stage in dirty],
+        "kept": [stage for stage in order if stage not in dirty],
+    }
+
+
+def describe(report):
+    """One line summary of a regenerate() report"""
+    rebuilt = ", ".join(report["rebuilt"]) or "nothing"
+    line = f"{report['generator']}: rebuilt {rebuilt}; kept {len(report['kept'])} stages"
+    if report.get("recomputed"):
+        line += f"; user parameters recomputed {', '.join(report['recomputed'])}"
+    return line
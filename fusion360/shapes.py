@@ -0,0 +1,100 @@
+"""
+OKP Sight - Analytic Shapes
+What the generators build, as analytic primitives in mm without the Fusion API:
+each component is its features in timeline order, as (operation, shape)
+steps on the interference.py Box, Cylinder and Prism primitives
+
+The steps follow main_body.py and picatinny_mount.py feature by feature,
+including cuts that miss their body. A step's operation is "new" (first
+body), "join" or "cut".
+"""
+
+from collections import namedtuple
+
+from . import interference
+from . import layout
+
+Step = namedtuple("Step", "operation shape")
+
+Box, Cylinder, Prism = interference.Box, interference.Cylinder, interference.Prism
+
+
+def body_box(p):
+    """main_body.create_body_box: the housing block on the rail plane"""
+    return Box("body", (-p.TOTAL_LENGTH / 2, -p.BODY_WIDTH / 2, 0.0),
+               (p.TOTAL_LENGTH / 2, p.BODY_WIDTH / 2, p.BODY_HEIGHT))
+
+
+def hood(p):
+    """main_body.create_hood: the blocks of p.HOOD_STYLE, standing on the body top"""
+    top = p.BODY_HEIGHT
+    if p.HOOD_STYLE == "minimal":
+        front = p.REFLECTOR_POSITION_X
+        return [Box("hood", (front - p.HOOD_MINIMAL_LENGTH, -p.BODY_WIDTH / 2, top),
+                    (front, p.BODY_WIDTH / 2, top + p.HOOD_MINIMAL_THICKNESS))]
+    if p.HOOD_STYLE == "full":
+        front = p.REFLECTOR_POSITION_X + p.HOOD_FULL_LENGTH / 2
+        rear = front - p.HOOD_FULL_LENGTH
+        outer, window = p.HOOD_FULL_WIDTH / 2, p.HOOD_FULL_WINDOW_WIDTH / 2
+        height = top + p.HOOD_FULL_HEIGHT
+        return [Box("hood_left", (rear, -outer, top), (front, -window, height)),
+                Box("hood_right", (rear, window, top), (front, outer, height))]
+    half = p.HOOD_SKELETON_RIB_THICKNESS / 2
+    return [Box(f"rib_{i + 1}", (x - half, -p.BODY_WIDTH / 2, top),
+                (x + half, p.BODY_WIDTH / 2, top + p.HOOD_SKELETON_RIB_HEIGHT))
+            for i, x in enumerate(skeleton_ribs(p))]
+
+
+def skeleton_ribs(p):
+    """x centres of the skeleton hood ribs, rear first, the front one on the reflector"""
+    count = p.HOOD_SKELETON_RIB_COUNT
+    spacing = p.HOOD_SKELETON_LENGTH / (count - 1) if count > 1 else 0.0
+    return [p.REFLECTOR_POSITION_X - (count - 1 - i) * spacing for i in range(count)]
+
+
+def main_body(p):
+    """Steps of main_body.build"""
+    steps = [Step("new", body_box(p))]
+    steps += [Step("cut", interference.primitive(cavity)) for cavity in layout.cavities(p)]
+    steps += [Step("join", shape) for shape in hood(p)]
+    return steps
+
+
+def rail_profile(p):
+    """MIL-STD-1913 cross-section as counter-clockwise (y, z) points, in mm (or cm for p.cm)
+
+    The dovetail is against the body: a flat top as wide as the neck, 45
+    degree flanks out to RAIL_SLOT_WIDTH and back in to RAIL_NECK_WIDTH, then
+    the neck down to the bottom of the mount.
+    """
+    head, neck = p.RAIL_SLOT_WIDTH / 2, p.RAIL_NECK_WIDTH / 2
+    flank = head - neck
+    if not (0 < flank and 2 * flank < p.MOUNT_HEIGHT_OFFSET):
+        raise ValueError("RAIL_NECK_WIDTH must be under RAIL_SLOT_WIDTH, with the dovetail "
+                         "within MOUNT_HEIGHT_OFFSET")
+    bottom = -p.MOUNT_HEIGHT_OFFSET
+    return [(-neck, bottom), (neck, bottom), (neck, -2 * flank), (head, -flank), (neck, 0.0),
+            (-neck, 0.0), (-head, -flank), (-neck, -2 * flank)]
+
+
+def rail_slots(p):
+    """x centres of the rail slots, RAIL_SPACING apart and centred on the mount"""
+    count = int(p.MOUNT_LENGTH / p.RAIL_SPACING)
+    return [(i - (count - 1) / 2) * p.RAIL_SPACING for i in range(count)]
+
+
+def mount(p):
+    """Steps of picatinny_mount.build"""
+    half_length, half_width = p.MOUNT_LENGTH / 2, p.RAIL_SLOT_WIDTH / 2
+    steps = [Step("new", Prism("mount", 0, rail_profile(p), -half_length, half_length))]
+    for i, x in enumerate(rail_slots(p)):
+        steps.append(Step("cut", Box(f"slot_{i + 1}", (x - p.RAIL_GROOVE_WIDTH / 2, -half_width, -p.RAIL_SLOT_DEPTH),
+                                     (x + p.RAIL_GROOVE_WIDTH / 2, half_width, 0.0))))
+    steps.append(Step("cut", Cylinder("cross_bolt", 0, (0.0, -p.MOUNT_HEIGHT_OFFSET / 2),
+                                      p.MOUNT_CROSS_BOLT_DIAMETER / 2, 0.0, p.RAIL_SLOT_WIDTH)))
+    return steps
+
+
+def components(p):
+    """{component name: steps} as the generators name their components"""
+    return {"OKP_MainBody": main_body(p), "Picatinny_Mount": mount(p)}
@@ -28,7 +28,7 @@ def run(context):
         # Extrude it 20mm
         extrudes = rootComp.features.extrudeFeatures
         prof = sketch.profiles.item(0)
-        extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.NewBodyFeature)
+        extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
         distance = adsk.core.ValueInput.createByReal(2.0)  # 2cm
         extInput.setDistanceExtent(False, distance)
         extrudes.add(extInput)
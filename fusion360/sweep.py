@@ -0,0 +1,343 @@
+"""
+OKP Sight - Parameter Sweep Runner
+Builds every combination of parameter overrides headlessly in a pool of worker
+processes and streams one result per variant to JSONL or Parquet
+
+Usage (from the repository root):
+    python -m fusion360.sweep \\
+        --grid REFLECTOR_RADIUS=200,225,250 \\
+        --range TOTAL_LENGTH=150:180:5 \\
+        --grid HOOD_STYLE=minimal,full,skeleton \\
+        --out sweep.jsonl --workers 8
+
+Combinations are generated lazily and only a bounded window of batches is in
+flight, so memory stays flat however large the sweep is. Results arrive in
+completion order; each row carries the variant's index.
+"""
+
+import argparse
+import concurrent.futures
+import itertools
+import json
+import os
+import sys
+import time
+
+# Material densities in g/cm^3 (see parameters.py)
+MATERIALS = {"asa": "ASA_DENSITY", "al6061": "AL6061_DENSITY", "al7075": "AL7075_DENSITY"}
+
+_cache = None  # geometry_cache.GeometryCache of this worker, when sweeping with --cache
+
+
+# ==============================================================================
+# SWEEP AXES
+# ==============================================================================
+
+def parse_value(text):
+    """Parse an override value: int, float or bare string"""
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_grid(spec):
+    """'NAME=a,b,c' -> ('NAME', [a, b, c])"""
+    name, _, values = spec.partition("=")
+    if not values:
+        raise ValueError(f"grid axis needs NAME=v1,v2,...: {spec!r}")
+    return name.strip(), [parse_value(v.strip()) for v in values.split(",")]
+
+
+def parse_range(spec):
+    """'NAME=start:stop:step' -> ('NAME', [start, ..., stop]) with stop included
+
+    Ints when start, stop and step are all ints (counts), floats otherwise.
+    """
+    name, _, bounds = spec.partition("=")
+    parts = bounds.split(":")
+    if len(parts) != 3:
+        raise ValueError(f"range axis needs NAME=start:stop:step: {spec!r}")
+    bounds = [parse_value(p.strip()) for p in parts]
+    if any(isinstance(bound, str) for bound in bounds):
+        raise ValueError(f"range bounds must be numbers: {spec!r}")
+    start, stop, step = bounds
+    if step <= 0:
+        raise ValueError(f"range step must be positive: {spec!r}")
+    count = int(round((stop - start) / step)) + 1
+    if all(isinstance(bound, int) for bound in bounds):
+        return name.strip(), [start + i * step for i in range(count)]
+    return name.strip(), [round(start + i * step, 10) for i in range(count)]
+
+
+def combinations(axes):
+    """Lazily yield one override dict per point of the grid spanned by axes"""
+    names = [name for name, _ in axes]
+    for values in itertools.product(*[values for _, values in axes]):
+        yield dict(zip(names, values))
+
+
+def sweep_size(axes):
+    total = 1
+    for _, values in axes:
+        total *= len(values)
+    return total
+
+
+# ==============================================================================
+# WORKER
+# ==============================================================================
+
+def _init_worker(cache_dir=None):
+    """Load the headless API and generators once per worker process"""
+    global _cache
+    from . import headless
+    headless.install()
+    from . import main_body, picatinny_mount  # noqa: F401 (import cost paid once)
+    if cache_dir:
+        from . import geometry_cache
+        _cache = geometry_cache.GeometryCache(cache_dir)
+
+
+def variant_parameters(overrides):
+    """Parameters for one sweep point; unknown names raise KeyError"""
+    from . import parameters as params
+    unknown = [name for name in overrides if name not in params.FIELDS]
+    if unknown:
+        raise KeyError(f"unknown parameters: {', '.join(unknown)}")
+    return params.DEFAULT.replace(**overrides)
+
+
+def evaluate(index, overrides, walls=False):
+    """Build one variant headlessly and measure it; walls adds the thinnest wall (needs NumPy)"""
+    from . import geometry_cache, headless, interference, main_body, picatinny_mount
+
+    row = {"index": index, "overrides": overrides, "valid": False, "error": None}
+    started = time.perf_counter()
+    try:
+        p = variant_parameters(overrides)
+        row["interferences"] = len(interference.check(p))
+        if walls:
+            from .analysis import walls as wall_analysis
+            row["min_wall_mm"] = wall_analysis.thinnest(p)
+        app = headless.new_session()
+        design = app.activeProduct
+        failures = []
+        if _cache is not None:
+            hits = _cache.store.stats["hits"]
+            try:
+                geometry_cache.build(design.rootComponent, p, _cache)
+            except Exception as e:
+                failures.append(f"{type(e).__name__}: {e}")
+            row["cache_hits"] = _cache.store.stats["hits"] - hits
+        else:
+            for generator in (main_body, picatinny_mount):
+                try:
+                    generator.build(design.rootComponent, p)
+                except Exception as e:
+                    failures.append(f"{type(e).__name__}: {e}")
+        built = time.perf_counter()
+
+        parts = [c for c in design.allComponents if c is not design.rootComponent]
+        bodies = [b for c in parts for b in c.bRepBodies]
+        volume = sum(b.volume for b in bodies)  # cm^3
+        lo, hi = [float("inf")] * 3, [float("-inf")] * 3
+        for body in bodies:
+            box = body.boundingBox
+            lo = [min(a, b) for a, b in zip(lo, box.minPoint.asArray())]
+            hi = [max(a, b) for a, b in zip(hi, box.maxPoint.asArray())]
+
+        if failures:
+            row["error"] = failures[0]
+        elif any(c.bRepBodies.count == 0 for c in parts) or any(b.volume <= 0 for b in bodies):
+            row["error"] = "component without solid body"
+        row["valid"] = row["error"] is None
+        row["volume_mm3"] = volume * 1000
+        for material, density in MATERIALS.items():
+            row[f"mass_g_{material}"] = volume * getattr(p, density)
+        row["bbox_mm"] = [v * 10 for v in lo + hi] if bodies else None
+        row["features"] = sum(c.features.extrudeFeatures.count + c.features.combineFeatures.count
+                              + c.features.baseFeatures.count for c in parts)
+        row["api_calls"] = len(app.recorded_calls)
+        row["build_ms"] = (built - started) * 1000
+        row["measure_ms"] = (time.perf_counter() - built) * 1000
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["total_ms"] = (time.perf_counter() - started) * 1000
+    return row
+
+
+def _evaluate_batch(batch, walls=False):
+    return [evaluate(index, overrides, walls) for index, overrides in batch]
+
+
+# ==============================================================================
+# OUTPUT
+# ==============================================================================
+
+class JsonlWriter:
+    def __init__(self, path):
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, rows):
+        for row in rows:
+            self._file.write(json.dumps(row) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+# Row columns and their types: every row has these, null where a failed variant never got that far
+COLUMNS = [("index", "int"), ("overrides", "str"), ("valid", "bool"), ("error", "str"),
+           ("interferences", "int"), ("volume_mm3", "float")]
+COLUMNS += [(f"mass_g_{material}", "float") for material in MATERIALS]
+COLUMNS += [("bbox_mm", "floats"), ("features", "int"), ("api_calls", "int"),
+            ("build_ms", "float"), ("measure_ms", "float"), ("total_ms", "float")]
+CACHE_COLUMNS = [("cache_hits", "int")]  # with a geometry cache
+WALL_COLUMNS = [("min_wall_mm", "float")]  # with walls
+
+
+def columns(cache=False, walls=False):
+    """(name, type) of every row column for the sweep's options"""
+    return COLUMNS + (CACHE_COLUMNS if cache else []) + (WALL_COLUMNS if walls else [])
+
+
+def parquet_schema(cache=False, walls=False):
+    """pyarrow schema of the rows, fixed up front so no row group has to guess it"""
+    import pyarrow
+    types = {"int": pyarrow.int64(), "float": pyarrow.float64(), "bool": pyarrow.bool_(),
+             "str": pyarrow.string(), "floats": pyarrow.list_(pyarrow.float64())}
+    return pyarrow.schema([(name, types[kind]) for name, kind in columns(cache, walls)])
+
+
+class ParquetWriter:
+    """Buffers rows into row groups of one fixed schema; needs pyarrow"""
+
+    def __init__(self, path, row_group_size=4096, cache=False, walls=False):
+        self._schema = parquet_schema(cache, walls)
+        self._path = path
+        self._rows = []
+        self._writer = None
+        self._row_group_size = row_group_size
+
+    def write(self, rows):
+        for row in rows:
+            row = dict(row, overrides=json.dumps(row["overrides"]))
+            self._rows.append({name: row.get(name) for name in self._schema.names})
+        if len(self._rows) >= self._row_group_size:
+            self._flush()
+
+    def _flush(self):
+        import pyarrow
+        import pyarrow.parquet
+        if not self._rows:
+            return
+        table = pyarrow.Table.from_pylist(self._rows, schema=self._schema)
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self._path, self._schema)
+        self._writer.write_table(table)
+        self._rows = []
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_writer(path, cache=False, walls=False):
+    """A Parquet writer for .parquet paths (cache and walls add their columns), JSONL otherwise"""
+    return ParquetWriter(path, cache=cache, walls=walls) if path.endswith(".parquet") else JsonlWriter(path)
+
+
+# ==============================================================================
+# RUNNER
+# ==============================================================================
+
+def _batches(axes, batch_size):
+    numbered = enumerate(combinations(axes))
+    while True:
+        batch = list(itertools.islice(numbered, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def run_sweep(axes, out_path, workers=None, batch_size=16, window=4, progress=None, cache_dir=None,
+              walls=False):
+    """Evaluate every combination and stream rows to out_path; returns a summary
+
+    At most workers * window batches are queued at once. With cache_dir the
+    workers share a geometry cache (geometry_cache.py) and only build parts
+    whose parameters they have not seen. With walls every row also gets the
+    thinnest wall of the body (analysis/walls.py).
+    """
+    workers = workers or os.cpu_count() or 1
+    writer = open_writer(out_path, cache=cache_dir is not None, walls=walls)
+    summary = {"variants": 0, "valid": 0, "cache_hits": 0, "seconds": 0.0}
+    started = time.perf_counter()
+    pending = set()
+    batches = _batches(axes, batch_size)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                    initargs=(cache_dir,)) as pool:
+            for batch in itertools.islice(batches, workers * window):
+                pending.add(pool.submit(_evaluate_batch, batch, walls))
+            while pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    rows = future.result()
+                    writer.write(rows)
+                    summary["variants"] += len(rows)
+                    summary["valid"] += sum(1 for r in rows if r["valid"])
+                    summary["cache_hits"] += sum(r.get("cache_hits", 0) for r in rows)
+                    nxt = next(batches, None)
+                    if nxt is not None:
+                        pending.add(pool.submit(_evaluate_batch, nxt, walls))
+                if progress:
+                    progress(summary["variants"])
+    finally:
+        writer.close()
+    summary["seconds"] = time.perf_counter() - started
+    summary["variants_per_second"] = summary["variants"] / summary["seconds"] if summary["seconds"] else 0.0
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=v1,v2,...",
+                        help="explicit values for a parameter")
+    parser.add_argument("--range", action="append", default=[], metavar="NAME=start:stop:step",
+                        help="evenly spaced values for a parameter (stop included)")
+    parser.add_argument("--out", default="sweep.jsonl", help="output file (.jsonl or .parquet)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--batch-size", type=int, default=16, help="variants per task sent to a worker")
+    parser.add_argument("--cache", metavar="DIR", default=None,
+                        help="reuse unchanged parts from a geometry cache directory")
+    parser.add_argument("--walls", action="store_true",
+                        help="add the thinnest wall per variant (analysis/walls.py, needs NumPy)")
+    args = parser.parse_args(argv)
+
+    axes = [parse_grid(spec) for spec in args.grid] + [parse_range(spec) for spec in args.range]
+    if not axes:
+        parser.error("give at least one --grid or --range axis")
+    total = sweep_size(axes)
+    print(f"Sweeping {total} variants over {', '.join(name for name, _ in axes)}")
+
+    def progress(done):
+        sys.stderr.write(f"\r{done}/{total}")
+        sys.stderr.flush()
+
+    summary = run_sweep(axes, args.out, args.workers, args.batch_size, progress=progress, cache_dir=args.cache,
+                        walls=args.walls)
+    sys.stderr.write("\n")
+    print(f"{summary['valid']}/{summary['variants']} valid in {summary['seconds']:.1f}s "
+          f"({summary['variants_per_second']:.0f} variants/s) -> {args.out}")
+    if args.cache:
+        print(f"{summary['cache_hits']} cached parts reused")
+
+
+if __name__ == "__main__":
+    main()
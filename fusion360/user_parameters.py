@@ -0,0 +1,364 @@
+"""
+OKP Sight - User Parameters
+Publishes parameters.py as Fusion user parameters and drives the generated
+sketches and features from them, so edits in Fusion recompute natively
+
+Usage:
+    Set USER_PARAMETERS = "linked" in parameters.py and run a generator: every
+    number in parameters.py becomes a user parameter of the design (Modify >
+    Change Parameters), with the derived values as expressions of the others,
+    e.g. LED_FOCAL_DISTANCE = REFLECTOR_RADIUS / 2. Edit them there and the
+    timeline recomputes without running the script again.
+
+    Run this file as a script to write the edited values back into
+    parameters.py.
+
+    From the repository root, headlessly: build, edit natively, compare with a
+    fresh build of the edited values:
+    python -m fusion360.user_parameters --set HOOD_STYLE=skeleton \\
+        --edit MOUNT_LENGTH=120 --edit HOOD_SKELETON_RIB_COUNT=6
+
+Linked builds take their lengths from p.cm as expressions.Linked values.
+value() hands those to the API as ValueInput.createByString(expression),
+and rectangle(), circle() and polygon() dimension the outlines they draw
+to the sketch origin with the matching expressions. Only horizontal,
+vertical and diameter dimensions are used, so even the dovetail's 45 degree
+flanks follow from their corners. Points on the origin's axes are lined up
+with the origin instead, and plain numbers in a linked outline are
+dimensioned by value, so every linked sketch is fully defined. Outlines with
+no Linked value are drawn as before, so with USER_PARAMETERS "off" nothing
+here adds an API call.
+
+adsk is imported inside the functions that call the API, so the headless
+check can install the stand-in first.
+"""
+
+import argparse
+import math
+import re
+import traceback
+from . import expressions
+from . import parameters as params
+
+PARAMETERS_PATH = params.__file__
+
+# Values with no unit in Fusion: counts, MOA and densities
+UNITLESS = ""
+# Fusion's internal units per parameters.py unit
+SCALE = {"mm": 0.1, "deg": math.pi / 180, UNITLESS: 1.0}
+
+_FIELD = r"^(\s*{}:\s*(\w+)\s*=\s*)([^#\n]+?)(\s*(?:#\s*(.*))?)$"
+
+
+def published(p=params.DEFAULT):
+    """Names of the user parameters a linked build publishes: every number, then the derived values"""
+    numbers = [name for name in params.FIELDS if isinstance(getattr(p, name), (int, float))]
+    return numbers + list(params.DERIVED)
+
+
+def unit(name):
+    if name in params.LENGTHS:
+        return "mm"
+    if name in params.ANGLES:
+        return "deg"
+    return UNITLESS
+
+
+def internal(name, value):
+    """A parameters.py value in Fusion's internal units (cm, rad)"""
+    return value * SCALE[unit(name)]
+
+
+def comments():
+    """{name: comment} of the fields in parameters.py"""
+    with open(PARAMETERS_PATH) as f:
+        text = f.read()
+    found = {}
+    for name in params.FIELDS:
+        match = re.search(_FIELD.format(name), text, re.MULTILINE)
+        if match and match.group(5):
+            found[name] = match.group(5)
+    return found
+
+
+# ==============================================================================
+# PUBLISHING
+# ==============================================================================
+
+def expression(p, name):
+    """The user-parameter expression for a field or derived value"""
+    if name in params.DERIVED_EXPRESSIONS:
+        return params.DERIVED_EXPRESSIONS[name]
+    return f"{getattr(p, name):.10g} {unit(name)}".strip()
+
+
+def publish(design, p):
+    """Add or update a user parameter per published() name; returns them
+
+    Derived values are checked against parameters.py, so an expression that
+    drifted from its CALCULATED VALUES property fails here rather than
+    building different geometry.
+    """
+    import adsk.core
+
+    userParameters = design.userParameters
+    notes = comments()
+    found = []
+    for name in published(p):
+        text = expression(p, name)
+        parameter = userParameters.itemByName(name)
+        if parameter is None:
+            parameter = userParameters.add(name, adsk.core.ValueInput.createByString(text), unit(name),
+                                           notes.get(name, "derived in parameters.py"))
+        elif parameter.expression != text:
+            parameter.expression = text
+        if name in params.DERIVED and abs(parameter.value - internal(name, getattr(p, name))) > 1e-9:
+            raise RuntimeError(f"DERIVED_EXPRESSIONS[{name!r}] = {text!r} no longer matches parameters.py")
+        found.append(parameter)
+    return found
+
+
+def link(design, p):
+    """publish() for USER_PARAMETERS "linked"; nothing otherwise"""
+    if p.USER_PARAMETERS != "linked":
+        return []
+    return publish(design, p)
+
+
+def value(x):
+    """ValueInput for a p.cm length or a count: its expression if linked, else the number"""
+    import adsk.core
+
+    if isinstance(x, expressions.Linked):
+        return adsk.core.ValueInput.createByString(x.expression)
+    return adsk.core.ValueInput.createByReal(x)
+
+
+def quantity(p, count, expression):
+    """A count for value(): linked to expression under USER_PARAMETERS "linked", else count itself"""
+    if p.USER_PARAMETERS != "linked":
+        return count
+    return expressions.Linked(count, expression, power=0)
+
+
+# ==============================================================================
+# DIMENSIONED SKETCHES
+# ==============================================================================
+
+def point(u, v):
+    """Sketch point from centimetre coordinates; Linked values pass as their numbers"""
+    import adsk.core
+
+    return adsk.core.Point3D.create(float(u), float(v), 0)
+
+
+def linked(*values):
+    """True if any value is Linked: the outline belongs to a linked build and gets dimensioned"""
+    return any(isinstance(value, expressions.Linked) for value in values)
+
+
+def dimension(sketch, one, two, axis, length):
+    """Hold the distance between two sketch points along axis (0 u, 1 v) at length, in cm
+
+    A Linked length follows its expression and a plain one keeps its value.
+    At zero the points are lined up instead: vertically for u, horizontally
+    for v.
+    """
+    import adsk.fusion
+
+    if abs(length) < 1e-9:
+        constraints = sketch.geometricConstraints
+        return constraints.addVerticalPoints(one, two) if axis == 0 else constraints.addHorizontalPoints(one, two)
+    orientation = (adsk.fusion.DimensionOrientations.HorizontalDimensionOrientation if axis == 0
+                   else adsk.fusion.DimensionOrientations.VerticalDimensionOrientation)
+    a, b = one.geometry, two.geometry
+    text = point((a.x + b.x) / 2 - 0.5 * axis, (a.y + b.y) / 2 - 0.5 * (1 - axis))
+    found = sketch.sketchDimensions.addDistanceDimension(one, two, orientation, text)
+    found.parameter.expression = expressions.expression(abs(length))
+    return found
+
+
+def place(sketch, sketchPoint, u, v):
+    """Hold a sketch point at (u, v) cm from the sketch origin"""
+    if abs(u) < 1e-9 and abs(v) < 1e-9:
+        return sketch.geometricConstraints.addCoincident(sketchPoint, sketch.originPoint)
+    return [dimension(sketch, sketch.originPoint, sketchPoint, 0, u),
+            dimension(sketch, sketch.originPoint, sketchPoint, 1, v)]
+
+
+def nearest(lines, u, v):
+    """The rectangle corner nearest (u, v)"""
+    points = [line.startSketchPoint for line in lines]
+    return min(points, key=lambda sketchPoint: abs(sketchPoint.geometry.x - u) + abs(sketchPoint.geometry.y - v))
+
+
+def rectangle(sketch, corner, size):
+    """Rectangle from its lowest (u, v) corner and (width, height) in cm, dimensioned if any is Linked
+
+    The corner is placed from the sketch origin and the size from the corner,
+    so the rectangle is fully defined by its expressions.
+    """
+    (u, v), (width, height) = corner, size
+    lines = sketch.sketchCurves.sketchLines.addTwoPointRectangle(point(u, v), point(u + width, v + height))
+    if linked(u, v, width, height):
+        start, end = nearest(lines, u, v), nearest(lines, u + width, v + height)
+        place(sketch, start, u, v)
+        dimension(sketch, start, end, 0, width)
+        dimension(sketch, start, end, 1, height)
+    return lines
+
+
+def circle(sketch, center, diameter):
+    """Circle from its (u, v) centre and diameter in cm, dimensioned if any is Linked"""
+    u, v = center
+    found = sketch.sketchCurves.sketchCircles.addByCenterRadius(point(u, v), float(diameter) / 2)
+    if linked(u, v, diameter):
+        place(sketch, found.centerSketchPoint, u, v)
+        text = point(u + diameter / 2, v + diameter / 2)
+        sketch.sketchDimensions.addDiameterDimension(found, text).parameter.expression = \
+            expressions.expression(diameter)
+    return found
+
+
+def polygon(sketch, corners):
+    """Closed outline through (u, v) corners in cm, each corner placed from the origin if any is Linked"""
+    lines = sketch.sketchCurves.sketchLines
+    drawn = []
+    for index in range(len(corners)):
+        start = drawn[-1].endSketchPoint if drawn else point(*corners[0])
+        end = drawn[0].startSketchPoint if index == len(corners) - 1 else point(*corners[index + 1])
+        drawn.append(lines.addByTwoPoints(start, end))
+    if linked(*(c for corner in corners for c in corner)):
+        for (u, v), line in zip(corners, drawn):
+            place(sketch, line.startSketchPoint, u, v)
+    return drawn
+
+
+# ==============================================================================
+# SYNCING BACK
+# ==============================================================================
+
+def edited(design):
+    """{name: value in parameters.py units} of the design's published fields"""
+    found = {}
+    for name in published():
+        parameter = design.userParameters.itemByName(name)
+        if parameter is not None and name in params.FIELDS:
+            found[name] = parameter.value / internal(name, 1.0)
+    return found
+
+
+def sync(design, path=PARAMETERS_PATH):
+    """Write user-parameter values edited in Fusion back into parameters.py
+
+    Only the fields change; derived values follow from their expressions.
+    Returns (name, old, new) per field written.
+    """
+    with open(path) as f:
+        text = f.read()
+    changes = []
+    for name, new in edited(design).items():
+        match = re.search(_FIELD.format(name), text, re.MULTILINE)
+        if match is None:
+            continue
+        old = float(match.group(3))
+        if abs(new - old) <= 1e-9 * max(1.0, abs(old)):
+            continue
+        written = str(round(new)) if match.group(2) == "int" else repr(round(new, 6))
+        text = text[:match.start(3)] + written + text[match.end(3):]
+        changes.append((name, old, float(written)))
+    if changes:
+        with open(path, "w") as f:
+            f.write(text)
+    return changes
+
+
+def format_changes(changes):
+    if not changes:
+        return "parameters.py already matches the user parameters"
+    return "\n".join(f"{name}: {old:g} -> {new:g}" for name, old, new in changes)
+
+
+def run(context):
+    import adsk.core
+    import adsk.fusion
+
+    ui = None
+    try:
+        app = adsk.core.Application.get()
+        ui = app.userInterface
+        design = adsk.fusion.Design.cast(app.activeProduct)
+        changes = sync(design)
+        ui.messageBox(f'User parameters synced to parameters.py:\n{format_changes(changes)}')
+
+    except:
+        if ui:
+            ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+
+
+# ==============================================================================
+# HEADLESS CHECK
+# ==============================================================================
+
+def volumes(design):
+    """{component name: total body volume in cm^3}"""
+    return {comp.name: sum(body.volume for body in comp.bRepBodies)
+            for comp in design.allComponents if comp.bRepBodies.count}
+
+
+def build_linked(p):
+    """A fresh headless design holding both generators built from p, linked"""
+    from . import headless
+    from . import main_body, picatinny_mount
+
+    design = headless.new_session().activeProduct
+    p = p.replace(USER_PARAMETERS="linked")
+    main_body.build(design.rootComponent, p)
+    picatinny_mount.build(design.rootComponent, p)
+    return design
+
+
+def main(argv=None):
+    from . import headless
+    from . import sweep
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="override a parameter before building")
+    parser.add_argument("--edit", action="append", default=[], metavar="NAME=VALUE",
+                        help="edit a user parameter after building (parameters.py units)")
+    parser.add_argument("--sync", metavar="PATH", help="write the edited values into PATH, a copy of parameters.py")
+    args = parser.parse_args(argv)
+
+    overrides, edits = {}, {}
+    for specs, found in ((args.set, overrides), (args.edit, edits)):
+        for spec in specs:
+            name, values = sweep.parse_grid(spec)
+            found[name] = values[0]
+    base = sweep.variant_parameters(overrides)
+
+    headless.install()
+    design = build_linked(base)
+    for name, new in edits.items():
+        parameter = design.userParameters.itemByName(name)
+        if parameter is None:
+            raise SystemExit(f"{name} is not a published user parameter")
+        parameter.expression = f"{new:.10g} {unit(name)}".strip()
+
+    rebuilt = volumes(build_linked(base.replace(**edits)))
+    mismatched = 0
+    for name, volume in volumes(design).items():
+        match = abs(volume - rebuilt.get(name, 0.0)) <= 1e-6 * max(1.0, volume)
+        mismatched += not match
+        print(f"{name:<20} {volume:10.4f} cm^3 edited, {rebuilt.get(name, 0.0):10.4f} cm^3 rebuilt"
+              f"{'' if match else '  MISMATCH'}")
+
+    if args.sync:
+        with open(PARAMETERS_PATH) as source, open(args.sync, "w") as copy:
+            copy.write(source.read())
+        print(format_changes(sync(design, args.sync)))
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
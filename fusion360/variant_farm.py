@@ -0,0 +1,221 @@
+"""
+OKP Sight - Variant Farm
+Builds the sight once and mutates it into each variant in turn, exporting
+every variant to its own file
+
+Usage:
+    Run this file as a script: FARM_AXES goes through a new document, one
+    STL and 3MF per variant in FARM_DIRECTORY.
+
+    From the repository root, headlessly:
+    python -m fusion360.variant_farm --grid HOOD_STYLE=minimal,full,skeleton \\
+        --grid HOOD_SKELETON_RIB_COUNT=3,4,5 --out farm --format stl
+
+    In code:
+    results = variant_farm.farm(design, variants.HOOD_VARIANTS, "exports")
+
+variants.build_variants places every variant side by side, so the design
+grows with the table. The farm keeps one body and one mount instead: each
+variant runs regen.regenerate with USER_PARAMETERS "linked", so changed
+lengths reach the model through its user parameters and recompute natively,
+and only stages steered by a changed hood style or count are rebuilt. The
+bodies are then streamed to <directory>/OKP_<name>.stl and .3mf
+(mesh_export) before the next variant. The timeline keeps the same size
+and only one variant's mesh is held at a time, for 3 variants or 300.
+
+A variant that fails (a feature that cannot recompute, an interference
+under INTERFERENCE_CHECK "strict") is reported, the model is dropped and
+the next variant builds it afresh.
+"""
+
+import argparse
+import os
+import time
+from collections import namedtuple
+from . import mesh_export
+from . import parameters as params
+
+FARM_DIRECTORY = os.path.join(mesh_export.EXPORT_DIRECTORY, "farm")
+
+# Sweep axes (see sweep.py) of the table run() farms: every hood at two mount lengths
+FARM_AXES = [("HOOD_STYLE", list(params.HOOD_STYLES)), ("MOUNT_LENGTH", [50.0, 100.0])]
+
+# rebuilt: generator.stage names rebuilt; recomputed: values the user parameters carried;
+# features: timeline entries after the variant; paths: exported files
+FarmResult = namedtuple("FarmResult", "variant ok error seconds rebuilt recomputed features paths")
+
+
+def run(context):
+    import adsk.core
+    import traceback
+    from . import api_trace
+    from . import build_mode
+
+    ui = None
+    try:
+        app = adsk.core.Application.get()
+        ui = app.userInterface
+
+        p = params.DEFAULT
+        with api_trace.tracing(p.API_TRACE == "on") as trace, \
+                build_mode.scratch_document(keep=True) as design:
+            results = farm(design, table(FARM_AXES, p), FARM_DIRECTORY, base=p)
+        traced = api_trace.write_generated(trace, "OKP_farm")
+        ui.messageBox(f'{summary(results)}\nExported to {FARM_DIRECTORY}{api_trace.format_traced(trace, traced)}')
+
+    except:
+        if ui:
+            ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+
+
+# ==============================================================================
+# TABLES
+# ==============================================================================
+
+def table(axes, base=params.DEFAULT):
+    """A Variant per point of sweep axes: HOOD_STYLE picks the hood, the other names are overrides"""
+    from . import sweep
+    from . import variants
+
+    found = []
+    for index, overrides in enumerate(sweep.combinations(axes), 1):
+        hood = overrides.pop("HOOD_STYLE", base.HOOD_STYLE)
+        found.append(variants.Variant(f"V{index:03d}", hood, 0, overrides=overrides))
+    return found
+
+
+def farm_parameters(variant, base=params.DEFAULT):
+    """Parameters of one variant, linked so that lengths change through the user parameters"""
+    from . import variants
+
+    # The farm needs the timeline, whatever BUILD_MODE the generator scripts use
+    return variants.variant_parameters(variant, base).replace(USER_PARAMETERS="linked", BUILD_MODE="normal")
+
+
+def orientation(variant):
+    """Row-major transform that stands an upright variant up for export; it stays in place"""
+    from . import variants
+
+    return tuple(variants.variant_transform(variant._replace(slot=0)).asArray())
+
+
+# ==============================================================================
+# FARMING
+# ==============================================================================
+
+def failed_features(design):
+    """Names of the timeline entries that did not recompute"""
+    import adsk.fusion
+
+    error = adsk.fusion.FeatureHealthStates.ErrorFeatureHealthState
+    timeline = design.timeline
+    entities = [timeline.item(i).entity for i in range(timeline.count)]
+    return [entity.name for entity in entities if getattr(entity, "healthState", None) == error]
+
+
+def reset(design):
+    """Drop the generated components and their dependency graphs, so the next variant starts afresh"""
+    from . import regen
+
+    for generator in regen.GENERATORS:
+        name = regen.generator_name(generator)
+        comp = regen.find_component(design, name)
+        for occurrence in list(design.rootComponent.occurrences):
+            if occurrence.component == comp:
+                occurrence.deleteMe()
+        graph = design.attributes.itemByName(regen.ATTRIBUTE_GROUP, name)
+        if graph:
+            graph.deleteMe()
+
+
+def farm(design, variant_table, directory=FARM_DIRECTORY, base=params.DEFAULT,
+         refinement=mesh_export.DEFAULT_REFINEMENT, formats=mesh_export.FORMATS, isolate=True, log=print):
+    """Mutate one model through every variant and export each; returns one FarmResult per variant
+
+    With isolate a failing variant is reported and the rest are still
+    farmed; otherwise the first failure is raised.
+    """
+    from . import regen
+    from . import variants
+
+    # One variant at a time, so each may override the published user parameters
+    variants.check(variant_table, base, shared=False)
+    results = []
+    for index, variant in enumerate(variant_table, 1):
+        log(f"[{index}/{len(variant_table)}] {variant.name}: {variant.hood} hood, {variant.overrides or {}}")
+        started = time.perf_counter()
+        try:
+            p = farm_parameters(variant, base)
+            reports = [regen.regenerate(design, generator, p) for generator in regen.GENERATORS]
+            failed = failed_features(design)
+            if failed:
+                raise RuntimeError(f"features failed to recompute: {', '.join(failed)}")
+            paths = mesh_export.export_component(design.rootComponent, directory, f"OKP_{variant.name}", refinement,
+                                                 formats, prefix=variant.name, transform=orientation(variant))
+            result = FarmResult(variant, True, None, 0.0,
+                                [f"{report['generator']}.{stage}" for report in reports for stage in report["rebuilt"]],
+                                sorted({name for report in reports for name in report["recomputed"]}),
+                                design.timeline.count, paths)
+        except Exception as e:
+            if not isolate:
+                raise
+            reset(design)
+            result = FarmResult(variant, False, f"{type(e).__name__}: {e}", 0.0, [], [], design.timeline.count, [])
+        results.append(result._replace(seconds=time.perf_counter() - started))
+    return results
+
+
+def summary(results):
+    """Report lines: one per variant with what changed, then the totals"""
+    lines = []
+    for result in results:
+        status = "✓" if result.ok else "✗"
+        detail = result.error
+        if result.ok:
+            detail = (f"rebuilt {', '.join(result.rebuilt) or 'nothing'}; "
+                      f"recomputed {', '.join(result.recomputed) or 'nothing'}")
+        lines.append(f"{status} {result.variant.name:<12} {result.variant.hood:<9} "
+                     f"{result.seconds * 1000:7.0f} ms {result.features:4d} features  {detail}")
+    farmed = sum(1 for result in results if result.ok)
+    total = sum(result.seconds for result in results)
+    largest = max((result.features for result in results), default=0)
+    lines.append(f"Exported {farmed}/{len(results)} variants in {total:.2f}s; "
+                 f"the design never held more than {largest} timeline features")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from . import headless
+    from . import sweep
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=v1,v2,...",
+                        help="variant axis (repeatable; default: FARM_AXES)")
+    parser.add_argument("--range", action="append", default=[], metavar="NAME=start:stop:step",
+                        help="variant axis over a range (repeatable)")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="override a parameter of every variant")
+    parser.add_argument("--refinement", choices=tuple(mesh_export.REFINEMENTS), default=mesh_export.DEFAULT_REFINEMENT)
+    parser.add_argument("--format", choices=mesh_export.FORMATS, action="append", default=None,
+                        help="output format (repeatable; default: both)")
+    parser.add_argument("--out", default=FARM_DIRECTORY, help="output directory")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for spec in args.set:
+        name, values = sweep.parse_grid(spec)
+        overrides[name] = values[0]
+    base = sweep.variant_parameters(overrides)
+    axes = [sweep.parse_grid(spec) for spec in args.grid] + [sweep.parse_range(spec) for spec in args.range]
+
+    headless.install()
+    design = headless.new_session().activeProduct
+    results = farm(design, table(axes or FARM_AXES, base), args.out, base, args.refinement,
+                   tuple(args.format or mesh_export.FORMATS), log=lambda line: None)
+    print(summary(results))
+    print(f"Exported to {args.out}")
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,195 @@
+"""
+OKP Sight - Variant Engine
+Builds a table of sight variants side by side with the shared generators
+
+Every variant is one line of a table:
+
+    Variant("Skeleton5", "skeleton", 2, overrides={"HOOD_SKELETON_RIB_COUNT": 5})
+
+hood is the HOOD_STYLE, slot places the variant along X (SLOT_SPACING
+apart) and overrides change any other parameter. Orientation "flat" keeps the
+generator axes (height along Z); "upright" stands the sight up along Y,
+Fusion's default up axis. Each variant gets its own component holding a
+main_body and a picatinny_mount build, so all dimensions come from
+parameters.py.
+"""
+
+import adsk.core
+import adsk.fusion
+import math
+import time
+import traceback
+from collections import namedtuple
+from . import api_trace
+from . import build_mode
+from . import main_body, mass_properties, mesh_export, picatinny_mount
+from . import user_parameters
+from . import parameters as params
+
+SLOT_SPACING = 250.0  # mm between neighbouring layout slots
+ORIENTATIONS = ("flat", "upright")
+
+Variant = namedtuple("Variant", "name hood slot orientation overrides", defaults=("flat", None))
+
+VariantResult = namedtuple("VariantResult", "variant ok error seconds bodies")
+
+# Minimal left, full centre, skeleton right
+HOOD_VARIANTS = [
+    Variant("Minimal", "minimal", -1),
+    Variant("Full", "full", 0),
+    Variant("Skeleton", "skeleton", 1),
+]
+
+
+def run(context):
+    run_table(HOOD_VARIANTS)
+
+
+def upright(variants):
+    """The same table standing upright"""
+    return [variant._replace(orientation="upright") for variant in variants]
+
+
+def check(variants, base=params.DEFAULT, shared=True):
+    """Reject tables that would build clashing components
+
+    shared: the variants are built into one design together (build_variants),
+    so with linked user parameters they cannot override published values.
+    """
+    names = [variant.name for variant in variants]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"duplicate variant names: {', '.join(duplicates)}")
+    for variant in variants:
+        if variant.orientation not in ORIENTATIONS:
+            raise ValueError(f"{variant.name}: orientation must be one of {ORIENTATIONS}, "
+                             f"got {variant.orientation!r}")
+        # A design has one set of user parameters, shared by every variant built into it
+        overridden = sorted(set(variant.overrides or {}) & set(user_parameters.published(base)))
+        if base.USER_PARAMETERS == "linked" and shared and overridden:
+            raise ValueError(f"{variant.name}: cannot override {', '.join(overridden)} with linked user parameters")
+
+
+def variant_parameters(variant, base=params.DEFAULT):
+    return base.replace(HOOD_STYLE=variant.hood, **(variant.overrides or {}))
+
+
+def variant_transform(variant):
+    """Placement of a variant's component: turn to its orientation, then move to its slot"""
+    transform = adsk.core.Matrix3D.create()
+    if variant.orientation == "upright":
+        # Height (Z) becomes Y
+        transform.setToRotation(-math.pi / 2, adsk.core.Vector3D.create(1, 0, 0),
+                                adsk.core.Point3D.create(0, 0, 0))
+    transform.translation = adsk.core.Vector3D.create(variant.slot * SLOT_SPACING / 10, 0, 0)
+    return transform
+
+
+def build_variant(comp, variant, base=params.DEFAULT):
+    """Build the body and mount of one variant into comp"""
+    p = variant_parameters(variant, base)
+    main_body.build(comp, p)
+    picatinny_mount.build(comp, p)
+
+
+def count_bodies(comp):
+    return comp.bRepBodies.count + sum(o.component.bRepBodies.count for o in comp.allOccurrences)
+
+
+def build_variants(design, variants, isolate=True, checkpoints=False, base=params.DEFAULT, log=print):
+    """Build every variant in order; returns one VariantResult per variant
+
+    With isolate a failing variant is removed and reported while the rest
+    are still built; otherwise the first failure is raised. With checkpoints
+    the document is saved after every variant that succeeds.
+    """
+    check(variants, base)
+    rootComp = design.rootComponent
+    results = []
+    for index, variant in enumerate(variants, 1):
+        log(f"[{index}/{len(variants)}] {variant.name}: {variant.hood} hood, {variant.orientation}")
+        started = time.perf_counter()
+        occurrence = rootComp.occurrences.addNewComponent(variant_transform(variant))
+        occurrence.component.name = f"OKP_{variant.name}"
+        try:
+            build_variant(occurrence.component, variant, base)
+            result = VariantResult(variant, True, None, 0.0, count_bodies(occurrence.component))
+        except Exception as e:
+            if not isolate:
+                raise
+            # Drop the half-built variant so the rest of the layout stays clean
+            occurrence.deleteMe()
+            result = VariantResult(variant, False, f"{type(e).__name__}: {e}", 0.0, 0)
+        results.append(result._replace(seconds=time.perf_counter() - started))
+
+        if checkpoints and result.ok:
+            save_checkpoint(design, f"OKP_{variant.name}", log)
+    return results
+
+
+def save_checkpoint(design, checkpoint_name, log=print):
+    """Save the design at a checkpoint"""
+    try:
+        doc = design.parentDocument
+        if doc.isSaved:
+            # Save existing document
+            doc.save(checkpoint_name)
+            log(f"  Saved checkpoint: {checkpoint_name}")
+        else:
+            # Document not saved yet - just mark the checkpoint
+            log(f"  Checkpoint: {checkpoint_name} (not saved - use File > Save)")
+        return True
+    except Exception as e:
+        log(f"  Savepoint warning: {str(e)}")
+        return False
+
+
+def summary(results, base=params.DEFAULT):
+    """Report lines: one per variant with its estimated mass per material, then the totals"""
+    lines = []
+    for result in results:
+        status = "✓" if result.ok else "✗"
+        detail = result.error
+        if result.ok:
+            masses = mass_properties.masses(variant_parameters(result.variant, base))
+            detail = f"{result.bodies} bodies, " + ", ".join(f"{m} {g:.0f} g" for m, g in masses.items())
+        lines.append(f"{status} {result.variant.name:<12} {result.variant.hood:<9} "
+                     f"{result.variant.orientation:<8} {result.seconds * 1000:7.0f} ms  {detail}")
+    built = sum(1 for result in results if result.ok)
+    total = sum(result.seconds for result in results)
+    lines.append(f"Created {built}/{len(results)} variants in {total:.2f}s")
+    return "\n".join(lines)
+
+
+def run_table(variants, **options):
+    """Script entry point: build a table in the active design and print the summary"""
+    try:
+        app = adsk.core.Application.get()
+        design = adsk.fusion.Design.cast(app.activeProduct)
+
+        if not design:
+            print("ERROR: No active design")
+            return False
+
+        base = options.get("base", params.DEFAULT)
+        print("=" * 60)
+        with api_trace.tracing(base.API_TRACE == "on") as trace, \
+                build_mode.building(design, base.BUILD_MODE) as generation:
+            results = build_variants(generation.design, variants, **options)
+            if base.EXPORT_REFINEMENT != "off":
+                built = [result.variant for result in results if result.ok]
+                exported = mesh_export.export_variants(generation.design, built, mesh_export.EXPORT_DIRECTORY,
+                                                       base.EXPORT_REFINEMENT)
+        print("=" * 60)
+        print(summary(results, base))
+        print(generation.report())
+        if base.EXPORT_REFINEMENT != "off":
+            print(mesh_export.format_exported(exported).strip())
+        if trace is not None:
+            print(api_trace.format_traced(trace, api_trace.write_generated(trace, "variants")).strip())
+        return all(result.ok for result in results)
+
+    except Exception as e:
+        print(f"FATAL: {str(e)}")
+        print(traceback.format_exc())
+        return False
@@ -0,0 +1,58 @@
+"""A geometry cache hit gives the parts a fresh build gives"""
+
+import shutil
+
+from fusion360 import headless
+from fusion360 import parameters as params
+
+headless.install()
+
+from fusion360 import geometry_cache  # noqa: E402 (needs the adsk stand-in)
+
+
+def shapes(design):
+    """{component name: [(volume cm^3, bounding box cm)] per body}"""
+    return {comp.name: [(body.volume, body.boundingBox.minPoint.asArray() + body.boundingBox.maxPoint.asArray())
+                        for body in comp.bRepBodies]
+            for comp in design.allComponents if comp.bRepBodies.count}
+
+
+def build(cache, p):
+    design = headless.new_session().activeProduct
+    geometry_cache.build(design.rootComponent, p, cache)
+    return shapes(design)
+
+
+def test_hit_returns_identical_parts(tmp_path):
+    cache = geometry_cache.GeometryCache(str(tmp_path))
+    p = params.DEFAULT
+    stored = build(cache, p)
+    assert cache.store.stats["hits"] == 0
+    parts = cache.store.stats["stored"]
+
+    reused = build(cache, p)
+    assert cache.store.stats["hits"] == parts and cache.store.stats["stored"] == parts
+    assert reused == stored
+
+    # Only the parts that read HOOD_STYLE miss
+    build(cache, p.replace(HOOD_STYLE="full"))
+    assert cache.store.labels["hood"]["misses"] == 2
+    assert cache.store.labels["mount"]["misses"] == 1
+
+
+def test_evicted_entry_counts_one_miss(tmp_path, monkeypatch):
+    cache = geometry_cache.GeometryCache(str(tmp_path))
+    build(cache, params.DEFAULT)
+    misses = cache.store.stats["misses"]
+
+    # Another process evicts each entry between contains() and get()
+    get = cache.store.get
+
+    def evicted(key, label=None):
+        shutil.rmtree(cache.store.path(key))
+        return get(key, label)
+    monkeypatch.setattr(cache.store, "get", evicted)
+    build(cache, params.DEFAULT)
+    assert cache.store.stats["misses"] - misses == misses
+    assert cache.store.stats["hits"] == 0
+
@@ -0,0 +1,29 @@
+"""interference.check on the default layout"""
+
+import pytest
+
+from fusion360 import interference
+from fusion360 import parameters as params
+
+# (kind, first, second, gap mm) of the default layout, worst first
+DEFAULT_FINDINGS = [
+    ("overlap", "light", "reflector", -8.398924762261725),
+    ("breakthrough", "reflector", "top", -7.0),
+    ("overlap", "laser", "reflector", -4.398924762261725),
+    ("overlap", "battery", "reflector", -2.0),
+    ("breakthrough", "light", "left", -1.0),
+    ("overlap", "battery", "light", -0.9743758102333651),
+]
+
+
+def test_default_layout():
+    found = interference.check(params.DEFAULT)
+    assert [finding[:3] for finding in found] == [finding[:3] for finding in DEFAULT_FINDINGS]
+    assert [finding.gap for finding in found] == pytest.approx([finding[3] for finding in DEFAULT_FINDINGS])
+
+
+def test_clearance_only_adds_findings():
+    plain = interference.check(params.DEFAULT)
+    spaced = interference.check(params.DEFAULT, clearance=params.DEFAULT.ASA_MIN_WALL_THICKNESS)
+    assert set(plain) <= set(spaced)
+    assert [finding.gap for finding in spaced] == sorted(finding.gap for finding in spaced)
@@ -0,0 +1,28 @@
+"""Batched cavities cut the body the separate cavities cut, from fewer sketches"""
+
+import pytest
+
+from fusion360 import headless
+from fusion360 import parameters as params
+
+headless.install()
+
+from fusion360 import main_body  # noqa: E402 (needs the adsk stand-in)
+
+
+@pytest.mark.parametrize("style", ["minimal", "skeleton"])
+def test_batched_matches_separate(style):
+    built = {}
+    for mode in ("separate", "batched"):
+        design = headless.new_session().activeProduct
+        comp = main_body.build(design.rootComponent, params.DEFAULT.replace(HOOD_STYLE=style, CAVITY_BUILD_MODE=mode))
+        body = comp.bRepBodies.item(0)
+        box = body.boundingBox
+        built[mode] = (comp.bRepBodies.count, body.volume, box.minPoint.asArray() + box.maxPoint.asArray(),
+                       comp.sketches.count, comp.features.extrudeFeatures.count)
+
+    separate, batched = built["separate"], built["batched"]
+    assert batched[0] == separate[0] == 1
+    assert batched[1] == pytest.approx(separate[1], rel=1e-12)
+    assert batched[2] == pytest.approx(separate[2], abs=1e-12)
+    assert batched[3] < separate[3] and batched[4] <= separate[4]
@@ -0,0 +1,42 @@
+"""mass_properties volumes against the hood volumes worked out by hand"""
+
+import pytest
+
+from fusion360 import mass_properties
+from fusion360 import parameters as params
+from fusion360 import shapes
+
+
+def hood_volume(p):
+    """The hood blocks of p.HOOD_STYLE, in mm^3"""
+    if p.HOOD_STYLE == "minimal":
+        return p.HOOD_MINIMAL_LENGTH * p.BODY_WIDTH * p.HOOD_MINIMAL_THICKNESS
+    if p.HOOD_STYLE == "full":
+        return (p.HOOD_FULL_WIDTH - p.HOOD_FULL_WINDOW_WIDTH) * p.HOOD_FULL_LENGTH * p.HOOD_FULL_HEIGHT
+    return (p.HOOD_SKELETON_RIB_COUNT * p.HOOD_SKELETON_RIB_THICKNESS * p.BODY_WIDTH
+            * p.HOOD_SKELETON_RIB_HEIGHT)
+
+
+@pytest.mark.parametrize("overrides", [
+    {"HOOD_STYLE": "minimal"},
+    {"HOOD_STYLE": "full"},
+    {"HOOD_STYLE": "skeleton"},
+    {"HOOD_STYLE": "skeleton", "HOOD_SKELETON_RIB_COUNT": 6},
+    {"HOOD_STYLE": "minimal", "BODY_WIDTH": 54.0},
+])
+def test_hood_volume(overrides):
+    p = params.DEFAULT.replace(**overrides)
+    steps = shapes.main_body(p)
+    hood = len(shapes.hood(p))
+    with_hood = mass_properties.moments(steps).volume
+    without = mass_properties.moments(steps[:-hood]).volume
+    assert with_hood - without == pytest.approx(hood_volume(p), rel=1e-9)
+
+
+def test_component_volumes_add_up():
+    p = params.DEFAULT
+    found = mass_properties.component_moments(p)
+    assert set(found) == {"OKP_MainBody", "Picatinny_Mount"}
+    total = sum(m.volume for m in found.values())
+    assert mass_properties.estimate(p).volume == pytest.approx(total)
+    assert mass_properties.masses(p)["asa"] == pytest.approx(total * p.ASA_DENSITY / 1000)
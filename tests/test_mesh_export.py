@@ -0,0 +1,71 @@
+"""STL and 3MF exports read back to the same closed meshes"""
+
+import struct
+import xml.etree.ElementTree as ET
+import zipfile
+
+import pytest
+
+from fusion360 import headless
+from fusion360 import parameters as params
+
+headless.install()
+
+from fusion360 import main_body, mesh_export, picatinny_mount  # noqa: E402 (needs the adsk stand-in)
+
+NS = {"m": "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"}
+
+
+def signed_volume(triangles):
+    """Volume enclosed by (a, b, c) triangles, mm^3"""
+    total = 0.0
+    for a, b, c in triangles:
+        total += (a[0] * (b[1] * c[2] - b[2] * c[1]) - a[1] * (b[0] * c[2] - b[2] * c[0])
+                  + a[2] * (b[0] * c[1] - b[1] * c[0])) / 6
+    return total
+
+
+def read_stl(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    count, = struct.unpack_from("<I", data, 80)
+    assert len(data) == 84 + 50 * count
+    triangles = []
+    for t in range(count):
+        values = struct.unpack_from("<12fH", data, 84 + 50 * t)
+        triangles.append((values[3:6], values[6:9], values[9:12]))
+    return triangles
+
+
+def read_3mf(path):
+    """{object name: triangles}"""
+    with zipfile.ZipFile(path) as package:
+        assert "[Content_Types].xml" in package.namelist()
+        model = ET.fromstring(package.read("3D/3dmodel.model"))
+    found = {}
+    for obj in model.iterfind(".//m:object", NS):
+        vertices = [tuple(float(v.get(axis)) for axis in "xyz") for v in obj.iterfind(".//m:vertex", NS)]
+        found[obj.get("name")] = [tuple(vertices[int(t.get(k))] for k in ("v1", "v2", "v3"))
+                                  for t in obj.iterfind(".//m:triangle", NS)]
+    return found
+
+
+def test_round_trip(tmp_path):
+    design = headless.new_session().activeProduct
+    main_body.build(design.rootComponent, params.DEFAULT)
+    picatinny_mount.build(design.rootComponent, params.DEFAULT)
+    stl, package = mesh_export.export_component(design.rootComponent, str(tmp_path), "OKP", "low")
+
+    from_stl = read_stl(stl)
+    objects = read_3mf(package)
+    assert sorted(objects) == ["OKP_Body", "OKP_Mount"]
+    from_3mf = objects["OKP_Body"] + objects["OKP_Mount"]
+    assert len(from_stl) == len(from_3mf)
+    # 3MF keeps 4 decimals, STL single precision
+    for a, b in zip(from_stl, from_3mf):
+        assert [c for vertex in a for c in vertex] == pytest.approx([c for vertex in b for c in vertex], abs=1e-3)
+
+    # Closed and outward-facing: the meshes enclose the bodies (the stand-in meshes on a voxel grid)
+    volume = sum(body.volume for comp in design.allComponents for body in comp.bRepBodies) * 1000
+    assert signed_volume(from_stl) == pytest.approx(volume, rel=0.05)
+    assert signed_volume(from_3mf) == pytest.approx(signed_volume(from_stl), rel=1e-6)
@@ -0,0 +1,51 @@
+"""Profiles are picked by geometry, whatever order their outlines were drawn in"""
+
+import math
+
+import pytest
+
+from fusion360 import headless
+
+headless.install()
+
+import adsk.core  # noqa: E402 (the stand-in)
+from fusion360 import profile_select  # noqa: E402
+
+
+def point(u, v):
+    return adsk.core.Point3D.create(u, v, 0)
+
+
+def window_and_hole(reverse):
+    """A 6 x 4 cm plate with a 2 x 2 cm window at (0, 0) and a separate 1 cm radius disc at (10, 0)"""
+    comp = headless.new_session().activeProduct.rootComponent
+    sketch = comp.sketches.add(comp.xYConstructionPlane)
+    draw = [
+        lambda: sketch.sketchCurves.sketchLines.addTwoPointRectangle(point(-3, -2), point(3, 2)),
+        lambda: sketch.sketchCurves.sketchLines.addTwoPointRectangle(point(-1, -1), point(1, 1)),
+        lambda: sketch.sketchCurves.sketchCircles.addByCenterRadius(point(10, 0), 1.0),
+    ]
+    for step in reversed(draw) if reverse else draw:
+        step()
+    return profile_select.SketchProfiles(sketch)
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_select_by_geometry(reverse):
+    found = window_and_hole(reverse)
+    assert len(found) == 3
+    ring = found.one(profile_select.is_ring)
+    window = found.one(profile_select.contains(0, 0))
+    disc = found.nearest(profile_select.by_area(math.pi), profile_select.is_solid)
+    assert ring.areaProperties().area == pytest.approx(24 - 4)
+    assert window.areaProperties().area == pytest.approx(4)
+    assert disc.areaProperties().area == pytest.approx(math.pi, rel=1e-3)
+    assert found.one(profile_select.contains(2, 1.5)) is ring
+    assert found.select(profile_select.is_solid, profile_select.excludes(10, 0)) == [window]
+    with pytest.raises(ValueError):
+        found.one(profile_select.is_solid)
+
+
+def test_order_is_stable():
+    areas = [[round(info.area, 6) for info in window_and_hole(reverse).infos] for reverse in (False, True)]
+    assert areas[0] == areas[1]
@@ -0,0 +1,57 @@
+"""regen.regenerate rebuilds only the stale stages and ends where a fresh build does"""
+
+import pytest
+
+from fusion360 import headless
+from fusion360 import parameters as params
+
+headless.install()
+
+from fusion360 import regen  # noqa: E402 (needs the adsk stand-in)
+
+
+def shapes(design):
+    """{component name: (volume cm^3, bounding box cm)} of every component with bodies"""
+    found = {}
+    for comp in design.allComponents:
+        bodies = list(comp.bRepBodies)
+        if bodies:
+            boxes = [body.boundingBox for body in bodies]
+            lo = [min(box.minPoint.asArray()[i] for box in boxes) for i in range(3)]
+            hi = [max(box.maxPoint.asArray()[i] for box in boxes) for i in range(3)]
+            found[comp.name] = (sum(body.volume for body in bodies), lo + hi)
+    return found
+
+
+def regenerate(design, p):
+    return {report["generator"]: report for report in
+            (regen.regenerate(design, generator, p) for generator in regen.GENERATORS)}
+
+
+def fresh(p):
+    design = headless.new_session().activeProduct
+    regenerate(design, p)
+    return shapes(design)
+
+
+def assert_same(found, expected):
+    assert set(found) == set(expected)
+    for name, (volume, box) in expected.items():
+        assert found[name][0] == pytest.approx(volume, rel=1e-9), name
+        assert found[name][1] == pytest.approx(box, abs=1e-9), name
+
+
+@pytest.mark.parametrize("edits, rebuilt", [
+    ({"HOOD_STYLE": "full"}, {"main_body": ["hood"], "picatinny_mount": []}),
+    ({"MOUNT_LENGTH": 120.0}, {"main_body": [], "picatinny_mount": ["base", "rail_slots", "cross_bolt"]}),
+])
+def test_only_stale_stages_rebuild(edits, rebuilt):
+    design = headless.new_session().activeProduct
+    regenerate(design, params.DEFAULT)
+    assert all(not report["rebuilt"] for report in regenerate(design, params.DEFAULT).values())
+
+    p = params.DEFAULT.replace(**edits)
+    reports = regenerate(design, p)
+    assert {name: report["rebuilt"] for name, report in reports.items()} == rebuilt
+    assert sorted(name for report in reports.values() for name in report["changed"]) == sorted(edits)
+    assert_same(shapes(design), fresh(p))
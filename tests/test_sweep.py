@@ -0,0 +1,68 @@
+"""Sweep axes and a small sweep over an integer axis"""
+
+import json
+
+import pytest
+
+from fusion360 import headless
+from fusion360 import sweep
+
+headless.install()  # evaluate builds in-process
+
+
+def test_parse_range_keeps_ints():
+    name, values = sweep.parse_range("HOOD_SKELETON_RIB_COUNT=2:5:1")
+    assert name == "HOOD_SKELETON_RIB_COUNT"
+    assert values == [2, 3, 4, 5]
+    assert all(type(value) is int for value in values)
+
+
+def test_parse_range_floats():
+    assert sweep.parse_range("TOTAL_LENGTH=150:160:2.5") == ("TOTAL_LENGTH", [150.0, 152.5, 155.0, 157.5, 160.0])
+
+
+@pytest.mark.parametrize("spec", ["A=1:2", "A=1:x:1", "A=1:2:0"])
+def test_parse_range_rejects(spec):
+    with pytest.raises(ValueError):
+        sweep.parse_range(spec)
+
+
+def test_sweep_int_axis(tmp_path):
+    axes = [("HOOD_STYLE", ["skeleton"]), sweep.parse_range("HOOD_SKELETON_RIB_COUNT=2:4:1")]
+    out = tmp_path / "sweep.jsonl"
+    summary = sweep.run_sweep(axes, str(out), workers=1, batch_size=2)
+    assert summary["variants"] == summary["valid"] == 3
+
+    rows = sorted((json.loads(line) for line in out.read_text().splitlines()), key=lambda row: row["index"])
+    assert [row["overrides"]["HOOD_SKELETON_RIB_COUNT"] for row in rows] == [2, 3, 4]
+    assert all(row["error"] is None for row in rows)
+    # Every extra rib adds the same block
+    volumes = [row["volume_mm3"] for row in rows]
+    assert volumes[2] - volumes[1] == pytest.approx(volumes[1] - volumes[0], rel=1e-9)
+    assert volumes[1] > volumes[0]
+
+
+def test_columns_cover_rows():
+    names = [name for name, _ in sweep.columns(cache=True, walls=True)]
+    failed = sweep.evaluate(0, {"NOT_A_PARAMETER": 1})
+    built = sweep.evaluate(1, {}, walls=True)
+    assert failed["error"].startswith("KeyError") and built["valid"]
+    assert set(failed) < set(built) <= set(names)
+
+
+def test_parquet_failed_row_first(tmp_path):
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    rows = [sweep.evaluate(0, {"NOT_A_PARAMETER": 1}), sweep.evaluate(1, {})]
+    out = str(tmp_path / "sweep.parquet")
+    # One row per group: the failed row alone must not decide the schema
+    writer = sweep.ParquetWriter(out, row_group_size=1)
+    for row in rows:
+        writer.write([row])
+    writer.close()
+
+    table = pyarrow_parquet.read_table(out)
+    assert table.schema == sweep.parquet_schema()
+    read = table.to_pylist()
+    assert read[0]["error"].startswith("KeyError") and read[0]["volume_mm3"] is None
+    assert read[1]["error"] is None and read[1]["volume_mm3"] == pytest.approx(rows[1]["volume_mm3"])
+    assert read[1]["bbox_mm"] == pytest.approx(rows[1]["bbox_mm"])
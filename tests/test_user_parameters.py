@@ -0,0 +1,33 @@
+"""Editing a linked user parameter matches a fresh build of the edited values"""
+
+import pytest
+
+from fusion360 import headless
+from fusion360 import parameters as params
+
+headless.install()
+
+from fusion360 import user_parameters  # noqa: E402 (needs the adsk stand-in)
+
+
+@pytest.mark.parametrize("base, edits", [
+    ({}, {"MOUNT_LENGTH": 120.0}),
+    ({}, {"BODY_WIDTH": 56.0}),
+    ({}, {"MOUNT_LENGTH": 120.0, "MOUNT_HEIGHT_OFFSET": 14.0, "BODY_WIDTH": 56.0}),
+    ({"HOOD_STYLE": "skeleton"}, {"HOOD_SKELETON_RIB_HEIGHT": 20.0}),
+    ({"HOOD_STYLE": "full"}, {"HOOD_FULL_HEIGHT": 30.0}),
+])
+def test_edit_matches_rebuild(base, edits):
+    p = params.DEFAULT.replace(**base)
+    design = user_parameters.build_linked(p)
+    for name, value in edits.items():
+        parameter = design.userParameters.itemByName(name)
+        assert parameter is not None, f"{name} is not published"
+        parameter.expression = f"{value:.10g} {user_parameters.unit(name)}".strip()
+
+    edited = user_parameters.volumes(design)
+    rebuilt = user_parameters.volumes(user_parameters.build_linked(p.replace(**edits)))
+    assert set(edited) == set(rebuilt)
+    for name, volume in rebuilt.items():
+        assert edited[name] == pytest.approx(volume, rel=1e-6), name
+    assert edited != user_parameters.volumes(user_parameters.build_linked(p))